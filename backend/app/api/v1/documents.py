@@ -10,13 +10,16 @@ from app.db.session import get_db
 from app.schemas.document import (
     DocumentCreate,
     DocumentResponse,
+    DocumentUploadResponse,
     DocumentListResponse,
+    ProcessingEstimate,
     DocumentUpdate,
     BlockUpdate,
     BlockResponse,
     OCRModeRecommendation,
+    DocumentProgress,
 )
-from app.services import document_service, ocr_service, export_service
+from app.services import document_service, ocr_service, export_service, progress_service, latency_service
 from app.models.document import OCRMode, Importance, DocumentStatus
 
 
@@ -101,7 +104,28 @@ async def get_processing_queue(
     )
 
 
-@router.post("", response_model=DocumentResponse, status_code=201)
+@router.get("/progress", response_model=List[DocumentProgress])
+def get_documents_progress(
+    ids: List[int] = Query(..., max_length=200, description="문서 ID 목록"),
+):
+    """
+    문서별 페이지 처리 진행 상황 및 예상 남은 시간 (Redis만 조회, DB 미사용)
+
+    진행 기록이 없는 문서(처리 시작 전, 완료 후 만료)는 결과에서 제외
+    """
+    return list(progress_service.get_progress(ids).values())
+
+
+@router.get("/{document_id}/progress", response_model=DocumentProgress)
+def get_document_progress(document_id: int):
+    """문서 페이지 처리 진행 상황 및 예상 남은 시간 (Redis만 조회, DB 미사용)"""
+    progress = progress_service.get_progress([document_id]).get(document_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="No progress for document")
+    return progress
+
+
+@router.post("", response_model=DocumentUploadResponse, status_code=201)
 async def upload_document(
     file: UploadFile = File(...),
     title: Optional[str] = Form(None),
@@ -109,9 +133,13 @@ async def upload_document(
     doc_type: Optional[str] = Form(None),
     importance: Importance = Form(Importance.MEDIUM),
     ocr_mode: OCRMode = Form(OCRMode.AUTO),
+    deadline_seconds: Optional[int] = Form(
+        None, ge=1, description="문서 처리 제한 시간 (초). AUTO는 이 안에 끝나는 가장 정확한 모드 선택",
+    ),
+    urgent: bool = Form(False, description="긴급 처리 (중요도와 무관하게 최우선 대기열)"),
     db: Session = Depends(get_db),
 ):
-    """문서 업로드 및 OCR 처리 시작"""
+    """문서 업로드 및 OCR 처리 시작 (처리 이력 기반 예상 완료 시간 포함)"""
     if not title:
         title = file.filename
 
@@ -121,10 +149,16 @@ async def upload_document(
         doc_type=doc_type,
         importance=importance,
         ocr_mode=ocr_mode,
+        deadline_seconds=deadline_seconds,
+        urgent=urgent,
     )
 
     document = await document_service.create_document(db, file, doc_create)
-    return document
+    response = DocumentUploadResponse.model_validate(document)
+    estimate = latency_service.estimate_document(document, deadline_seconds)
+    if estimate:
+        response.estimate = ProcessingEstimate(**estimate)
+    return response
 
 
 @router.get("", response_model=DocumentListResponse)
@@ -192,10 +226,24 @@ async def recommend_ocr_mode(document_id: int, db: Session = Depends(get_db)):
 async def reprocess_document(
     document_id: int,
     ocr_mode: Optional[OCRMode] = Query(None),
+    deadline_seconds: Optional[int] = Query(None, ge=1, description="정밀 OCR 문서 처리 제한 시간 (초)"),
+    urgent: bool = Query(False, description="긴급 처리 (중요도와 무관하게 최우선 대기열)"),
     db: Session = Depends(get_db),
 ):
     """OCR 재처리"""
-    document = await document_service.reprocess_document(db, document_id, ocr_mode)
+    document = await document_service.reprocess_document(db, document_id, ocr_mode, deadline_seconds, urgent)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+
+@router.post("/{document_id}/cancel", response_model=DocumentResponse)
+async def cancel_document(
+    document_id: int,
+    db: Session = Depends(get_db),
+):
+    """OCR 처리 취소 (대기 작업 제거, 실행 중인 작업은 다음 페이지 전에 중단)"""
+    document = await document_service.cancel_document(db, document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     return document
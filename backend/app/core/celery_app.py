@@ -1,12 +1,14 @@
 from celery import Celery
 
 from app.core.config import settings
+from app.services.priority_service import PRIORITY_STEPS, PRIORITY_SEP
 
 celery_app = Celery(
     "pbt_ocr_worker",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=["app.workers.tasks"],
+    # work_stealing: 주 큐가 빈 동안 보조 큐를 소비하는 워커 소비자 bootstep 등록
+    include=["app.workers.tasks", "app.workers.work_stealing"],
 )
 
 celery_app.conf.update(
@@ -16,13 +18,45 @@ celery_app.conf.update(
     timezone="Asia/Seoul",
     enable_utc=True,
     task_track_started=True,
+    # OCR 태스크는 완료 후 ack (acks_late) - 긴 태스크가 다른 워커에 중복 전달되지 않도록
+    # 가시성 제한 시간을 늘리고, 워커가 미리 가져가 묶어두는 메시지를 1개로 제한
+    # 우선순위(중요도/긴급 요청)별 리스트를 나눠 높은 우선순위(낮은 숫자)부터 처리
+    broker_transport_options={
+        "visibility_timeout": settings.CELERY_VISIBILITY_TIMEOUT_SECONDS,
+        "priority_steps": PRIORITY_STEPS,
+        "sep": PRIORITY_SEP,
+        "queue_order_strategy": "priority",
+    },
+    worker_prefetch_multiplier=1,
+    # --autoscale로 실행한 워커는 큐 깊이/CPU/메모리/페이지 처리 시간으로 프로세스 수를 조정하고
+    # prefetch를 현재 프로세스 수 x 큐별 배수로 유지 (OCR_WORKER_PREFETCH_MULTIPLIER)
+    worker_autoscaler="app.workers.autoscaler:OCRAutoscaler",
     task_default_queue="fast_ocr",
     # 큐 라우팅은 document_service에서 동적으로 처리
     # fast_ocr: Tesseract 기반 빠른 처리
     # accurate_ocr: PaddleOCR 딥러닝 기반
     # precision_ocr: Chandra VLM 기반
     task_routes={
+        # AUTO 문서 모드 결정은 CPU만 쓰므로 fast_ocr 워커에서 처리 후 모드별 큐로 재등록
+        "classify_document": {"queue": "fast_ocr"},
         "cleanup_document_files": {"queue": "fast_ocr"},
         "generate_embeddings": {"queue": "fast_ocr"},
+        # 분할 처리 서브태스크(process_page_range)는 OCR 모드별 큐로 직접 지정
+        "finalize_document": {"queue": "fast_ocr"},
+        "mark_document_failed": {"queue": "fast_ocr"},
+        "age_ocr_queues": {"queue": "fast_ocr"},
+        "dispatch_ocr_queues": {"queue": "fast_ocr"},
+    },
+    beat_schedule={
+        # 낮은 우선순위 작업이 계속 밀리지 않도록 오래 대기한 메시지를 주기적으로 한 단계씩 올림
+        "age-ocr-queues": {
+            "task": "age_ocr_queues",
+            "schedule": float(settings.OCR_PRIORITY_AGING_SECONDS),
+        },
+        # 공정 분배 대기열: 만료된 슬롯 회수 후 dispatch (평소에는 작업 등록/완료 시 바로 dispatch)
+        "dispatch-ocr-queues": {
+            "task": "dispatch_ocr_queues",
+            "schedule": 30.0,
+        },
     },
 )
@@ -31,12 +31,80 @@ class Settings(BaseSettings):
     OCR_PRECISION_THRESHOLD: int = 60
     OCR_DEFAULT_MODE: str = "auto"
     OCR_HIGH_RES_DPI: int = 300
+    # AUTO 모드 사전 분석: 샘플 페이지(첫/가운데)를 저해상도로 렌더링해 스캔/표/다단 감지
+    OCR_PREANALYSIS_SAMPLE_PAGES: int = 2
+    OCR_PREANALYSIS_DPI: int = 100
+    OCR_QUALITY_THRESHOLD: float = 0.75  # 사전 분석 품질 점수가 이보다 낮은 스캔본은 정밀 OCR
+    # 엔진별 페이지당 처리 시간 기본값 (처리 이력이 쌓이기 전 완료 시간 예측에 사용, 초)
+    OCR_DEFAULT_PAGE_SECONDS: str = "fast=1.5,accurate=4,precision=20"
+
+    # 정밀 OCR 캐스케이드: Tesseract로 먼저 읽고 아래 기준을 못 넘는 페이지만 VLM으로 전송
+    OCR_PRECISION_CASCADE: bool = False
+    OCR_CASCADE_MIN_CONFIDENCE: float = 0.85  # 평균 단어 신뢰도 (0~1)
+    OCR_CASCADE_MAX_COMPLEXITY: float = 0.3  # 레이아웃 복잡도 (0~1, 다단/표/저신뢰 단어)
+    # 정밀 OCR 제한 시간 (0이면 제한 없음). 초과 페이지는 대체 엔진으로 처리 후 REVIEW 상태
+    # 페이지는 VLM 요청 전송 시점부터, 문서는 등록 시점부터 (재시도해도 유지)
+    OCR_PRECISION_PAGE_DEADLINE_SECONDS: int = 300
+    OCR_PRECISION_DOCUMENT_DEADLINE_SECONDS: int = 3600
+    # 모드별 페이지 단위 대체 엔진 순서 (엔진 오류/제한 시간 초과 페이지를 다음 엔진으로 다시 처리, CPU 엔진만 대체 가능)
+    OCR_FALLBACK_CHAINS: str = "precision=accurate>fast,accurate=fast"
+    # 대용량 PDF 분할 처리: 서브태스크당 페이지 수 (0이면 분할하지 않음)
+    OCR_FANOUT_PAGES_PER_TASK: int = 16
+    # OCR 태스크 재시도 (완료된 페이지는 건너뛰고 이어서 처리)
+    OCR_TASK_MAX_RETRIES: int = 3
+    OCR_TASK_RETRY_DELAY_SECONDS: int = 30
+    OCR_PAGE_WRITE_BATCH: int = 10  # CPU 엔진 페이지 일괄 저장/커밋 단위 (재처리 체크포인트 단위)
+    # 문서별 처리 임대 TTL (처리 중에는 1/3 주기로 연장, 워커가 죽으면 이 시간 뒤에 다른 태스크가 이어서 처리)
+    OCR_DOCUMENT_LEASE_SECONDS: int = 60
+    # 이 시간 이상 대기한 OCR 작업은 우선순위를 한 단계 올림 (aging 주기, 초, 부서 대기열도 같은 기준)
+    OCR_PRIORITY_AGING_SECONDS: int = 300
+    # 부서별 공정 분배: 부서 대기열에서 가중치 순으로 큐별 dispatch window만큼만 Celery 큐로 보냄
+    OCR_FAIR_SHARE_ENABLED: bool = True
+    OCR_FAIR_SHARE_DISPATCH_WINDOW: str = "fast_ocr=6,accurate_ocr=3,precision_ocr=2"  # 큐별 미완료 작업 상한
+    OCR_FAIR_SHARE_DEFAULT_DISPATCH_WINDOW: int = 4
+    OCR_FAIR_SHARE_WEIGHTS: str = ""  # "재무팀=2,법무팀=3" (미지정 부서는 기본 가중치)
+    OCR_FAIR_SHARE_DEFAULT_WEIGHT: float = 1.0
+    OCR_FAIR_SHARE_MAX_INFLIGHT: str = ""  # "스캔센터=2" 부서별 최대 동시 처리 작업 수
+    OCR_FAIR_SHARE_DEFAULT_MAX_INFLIGHT: int = 0  # 0이면 제한 없음 (dispatch window 안에서 가중치로만 분배)
+    # 작업 완료 후 ack하므로 가장 긴 문서 처리 시간보다 길어야 중복 전달되지 않음
+    CELERY_VISIBILITY_TIMEOUT_SECONDS: int = 21600
+    # 워커 autoscale (--autoscale=최대,최소 범위 안에서 프로세스 수 조정, app/workers/autoscaler.py)
+    OCR_AUTOSCALE_INTERVAL_SECONDS: float = 5.0  # 큐 깊이/자원 사용량 측정 최소 간격
+    OCR_AUTOSCALE_CPU_TARGET: float = 0.85  # 워커 프로세스 CPU 사용량 합계 목표 (코어 수 대비)
+    OCR_AUTOSCALE_MIN_FREE_MEMORY_MB: int = 1024  # 증설 후에도 남겨둘 가용 메모리
+    OCR_AUTOSCALE_MAX_SLOWDOWN: float = 2.0  # 페이지 처리 시간이 유휴 시 대비 이 배수 이상이면 증설 중단
+    OCR_WORKER_PREFETCH_MULTIPLIER: str = "fast_ocr=2,accurate_ocr=1,precision_ocr=1"  # 큐별 프로세스당 prefetch
+    # 작업 가져가기: 주 큐가 비어 있으면 보조 큐도 소비하고 주 큐에 작업이 들어오면 반환 (app/workers/work_stealing.py)
+    # "주 큐=보조 큐>보조 큐" 형식 (예: "accurate_ocr=fast_ocr,precision_ocr=fast_ocr"), 기본은 사용 안 함
+    # 워커에 엔진이 없는 큐는 설정해도 가져가지 않음
+    OCR_WORK_STEALING: str = ""
+    OCR_WORK_STEALING_INTERVAL_SECONDS: float = 2.0  # 주/보조 큐 깊이 확인 주기
 
     # VLM Settings (for GPU-based Precision OCR)
     VLM_API_BASE: str = "http://localhost:8080/v1"
+    # 여러 vLLM 레플리카 (쉼표 구분, "url;weight=2" 형식으로 가중치 지정). 설정 시 VLM_API_BASE 대신 사용
+    VLM_API_BASES: str = ""
+    VLM_HEALTH_PROBE_SECONDS: float = 30.0  # 엔드포인트 주기적 헬스 체크 간격, 0이면 제외된 엔드포인트만 검사
+    VLM_CONCURRENCY: int = 2  # 워커 프로세스당 동시 페이지 요청 수
+    VLM_ADAPTIVE_MAX_TOKENS: bool = True  # 페이지 텍스트 밀도로 max_tokens 추정
+    VLM_MAX_CONTINUATIONS: int = 2  # max_tokens에서 잘린 출력 이어받기 최대 횟수
+    VLM_PACK_MAX_IMAGES: int = 1  # 소형 페이지(영수증/전표 등) 묶음 요청 최대 수, 1이면 사용 안 함
+    VLM_IMAGE_TRANSPORT: str = "inline"  # inline | minio | file
+    VLM_IMAGE_SHARED_DIR: str = "/shared/vlm-images"  # file 모드 공유 볼륨 경로
+    VLM_IMAGE_URL_TTL_SECONDS: int = 300  # minio 모드 사전 서명 URL 만료
+    # 워커 간 공유 동시 요청 제한 (vLLM /metrics 기반 자동 조정)
+    VLM_ADMISSION_CONTROL: bool = True
+    VLM_ADMISSION_INITIAL_LIMIT: int = 4  # 레플리카당 초기 동시 요청 한도
+    VLM_ADMISSION_MIN_LIMIT: int = 1
+    VLM_ADMISSION_MAX_LIMIT: int = 32
+    VLM_ADMISSION_KV_HIGH: float = 0.9  # 이 이상 KV 캐시 사용률이면 한도 감소
+    VLM_ADMISSION_ADJUST_SECONDS: float = 2.0  # 한도 조정 주기
     VLM_MODEL_NAME: str = "qwen3-vl"
     VLM_MAX_TOKENS: int = 8192
     VLM_TIMEOUT: int = 120  # seconds
+    VLM_RENDER_DPI: int = 200  # PDF 렌더링 해상도 (모델 입력 크기는 토큰 예산으로 조정)
+    VLM_MAX_IMAGE_TOKENS: int = 1536  # 이미지당 비전 토큰 예산 (컨텍스트 4096 - 출력 - 프롬프트)
+    VLM_MAX_TILES: int = 4  # 고밀도 페이지 최대 타일 분할 수 (1 = 분할 안 함)
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,32 @@
+"""
+VLM 엔드포인트 설정 파싱
+
+시스템 상태 API(vlm_stats_service)와 정밀 OCR 워커(workers/precision_ocr/processor.py)가
+같은 해석을 쓰도록 공유하는 파서. 워커 단독 실행 스크립트에서도 쓰이므로 외부 패키지에 의존하지 않는다.
+"""
+from typing import Iterable, List, Tuple, Union
+
+MIN_WEIGHT = 0.01
+
+
+def parse_endpoint_spec(spec: Union[str, Iterable[str]]) -> List[Tuple[str, float]]:
+    """
+    엔드포인트 설정 파싱
+
+    "http://gpu1:8000/v1;weight=2,http://gpu2:8000/v1" 형식의 문자열 또는 리스트
+
+    Returns:
+        (api_base, weight) 리스트 (끝의 "/" 제거, 가중치 기본 1.0)
+    """
+    entries = spec.split(",") if isinstance(spec, str) else list(spec)
+    endpoints = []
+    for entry in entries:
+        entry = entry.strip()
+        if not entry:
+            continue
+        url, _, options = entry.partition(";")
+        weight = 1.0
+        if options.strip().startswith("weight="):
+            weight = float(options.strip()[len("weight="):])
+        endpoints.append((url.strip().rstrip("/"), max(weight, MIN_WEIGHT)))
+    return endpoints
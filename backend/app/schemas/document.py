@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 from pydantic import BaseModel, Field
 
 from app.models.document import OCRMode, DocumentStatus, Importance, BlockType
@@ -60,7 +60,10 @@ class DocumentBase(BaseModel):
 
 
 class DocumentCreate(DocumentBase):
-    pass
+    # 정밀 OCR 문서 처리 제한 시간 (초, 저장하지 않고 처리 태스크에만 전달)
+    deadline_seconds: Optional[int] = Field(None, ge=1)
+    # 긴급 처리 요청 (저장하지 않고 큐 우선순위에만 반영)
+    urgent: bool = False
 
 
 class DocumentUpdate(BaseModel):
@@ -91,6 +94,25 @@ class DocumentResponse(DocumentBase):
         from_attributes = True
 
 
+class ModeEstimate(BaseModel):
+    queue_wait_seconds: float
+    processing_seconds: float
+    total_seconds: float
+    samples: int = 0  # 예측에 쓴 처리 이력 표본 수 (0이면 기본 페이지당 시간)
+
+
+class ProcessingEstimate(BaseModel):
+    ocr_mode: OCRMode  # 예상 처리 모드 (AUTO는 분류 단계에서 확정)
+    estimated_seconds: float
+    deadline_seconds: Optional[int] = None
+    meets_deadline: Optional[bool] = None
+    modes: Dict[str, ModeEstimate]
+
+
+class DocumentUploadResponse(DocumentResponse):
+    estimate: Optional[ProcessingEstimate] = None
+
+
 class DocumentListResponse(BaseModel):
     total: int
     page: int
@@ -102,3 +124,16 @@ class OCRModeRecommendation(BaseModel):
     recommended_mode: OCRMode
     precision_score: int
     reasons: List[str]
+    features: Optional[dict] = None  # 사전 분석 페이지 특징 (분류 전이면 None)
+
+
+class DocumentProgress(BaseModel):
+    document_id: int
+    stage: str
+    pages_done: int
+    pages_total: Optional[int] = None
+    percent: Optional[float] = None
+    avg_page_seconds: Optional[float] = None
+    elapsed_seconds: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    updated_at: Optional[float] = None
@@ -37,6 +37,45 @@ class GPUStatus(BaseModel):
     status: str  # "available", "busy", "unavailable"
 
 
+class VLMEndpointStatus(BaseModel):
+    """VLM 레플리카 엔드포인트 상태 (워커 집계 통계)"""
+    api_base: str
+    weight: float = 1.0
+    status: str  # "healthy", "ejected", "unknown"
+    in_flight: int = 0
+    requests: int = 0
+    errors: int = 0
+    error_rate: float = 0.0
+    latency_ms_avg: Optional[float] = None
+    last_error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    # 전역 동시 요청 제어 (vLLM /metrics 기반)
+    admission_limit: Optional[int] = None
+    admission_in_use: int = 0
+    vllm_running: Optional[float] = None
+    vllm_waiting: Optional[float] = None
+    kv_cache_usage: Optional[float] = None
+
+
+class QueueWaitStatus(BaseModel):
+    """우선순위 등급별 큐 대기 시간 (최근 표본 기준)"""
+    priority_class: str  # "urgent", "high", "medium", "low"
+    priority: int
+    samples: int = 0
+    avg_seconds: Optional[float] = None
+    p50_seconds: Optional[float] = None
+    p95_seconds: Optional[float] = None
+    max_seconds: Optional[float] = None
+
+
+class FairShareTenantStatus(BaseModel):
+    """공정 분배 대기열 부서별 상태"""
+    queue_name: str
+    tenant: str
+    pending: int = 0
+    inflight: int = 0
+
+
 class StorageStatus(BaseModel):
     """스토리지 상태"""
     name: str
@@ -53,4 +92,7 @@ class SystemStatusResponse(BaseModel):
     services: List[ServiceStatus]
     workers: List[WorkerQueueStatus]
     gpu: Optional[List[GPUStatus]] = None
+    vlm_endpoints: Optional[List[VLMEndpointStatus]] = None
+    queue_wait: Optional[List[QueueWaitStatus]] = None
+    fair_share: Optional[List[FairShareTenantStatus]] = None
     storage: Optional[StorageStatus] = None
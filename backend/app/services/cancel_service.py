@@ -0,0 +1,85 @@
+"""
+OCR 처리 취소 서비스
+
+취소 요청 시 대기 중인 작업은 공정 분배 대기열에서 빼고 Celery 큐에 들어간 태스크는 revoke하며,
+이미 실행 중인 태스크는 페이지 처리 루프가 페이지마다 취소 표시를 확인해 다음 페이지 전에 중단한다
+(워커, GPU, VLM 연결은 한 페이지 안에 반환됨).
+
+- ocr:cancel:{id}   취소 표시 (실행 중인 모든 서브태스크가 확인할 수 있도록 재처리 요청 전까지 유지)
+- ocr:tasks:{id}    문서의 OCR 태스크 ID 집합 (Celery 큐로 보낼 때 기록, revoke 대상)
+"""
+from typing import List
+
+import redis
+
+from app.core.config import settings
+
+CANCEL_KEY_PREFIX = "ocr:cancel"
+TASKS_KEY_PREFIX = "ocr:tasks"
+CANCEL_TTL_SECONDS = 24 * 3600
+TASKS_TTL_SECONDS = 7 * 24 * 3600
+
+CANCEL_MESSAGE = "사용자 요청으로 OCR 처리가 취소되었습니다"
+
+
+class DocumentCancelled(Exception):
+    """처리 중 문서가 취소됨 (페이지 처리 루프에서 발생, 태스크가 재시도하지 않고 종료)"""
+
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def request_cancel(document_id: int) -> None:
+    """취소 표시 (Redis 오류는 호출자가 처리)"""
+    _redis().set(f"{CANCEL_KEY_PREFIX}:{document_id}", 1, ex=CANCEL_TTL_SECONDS)
+
+
+def is_cancelled(document_id: int) -> bool:
+    """취소 여부 (Redis 오류면 처리를 계속하도록 False)"""
+    try:
+        return bool(_redis().exists(f"{CANCEL_KEY_PREFIX}:{document_id}"))
+    except redis.RedisError:
+        return False
+
+
+def check(document_id: int) -> None:
+    """취소되었으면 DocumentCancelled 발생 (페이지 처리 루프에서 페이지마다 호출)"""
+    if is_cancelled(document_id):
+        raise DocumentCancelled(CANCEL_MESSAGE)
+
+
+def clear(document_id: int) -> None:
+    """취소 표시와 태스크 ID 기록 삭제 (재처리 요청, 문서 삭제 시)"""
+    try:
+        _redis().delete(f"{CANCEL_KEY_PREFIX}:{document_id}", f"{TASKS_KEY_PREFIX}:{document_id}")
+    except redis.RedisError:
+        pass
+
+
+def track_task(document_id: int, task_id: str) -> None:
+    """Celery로 보낸 문서 태스크 ID 기록"""
+    key = f"{TASKS_KEY_PREFIX}:{document_id}"
+    try:
+        pipe = _redis().pipeline()
+        pipe.sadd(key, task_id)
+        pipe.expire(key, TASKS_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def pop_tasks(document_id: int) -> List[str]:
+    """기록된 태스크 ID를 꺼내고 기록 삭제 (Redis 오류는 호출자가 처리)"""
+    key = f"{TASKS_KEY_PREFIX}:{document_id}"
+    pipe = _redis().pipeline()
+    pipe.smembers(key)
+    pipe.delete(key)
+    members, _ = pipe.execute()
+    return sorted(m.decode() if isinstance(m, bytes) else m for m in members)
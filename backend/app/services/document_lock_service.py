@@ -0,0 +1,129 @@
+"""
+문서별 처리 임대(lease) 및 OCR 요청 표시
+
+재처리 중복 클릭이나 Celery 재전달로 같은 문서를 두 태스크가 동시에 처리하면
+페이지 삭제/저장과 이미지 업로드가 겹쳐 작업이 두 배가 되고 결과가 섞인다.
+- 태스크는 시작할 때 문서(또는 페이지 범위) 임대를 잡고, 다른 태스크가 잡고 있으면 처리하지 않는다
+- 임대는 짧은 TTL로 잡고 처리 중에는 백그라운드 스레드가 주기적으로 연장(heartbeat)하므로
+  워커가 비정상 종료해도 TTL 뒤에 풀린다
+- 업로드/재처리 시 문서별 요청 표시를 남기고 완료/실패 시 지운다. 재처리 요청이 들어왔을 때
+  표시가 남아 있으면 새 작업을 등록하지 않고 진행 중인 요청에 합친다
+
+- ocr:lock:{name}      임대 소유자 토큰 (name: doc:{id}, doc:{id}:{첫 페이지}, classify:{id})
+- ocr:request:{id}     대기/처리 중인 OCR 요청 표시
+"""
+import threading
+import uuid
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+
+LOCK_KEY_PREFIX = "ocr:lock"
+REQUEST_KEY_PREFIX = "ocr:request"
+REQUEST_TTL_SECONDS = 24 * 3600  # 완료/실패 처리 없이 사라진 요청의 표시가 남는 최대 시간
+
+# 소유자가 같을 때만 TTL 연장
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# 소유자가 같을 때만 삭제 (TTL이 지나 다른 태스크가 잡은 임대는 유지)
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def _request_key(document_id: int) -> str:
+    return f"{REQUEST_KEY_PREFIX}:{document_id}"
+
+
+class DocumentLease:
+    """
+    Redis 임대 (SET NX PX + heartbeat 연장)
+
+    Redis 오류로 임대를 확인할 수 없으면 처리를 막지 않도록 임대 없이 진행한다.
+    """
+
+    def __init__(self, name: str, ttl_seconds: Optional[float] = None):
+        self.key = f"{LOCK_KEY_PREFIX}:{name}"
+        self.ttl_ms = int((ttl_seconds or settings.OCR_DOCUMENT_LEASE_SECONDS) * 1000)
+        self.token = uuid.uuid4().hex
+        self.held = False
+        self.lost = False
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def acquire(self) -> bool:
+        """임대 획득 (다른 태스크가 잡고 있으면 False)"""
+        try:
+            if not _redis().set(self.key, self.token, nx=True, px=self.ttl_ms):
+                return False
+        except redis.RedisError as e:
+            print(f"[WARNING] Lease {self.key} unavailable, continuing without it: {e}")
+            return True
+        self.held = True
+        self._heartbeat = threading.Thread(target=self._renew_loop, name=f"lease:{self.key}", daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def _renew_loop(self):
+        """TTL의 1/3마다 연장 (연장하지 못한 채 TTL이 지나면 다른 태스크가 임대를 잡을 수 있음)"""
+        script = _redis().register_script(_RENEW_SCRIPT)
+        while not self._stop.wait(self.ttl_ms / 3000):
+            try:
+                if not script(keys=[self.key], args=[self.token, self.ttl_ms]):
+                    self.lost = True
+                    print(f"[WARNING] Lease {self.key} expired before renewal")
+                    return
+            except redis.RedisError as e:
+                print(f"[WARNING] Failed to renew lease {self.key}: {e}")
+
+    def release(self):
+        """임대 반환 (heartbeat 중지)"""
+        if not self.held:
+            return
+        self.held = False
+        self._stop.set()
+        self._heartbeat.join(timeout=5)
+        try:
+            _redis().register_script(_RELEASE_SCRIPT)(keys=[self.key], args=[self.token])
+        except redis.RedisError:
+            pass  # TTL이 지나면 풀림
+
+
+def claim_request(document_id: int) -> bool:
+    """
+    문서 OCR 요청 표시
+
+    Returns:
+        표시를 남겼으면 True, 이미 대기/처리 중인 요청이 있으면 False (Redis 오류면 True)
+    """
+    try:
+        return bool(_redis().set(_request_key(document_id), 1, nx=True, ex=REQUEST_TTL_SECONDS))
+    except redis.RedisError:
+        return True
+
+
+def clear_request(document_id: int) -> None:
+    """문서 OCR 요청 표시 삭제 (처리 완료/실패, 등록 실패, 문서 삭제 시)"""
+    try:
+        _redis().delete(_request_key(document_id))
+    except redis.RedisError:
+        pass
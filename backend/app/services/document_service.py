@@ -4,10 +4,12 @@
 문서 CRUD, OCR 처리 요청 등
 """
 import os
+import time
 import uuid
 from typing import Optional
 from datetime import datetime
 
+import redis
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
 
@@ -15,6 +17,18 @@ from app.core.config import settings
 from app.models.document import Document, DocumentBlock, DocumentPage, DocumentStatus, OCRMode
 from app.schemas.document import DocumentCreate, DocumentUpdate, BlockUpdate, DocumentListResponse
 from app.services.storage_service import storage_service
+from app.services.page_persistence_service import delete_document_pages
+from app.services import (
+    priority_service,
+    fair_share_service,
+    page_analysis_service,
+    document_lock_service,
+    cancel_service,
+    fanout_service,
+    progress_service,
+)
+
+OCR_QUEUES = ("fast_ocr", "accurate_ocr", "precision_ocr")
 
 
 def _get_ocr_queue(ocr_mode) -> str:
@@ -25,11 +39,71 @@ def _get_ocr_queue(ocr_mode) -> str:
         "fast": "fast_ocr",
         "accurate": "accurate_ocr",
         "precision": "precision_ocr",
-        "auto": "fast_ocr",  # AUTO는 기본적으로 fast 큐로, 태스크에서 재결정
+        "auto": "fast_ocr",  # AUTO는 fast 큐의 classify_document에서 모드 결정 후 해당 큐로 재등록
     }
     return queue_mapping.get(mode_str, "fast_ocr")
 
 
+def _enqueue_document(
+    document: Document, kwargs: dict, urgent: bool = False, ocr_mode: Optional[OCRMode] = None,
+):
+    """
+    문서 OCR 태스크 등록
+
+    AUTO 문서는 classify_document로 모드를 먼저 정하고 (처리 슬롯을 차지하지 않음),
+    나머지는 모드별 큐의 process_document로 바로 등록한다.
+    ocr_mode를 주면 (이어서 처리하는 AUTO 문서) 분류 없이 그 모드의 큐로 바로 등록한다.
+    정밀 OCR 문서 제한 시각(deadline)은 여기서 한 번 정해 재시도/재등록에서도 그대로 쓴다.
+    """
+    from app.workers.tasks import enqueue_ocr
+
+    deadline_seconds = kwargs.get("deadline_seconds") or settings.OCR_PRECISION_DOCUMENT_DEADLINE_SECONDS
+    kwargs = {**kwargs, "deadline": time.time() + deadline_seconds if deadline_seconds else None}
+    ocr_mode = ocr_mode or document.ocr_mode
+    classify = ocr_mode == OCRMode.AUTO
+    job = fair_share_service.make_job(
+        "classify_document" if classify else "process_document",
+        args=[document.id],
+        kwargs=kwargs,
+        slot=None if classify else f"doc:{document.id}",
+        priority_cls=priority_service.priority_class(document.importance, urgent),
+    )
+    try:
+        enqueue_ocr(_get_ocr_queue(ocr_mode), fair_share_service.tenant_of(document), [job])
+    except Exception:
+        # 등록하지 못한 요청에 이후 재처리가 합쳐지지 않도록 요청 표시 삭제
+        document_lock_service.clear_request(document.id)
+        raise
+
+
+def _stop_processing(document: Document):
+    """
+    대기/실행 중인 OCR 작업 중단
+
+    1. 취소 표시 (실행 중인 태스크는 다음 페이지 전에 중단)
+    2. 공정 분배 대기열의 대기 작업 제거, Celery 큐에 들어간 태스크 revoke
+    3. 문서의 공정 분배 슬롯 반환, 분할 처리 기록/범위 PDF 정리
+    """
+    from app.core.celery_app import celery_app
+    from app.workers.tasks import _release_slot
+
+    try:
+        cancel_service.request_cancel(document.id)
+        if settings.OCR_FAIR_SHARE_ENABLED:
+            fair_share_service.remove_document(fair_share_service.tenant_of(document), document.id, list(OCR_QUEUES))
+        task_ids = cancel_service.pop_tasks(document.id)
+        if task_ids:
+            celery_app.control.revoke(task_ids)
+        if settings.OCR_FAIR_SHARE_ENABLED:
+            for slot in fair_share_service.document_slots(document.id, list(OCR_QUEUES)):
+                _release_slot(slot)
+        fanout_service.clear(document.id)
+    except redis.RedisError as e:
+        # 시작 전 태스크는 문서 상태를 보고 건너뛰므로 실행 중인 태스크만 끝까지 처리됨
+        print(f"[WARNING] Failed to stop OCR tasks of document {document.id}: {e}")
+    storage_service.delete_document_chunks(document.id)
+
+
 async def create_document(
     db: Session, file: UploadFile, doc_create: DocumentCreate
 ) -> Document:
@@ -61,6 +135,8 @@ async def create_document(
         doc_type=doc_create.doc_type,
         importance=doc_create.importance,
         ocr_mode=doc_create.ocr_mode,
+        # 완료 시간 예측/모드 추천용 (OCR 처리 시 다시 확인)
+        page_count=page_analysis_service.count_pages(file_content, file.content_type),
         status=DocumentStatus.PENDING,
     )
 
@@ -68,10 +144,9 @@ async def create_document(
     db.commit()
     db.refresh(document)
 
-    # Celery OCR 태스크 호출 (OCR 모드에 따라 큐 선택)
-    from app.workers.tasks import process_document
-    queue = _get_ocr_queue(doc_create.ocr_mode)
-    process_document.apply_async(args=[document.id], queue=queue)
+    # OCR 태스크 등록 (OCR 모드에 따라 큐 선택, 중요도/긴급 여부에 따라 우선순위 지정, 부서별 공정 분배)
+    document_lock_service.claim_request(document.id)
+    _enqueue_document(document, {"deadline_seconds": doc_create.deadline_seconds}, doc_create.urgent)
 
     return document
 
@@ -136,26 +211,38 @@ async def delete_document(db: Session, document_id: int) -> bool:
 
     1. MinIO에서 원본 파일 삭제
     2. MinIO에서 페이지 이미지/썸네일 삭제
-    3. DB에서 문서 삭제 (cascade로 페이지/블록도 삭제)
+    3. DB에서 페이지/블록 일괄 삭제 후 문서 삭제
     """
     document = await get_document(db, document_id)
     if not document:
         return False
 
+    # 처리 중인 문서는 태스크가 삭제된 문서를 계속 처리하지 않도록 먼저 중단
+    if document.status in (DocumentStatus.PENDING, DocumentStatus.PROCESSING):
+        _stop_processing(document)
+
     # MinIO에서 원본 파일 삭제
     storage_service.delete_file(document.file_path)
 
     # MinIO에서 페이지 이미지/썸네일 삭제
     storage_service.delete_document_files(document_id)
+    page_analysis_service.clear(document_id)
+    document_lock_service.clear_request(document_id)
 
-    # DB에서 삭제
+    # DB에서 삭제 (ORM cascade는 페이지/블록을 모두 로드해 한 행씩 삭제하므로 먼저 일괄 삭제)
+    delete_document_pages(db, document_id)
+    db.expire(document, ["pages"])
     db.delete(document)
     db.commit()
     return True
 
 
 async def reprocess_document(
-    db: Session, document_id: int, ocr_mode: Optional[OCRMode] = None
+    db: Session,
+    document_id: int,
+    ocr_mode: Optional[OCRMode] = None,
+    deadline_seconds: Optional[int] = None,
+    urgent: bool = False,
 ) -> Optional[Document]:
     """
     OCR 재처리
@@ -163,33 +250,78 @@ async def reprocess_document(
     1. 기존 페이지/블록 데이터 삭제
     2. 기존 이미지/썸네일 삭제
     3. 새로운 OCR 태스크 시작
+
+    처리 도중 실패/중단된 문서를 같은 OCR 모드로 재처리하면 저장된 페이지는 유지하고
+    첫 번째 미완료 페이지부터 이어서 처리한다. 저장된 페이지가 있는 AUTO 문서는 다시 분류하지 않고
+    그 페이지를 만든 모드(recommended_ocr_mode)로 이어서 처리해 한 문서에 엔진이 섞이지 않게 한다.
+
+    이미 대기/처리 중인 OCR 요청이 있으면 (중복 클릭 등) 페이지를 지우거나 새로 등록하지 않고
+    진행 중인 요청에 합쳐 현재 문서를 그대로 반환한다. 다른 OCR 모드로 바꾸려면 처리가 끝난 뒤 다시 요청한다.
     """
     document = await get_document(db, document_id)
     if not document:
         return None
 
-    # 기존 페이지 및 블록 삭제
-    for page in document.pages:
-        for block in page.blocks:
-            db.delete(block)
-        db.delete(page)
+    if not document_lock_service.claim_request(document_id):
+        return document
+    cancel_service.clear(document_id)
 
-    # MinIO에서 기존 이미지 삭제
-    storage_service.delete_document_files(document_id)
+    resume = (
+        document.status in (DocumentStatus.FAILED, DocumentStatus.PROCESSING)
+        and (ocr_mode is None or ocr_mode == document.ocr_mode)
+    )
+    if not resume:
+        # 기존 페이지 및 블록 삭제
+        delete_document_pages(db, document_id)
+        db.expire(document, ["pages"])
+
+        # MinIO에서 기존 이미지 삭제
+        storage_service.delete_document_files(document_id)
+        document.page_count = 0
 
     if ocr_mode:
         document.ocr_mode = ocr_mode
 
+    # 저장된 페이지를 만든 모드로 고정 (다시 분류하면 다른 모드가 나올 수 있음)
+    pinned_mode = None
+    if resume and document.ocr_mode == OCRMode.AUTO and document.recommended_ocr_mode:
+        has_pages = db.query(DocumentPage.id).filter(DocumentPage.document_id == document_id).first()
+        if has_pages:
+            pinned_mode = document.recommended_ocr_mode
+
     document.status = DocumentStatus.PENDING
     document.error_message = None
     document.processed_at = None
-    document.page_count = 0
     db.commit()
 
-    # Celery 태스크 호출 (OCR 모드에 따라 큐 선택)
-    from app.workers.tasks import process_document
-    queue = _get_ocr_queue(document.ocr_mode)
-    process_document.apply_async(args=[document.id], queue=queue)
+    # OCR 태스크 등록 (OCR 모드에 따라 큐 선택, 중요도/긴급 여부에 따라 우선순위 지정, 부서별 공정 분배)
+    _enqueue_document(document, {"deadline_seconds": deadline_seconds}, urgent, pinned_mode)
+
+    db.refresh(document)
+    return document
+
+
+async def cancel_document(db: Session, document_id: int) -> Optional[Document]:
+    """
+    OCR 처리 취소
+
+    대기/처리 중인 문서의 작업을 중단하고 취소 메시지와 함께 실패 상태로 표시한다.
+    이미 저장된 페이지는 유지되므로 같은 OCR 모드로 재처리하면 이어서 처리한다.
+    대기/처리 중이 아닌 문서는 그대로 반환한다.
+    """
+    document = await get_document(db, document_id)
+    if not document:
+        return None
+    if document.status not in (DocumentStatus.PENDING, DocumentStatus.PROCESSING):
+        return document
+
+    _stop_processing(document)
+
+    document.status = DocumentStatus.FAILED
+    document.error_message = cancel_service.CANCEL_MESSAGE
+    db.commit()
+    progress_service.finish(document_id, progress_service.STAGE_CANCELLED)
+    document_lock_service.clear_request(document_id)
 
     db.refresh(document)
     return document
@@ -0,0 +1,322 @@
+"""
+OCR 작업 공정 분배 서비스 (부서별 fair-share)
+
+문서를 Celery 큐에 바로 넣지 않고 부서(테넌트)별 대기열에 넣은 뒤, 큐마다
+처리 중인 작업이 OCR_FAIR_SHARE_DISPATCH_WINDOW개 미만일 때만 Celery로 보낸다.
+보낼 작업은 가중치 기반 공정 큐잉(start-time fair queueing)으로 고른다.
+- 부서마다 가상 시각(vtime)을 두고 가장 작은 부서의 작업을 먼저 보낸다
+- 작업을 보낼 때마다 해당 부서의 vtime이 1/가중치만큼 증가
+- 새로 대기열에 들어온 부서는 현재 시각(clock)에서 시작하므로 쉬는 동안 몫을 쌓아두지 못한다
+- 부서별 최대 동시 처리 수(OCR_FAIR_SHARE_MAX_INFLIGHT)를 넘으면 건너뛴다
+
+Celery 큐에는 처리할 만큼만 들어가므로 대량 업로드 부서가 있어도 다른 부서 문서는
+다음 빈 슬롯에서 바로 처리된다. 처리 중 슬롯은 만료 시각이 있는 임대로 관리하여
+워커가 비정상 종료해도 일정 시간 후 반환된다.
+다른 큐 워커가 작업을 가져가는(work stealing) 동안에는 빌려준 동시 처리 수만큼 window를 넓힌다.
+"""
+import json
+import time
+from typing import Dict, Any, List, Optional
+
+import redis
+
+from app.core.config import settings
+from app.services import priority_service
+
+KEY_PREFIX = "ocr:fair"
+DEFAULT_TENANT = "default"
+
+# 부서 대기열에 작업 추가 (처음 들어온 부서는 max(이전 vtime, clock)에서 시작)
+_SUBMIT_SCRIPT = """
+local pending = KEYS[1]
+local active = KEYS[2]
+local vtimes = KEYS[3]
+local clock = KEYS[4]
+local tenant = ARGV[1]
+local added = 0
+for i = 2, #ARGV, 2 do
+    added = added + redis.call('ZADD', pending, ARGV[i], ARGV[i + 1])
+end
+if not redis.call('ZSCORE', active, tenant) then
+    local last = tonumber(redis.call('HGET', vtimes, tenant) or '0')
+    local now = tonumber(redis.call('GET', clock) or '0')
+    redis.call('ZADD', active, math.max(last, now), tenant)
+end
+return added
+"""
+
+# 빈 슬롯만큼 vtime이 가장 작은 부서부터 작업을 꺼내 처리 중 슬롯 등록
+_DISPATCH_SCRIPT = """
+local active = KEYS[1]
+local vtimes = KEYS[2]
+local clock = KEYS[3]
+local inflight = KEYS[4]
+local owners = KEYS[5]
+local now = tonumber(ARGV[1])
+local lease = tonumber(ARGV[2])
+local window = tonumber(ARGV[3])
+local default_weight = tonumber(ARGV[4])
+local default_max = tonumber(ARGV[5])
+local weights = cjson.decode(ARGV[6])
+local maxes = cjson.decode(ARGV[7])
+local pending_prefix = ARGV[8]
+
+for _, slot in ipairs(redis.call('ZRANGEBYSCORE', inflight, '-inf', now)) do
+    redis.call('HDEL', owners, slot)
+end
+redis.call('ZREMRANGEBYSCORE', inflight, '-inf', now)
+
+local slots = redis.call('ZRANGE', inflight, 0, -1)
+local total = #slots
+local counts = {}
+if total > 0 then
+    for _, tenant in ipairs(redis.call('HMGET', owners, unpack(slots))) do
+        if tenant then counts[tenant] = (counts[tenant] or 0) + 1 end
+    end
+end
+
+local jobs = {}
+while total < window do
+    local tenant, vt = nil, nil
+    local candidates = redis.call('ZRANGE', active, 0, -1, 'WITHSCORES')
+    for i = 1, #candidates, 2 do
+        local limit = tonumber(maxes[candidates[i]] or default_max)
+        if limit <= 0 or (counts[candidates[i]] or 0) < limit then
+            tenant = candidates[i]
+            vt = tonumber(candidates[i + 1])
+            break
+        end
+    end
+    if not tenant then break end
+
+    local pending = pending_prefix .. tenant
+    local job = redis.call('ZRANGE', pending, 0, 0)[1]
+    if job then
+        redis.call('ZREM', pending, job)
+        local slot = cjson.decode(job)['slot']
+        redis.call('ZADD', inflight, now + lease, slot)
+        redis.call('HSET', owners, slot, tenant)
+        counts[tenant] = (counts[tenant] or 0) + 1
+        total = total + 1
+        table.insert(jobs, job)
+        redis.call('SET', clock, tostring(vt))
+        vt = vt + 1 / tonumber(weights[tenant] or default_weight)
+        redis.call('HSET', vtimes, tenant, tostring(vt))
+    end
+    if redis.call('ZCARD', pending) > 0 then
+        redis.call('ZADD', active, vt, tenant)
+    else
+        redis.call('ZREM', active, tenant)
+    end
+end
+return jobs
+"""
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def _key(queue: str, name: str) -> str:
+    return f"{KEY_PREFIX}:{queue}:{name}"
+
+
+def parse_setting_map(spec: str) -> Dict[str, float]:
+    """이름별 설정 파싱 ("재무팀=2,법무팀=3" -> {"재무팀": 2.0, "법무팀": 3.0})"""
+    values = {}
+    for entry in (spec or "").split(","):
+        name, sep, value = entry.partition("=")
+        if sep and name.strip():
+            values[name.strip()] = float(value)
+    return values
+
+
+def dispatch_window(queue: str) -> int:
+    """큐별로 Celery에 보내 둘 미완료 작업 수 상한 (워커 동시 처리 수 합계 이상이어야 워커가 놀지 않음)"""
+    windows = parse_setting_map(settings.OCR_FAIR_SHARE_DISPATCH_WINDOW)
+    return int(windows.get(queue, settings.OCR_FAIR_SHARE_DEFAULT_DISPATCH_WINDOW))
+
+
+def lent_capacity(queue: str, r=None) -> int:
+    """다른 큐 워커가 빌려준 동시 처리 수 합계 (만료된 항목 제외, 작업 가져가기 중인 워커)"""
+    r = r or _redis()
+    now = time.time()
+    total = 0
+    for value in r.hvals(_key(queue, "lent")):
+        processes, _, expires = _decode(value).partition(":")
+        if float(expires) > now:
+            total += int(processes)
+    return total
+
+
+def lend_capacity(queue: str, worker: str, processes: int, ttl_seconds: float) -> None:
+    """
+    워커가 다른 큐 작업을 가져가는 동안 그 큐의 dispatch window 확장 (Redis 오류는 호출자가 처리)
+
+    주기적으로 다시 호출해 만료 시각을 연장하며, 워커가 죽으면 ttl 뒤에 빠진다.
+    """
+    key = _key(queue, "lent")
+    pipe = _redis().pipeline()
+    pipe.hset(key, worker, f"{processes}:{time.time() + ttl_seconds}")
+    pipe.expire(key, int(ttl_seconds) + 1)
+    pipe.execute()
+
+
+def return_capacity(queue: str, worker: str) -> None:
+    """빌려준 동시 처리 수 회수 (Redis 오류는 TTL 뒤에 만료)"""
+    try:
+        _redis().hdel(_key(queue, "lent"), worker)
+    except redis.RedisError:
+        pass
+
+
+def tenant_of(document) -> str:
+    """공정 분배 단위 (문서 부서, 없으면 default)"""
+    return (document.department or "").strip() or DEFAULT_TENANT
+
+
+def make_job(
+    task: str,
+    args: List[Any],
+    kwargs: Dict[str, Any],
+    slot: Optional[str],
+    priority_cls: str,
+) -> Dict[str, Any]:
+    """
+    대기열 작업 생성
+
+    Args:
+        task: Celery 태스크 이름 (classify_document, process_document, process_page_range)
+        slot: 처리 중 슬롯 ID (작업 완료 시 release에 사용, None이면 대기열을 거치지 않는 가벼운 작업)
+        priority_cls: 우선순위 등급 (부서 대기열 안에서는 등급별 가산 시간 + 등록 시각 순)
+    """
+    return {
+        "task": task,
+        "args": args,
+        "kwargs": kwargs,
+        "slot": slot,
+        "priority_class": priority_cls,
+        "enqueued_at": time.time(),
+    }
+
+
+def submit(queue: str, tenant: str, jobs: List[Dict[str, Any]]) -> None:
+    """부서 대기열에 작업 추가 (Redis 오류는 호출자가 처리)"""
+    r = _redis()
+    pairs = []
+    for job in jobs:
+        score = priority_service.pending_score(job["priority_class"], job["enqueued_at"])
+        pairs += [score, json.dumps(job)]
+    r.register_script(_SUBMIT_SCRIPT)(
+        keys=[
+            _key(queue, f"pending:{tenant}"),
+            _key(queue, "active"),
+            _key(queue, "vtime"),
+            _key(queue, "clock"),
+        ],
+        args=[tenant, *pairs],
+    )
+
+
+def dispatch(queue: str) -> List[Dict[str, Any]]:
+    """
+    빈 슬롯만큼 공정 분배 순서로 작업 꺼내기
+
+    Returns:
+        Celery 큐로 보낼 작업 목록 (슬롯은 이미 등록됨)
+    """
+    r = _redis()
+    jobs = r.register_script(_DISPATCH_SCRIPT)(
+        keys=[
+            _key(queue, "active"),
+            _key(queue, "vtime"),
+            _key(queue, "clock"),
+            _key(queue, "inflight"),
+            _key(queue, "owners"),
+        ],
+        args=[
+            time.time(),
+            settings.CELERY_VISIBILITY_TIMEOUT_SECONDS,
+            dispatch_window(queue) + lent_capacity(queue, r),
+            settings.OCR_FAIR_SHARE_DEFAULT_WEIGHT,
+            settings.OCR_FAIR_SHARE_DEFAULT_MAX_INFLIGHT,
+            json.dumps(parse_setting_map(settings.OCR_FAIR_SHARE_WEIGHTS)),
+            json.dumps(parse_setting_map(settings.OCR_FAIR_SHARE_MAX_INFLIGHT)),
+            _key(queue, "pending:"),
+        ],
+    )
+    return [json.loads(job) for job in jobs]
+
+
+def release(slot: str, queues: List[str]) -> List[str]:
+    """
+    처리 중 슬롯 반환
+
+    Returns:
+        슬롯이 있던 큐 목록 (다음 작업을 dispatch할 큐)
+    """
+    r = _redis()
+    pipe = r.pipeline()
+    for queue in queues:
+        pipe.zrem(_key(queue, "inflight"), slot)
+        pipe.hdel(_key(queue, "owners"), slot)
+    removed = pipe.execute()[::2]
+    return [queue for queue, count in zip(queues, removed) if count]
+
+
+def remove_document(tenant: str, document_id: int, queues: List[str]) -> int:
+    """
+    부서 대기열에서 문서의 대기 작업 제거 (처리 취소 시)
+
+    Returns:
+        제거한 작업 수 (이미 dispatch된 작업은 태스크가 문서 상태를 보고 건너뜀)
+    """
+    r = _redis()
+    removed = 0
+    for queue in queues:
+        pending = _key(queue, f"pending:{tenant}")
+        jobs = [job for job in r.zrange(pending, 0, -1) if json.loads(job)["args"][:1] == [document_id]]
+        if jobs:
+            removed += r.zrem(pending, *jobs)
+    return removed
+
+
+def document_slots(document_id: int, queues: List[str]) -> List[str]:
+    """문서의 처리 중 슬롯 (문서 전체 doc:{id}, 페이지 범위 doc:{id}:{첫 페이지})"""
+    r = _redis()
+    prefix = f"doc:{document_id}"
+    slots = set()
+    for queue in queues:
+        for slot in r.zrange(_key(queue, "inflight"), 0, -1):
+            slot = _decode(slot)
+            if slot == prefix or slot.startswith(f"{prefix}:"):
+                slots.add(slot)
+    return sorted(slots)
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def get_status(queue: str, r=None) -> Dict[str, Dict[str, Any]]:
+    """
+    부서별 대기/처리 중 작업 수 (대기 또는 처리 중 작업이 있는 부서만)
+
+    Returns:
+        부서 -> {pending, inflight}
+    """
+    r = r or _redis()
+    owners = [_decode(t) for t in r.hvals(_key(queue, "owners"))]
+    tenants = sorted(set(owners) | {_decode(t) for t in r.zrange(_key(queue, "active"), 0, -1)})
+    pipe = r.pipeline()
+    for tenant in tenants:
+        pipe.zcard(_key(queue, f"pending:{tenant}"))
+    return {
+        tenant: {"pending": pending, "inflight": owners.count(tenant)}
+        for tenant, pending in zip(tenants, pipe.execute())
+    }
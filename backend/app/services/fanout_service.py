@@ -0,0 +1,78 @@
+"""
+페이지 범위 분할 처리 완료 추적
+
+분할된 문서의 페이지 범위 서브태스크는 공정 분배 대기열을 거쳐 나중에 Celery로 보내지므로
+chord 대신 Redis에 완료된 범위를 기록하고, 마지막 범위를 끝낸 서브태스크가 문서를 마무리한다.
+같은 범위가 재전달되어 다시 완료 보고해도 한 번만 집계된다.
+
+- ocr:fanout:{id}        해시 (total, degraded:{첫 페이지})
+- ocr:fanout:{id}:done   완료된 범위의 첫 페이지 집합
+"""
+import redis
+
+from app.core.config import settings
+
+KEY_PREFIX = "ocr:fanout"
+FANOUT_TTL_SECONDS = 7 * 24 * 3600
+
+# 범위 완료 기록, 이번 보고로 모든 범위가 끝났으면 1 반환 (마무리는 정확히 한 번)
+_RANGE_DONE_SCRIPT = """
+local meta = KEYS[1]
+local done = KEYS[2]
+local added = redis.call('SADD', done, ARGV[1])
+redis.call('HSET', meta, 'degraded:' .. ARGV[1], ARGV[2])
+local total = tonumber(redis.call('HGET', meta, 'total') or '-1')
+if added == 1 and redis.call('SCARD', done) == total then
+    return 1
+end
+return 0
+"""
+
+
+def _redis():
+    return redis.from_url(settings.REDIS_URL)
+
+
+def _keys(document_id: int):
+    meta = f"{KEY_PREFIX}:{document_id}"
+    return meta, f"{meta}:done"
+
+
+def start(document_id: int, total: int) -> None:
+    """분할 처리 시작 (이전 분할 기록 초기화)"""
+    meta, done = _keys(document_id)
+    pipe = _redis().pipeline()
+    pipe.delete(meta, done)
+    pipe.hset(meta, "total", total)
+    pipe.expire(meta, FANOUT_TTL_SECONDS)
+    pipe.execute()
+
+
+def range_done(document_id: int, first_page: int, degraded_pages: int) -> bool:
+    """
+    페이지 범위 완료 보고
+
+    Returns:
+        이 범위로 문서의 모든 범위가 끝났으면 True
+    """
+    meta, done = _keys(document_id)
+    r = _redis()
+    finished = r.register_script(_RANGE_DONE_SCRIPT)(keys=[meta, done], args=[first_page, degraded_pages])
+    r.expire(done, FANOUT_TTL_SECONDS)
+    return bool(finished)
+
+
+def degraded_pages(document_id: int) -> int:
+    """범위별로 보고된 빠른 OCR 대체 페이지 수 합계"""
+    meta, _ = _keys(document_id)
+    values = _redis().hgetall(meta)
+    return sum(
+        int(value)
+        for field, value in values.items()
+        if (field.decode() if isinstance(field, bytes) else field).startswith("degraded:")
+    )
+
+
+def clear(document_id: int) -> None:
+    """분할 처리 기록 삭제"""
+    _redis().delete(*_keys(document_id))
@@ -0,0 +1,258 @@
+"""
+OCR 엔진별 처리 시간 이력 및 완료 시간 예측 서비스
+
+워커가 페이지를 처리할 때마다 엔진(OCR 모드)별 페이지당 처리 시간을 이동 평균으로 기록한다.
+같은 엔진이라도 스캔본/표가 많은 문서와 큐가 밀려 동시 처리가 많을 때 느려지므로
+페이지 특징(page_analysis_service)과 처리 시작 시점의 큐 깊이로 나눠 보관한다.
+
+- ocr:latency:{mode}  해시 ({bucket}:avg, {bucket}:n, task:avg, task:n)
+  bucket: "{layout}:{load}", "{layout}", "all:{load}", "all" (구체적인 것부터 조회, 표본이 부족하면 상위로)
+
+업로드 시 모드별 예상 완료 시간(큐 대기 + 처리)을 계산하고, 제한 시간이 주어지면
+제한 시간 안에 끝날 것으로 예상되는 가장 정확한 모드를 고른다.
+"""
+import math
+from typing import Dict, Any, Optional, List
+
+import redis
+
+from app.core.config import settings
+from app.models.document import OCRMode
+from app.services import priority_service, fair_share_service, page_analysis_service
+
+KEY_PREFIX = "ocr:latency"
+LATENCY_TTL_SECONDS = 30 * 24 * 3600
+EMA_ALPHA = 0.1
+MIN_SAMPLES = 3  # 이 표본 수 미만 버킷은 건너뛰고 상위 버킷 사용
+
+# 정확도 높은 순
+MODES_BY_ACCURACY = [OCRMode.PRECISION, OCRMode.ACCURATE, OCRMode.FAST]
+
+# 버킷별 이동 평균 갱신 (ARGV: alpha, 값, TTL, 버킷...)
+_RECORD_SCRIPT = """
+local key = KEYS[1]
+local alpha = tonumber(ARGV[1])
+local value = tonumber(ARGV[2])
+for i = 4, #ARGV do
+    local bucket = ARGV[i]
+    local n = tonumber(redis.call('HGET', key, bucket .. ':n') or '0')
+    local avg = tonumber(redis.call('HGET', key, bucket .. ':avg') or '0')
+    if n == 0 then
+        avg = value
+    else
+        avg = avg + alpha * (value - avg)
+    end
+    redis.call('HSET', key, bucket .. ':avg', tostring(avg), bucket .. ':n', n + 1)
+end
+redis.call('EXPIRE', key, ARGV[3])
+return 1
+"""
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def _key(mode: OCRMode) -> str:
+    return f"{KEY_PREFIX}:{mode.value}"
+
+
+def layout_bucket(features: Optional[Dict[str, Any]]) -> Optional[str]:
+    """페이지 특징 버킷 (scan/digital + complex/simple, 사전 분석이 없으면 None)"""
+    if not features:
+        return None
+    source = "digital" if features.get("text_layer") else "scan"
+    layout = "complex" if page_analysis_service.has_complex_layout(features) else "simple"
+    return f"{source}_{layout}"
+
+
+def load_bucket(queue: str, queue_depth: int) -> str:
+    """큐 부하 버킷 (대기 작업이 없음 / dispatch window 미만 / 이상)"""
+    if queue_depth <= 0:
+        return "idle"
+    if queue_depth < fair_share_service.dispatch_window(queue):
+        return "busy"
+    return "saturated"
+
+
+def _buckets(layout: Optional[str], load: str) -> List[str]:
+    buckets = [f"{layout}:{load}", layout] if layout else []
+    return buckets + [f"all:{load}", "all"]
+
+
+def queue_depth(queue: str, r=None) -> int:
+    """큐 대기 작업 수 (Celery 우선순위 리스트 + 공정 분배 부서 대기열)"""
+    r = r or _redis()
+    depth = priority_service.queue_length(r, queue)
+    if settings.OCR_FAIR_SHARE_ENABLED:
+        depth += sum(counts["pending"] for counts in fair_share_service.get_status(queue, r).values())
+    return depth
+
+
+def record(
+    mode: OCRMode,
+    features: Optional[Dict[str, Any]],
+    depth: int,
+    pages: int,
+    seconds: float,
+) -> None:
+    """
+    처리 시간 기록 (태스크가 처리한 페이지 수와 걸린 시간)
+
+    Args:
+        depth: 처리 시작 시점의 해당 모드 큐 깊이
+    """
+    if pages <= 0 or seconds <= 0:
+        return
+    from app.services.document_service import _get_ocr_queue
+
+    buckets = _buckets(layout_bucket(features), load_bucket(_get_ocr_queue(mode), depth))
+    try:
+        script = _redis().register_script(_RECORD_SCRIPT)
+        script(keys=[_key(mode)], args=[EMA_ALPHA, seconds / pages, LATENCY_TTL_SECONDS, *buckets])
+        script(keys=[_key(mode)], args=[EMA_ALPHA, seconds, LATENCY_TTL_SECONDS, "task"])
+    except redis.RedisError:
+        pass
+
+
+def _lookup(stats: Dict[str, float], buckets: List[str]) -> Optional[Dict[str, Any]]:
+    """표본이 충분한 가장 구체적인 버킷의 평균"""
+    for bucket in buckets:
+        if stats.get(f"{bucket}:n", 0) >= MIN_SAMPLES:
+            return {"avg": stats[f"{bucket}:avg"], "samples": int(stats[f"{bucket}:n"])}
+    return None
+
+
+def _load_stats(r) -> Dict[OCRMode, Dict[str, float]]:
+    pipe = r.pipeline()
+    for mode in MODES_BY_ACCURACY:
+        pipe.hgetall(_key(mode))
+    return {
+        mode: {
+            (k.decode() if isinstance(k, bytes) else k): float(v)
+            for k, v in raw.items()
+        }
+        for mode, raw in zip(MODES_BY_ACCURACY, pipe.execute())
+    }
+
+
+def slowdown(mode: OCRMode, depth: int) -> Optional[float]:
+    """
+    현재 큐 부하에서의 페이지당 처리 시간 / 대기 작업이 없을 때의 페이지당 처리 시간
+
+    동시 처리가 늘어 워커끼리 CPU/메모리를 나눠 쓰면 커진다 (워커 autoscaler가 증설 중단 판단에 사용).
+    큐가 비어 있거나 표본이 부족하거나 Redis 오류면 None.
+    """
+    from app.services.document_service import _get_ocr_queue
+
+    load = load_bucket(_get_ocr_queue(mode), depth)
+    if load == "idle":
+        return None
+    try:
+        raw = _redis().hgetall(_key(mode))
+    except redis.RedisError:
+        return None
+    stats = {(k.decode() if isinstance(k, bytes) else k): float(v) for k, v in raw.items()}
+    loaded = _lookup(stats, [f"all:{load}"])
+    idle = _lookup(stats, ["all:idle"])
+    if not loaded or not idle or idle["avg"] <= 0:
+        return None
+    return loaded["avg"] / idle["avg"]
+
+
+def estimate_modes(page_count: int, features: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    모드별 예상 완료 시간
+
+    처리 시간 = 페이지 수 x 페이지당 시간 / 동시 처리 범위 수 (분할 처리 시 dispatch window까지 병렬)
+    대기 시간 = 큐 깊이 / dispatch window x 평균 태스크 시간
+
+    Returns:
+        모드 -> {queue_wait_seconds, processing_seconds, total_seconds, samples} (Redis 오류면 None)
+    """
+    from app.services.document_service import _get_ocr_queue
+
+    defaults = fair_share_service.parse_setting_map(settings.OCR_DEFAULT_PAGE_SECONDS)
+    pages = max(page_count or 1, 1)
+    per_task = settings.OCR_FANOUT_PAGES_PER_TASK
+    ranges = math.ceil(pages / per_task) if per_task > 0 else 1
+    layout = layout_bucket(features)
+    try:
+        r = _redis()
+        stats = _load_stats(r)
+        depths = {mode: queue_depth(_get_ocr_queue(mode), r) for mode in MODES_BY_ACCURACY}
+    except redis.RedisError:
+        return None
+
+    estimates = {}
+    for mode in MODES_BY_ACCURACY:
+        queue = _get_ocr_queue(mode)
+        window = max(fair_share_service.dispatch_window(queue), 1)
+        default_seconds = defaults.get(mode.value, 1.0)
+        page_stat = _lookup(stats[mode], _buckets(layout, load_bucket(queue, depths[mode])))
+        page_seconds = page_stat["avg"] if page_stat else default_seconds
+        task_stat = _lookup(stats[mode], ["task"])
+        task_seconds = task_stat["avg"] if task_stat else default_seconds * min(pages, per_task or pages)
+
+        processing = pages * page_seconds / min(ranges, window)
+        wait = math.ceil(depths[mode] / window) * task_seconds
+        estimates[mode.value] = {
+            "queue_wait_seconds": round(wait, 1),
+            "processing_seconds": round(processing, 1),
+            "total_seconds": round(wait + processing, 1),
+            "samples": page_stat["samples"] if page_stat else 0,
+        }
+    return estimates
+
+
+def select_mode(
+    estimates: Dict[str, Dict[str, Any]],
+    deadline_seconds: float,
+    max_mode: OCRMode = OCRMode.PRECISION,
+) -> OCRMode:
+    """
+    제한 시간 안에 끝날 것으로 예상되는 가장 정확한 모드
+
+    추천 모드(max_mode)보다 정확한 모드는 고르지 않는다 (필요 없는 문서에 GPU를 쓰지 않도록).
+    어떤 모드도 제한 시간을 맞추지 못하면 예상 시간이 가장 짧은 모드.
+    """
+    candidates = MODES_BY_ACCURACY[MODES_BY_ACCURACY.index(max_mode):]
+    for mode in candidates:
+        if estimates[mode.value]["total_seconds"] <= deadline_seconds:
+            return mode
+    return min(candidates, key=lambda mode: estimates[mode.value]["total_seconds"])
+
+
+def estimate_document(document, deadline_seconds: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    업로드 응답용 처리 시간 예측
+
+    AUTO 문서는 메타데이터 기반 추천 모드(제한 시간이 있으면 그 안에 끝나는 모드)를 예상 모드로 보여준다.
+    실제 모드는 classify_document에서 페이지 특징까지 반영해 같은 방식으로 확정한다.
+    """
+    from app.services.ocr_service import get_ocr_mode_recommendation
+
+    features = page_analysis_service.get_cached(document.id)
+    estimates = estimate_modes(document.page_count, features)
+    if estimates is None:
+        return None
+
+    ocr_mode = OCRMode(document.ocr_mode)
+    if ocr_mode == OCRMode.AUTO:
+        ocr_mode = get_ocr_mode_recommendation(document, features).recommended_mode
+        if deadline_seconds:
+            ocr_mode = select_mode(estimates, deadline_seconds, ocr_mode)
+
+    estimated = estimates[ocr_mode.value]["total_seconds"]
+    return {
+        "ocr_mode": ocr_mode,
+        "estimated_seconds": estimated,
+        "deadline_seconds": deadline_seconds,
+        "meets_deadline": estimated <= deadline_seconds if deadline_seconds else None,
+        "modes": estimates,
+    }
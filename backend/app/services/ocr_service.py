@@ -1,15 +1,27 @@
-from typing import List
+import importlib.util
+import os
+import shutil
+from typing import List, Dict, Any, Optional
+
 from app.models.document import Document, OCRMode, Importance
 from app.schemas.document import OCRModeRecommendation
 from app.core.config import settings
+from app.services import page_analysis_service
 
 # 문서 유형별 정밀 OCR 필요 여부
 PRECISION_REQUIRED_TYPES = ["contract", "financial", "legal", "research", "계약", "재무", "법무", "연구"]
 
 
 async def recommend_ocr_mode(document: Document) -> OCRModeRecommendation:
+    """OCR 모드 자동 추천 (API용, 분류 단계에서 캐시된 페이지 특징이 있으면 반영)"""
+    return get_ocr_mode_recommendation(document, page_analysis_service.get_cached(document.id))
+
+
+def get_ocr_mode_recommendation(
+    document: Document, features: Optional[Dict[str, Any]] = None
+) -> OCRModeRecommendation:
     """
-    OCR 모드 자동 추천 로직
+    OCR 모드 자동 추천 로직 (워커의 classify_document에서 직접 호출)
 
     OCR 모드:
     - FAST: Tesseract 기반 (CPU, 빠른 처리)
@@ -19,9 +31,14 @@ async def recommend_ocr_mode(document: Document) -> OCRModeRecommendation:
     PRD 기준:
     - 무조건 결정 규칙 (Override) 우선 적용
     - 점수 기반 추천 (precision_score >= 60 → 정밀 OCR, >= 30 → 정확 OCR)
+
+    Args:
+        features: page_analysis_service 사전 분석 결과 (스캔본/표/다단/품질 판단, 없으면 메타데이터만 사용)
     """
     reasons = []
     precision_score = 0
+    features = features or {}
+    page_count = document.page_count or features.get("page_count")
 
     # 1. 무조건 정밀 OCR 강제 조건
     if document.doc_type and document.doc_type.lower() in PRECISION_REQUIRED_TYPES:
@@ -29,6 +46,7 @@ async def recommend_ocr_mode(document: Document) -> OCRModeRecommendation:
             recommended_mode=OCRMode.PRECISION,
             precision_score=100,
             reasons=[f"문서 유형({document.doc_type})이 정밀 OCR 필수 대상입니다."],
+            features=features or None,
         )
 
     if document.importance == Importance.HIGH:
@@ -36,17 +54,29 @@ async def recommend_ocr_mode(document: Document) -> OCRModeRecommendation:
             recommended_mode=OCRMode.PRECISION,
             precision_score=100,
             reasons=["중요도가 High로 설정되어 정밀 OCR이 권장됩니다."],
+            features=features or None,
         )
 
     # 2. 무조건 빠른 OCR 강제 조건
-    if document.importance == Importance.LOW and document.page_count and document.page_count > 200:
+    if document.importance == Importance.LOW and page_count and page_count > 200:
         return OCRModeRecommendation(
             recommended_mode=OCRMode.FAST,
             precision_score=0,
             reasons=["중요도 Low + 200페이지 이상으로 빠른 OCR이 적합합니다."],
+            features=features or None,
+        )
+
+    # 3. 스캔 품질이 낮으면 정밀 OCR
+    quality = pre_ocr_quality_check(features)
+    if features and quality < settings.OCR_QUALITY_THRESHOLD:
+        return OCRModeRecommendation(
+            recommended_mode=OCRMode.PRECISION,
+            precision_score=100,
+            reasons=[f"스캔 품질 점수 {quality:.2f} < {settings.OCR_QUALITY_THRESHOLD}로 정밀 OCR이 권장됩니다."],
+            features=features,
         )
 
-    # 3. 점수 기반 추천
+    # 4. 점수 기반 추천
     # 중요도 점수 (+30)
     if document.importance == Importance.HIGH:
         precision_score += 30
@@ -61,12 +91,22 @@ async def recommend_ocr_mode(document: Document) -> OCRModeRecommendation:
         reasons.append(f"문서 유형 {document.doc_type} (+25)")
 
     # 페이지 수 감점 (-15)
-    if document.page_count and document.page_count > 100:
+    if page_count and page_count > 100:
         precision_score -= 15
-        reasons.append(f"페이지 수 {document.page_count}p (-15)")
-
-    # TODO: 스캔본 감지 (+20)
-    # TODO: 표/다단 감지 (+20)
+        reasons.append(f"페이지 수 {page_count}p (-15)")
+
+    # 스캔본 감지 (+20): 텍스트 레이어 없음
+    if features and not features.get("text_layer"):
+        precision_score += 20
+        reasons.append("스캔본 (텍스트 레이어 없음) (+20)")
+
+    # 표/다단 감지 (+20)
+    if page_analysis_service.has_complex_layout(features):
+        precision_score += 20
+        reasons.append(
+            f"표/다단 레이아웃 (괘선 {features.get('table_line_density', 0)}개/페이지, "
+            f"{features.get('column_count', 1)}단) (+20)"
+        )
 
     # 추천 모드 결정 (3단계)
     if precision_score >= settings.OCR_PRECISION_THRESHOLD:
@@ -83,14 +123,52 @@ async def recommend_ocr_mode(document: Document) -> OCRModeRecommendation:
         recommended_mode=recommended_mode,
         precision_score=precision_score,
         reasons=reasons,
+        features=features or None,
     )
 
 
-async def pre_ocr_quality_check(document: Document) -> float:
+def engine_available(ocr_mode: OCRMode) -> bool:
+    """
+    이 워커가 OCR 모드의 엔진을 실행할 수 있는지 (워커 이미지마다 설치된 엔진이 다름)
+
+    - FAST: Tesseract 실행 파일과 pytesseract 패키지
+    - ACCURATE: PaddleOCR 패키지
+    - PRECISION: VLM 서버 설정
+    """
+    if ocr_mode == OCRMode.FAST:
+        return shutil.which("tesseract") is not None and importlib.util.find_spec("pytesseract") is not None
+    if ocr_mode == OCRMode.ACCURATE:
+        return importlib.util.find_spec("paddleocr") is not None
+    if ocr_mode == OCRMode.PRECISION:
+        return bool(settings.VLM_API_BASES or os.getenv("VLLM_API_BASE", ""))
+    return False
+
+
+def get_fallback_chain(ocr_mode: OCRMode) -> List[OCRMode]:
+    """
+    OCR 모드의 페이지 단위 대체 엔진 순서 (OCR_FALLBACK_CHAINS, "precision=accurate>fast,accurate=fast")
+
+    대체 엔진은 페이지를 한 장씩 처리할 수 있는 CPU 엔진(accurate, fast)만 허용하며 자기 자신은 제외한다.
+    이 워커에서 실행할 수 없는 엔진도 제외한다.
+    """
+    allowed = {OCRMode.ACCURATE.value, OCRMode.FAST.value} - {ocr_mode.value}
+    for entry in settings.OCR_FALLBACK_CHAINS.split(","):
+        mode, sep, chain = entry.partition("=")
+        if sep and mode.strip() == ocr_mode.value:
+            names = [name.strip() for name in chain.split(">")]
+            return [
+                OCRMode(name) for i, name in enumerate(names)
+                if name in allowed and name not in names[:i] and engine_available(OCRMode(name))
+            ]
+    return []
+
+
+def pre_ocr_quality_check(features: Dict[str, Any]) -> float:
     """
-    프리 OCR 기반 품질 점검 (선택적)
-    1~2페이지 일반 OCR 샘플로 품질 점수 측정
-    품질 점수 < 0.75 → 정밀 OCR 상향
+    사전 분석 기반 품질 점검
+    1~2페이지 샘플의 텍스트 레이어/잡음으로 예상 OCR 품질 점수 측정 (분석 결과가 없으면 1.0)
+    품질 점수 < OCR_QUALITY_THRESHOLD(0.75) → 정밀 OCR 상향
     """
-    # TODO: 구현
-    return 1.0
+    if not features:
+        return 1.0
+    return features.get("quality_score", page_analysis_service.quality_score(features))
@@ -0,0 +1,226 @@
+"""
+OCR 전 페이지 특징 분석 서비스
+
+문서 앞쪽/가운데 1~2페이지만 저해상도로 렌더링해 OCR 모드 추천에 쓸 특징을 계산한다.
+- page_count: 전체 페이지 수 (PDF 메타데이터)
+- text_layer: 샘플 페이지 과반에 텍스트 레이어가 있는지 (디지털 원본 여부)
+- scan_noise: 고립된 점 잡음이 차지하는 면적 비율 (스캔 품질이 나쁠수록 큼)
+- table_line_density: 샘플 페이지당 긴 가로/세로 괘선 수 (표 감지)
+- column_count: 세로 투영의 여백 구간으로 센 단 수 (다단 감지)
+- quality_score: 잡음 기반 예상 OCR 품질 (0~1, 텍스트 레이어가 있으면 1.0)
+
+계산 결과는 문서별로 Redis에 캐시하여 분류 재시도, 재처리, 추천 API에서 다시 계산하지 않는다.
+"""
+import json
+from typing import Dict, Any, List, Optional
+
+import redis
+from PIL import Image, ImageChops, ImageFilter, ImageStat
+
+from app.core.config import settings
+
+KEY_PREFIX = "ocr:page_features"
+FEATURES_TTL_SECONDS = 30 * 24 * 3600
+
+TEXT_LAYER_MIN_CHARS = 20  # 페이지에 이 글자 수 이상 추출되면 텍스트 레이어 있음
+DARK_THRESHOLD = 128  # 이진화 기준 (회색조 0~255)
+HLINE_MIN_LENGTH = 0.3  # 가로 괘선 최소 길이 (페이지 폭 대비)
+VLINE_MIN_LENGTH = 0.15  # 세로 괘선 최소 길이 (페이지 높이 대비)
+SPECK_MAX_NEIGHBORS = 2 * 255 / 25  # 5x5 이웃 평균이 이 이하(자신 포함 2픽셀)면 잡음 점
+GUTTER_MAX_COVERAGE = 0.002  # 단 사이 여백으로 볼 열의 최대 어두운 픽셀 비율
+GUTTER_RELATIVE_COVERAGE = 0.1  # 페이지 평균 열 밀도 대비 여백 기준 (잡음이 남은 스캔본)
+GUTTER_MIN_WIDTH = 0.02  # 단 사이 여백 최소 폭 (페이지 폭 대비)
+NOISE_SCALE = 0.01  # 고립된 점 잡음이 페이지 면적의 이 비율 이상이면 품질 점수 0
+
+TABLE_LINES_PER_PAGE = 4.0  # 추천 시 표가 있다고 볼 페이지당 괘선 수
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def _key(document_id: int) -> str:
+    return f"{KEY_PREFIX}:{document_id}"
+
+
+def sample_page_numbers(page_count: int, sample_pages: int) -> List[int]:
+    """분석할 페이지 번호 (0부터, 첫 페이지 + 가운데 페이지)"""
+    candidates = [0, page_count // 2]
+    return sorted(set(candidates[:max(sample_pages, 1)]))[:page_count]
+
+
+def _runs(flags: List[bool]) -> List[int]:
+    """연속 True 구간의 길이 목록"""
+    runs, length = [], 0
+    for flag in flags:
+        if flag:
+            length += 1
+        elif length:
+            runs.append(length)
+            length = 0
+    if length:
+        runs.append(length)
+    return runs
+
+
+def _dark_ratio(binary: Image.Image) -> float:
+    return ImageStat.Stat(binary).mean[0] / 255
+
+
+def _close_horizontal(binary: Image.Image) -> Image.Image:
+    """가로 방향으로만 2픽셀 이하 끊김을 메움 (스캔 잡음으로 끊긴 괘선 복원, 단어 간격은 유지)"""
+    dilated = binary
+    for dx in (1, 2):
+        dilated = ImageChops.lighter(dilated, ImageChops.offset(binary, dx, 0))
+    closed = dilated
+    for dx in (1, 2):
+        closed = ImageChops.darker(closed, ImageChops.offset(dilated, -dx, 0))
+    return closed
+
+
+def _count_lines(binary: Image.Image, min_length: int) -> int:
+    """min_length 이상 연속된 어두운 픽셀이 있는 행 구간 수 (두꺼운 선은 하나로 셈)"""
+    width, height = binary.size
+    data = _close_horizontal(binary).tobytes()
+    needle = b"\xff" * min_length
+    return len(_runs([needle in data[y * width:(y + 1) * width] for y in range(height)]))
+
+
+def analyze_image(image: Image.Image) -> Dict[str, Any]:
+    """
+    렌더링한 페이지 이미지 한 장의 특징
+
+    Returns:
+        {scan_noise, table_lines, column_count}
+    """
+    gray = image.convert("L")
+    width, height = gray.size
+
+    # 어두운 픽셀 = 255로 이진화 (평균이 곧 어두운 픽셀 비율)
+    binary = gray.point(lambda p: 255 if p < DARK_THRESHOLD else 0)
+
+    # 잡음: 5x5 이웃에 다른 어두운 픽셀이 거의 없는 고립된 점 (글자 획, i의 점, 마침표는 유지)
+    neighborhood = binary.filter(ImageFilter.Kernel((5, 5), [1] * 25, scale=25))
+    kept = ImageChops.darker(binary, neighborhood.point(lambda p: 255 if p > SPECK_MAX_NEIGHBORS else 0))
+    scan_noise = _dark_ratio(binary) - _dark_ratio(kept)
+
+    # 괘선: 충분히 긴 연속 가로/세로 선 (세로선은 90도 회전해 같은 방식으로 셈)
+    table_lines = _count_lines(kept, int(HLINE_MIN_LENGTH * width))
+    table_lines += _count_lines(kept.transpose(Image.Transpose.ROTATE_90), int(VLINE_MIN_LENGTH * height))
+
+    # 단 수: 내용 영역 안에서 충분히 넓은 세로 여백으로 나뉜 구간 수
+    # (여백 기준은 페이지 평균 잉크 밀도에 비례시켜 남은 잡음이 여백을 채우지 않게 함)
+    cols = [value / 255 for value in kept.resize((width, 1), Image.BOX).getdata()]
+    gutter_max = max(GUTTER_MAX_COVERAGE, GUTTER_RELATIVE_COVERAGE * sum(cols) / width)
+    column_count = 0
+    content = [i for i, c in enumerate(cols) if c > gutter_max]
+    if content:
+        inner = cols[content[0]:content[-1] + 1]
+        gutters = [
+            run for run in _runs([c <= gutter_max for c in inner])
+            if run >= GUTTER_MIN_WIDTH * width
+        ]
+        column_count = len(gutters) + 1
+
+    return {"scan_noise": scan_noise, "table_lines": table_lines, "column_count": column_count}
+
+
+def quality_score(features: Dict[str, Any]) -> float:
+    """예상 OCR 품질 (텍스트 레이어가 있으면 1.0, 스캔본은 잡음이 클수록 낮음)"""
+    if features.get("text_layer"):
+        return 1.0
+    return round(max(0.0, 1.0 - features.get("scan_noise", 0.0) / NOISE_SCALE), 3)
+
+
+def analyze(local_file: str, mime_type: Optional[str]) -> Dict[str, Any]:
+    """
+    문서 파일 사전 분석 (샘플 페이지만 렌더링)
+
+    Args:
+        local_file: 원본 파일 경로
+        mime_type: 문서 MIME 타입 (PDF가 아니면 이미지 한 장으로 처리)
+    """
+    import fitz  # PyMuPDF
+
+    dpi = settings.OCR_PREANALYSIS_DPI
+    pages = []
+    if mime_type == "application/pdf":
+        with fitz.open(local_file) as pdf:
+            page_count = pdf.page_count
+            for page_no in sample_page_numbers(page_count, settings.OCR_PREANALYSIS_SAMPLE_PAGES):
+                page = pdf[page_no]
+                pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+                image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+                pages.append({**analyze_image(image), "text_chars": len(page.get_text().strip())})
+    else:
+        page_count = 1
+        with Image.open(local_file) as image:
+            image.thumbnail((int(8.5 * dpi), int(11 * dpi)))
+            pages.append({**analyze_image(image), "text_chars": 0})
+
+    if not pages:
+        return {"page_count": page_count, "sampled_pages": 0, "text_layer": False, "quality_score": 1.0}
+
+    sampled = len(pages)
+    features = {
+        "page_count": page_count,
+        "sampled_pages": sampled,
+        "text_layer": sum(p["text_chars"] >= TEXT_LAYER_MIN_CHARS for p in pages) * 2 > sampled,
+        "text_chars": sum(p["text_chars"] for p in pages) // sampled,
+        "scan_noise": round(max(p["scan_noise"] for p in pages), 4),
+        "table_line_density": round(sum(p["table_lines"] for p in pages) / sampled, 2),
+        "column_count": max(p["column_count"] for p in pages),
+    }
+    features["quality_score"] = quality_score(features)
+    return features
+
+
+def count_pages(data: bytes, mime_type: Optional[str]) -> int:
+    """업로드 파일 페이지 수 (PDF 메타데이터만 읽음, 읽지 못하면 0)"""
+    if mime_type != "application/pdf":
+        return 1
+    import fitz  # PyMuPDF
+
+    try:
+        with fitz.open(stream=data, filetype="pdf") as pdf:
+            return pdf.page_count
+    except Exception:
+        return 0
+
+
+def has_complex_layout(features: Dict[str, Any]) -> bool:
+    """표 또는 다단 레이아웃 여부"""
+    return (
+        features.get("table_line_density", 0) >= TABLE_LINES_PER_PAGE
+        or features.get("column_count", 0) >= 2
+    )
+
+
+def get_cached(document_id: int) -> Optional[Dict[str, Any]]:
+    """캐시된 문서 특징 (없거나 Redis 오류면 None)"""
+    try:
+        raw = _redis().get(_key(document_id))
+    except redis.RedisError:
+        return None
+    return json.loads(raw) if raw else None
+
+
+def cache(document_id: int, features: Dict[str, Any]) -> None:
+    """문서 특징 캐시 (원본 파일은 바뀌지 않으므로 TTL 동안 유지)"""
+    try:
+        _redis().set(_key(document_id), json.dumps(features), ex=FEATURES_TTL_SECONDS)
+    except redis.RedisError:
+        pass
+
+
+def clear(document_id: int) -> None:
+    """문서 특징 캐시 삭제 (문서 삭제 시)"""
+    try:
+        _redis().delete(_key(document_id))
+    except redis.RedisError:
+        pass
@@ -0,0 +1,105 @@
+"""
+페이지/블록 일괄 저장 서비스
+
+OCR 결과 페이지와 블록을 행 단위 ORM 객체 대신 집합 단위 SQL로 저장/삭제
+- 저장: 페이지 INSERT ... RETURNING id 한 번 + 블록 INSERT 한 번 (executemany, insertmanyvalues 배치)
+- 삭제: 문서 단위 DELETE 두 번 (블록 → 페이지)
+"""
+from typing import Callable, List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import insert, delete, select
+from sqlalchemy.orm import Session
+
+from app.models.document import DocumentPage, DocumentBlock
+
+
+def insert_pages(
+    db: Session,
+    pages: List[Dict[str, Any]],
+    blocks: List[List[Dict[str, Any]]],
+) -> List[int]:
+    """
+    페이지와 블록 일괄 INSERT
+
+    Args:
+        pages: DocumentPage 컬럼 값 목록
+        blocks: 페이지별 DocumentBlock 컬럼 값 목록 (page_id 제외, pages와 같은 순서)
+
+    Returns:
+        생성된 페이지 ID 목록 (pages와 같은 순서)
+    """
+    if not pages:
+        return []
+    page_ids = db.execute(
+        insert(DocumentPage).returning(DocumentPage.id, sort_by_parameter_order=True),
+        pages,
+    ).scalars().all()
+
+    rows = [
+        {**block, "page_id": page_id}
+        for page_id, page_blocks in zip(page_ids, blocks)
+        for block in page_blocks
+    ]
+    if rows:
+        db.execute(insert(DocumentBlock), rows)
+    return list(page_ids)
+
+
+def delete_document_pages(db: Session, document_id: int) -> Tuple[int, int]:
+    """
+    문서의 페이지/블록 일괄 DELETE
+
+    Returns:
+        (삭제된 페이지 수, 삭제된 블록 수)
+    """
+    page_ids = select(DocumentPage.id).where(DocumentPage.document_id == document_id)
+    blocks = db.execute(
+        delete(DocumentBlock).where(DocumentBlock.page_id.in_(page_ids)),
+        execution_options={"synchronize_session": False},
+    )
+    pages = db.execute(
+        delete(DocumentPage).where(DocumentPage.document_id == document_id),
+        execution_options={"synchronize_session": False},
+    )
+    return pages.rowcount, blocks.rowcount
+
+
+class PageWriter:
+    """
+    페이지 결과 버퍼 (batch_size 페이지마다 일괄 INSERT 후 커밋)
+
+    커밋 단위가 곧 재처리 시 이어서 처리하는 체크포인트 단위이므로,
+    다시 처리하는 비용이 큰 엔진(VLM)은 batch_size를 작게 둔다.
+    on_flush는 커밋된 페이지 번호 목록으로 호출된다 (진행 상황은 커밋된 페이지만 완료로 보고).
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int = 1,
+        on_flush: Optional[Callable[[List[int]], None]] = None,
+    ):
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.on_flush = on_flush
+        self._pages: List[Dict[str, Any]] = []
+        self._blocks: List[List[Dict[str, Any]]] = []
+        self.written = 0
+
+    def add(self, page: Dict[str, Any], blocks: List[Dict[str, Any]]):
+        self._pages.append(page)
+        self._blocks.append(blocks)
+        if len(self._pages) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """버퍼의 페이지/블록 저장 후 커밋"""
+        if not self._pages:
+            return
+        insert_pages(self.db, self._pages, self._blocks)
+        self.db.commit()
+        page_nos = [page["page_no"] for page in self._pages]
+        self.written += len(page_nos)
+        self._pages, self._blocks = [], []
+        if self.on_flush:
+            self.on_flush(page_nos)
@@ -0,0 +1,174 @@
+"""
+OCR 큐 우선순위 서비스
+
+문서 중요도(Importance)와 사용자 긴급 요청을 Celery 브로커 우선순위로 변환하고,
+낮은 우선순위 작업이 무한정 밀리지 않도록 오래 대기한 메시지를 한 단계씩 올린다(aging).
+공정 분배 부서 대기열은 등급을 대기 시간으로 환산한 점수로 정렬해 같은 효과를 낸다 (pending_score).
+
+Redis 브로커는 우선순위별로 별도 리스트(큐 이름 + ":" + 단계)를 두고
+낮은 숫자(0)의 리스트부터 꺼낸다. 단계 0은 접미사 없는 기존 큐 이름을 그대로 사용한다.
+"""
+import time
+from typing import Dict, Any, List, Optional
+
+import redis
+
+from app.core.config import settings
+from app.models.document import Importance
+
+# 우선순위 등급 -> 브로커 우선순위 (Redis: 낮을수록 먼저 처리)
+PRIORITY_CLASSES = {
+    "urgent": 0,
+    "high": 3,
+    "medium": 6,
+    "low": 9,
+}
+PRIORITY_STEPS = sorted(PRIORITY_CLASSES.values())
+PRIORITY_SEP = ":"
+
+IMPORTANCE_CLASSES = {
+    Importance.HIGH: "high",
+    Importance.MEDIUM: "medium",
+    Importance.LOW: "low",
+}
+
+WAIT_KEY_PREFIX = "ocr:queue_wait"
+WAIT_SAMPLES = 1000  # 등급별 보관하는 최근 대기 시간 표본 수
+WAIT_TTL_SECONDS = 7 * 24 * 3600
+
+# 소스 리스트의 가장 오래된 메시지(오른쪽 끝, 다음에 꺼낼 메시지)부터 cutoff 이전에 들어온 것을
+# 한 단계 높은 리스트의 오른쪽 끝으로 이동. 이동한 메시지끼리 기존 순서를 유지하도록 역순으로 넣는다.
+# 등록 시각이 없는 메시지(재시도 등)는 리스트 전체의 aging을 막지 않도록 오래된 것으로 본다.
+_AGE_SCRIPT = """
+local src = KEYS[1]
+local dst = KEYS[2]
+local cutoff = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local moved = {}
+while #moved < limit do
+    local raw = redis.call('LINDEX', src, -1)
+    if not raw then break end
+    local ok, message = pcall(cjson.decode, raw)
+    local enqueued_at = nil
+    if ok and type(message) == 'table' and type(message['headers']) == 'table' then
+        enqueued_at = tonumber(message['headers']['enqueued_at'])
+    end
+    if enqueued_at and enqueued_at > cutoff then break end
+    table.insert(moved, redis.call('RPOP', src))
+end
+for i = #moved, 1, -1 do
+    redis.call('RPUSH', dst, moved[i])
+end
+return #moved
+"""
+
+
+def priority_class(importance: Optional[Importance], urgent: bool = False) -> str:
+    """문서 중요도/긴급 요청으로 우선순위 등급 결정"""
+    if urgent:
+        return "urgent"
+    return IMPORTANCE_CLASSES.get(importance, "medium")
+
+
+def class_options(cls: str) -> Dict[str, Any]:
+    """
+    우선순위 등급의 apply_async/signature 옵션
+
+    대기 시간 측정과 aging을 위해 등록 시각과 원래 등급을 메시지 헤더에 남긴다.
+    """
+    return {
+        "priority": PRIORITY_CLASSES[cls],
+        "headers": {"enqueued_at": time.time(), "priority_class": cls},
+    }
+
+
+def pending_score(cls: str, enqueued_at: float) -> float:
+    """
+    부서 대기열(공정 분배) 정렬 점수 (낮을수록 먼저)
+
+    등급이 한 단계 낮을 때마다 OCR_PRIORITY_AGING_SECONDS를 더한 등록 시각을 쓴다.
+    같은 시각이면 등급 순이지만 aging 주기만큼 더 기다린 작업은 한 단계 높은 등급의 새 작업보다 앞서므로,
+    브로커 큐의 aging과 같이 가장 낮은 등급도 aging 주기 x 단계 수 안에 새로 들어오는 최상위 작업을 앞선다.
+    """
+    return enqueued_at + PRIORITY_STEPS.index(PRIORITY_CLASSES[cls]) * settings.OCR_PRIORITY_AGING_SECONDS
+
+
+def priority_queue_names(queue: str) -> List[str]:
+    """큐의 우선순위별 Redis 리스트 이름 (높은 우선순위부터)"""
+    return [queue if step == 0 else f"{queue}{PRIORITY_SEP}{step}" for step in PRIORITY_STEPS]
+
+
+def queue_length(r, queue: str) -> int:
+    """우선순위 리스트를 모두 합친 대기 메시지 수"""
+    pipe = r.pipeline()
+    for name in priority_queue_names(queue):
+        pipe.llen(name)
+    return sum(pipe.execute())
+
+
+def age_queue(r, queue: str, max_wait_seconds: float, limit: int = 100) -> int:
+    """
+    오래 대기한 메시지를 한 단계 높은 우선순위로 이동
+
+    주기적으로 호출되므로 가장 낮은 등급도 max_wait_seconds x 단계 수 안에 최상위 등급에 도달한다.
+
+    Returns:
+        이동한 메시지 수
+    """
+    script = r.register_script(_AGE_SCRIPT)
+    cutoff = time.time() - max_wait_seconds
+    names = priority_queue_names(queue)
+    moved = 0
+    # 높은 등급부터 처리해 한 번 호출에 두 단계 이상 올라가지 않게 한다
+    for dst, src in zip(names, names[1:]):
+        moved += int(script(keys=[src, dst], args=[cutoff, limit]))
+    return moved
+
+
+def record_wait(priority_cls: Optional[str], enqueued_at: Optional[float]) -> None:
+    """태스크 시작 시 큐 대기 시간 기록 (등급별 최근 WAIT_SAMPLES개)"""
+    if not priority_cls or enqueued_at is None:
+        return
+    key = f"{WAIT_KEY_PREFIX}:{priority_cls}"
+    try:
+        r = redis.from_url(settings.REDIS_URL)
+        pipe = r.pipeline()
+        pipe.lpush(key, round(max(time.time() - float(enqueued_at), 0.0), 3))
+        pipe.ltrim(key, 0, WAIT_SAMPLES - 1)
+        pipe.expire(key, WAIT_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def get_wait_stats(r=None) -> Dict[str, Dict[str, Any]]:
+    """
+    우선순위 등급별 큐 대기 시간 통계 (최근 표본 기준)
+
+    Returns:
+        등급 -> {samples, avg_seconds, p50_seconds, p95_seconds, max_seconds}
+    """
+    r = r or redis.from_url(settings.REDIS_URL)
+    pipe = r.pipeline()
+    for cls in PRIORITY_CLASSES:
+        pipe.lrange(f"{WAIT_KEY_PREFIX}:{cls}", 0, -1)
+
+    stats = {}
+    for cls, raw in zip(PRIORITY_CLASSES, pipe.execute()):
+        waits = [float(v) for v in raw]
+        if not waits:
+            stats[cls] = {"samples": 0}
+            continue
+        stats[cls] = {
+            "samples": len(waits),
+            "avg_seconds": round(sum(waits) / len(waits), 2),
+            "p50_seconds": round(_percentile(waits, 0.5), 2),
+            "p95_seconds": round(_percentile(waits, 0.95), 2),
+            "max_seconds": round(max(waits), 2),
+        }
+    return stats
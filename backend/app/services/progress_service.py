@@ -0,0 +1,223 @@
+"""
+문서 처리 진행 상황 서비스
+
+OCR 워커가 페이지를 처리할 때마다 완료 페이지 수, 전체 페이지 수, 현재 단계,
+페이지당 처리 시간 이동 평균을 Redis에 발행하고, 진행 상황 API는 DB 조회 없이
+Redis만 읽어 문서별 예상 남은 시간(ETA)을 계산한다.
+
+- ocr:progress:{id}        해시 (stage, pages_total, avg_page_seconds, started_at, last_page_at, updated_at)
+- ocr:progress:{id}:pages  완료 페이지 번호 집합 (재시도/재전달로 같은 페이지를 다시 보고해도 한 번만 집계)
+
+진행 상황은 부가 정보이므로 Redis 오류는 OCR 처리를 중단시키지 않는다.
+"""
+import time
+from typing import Dict, Any, Iterable, List, Optional
+
+import redis
+
+from app.core.config import settings
+
+KEY_PREFIX = "ocr:progress"
+PROGRESS_TTL_SECONDS = 24 * 3600
+FINISHED_TTL_SECONDS = 3600  # 완료/실패 후 보존 시간
+EMA_ALPHA = 0.2  # 페이지당 처리 시간 이동 평균 가중치
+
+STAGE_QUEUED = "queued"
+STAGE_CLASSIFYING = "classifying"
+STAGE_DOWNLOADING = "downloading"
+STAGE_SPLITTING = "splitting"
+STAGE_RENDERING = "rendering"
+STAGE_OCR = "ocr"
+STAGE_CASCADE = "cascade"
+STAGE_VLM = "vlm"
+STAGE_FALLBACK = "fallback"
+STAGE_FINALIZING = "finalizing"
+STAGE_COMPLETED = "completed"
+STAGE_FAILED = "failed"
+STAGE_CANCELLED = "cancelled"
+
+# 완료 페이지 기록 + 페이지 완료 간격으로 이동 평균 갱신
+# 분할 처리 시 여러 서브태스크가 같은 문서를 동시에 갱신하므로 원자적으로 처리하고,
+# 완료 간격 기준이라 병렬 처리 효과가 평균에 그대로 반영된다.
+_PAGE_DONE_SCRIPT = """
+local meta = KEYS[1]
+local pages = KEYS[2]
+local now = tonumber(ARGV[1])
+local alpha = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local timed = ARGV[4] == '1'
+local added = 0
+for i = 5, #ARGV do
+    added = added + redis.call('SADD', pages, ARGV[i])
+end
+if added > 0 and timed then
+    local last = redis.call('HGET', meta, 'last_page_at')
+    if last then
+        local sample = math.max(now - tonumber(last), 0) / added
+        local avg = redis.call('HGET', meta, 'avg_page_seconds')
+        if avg then
+            sample = alpha * sample + (1 - alpha) * tonumber(avg)
+        end
+        redis.call('HSET', meta, 'avg_page_seconds', tostring(sample))
+    end
+    redis.call('HSET', meta, 'last_page_at', tostring(now))
+end
+redis.call('HSET', meta, 'updated_at', tostring(now))
+redis.call('EXPIRE', meta, ttl)
+redis.call('EXPIRE', pages, ttl)
+return added
+"""
+
+_client = None
+_page_done = None
+
+
+def _redis():
+    """프로세스 공유 Redis 클라이언트 (페이지마다 연결 풀을 만들지 않도록 재사용)"""
+    global _client, _page_done
+    if _client is None:
+        _client = redis.from_url(settings.REDIS_URL)
+        _page_done = _client.register_script(_PAGE_DONE_SCRIPT)
+    return _client
+
+
+def _keys(document_id: int):
+    meta = f"{KEY_PREFIX}:{document_id}"
+    return meta, f"{meta}:pages"
+
+
+def start(document_id: int, stage: str = STAGE_DOWNLOADING) -> None:
+    """문서 처리 시작 (이전 진행 기록 초기화, 이미 저장된 페이지는 렌더링 단계에서 다시 집계)"""
+    meta, pages = _keys(document_id)
+    now = time.time()
+    try:
+        pipe = _redis().pipeline()
+        pipe.delete(meta, pages)
+        pipe.hset(meta, mapping={"stage": stage, "started_at": now, "updated_at": now})
+        pipe.expire(meta, PROGRESS_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def update(document_id: int, stage: Optional[str] = None, pages_total: Optional[int] = None) -> None:
+    """
+    단계/전체 페이지 수 갱신
+
+    OCR 단계에 들어가면 완료 간격 기준 시각을 초기화하여
+    렌더링/이미지 업로드 시간이 첫 페이지 처리 시간으로 잡히지 않게 한다.
+    """
+    meta, _ = _keys(document_id)
+    now = time.time()
+    fields: Dict[str, Any] = {"updated_at": now}
+    if stage is not None:
+        fields["stage"] = stage
+    if pages_total is not None:
+        fields["pages_total"] = pages_total
+    if stage in (STAGE_OCR, STAGE_CASCADE, STAGE_VLM, STAGE_FALLBACK):
+        fields["last_page_at"] = now
+    try:
+        pipe = _redis().pipeline()
+        pipe.hset(meta, mapping=fields)
+        pipe.expire(meta, PROGRESS_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def page_done(document_id: int, page_nos: Iterable[int], timed: bool = True) -> None:
+    """
+    완료 페이지 보고
+
+    Args:
+        page_nos: 완료된 페이지 번호
+        timed: False면 이동 평균에 반영하지 않음 (이어서 처리할 때 이미 저장된 페이지)
+    """
+    page_nos = list(page_nos)
+    if not page_nos:
+        return
+    meta, pages = _keys(document_id)
+    try:
+        _redis()
+        _page_done(
+            keys=[meta, pages],
+            args=[time.time(), EMA_ALPHA, PROGRESS_TTL_SECONDS, 1 if timed else 0, *page_nos],
+        )
+    except redis.RedisError:
+        pass
+
+
+def finish(document_id: int, stage: str = STAGE_COMPLETED) -> None:
+    """처리 완료/실패/취소 기록 (FINISHED_TTL_SECONDS 후 만료)"""
+    meta, pages = _keys(document_id)
+    try:
+        pipe = _redis().pipeline()
+        pipe.hset(meta, mapping={"stage": stage, "updated_at": time.time()})
+        pipe.expire(meta, FINISHED_TTL_SECONDS)
+        pipe.expire(pages, FINISHED_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def _decode(raw: Dict[bytes, bytes]) -> Dict[str, str]:
+    return {
+        (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+        for k, v in raw.items()
+    }
+
+
+def _build_progress(document_id: int, raw: Dict[str, str], pages_done: int, now: float) -> Dict[str, Any]:
+    """Redis 해시 값을 진행 상황 응답으로 변환 (ETA = 남은 페이지 수 x 페이지당 평균 시간)"""
+    stage = raw.get("stage", STAGE_QUEUED)
+    pages_total = int(raw["pages_total"]) if raw.get("pages_total") else None
+    avg = float(raw["avg_page_seconds"]) if raw.get("avg_page_seconds") else None
+    started_at = float(raw["started_at"]) if raw.get("started_at") else None
+
+    eta_seconds = None
+    if stage == STAGE_COMPLETED:
+        eta_seconds = 0.0
+    elif stage not in (STAGE_FAILED, STAGE_CANCELLED) and pages_total is not None and avg is not None:
+        eta_seconds = round(max(pages_total - pages_done, 0) * avg, 1)
+
+    return {
+        "document_id": document_id,
+        "stage": stage,
+        "pages_done": pages_done,
+        "pages_total": pages_total,
+        "percent": round(min(pages_done / pages_total, 1.0) * 100, 1) if pages_total else None,
+        "avg_page_seconds": round(avg, 3) if avg is not None else None,
+        "elapsed_seconds": round(now - started_at, 1) if started_at else None,
+        "eta_seconds": eta_seconds,
+        "updated_at": float(raw["updated_at"]) if raw.get("updated_at") else None,
+    }
+
+
+def get_progress(document_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    문서별 진행 상황 조회 (Redis 왕복 한 번)
+
+    Returns:
+        document_id -> 진행 상황. 기록이 없는 문서(대기 중, 만료)는 제외,
+        Redis 오류 시 빈 결과 (진행 상황 API가 실패하지 않도록)
+    """
+    if not document_ids:
+        return {}
+    try:
+        pipe = _redis().pipeline()
+        for document_id in document_ids:
+            meta, pages = _keys(document_id)
+            pipe.hgetall(meta)
+            pipe.scard(pages)
+        replies = pipe.execute()
+    except redis.RedisError as e:
+        print(f"[WARNING] Progress unavailable: {e}")
+        return {}
+
+    now = time.time()
+    progress = {}
+    for i, document_id in enumerate(document_ids):
+        raw, pages_done = replies[2 * i], replies[2 * i + 1]
+        if raw:
+            progress[document_id] = _build_progress(document_id, _decode(raw), int(pages_done or 0), now)
+    return progress
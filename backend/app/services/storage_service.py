@@ -209,6 +209,60 @@ class StorageService:
 
         return object_name
 
+    def upload_vlm_image(
+        self,
+        image_data: bytes,
+        expires: timedelta = timedelta(minutes=5),
+    ) -> Tuple[str, str]:
+        """
+        VLM 요청용 임시 페이지 이미지 업로드
+
+        vLLM 서버는 내부 네트워크에서 MinIO에 접근하므로 외부 엔드포인트로
+        치환하지 않은 사전 서명 URL을 반환한다.
+
+        Args:
+            image_data: JPEG 바이트 데이터
+            expires: URL 만료 시간
+
+        Returns:
+            (사전 서명된 URL, 객체 이름)
+        """
+        object_name = f"vlm-tmp/{uuid.uuid4().hex}.jpg"
+        self.upload_file(image_data, object_name, "image/jpeg")
+        url = self.client.presigned_get_object(settings.MINIO_BUCKET, object_name, expires=expires)
+        return url, object_name
+
+    def upload_document_chunk(
+        self,
+        pdf_data: bytes,
+        document_id: int,
+        first_page: int,
+        last_page: int,
+    ) -> str:
+        """
+        분할 처리용 페이지 범위 PDF 업로드
+
+        Args:
+            pdf_data: 범위 PDF 바이트 데이터
+            document_id: 문서 ID
+            first_page / last_page: 페이지 범위 (1부터)
+
+        Returns:
+            저장된 객체 경로
+        """
+        object_name = f"chunks/{document_id}/pages_{first_page:04d}-{last_page:04d}.pdf"
+        return self.upload_file(pdf_data, object_name, "application/pdf")
+
+    def delete_document_chunks(self, document_id: int) -> bool:
+        """분할 처리용 페이지 범위 PDF 삭제"""
+        try:
+            objects = self.client.list_objects(settings.MINIO_BUCKET, prefix=f"chunks/{document_id}/", recursive=True)
+            for obj in objects:
+                self.client.remove_object(settings.MINIO_BUCKET, obj.object_name)
+            return True
+        except S3Error:
+            return False
+
     # =========================================
     # 파일 다운로드
     # =========================================
@@ -577,5 +631,23 @@ class StorageService:
             }
 
 
+class VLMImageStore:
+    """
+    정밀 OCR 이미지 참조 전송용 저장소 (MinIO 사전 서명 URL)
+
+    ChandraOCRProcessor의 image_store 인터페이스(put/delete) 구현
+    """
+
+    def __init__(self, storage: StorageService, expires: timedelta = timedelta(minutes=5)):
+        self.storage = storage
+        self.expires = expires
+
+    def put(self, image_data: bytes) -> Tuple[str, str]:
+        return self.storage.upload_vlm_image(image_data, self.expires)
+
+    def delete(self, object_name: str):
+        self.storage.delete_file(object_name)
+
+
 # 싱글톤 인스턴스
 storage_service = StorageService()
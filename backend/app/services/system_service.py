@@ -16,9 +16,13 @@ from app.schemas.system import (
     ServiceStatus,
     WorkerQueueStatus,
     GPUStatus,
+    VLMEndpointStatus,
+    QueueWaitStatus,
+    FairShareTenantStatus,
     StorageStatus,
     SystemStatusResponse,
 )
+from app.services import vlm_stats_service, vlm_admission_service, priority_service, fair_share_service
 
 
 async def check_database(db: Session) -> ServiceStatus:
@@ -211,8 +215,8 @@ async def get_worker_status() -> List[WorkerQueueStatus]:
 
         for name, queue_name in queues:
             try:
-                # 큐의 대기 중인 작업 수 확인
-                queue_length = r.llen(queue_name)
+                # 큐의 대기 중인 작업 수 확인 (우선순위별 리스트 합산)
+                queue_length = priority_service.queue_length(r, queue_name)
 
                 # 워커 상태 확인 (celery inspect를 사용할 수도 있지만, 간단히 큐 길이로 판단)
                 status = "active" if queue_length > 0 else "idle"
@@ -278,6 +282,87 @@ async def get_gpu_status() -> Optional[List[GPUStatus]]:
     return None
 
 
+async def get_vlm_endpoint_status() -> Optional[List[VLMEndpointStatus]]:
+    """VLM 레플리카별 상태 (정밀 OCR 워커가 발행한 지연 시간/오류 통계)"""
+    configured = vlm_stats_service.configured_endpoints()
+    try:
+        stats = vlm_stats_service.get_endpoint_stats()
+    except Exception:
+        stats = {}
+
+    # 설정에 없지만 워커가 사용 중인 엔드포인트도 표시
+    weights = {e["api_base"]: e["weight"] for e in configured}
+    for api_base in stats:
+        weights.setdefault(api_base, 1.0)
+
+    if not weights:
+        return None
+
+    endpoints = []
+    for api_base, weight in weights.items():
+        admission = {}
+        if settings.VLM_ADMISSION_CONTROL:
+            try:
+                status = vlm_admission_service.get_admission_status(api_base)
+                metrics = status["metrics"] or {}
+                admission = {
+                    "admission_limit": status["limit"],
+                    "admission_in_use": status["in_use"],
+                    "vllm_running": metrics.get("running"),
+                    "vllm_waiting": metrics.get("waiting"),
+                    "kv_cache_usage": metrics.get("kv_cache_usage"),
+                }
+            except Exception:
+                pass
+
+        item = stats.get(api_base)
+        if not item:
+            endpoints.append(VLMEndpointStatus(api_base=api_base, weight=weight, status="unknown", **admission))
+            continue
+        endpoints.append(VLMEndpointStatus(
+            api_base=api_base,
+            weight=weight,
+            status="healthy" if item["healthy"] else "ejected",
+            in_flight=item["in_flight"],
+            requests=item["requests"],
+            errors=item["errors"],
+            error_rate=round(item["errors"] / item["requests"], 4) if item["requests"] else 0.0,
+            latency_ms_avg=item["latency_ms_avg"],
+            last_error=item["last_error"],
+            updated_at=datetime.utcfromtimestamp(item["updated_at"]) if item["updated_at"] else None,
+            **admission,
+        ))
+    return endpoints
+
+
+async def get_queue_wait_status() -> Optional[List[QueueWaitStatus]]:
+    """우선순위 등급별 큐 대기 시간 (OCR 태스크 시작 시 기록)"""
+    try:
+        stats = priority_service.get_wait_stats()
+    except Exception:
+        return None
+    return [
+        QueueWaitStatus(priority_class=cls, priority=priority, **stats.get(cls, {}))
+        for cls, priority in priority_service.PRIORITY_CLASSES.items()
+    ]
+
+
+async def get_fair_share_status() -> Optional[List[FairShareTenantStatus]]:
+    """공정 분배 대기열의 부서별 대기/처리 중 작업 수"""
+    from app.services.document_service import OCR_QUEUES
+
+    if not settings.OCR_FAIR_SHARE_ENABLED:
+        return None
+    try:
+        return [
+            FairShareTenantStatus(queue_name=queue, tenant=tenant, **counts)
+            for queue in OCR_QUEUES
+            for tenant, counts in fair_share_service.get_status(queue).items()
+        ]
+    except Exception:
+        return None
+
+
 async def get_storage_status() -> Optional[StorageStatus]:
     """스토리지 상태 확인"""
     try:
@@ -311,6 +396,9 @@ async def get_system_status(db: Session) -> SystemStatusResponse:
 
     workers = await get_worker_status()
     gpu = await get_gpu_status()
+    vlm_endpoints = await get_vlm_endpoint_status()
+    queue_wait = await get_queue_wait_status()
+    fair_share = await get_fair_share_status()
     storage = await get_storage_status()
 
     # 전체 상태 결정
@@ -330,5 +418,8 @@ async def get_system_status(db: Session) -> SystemStatusResponse:
         services=list(services),
         workers=workers,
         gpu=gpu,
+        vlm_endpoints=vlm_endpoints,
+        queue_wait=queue_wait,
+        fair_share=fair_share,
         storage=storage,
     )
@@ -0,0 +1,210 @@
+"""
+VLM 전역 동시 요청 제어 (admission control)
+
+여러 정밀 OCR 워커가 같은 vLLM 레플리카로 보내는 동시 요청 수를 Redis로 공유 제한하고,
+vLLM /metrics (실행/대기 요청 수, KV 캐시 사용률)에 따라 허용 한도를 AIMD 방식으로 조정
+- 대기 요청이 쌓이거나 KV 캐시가 포화되면 한도를 곱셈 감소
+- 한도까지 사용 중인데 서버에 여유가 있으면 한도를 1씩 증가
+"""
+import json
+import time
+import uuid
+import random
+from typing import Dict, Any, Optional
+
+import httpx
+import redis
+
+from app.core.config import settings
+
+KEY_PREFIX = "vlm:admission"
+
+# 슬롯 획득 (만료된 임대 정리 후 한도 미만이면 임대 추가)
+_ACQUIRE_SCRIPT = """
+local slots = KEYS[1]
+local limit_key = KEYS[2]
+local now = tonumber(ARGV[1])
+local lease = tonumber(ARGV[2])
+local token = ARGV[3]
+local limit = tonumber(redis.call('GET', limit_key) or ARGV[4])
+redis.call('ZREMRANGEBYSCORE', slots, '-inf', now)
+if redis.call('ZCARD', slots) < limit then
+    redis.call('ZADD', slots, now + lease, token)
+    redis.call('EXPIRE', slots, math.ceil(lease))
+    return 1
+end
+return 0
+"""
+
+
+def parse_vllm_metrics(text: str) -> Dict[str, float]:
+    """
+    vLLM Prometheus 지표에서 부하 지표 추출
+
+    Returns:
+        running, waiting, kv_cache_usage (0~1)
+    """
+    metrics = {"running": 0.0, "waiting": 0.0, "kv_cache_usage": 0.0}
+    names = {
+        "vllm:num_requests_running": "running",
+        "vllm:num_requests_waiting": "waiting",
+        "vllm:gpu_cache_usage_perc": "kv_cache_usage",  # V0
+        "vllm:kv_cache_usage_perc": "kv_cache_usage",   # V1
+    }
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name = line.split("{", 1)[0].split(" ", 1)[0]
+        key = names.get(name)
+        if key is None:
+            continue
+        try:
+            value = float(line.rsplit(" ", 1)[1])
+        except (IndexError, ValueError):
+            continue
+        if key == "kv_cache_usage":
+            metrics[key] = max(metrics[key], value)
+        else:
+            metrics[key] += value  # 모델(레이블)별 합산
+    return metrics
+
+
+def next_limit(
+    current: int,
+    in_use: int,
+    metrics: Dict[str, float],
+    min_limit: int,
+    max_limit: int,
+    kv_high: float = 0.9,
+) -> int:
+    """
+    vLLM 부하 지표로 다음 동시 요청 한도 계산 (AIMD)
+
+    Args:
+        current: 현재 한도
+        in_use: 현재 사용 중인 슬롯 수
+        metrics: parse_vllm_metrics 결과
+        min_limit / max_limit: 한도 범위
+        kv_high: 이 이상 KV 캐시 사용률이면 감소
+    """
+    if metrics["waiting"] > 0 or metrics["kv_cache_usage"] >= kv_high:
+        # 서버 대기열이 생기면 선점/스와핑으로 지연이 급증하므로 빠르게 줄임
+        return max(min_limit, int(current * 0.75))
+    if in_use >= current and metrics["kv_cache_usage"] < kv_high - 0.1:
+        return min(max_limit, current + 1)
+    return current
+
+
+class VLMAdmissionController:
+    """
+    Redis 기반 VLM 동시 요청 제한기 (ChandraOCRProcessor admission 인터페이스)
+
+    슬롯은 만료 시각을 점수로 하는 ZSET 임대로 관리하여, 워커가 비정상 종료해도
+    lease_seconds 후 자동 반환된다. Redis 장애 시에는 제한 없이 요청을 허용한다.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        initial_limit: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        kv_high: Optional[float] = None,
+        adjust_interval: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+        wait_timeout: Optional[float] = None,
+    ):
+        self.redis = redis_client or redis.from_url(settings.REDIS_URL)
+        self.initial_limit = initial_limit or settings.VLM_ADMISSION_INITIAL_LIMIT
+        self.min_limit = min_limit or settings.VLM_ADMISSION_MIN_LIMIT
+        self.max_limit = max_limit or settings.VLM_ADMISSION_MAX_LIMIT
+        self.kv_high = kv_high or settings.VLM_ADMISSION_KV_HIGH
+        self.adjust_interval = adjust_interval or settings.VLM_ADMISSION_ADJUST_SECONDS
+        self.lease_seconds = lease_seconds or settings.VLM_TIMEOUT + 30
+        self.wait_timeout = wait_timeout or settings.VLM_TIMEOUT
+        self._acquire = self.redis.register_script(_ACQUIRE_SCRIPT)
+
+    @staticmethod
+    def _key(api_base: str, name: str) -> str:
+        return f"{KEY_PREFIX}:{api_base}:{name}"
+
+    def acquire(self, api_base: str) -> Optional[str]:
+        """
+        요청 슬롯 획득 (한도에 여유가 생길 때까지 대기)
+
+        Returns:
+            슬롯 토큰 (Redis 장애 또는 대기 시간 초과로 제한 없이 진행하면 None)
+        """
+        token = uuid.uuid4().hex
+        deadline = time.time() + self.wait_timeout
+        delay = 0.05
+        while True:
+            try:
+                self._maybe_adjust(api_base)
+                acquired = self._acquire(
+                    keys=[self._key(api_base, "slots"), self._key(api_base, "limit")],
+                    args=[time.time(), self.lease_seconds, token, self.initial_limit],
+                )
+            except redis.RedisError as e:
+                print(f"[WARNING] VLM admission unavailable, sending without limit: {e}")
+                return None
+
+            if acquired:
+                return token
+            if time.time() >= deadline:
+                print(f"[WARNING] VLM admission wait exceeded {self.wait_timeout}s for {api_base}, sending anyway")
+                return None
+            time.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, 0.5)
+
+    def release(self, api_base: str, token: str) -> None:
+        """요청 슬롯 반환"""
+        try:
+            self.redis.zrem(self._key(api_base, "slots"), token)
+        except redis.RedisError:
+            pass  # 임대 만료로 자동 반환
+
+    def _maybe_adjust(self, api_base: str) -> None:
+        """adjust_interval마다 한 워커만 vLLM 지표를 읽어 한도 조정"""
+        if not self.redis.set(self._key(api_base, "adjust"), 1, nx=True, ex=max(1, int(self.adjust_interval))):
+            return
+        try:
+            metrics_url = api_base.rstrip("/")
+            if metrics_url.endswith("/v1"):
+                metrics_url = metrics_url[:-3]
+            response = httpx.get(f"{metrics_url}/metrics", timeout=2)
+            response.raise_for_status()
+            metrics = parse_vllm_metrics(response.text)
+        except httpx.HTTPError:
+            return  # 지표를 못 읽으면 현재 한도 유지
+
+        current = int(self.redis.get(self._key(api_base, "limit")) or self.initial_limit)
+        in_use = self.redis.zcount(self._key(api_base, "slots"), time.time(), "+inf")
+        limit = next_limit(current, in_use, metrics, self.min_limit, self.max_limit, self.kv_high)
+        pipe = self.redis.pipeline()
+        pipe.set(self._key(api_base, "limit"), limit)
+        pipe.set(
+            self._key(api_base, "metrics"),
+            json.dumps({**metrics, "updated_at": time.time()}),
+            ex=max(60, int(self.adjust_interval * 10)),
+        )
+        pipe.execute()
+        if limit != current:
+            print(
+                f"[INFO] VLM admission limit {current} -> {limit} for {api_base} "
+                f"(running={metrics['running']:.0f}, waiting={metrics['waiting']:.0f}, "
+                f"kv_cache={metrics['kv_cache_usage']:.2f})"
+            )
+
+
+def get_admission_status(api_base: str) -> Dict[str, Any]:
+    """엔드포인트별 현재 한도/사용 슬롯/최근 vLLM 지표 (시스템 상태 API용)"""
+    r = redis.from_url(settings.REDIS_URL)
+    key = f"{KEY_PREFIX}:{api_base}"
+    limit = r.get(f"{key}:limit")
+    metrics = r.get(f"{key}:metrics")
+    return {
+        "limit": int(limit) if limit else None,
+        "in_use": r.zcount(f"{key}:slots", time.time(), "+inf"),
+        "metrics": json.loads(metrics) if metrics else None,
+    }
@@ -0,0 +1,120 @@
+"""
+VLM 엔드포인트 통계 서비스
+
+정밀 OCR 워커가 집계한 vLLM 레플리카별 지연 시간/오류 통계를 Redis에 발행하고,
+시스템 상태 API에서 워커 프로세스별 통계를 합산하여 조회
+"""
+import os
+import json
+import time
+import socket
+from typing import List, Dict, Any, Optional
+
+import redis
+
+from app.core.config import settings
+from app.core.vlm_endpoints import parse_endpoint_spec
+
+ENDPOINT_STATS_KEY = "vlm:endpoint_stats"
+TOKEN_ESTIMATOR_KEY = "vlm:token_estimator"
+TRUNCATED_PAGES_KEY = "vlm:truncated_pages"
+STATS_TTL_SECONDS = 24 * 3600
+STALE_AFTER_SECONDS = 600  # 이 시간 이상 갱신되지 않은 워커 통계는 무시
+
+
+def configured_endpoints() -> List[Dict[str, Any]]:
+    """설정된 VLM 엔드포인트 목록 (VLM_API_BASES 우선, 없으면 VLM_API_BASE)"""
+    spec = settings.VLM_API_BASES or settings.VLM_API_BASE
+    return [{"api_base": url, "weight": weight} for url, weight in parse_endpoint_spec(spec)]
+
+
+def publish_endpoint_stats(stats: List[Dict[str, Any]]) -> None:
+    """워커 프로세스의 엔드포인트 통계 발행 (VLMClient on_endpoint_stats 콜백)"""
+    r = redis.from_url(settings.REDIS_URL)
+    reporter = f"{socket.gethostname()}:{os.getpid()}"
+    now = time.time()
+    pipe = r.pipeline()
+    for item in stats:
+        pipe.hset(
+            ENDPOINT_STATS_KEY,
+            f"{reporter}|{item['api_base']}",
+            json.dumps({**item, "updated_at": now}),
+        )
+    pipe.expire(ENDPOINT_STATS_KEY, STATS_TTL_SECONDS)
+    pipe.execute()
+
+
+def get_endpoint_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    엔드포인트별 통계 합산 조회
+
+    Returns:
+        api_base -> {requests, errors, in_flight, latency_ms_avg, healthy, last_error, reporters, updated_at}
+    """
+    r = redis.from_url(settings.REDIS_URL)
+    now = time.time()
+    merged: Dict[str, Dict[str, Any]] = {}
+
+    for raw in r.hvals(ENDPOINT_STATS_KEY):
+        item = json.loads(raw)
+        if now - item.get("updated_at", 0) > STALE_AFTER_SECONDS:
+            continue
+
+        entry = merged.setdefault(item["api_base"], {
+            "requests": 0,
+            "errors": 0,
+            "in_flight": 0,
+            "latency_weighted_sum": 0.0,
+            "latency_samples": 0,
+            "healthy": True,
+            "last_error": None,
+            "reporters": 0,
+            "updated_at": 0.0,
+        })
+        entry["requests"] += item.get("requests", 0)
+        entry["errors"] += item.get("errors", 0)
+        entry["in_flight"] += item.get("in_flight", 0)
+        entry["reporters"] += 1
+        # 한 워커라도 제외(eject) 상태면 비정상으로 표시
+        entry["healthy"] = entry["healthy"] and item.get("healthy", True)
+        if item.get("latency_ms_avg") is not None:
+            weight = max(item.get("requests", 0) - item.get("errors", 0), 1)
+            entry["latency_weighted_sum"] += item["latency_ms_avg"] * weight
+            entry["latency_samples"] += weight
+        if item.get("updated_at", 0) >= entry["updated_at"]:
+            entry["updated_at"] = item["updated_at"]
+            entry["last_error"] = item.get("last_error") or entry["last_error"]
+
+    for entry in merged.values():
+        samples = entry.pop("latency_samples")
+        total = entry.pop("latency_weighted_sum")
+        entry["latency_ms_avg"] = round(total / samples, 2) if samples else None
+
+    return merged
+
+
+def load_token_estimator_state() -> Optional[Dict[str, Any]]:
+    """워커 간 공유되는 출력 토큰 추정기 학습 상태 조회"""
+    try:
+        r = redis.from_url(settings.REDIS_URL)
+        raw = r.get(TOKEN_ESTIMATOR_KEY)
+        return json.loads(raw) if raw else None
+    except Exception:
+        return None
+
+
+def save_token_estimator_state(state: Dict[str, Any], truncated_pages: int = 0) -> None:
+    """
+    출력 토큰 추정기 학습 상태 저장
+
+    max_tokens에 걸려 잘린(finish_reason=length) 페이지 수는 누적 카운터로 기록
+    """
+    try:
+        r = redis.from_url(settings.REDIS_URL)
+        pipe = r.pipeline()
+        pipe.set(TOKEN_ESTIMATOR_KEY, json.dumps(state))
+        if truncated_pages:
+            pipe.incrby(TRUNCATED_PAGES_KEY, truncated_pages)
+        pipe.execute()
+    except Exception:
+        pass
@@ -0,0 +1,244 @@
+"""
+OCR 워커 autoscaler
+
+워커를 --autoscale=최대,최소로 실행하면 Celery 기본 autoscaler 대신 이 클래스가 프로세스 수를 정한다
+(celery_app의 worker_autoscaler 설정). 기본 autoscaler는 워커가 이미 받아둔 메시지 수만 보므로
+prefetch가 작으면 큐가 밀려도 늘지 않고, 자원 사용량과 관계없이 최대까지 늘린다.
+
+- 수요: 워커가 받아둔 작업 + 담당 큐 대기 작업 (공정 분배를 쓰면 dispatch window 이상은 동시에 처리되지 않음)
+- CPU: 작업 중인 프로세스당 CPU 사용량(/proc)으로 코어 수 x OCR_AUTOSCALE_CPU_TARGET까지
+- 메모리: 프로세스당 RSS로 가용 메모리가 OCR_AUTOSCALE_MIN_FREE_MEMORY_MB 아래로 떨어지지 않는 수까지
+- 처리 시간: 현재 부하의 페이지당 처리 시간이 유휴 시 대비 OCR_AUTOSCALE_MAX_SLOWDOWN배 이상이면
+  프로세스끼리 자원을 다투고 있으므로 더 늘리지 않음
+
+prefetch는 현재 프로세스 수 x 큐별 배수(OCR_WORKER_PREFETCH_MULTIPLIER)로 맞춘다. Celery는 최대 프로세스 수
+기준으로 잡으므로 그대로 두면 축소된 상태의 바쁜 프로세스가 긴 OCR 작업을 미리 받아 묶어둔다.
+"""
+import os
+from time import monotonic
+from typing import Dict, Any, Optional, List, Tuple
+
+import redis
+from celery.signals import worker_ready
+from celery.worker import state
+from celery.worker.autoscale import Autoscaler
+
+from app.core.config import settings
+from app.models.document import OCRMode
+from app.services import fair_share_service, latency_service
+
+# 워커가 처리할 수 있는 OCR 큐와 모드
+QUEUE_MODES = {
+    "fast_ocr": OCRMode.FAST,
+    "accurate_ocr": OCRMode.ACCURATE,
+    "precision_ocr": OCRMode.PRECISION,
+}
+
+CPU_PER_TASK_FLOOR = 0.05  # VLM 응답 대기처럼 CPU를 거의 쓰지 않는 작업의 코어 사용량 하한
+USAGE_EMA_ALPHA = 0.3
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def process_usage(pid: int) -> Optional[Tuple[float, int]]:
+    """프로세스 (누적 CPU 초, RSS 바이트) (/proc에서 읽지 못하면 None)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    # 프로세스 이름 뒤 필드: state(0) ... utime(11), stime(12)
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return cpu_seconds, rss_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def available_memory() -> Optional[int]:
+    """가용 메모리 바이트 (/proc/meminfo MemAvailable, 읽지 못하면 None)"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def cpu_count() -> int:
+    """워커가 쓸 수 있는 코어 수"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def target_processes(
+    demand: int,
+    current: int,
+    min_concurrency: int,
+    max_concurrency: int,
+    cpus: int,
+    cpu_per_task: Optional[float] = None,
+    rss_per_task: Optional[int] = None,
+    free_memory: Optional[int] = None,
+    slowdown: Optional[float] = None,
+) -> int:
+    """
+    목표 프로세스 수
+
+    수요만큼 늘리되 자원 기준을 넘지 않는다. 자원 기준이 현재보다 작으면 줄이는데,
+    Celery는 작업 중인 프로세스를 줄이지 않으므로 작업이 끝난 프로세스부터 정리된다.
+    """
+    limit = max_concurrency
+    if cpu_per_task is not None:
+        per_task = max(cpu_per_task, CPU_PER_TASK_FLOOR)
+        limit = min(limit, max(int(cpus * settings.OCR_AUTOSCALE_CPU_TARGET / per_task), 1))
+    if rss_per_task and free_memory is not None:
+        spare = free_memory - settings.OCR_AUTOSCALE_MIN_FREE_MEMORY_MB * 1024 * 1024
+        limit = min(limit, current + spare // rss_per_task)
+    if slowdown is not None and slowdown >= settings.OCR_AUTOSCALE_MAX_SLOWDOWN:
+        limit = min(limit, current)
+    return max(min(demand, limit), min_concurrency)
+
+
+class OCRAutoscaler(Autoscaler):
+    """큐 깊이, 프로세스 자원 사용량, 페이지 처리 시간 기반 autoscaler"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.target = None
+        self.cpu_per_task = None
+        self.rss_per_task = None
+        self._checked_at = None
+        self._cpu_seconds = {}  # pid -> 누적 CPU 초 (이전 측정)
+
+    def queues(self) -> List[str]:
+        """워커가 소비하는 OCR 큐"""
+        consume_from = self.worker.app.amqp.queues.consume_from if self.worker else {}
+        return [queue for queue in QUEUE_MODES if queue in consume_from]
+
+    def prefetch_multiplier(self) -> int:
+        """프로세스당 prefetch (여러 큐를 소비하면 가장 작은 값)"""
+        multipliers = fair_share_service.parse_setting_map(settings.OCR_WORKER_PREFETCH_MULTIPLIER)
+        return max(min([int(multipliers[q]) for q in self.queues() if q in multipliers] or [1]), 1)
+
+    def _sample_usage(self, elapsed: Optional[float]):
+        """자식 프로세스 사용량 갱신 (작업 중인 프로세스당 평균 CPU 코어 사용량, 가장 큰 RSS)"""
+        usage = {}
+        for pid in self.pool.info.get("processes", []):
+            sample = process_usage(pid)
+            if sample:
+                usage[pid] = sample
+        if usage:
+            self.rss_per_task = max(rss for _, rss in usage.values())
+
+        active = len(state.active_requests)
+        if elapsed and active:
+            used = sum(
+                max(cpu - self._cpu_seconds[pid], 0.0)
+                for pid, (cpu, _) in usage.items() if pid in self._cpu_seconds
+            )
+            per_task = used / elapsed / active
+            if self.cpu_per_task is None:
+                self.cpu_per_task = per_task
+            else:
+                self.cpu_per_task += USAGE_EMA_ALPHA * (per_task - self.cpu_per_task)
+        self._cpu_seconds = {pid: cpu for pid, (cpu, _) in usage.items()}
+
+    def _queue_load(self, queues: List[str]) -> Tuple[int, Optional[float]]:
+        """(담당 큐 대기 작업 수, 가장 큰 페이지 처리 시간 증가율) (Redis 오류면 대기 작업 0)"""
+        depth, slowdowns = 0, []
+        try:
+            r = _redis()
+            for queue in queues:
+                queue_depth = latency_service.queue_depth(queue, r)
+                depth += queue_depth
+                slowdowns.append(latency_service.slowdown(QUEUE_MODES[queue], queue_depth))
+        except redis.RedisError as e:
+            print(f"[WARNING] Autoscaler could not read queue depth: {e}")
+            return 0, None
+        slowdowns = [s for s in slowdowns if s is not None]
+        return depth, max(slowdowns) if slowdowns else None
+
+    def compute_target(self, elapsed: Optional[float] = None) -> int:
+        """현재 측정값으로 목표 프로세스 수 계산"""
+        queues = self.queues()
+        self._sample_usage(elapsed)
+        depth, slowdown = self._queue_load(queues)
+        demand = self.qty + depth
+        if settings.OCR_FAIR_SHARE_ENABLED and queues:
+            demand = min(demand, sum(fair_share_service.dispatch_window(q) for q in queues))
+        return target_processes(
+            demand,
+            self.processes,
+            self.min_concurrency,
+            self.max_concurrency,
+            cpu_count(),
+            cpu_per_task=self.cpu_per_task,
+            rss_per_task=self.rss_per_task,
+            free_memory=available_memory(),
+            slowdown=slowdown,
+        )
+
+    def _maybe_scale(self, req=None):
+        # 태스크 메시지마다 호출되므로 측정은 OCR_AUTOSCALE_INTERVAL_SECONDS 간격으로만
+        now = monotonic()
+        elapsed = now - self._checked_at if self._checked_at is not None else None
+        if elapsed is None or elapsed >= settings.OCR_AUTOSCALE_INTERVAL_SECONDS:
+            self.target = self.compute_target(elapsed)
+            self._checked_at = now
+
+        procs = self.processes
+        scaled = False
+        if self.target > procs:
+            self.scale_up(self.target - procs)
+            scaled = True
+        elif self.target < procs:
+            scaled = self.scale_down(procs - self.target)
+        self.sync_prefetch()
+        return scaled
+
+    def scale_down(self, n):
+        """마지막 증설 후 keepalive 동안은 줄이지 않음 (증설한 적이 없으면 바로 줄임)"""
+        if self._last_scale_up is not None and monotonic() - self._last_scale_up <= self.keepalive:
+            return False
+        self._shrink(n)
+        return True
+
+    def sync_prefetch(self):
+        """prefetch를 현재 프로세스 수 x 큐별 배수로 맞춤 (prefetch를 끈 워커는 그대로)"""
+        consumer = getattr(self.worker, "consumer", None)
+        qos = getattr(consumer, "qos", None)
+        if qos is None or not consumer.initial_prefetch_count:
+            return
+        prefetch = max(self.processes, 1) * self.prefetch_multiplier()
+        consumer.initial_prefetch_count = prefetch
+        if qos.value < prefetch:
+            qos.increment_eventually(prefetch - qos.value)
+        elif qos.value > prefetch:
+            qos.decrement_eventually(qos.value - prefetch)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            **super().info(),
+            "target": self.target,
+            "cpu_per_task": self.cpu_per_task,
+            "rss_per_task": self.rss_per_task,
+        }
+
+
+@worker_ready.connect
+def _sync_prefetch_on_start(sender=None, **kwargs):
+    """기동 직후 prefetch를 최소 프로세스 수 기준으로 (Celery는 최대 프로세스 수 기준으로 시작)"""
+    autoscaler = getattr(getattr(sender, "controller", None), "autoscaler", None)
+    if isinstance(autoscaler, OCRAutoscaler):
+        autoscaler.sync_prefetch()
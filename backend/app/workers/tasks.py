@@ -4,13 +4,15 @@ OCR 처리 Celery 태스크
 VLM OCR: https://github.com/datalab-to/chandra
 """
 import os
-from datetime import datetime
-from typing import Optional, List
+import time
+from datetime import datetime, timedelta
+from typing import Optional, List, Tuple
 
+import redis
 from celery import shared_task
 from sqlalchemy.orm import Session
 from PIL import Image
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import tempfile
 
 from app.core.celery_app import celery_app
@@ -19,79 +21,700 @@ from app.db.session import SessionLocal
 from app.models.document import (
     Document,
     DocumentPage,
-    DocumentBlock,
     DocumentStatus,
     OCRMode,
     BlockType,
 )
-from app.services.storage_service import storage_service
+from app.services.storage_service import storage_service, VLMImageStore
+from app.services import (
+    vlm_stats_service,
+    progress_service,
+    priority_service,
+    fair_share_service,
+    fanout_service,
+    page_analysis_service,
+    latency_service,
+    document_lock_service,
+    cancel_service,
+)
+from app.services.ocr_service import get_ocr_mode_recommendation, get_fallback_chain
+from app.services.vlm_admission_service import VLMAdmissionController
+from app.services.page_persistence_service import PageWriter
+
+
+# ocr_json.ocr_engine에 기록하는 모드별 엔진 이름
+ENGINE_NAMES = {
+    OCRMode.FAST: "tesseract",
+    OCRMode.ACCURATE: "paddleocr",
+    OCRMode.PRECISION: "chandra",
+}
+
+# 페이지 단위로 커밋하므로 워커가 중단되면 메시지를 다시 받아 첫 번째 미완료 페이지부터 이어서 처리
+RESUMABLE_TASK_OPTIONS = {
+    "acks_late": True,
+    "reject_on_worker_lost": True,
+    "max_retries": settings.OCR_TASK_MAX_RETRIES,
+    "default_retry_delay": settings.OCR_TASK_RETRY_DELAY_SECONDS,
+}
+
+
+@celery_app.task(bind=True, name="process_document", **RESUMABLE_TASK_OPTIONS)
+def process_document(
+    self,
+    document_id: int,
+    deadline_seconds: Optional[int] = None,
+    deadline: Optional[float] = None,
+):
+    """
+    문서 OCR 처리 메인 태스크
 
+    페이지 수가 OCR_FANOUT_PAGES_PER_TASK를 넘는 PDF는 페이지 범위별 서브태스크로 나눠
+    여러 워커에서 동시에 처리하고, 마지막 범위가 끝나면 finalize_document에서 문서 상태를 마무리한다.
+    오류 시 재시도하며, 재시도/재전달/재처리 모두 이미 저장된 페이지는 건너뛴다.
+    재시도할 때를 제외하면 끝날 때 공정 분배 슬롯을 반환한다.
+    AUTO 문서는 classify_document가 정한 recommended_ocr_mode로 처리하며,
+    모드에 맞지 않는 큐로 전달된 메시지는 처리하지 않고 맞는 큐로 다시 등록한다
+    (GPU/딥러닝 엔진은 해당 엔진이 설치된 워커에서만 실행).
+    같은 문서를 다른 태스크가 처리 중이거나 이미 처리가 끝난 문서면 바로 종료한다.
+
+    Args:
+        document_id: 문서 ID
+        deadline_seconds: 정밀 OCR 문서 처리 제한 시간 (업로드 시 지정, 없으면 설정값)
+        deadline: 등록 시 정한 문서 제한 시각 (epoch seconds, 재시도/재등록에도 유지)
+    """
+    lease = document_lock_service.DocumentLease(f"doc:{document_id}")
+    if not lease.acquire():
+        return _defer_duplicate(self, f"Document {document_id}", {"status": "duplicate", "document_id": document_id})
+
+    # 우선순위 등급별 큐 대기 시간 기록 (재시도/재전달은 제외)
+    if not self.request.retries and not (self.request.delivery_info or {}).get("redelivered"):
+        priority_service.record_wait(
+            _request_header(self.request, "priority_class"),
+            _request_header(self.request, "enqueued_at"),
+        )
+
+    from app.services.document_service import _get_ocr_queue
 
-@celery_app.task(bind=True, name="process_document")
-def process_document(self, document_id: int):
-    """문서 OCR 처리 메인 태스크"""
     db = SessionLocal()
+    release_slot = True
     try:
         document = db.query(Document).filter(Document.id == document_id).first()
         if not document:
             return {"status": "error", "message": "Document not found"}
+        if document.status not in (DocumentStatus.PENDING, DocumentStatus.PROCESSING):
+            print(f"[INFO] Document {document_id} is already {document.status.value}, skipping duplicate task")
+            return {"status": "duplicate", "document_id": document_id}
 
-        document.status = DocumentStatus.PROCESSING
-        db.commit()
-
-        # OCR 모드 결정
+        # OCR 모드 결정 (AUTO는 분류 태스크 결과 사용)
         ocr_mode = document.ocr_mode
         if ocr_mode == OCRMode.AUTO:
-            ocr_mode = _determine_ocr_mode(document)
-            document.recommended_ocr_mode = ocr_mode
-
-        # OCR 처리 (3가지 모드)
-        if ocr_mode == OCRMode.FAST:
-            _process_fast_ocr(db, document)
-        elif ocr_mode == OCRMode.ACCURATE:
-            _process_accurate_ocr(db, document)
-        else:  # PRECISION
-            _process_precision_ocr(db, document)
-
-        document.status = DocumentStatus.COMPLETED
-        document.processed_at = datetime.utcnow()
+            ocr_mode = document.recommended_ocr_mode
+
+        delivered_queue = (self.request.delivery_info or {}).get("routing_key")
+        if ocr_mode in (None, OCRMode.AUTO) or (
+            delivered_queue and delivered_queue != _get_ocr_queue(ocr_mode)
+        ):
+            # 슬롯/임대를 먼저 반환해야 다시 등록한 작업의 슬롯이 지워지거나 중복으로 종료되지 않음
+            release_slot = False
+            _release_slot(f"doc:{document_id}")
+            lease.release()
+            _requeue_document(
+                document,
+                ocr_mode,
+                {"deadline_seconds": deadline_seconds, "deadline": deadline},
+                _request_header(self.request, "priority_class"),
+                _request_header(self.request, "enqueued_at"),
+            )
+            return {"status": "rerouted", "document_id": document_id}
+
+        document.status = DocumentStatus.PROCESSING
         db.commit()
+        progress_service.start(document_id)
+
+        # 정밀 OCR 문서 제한 시각 (분할 처리 시 서브태스크가 같은 시각을 공유하도록 절대 시각으로 전달)
+        if deadline is None:
+            deadline = _document_deadline(deadline_seconds, _request_header(self.request, "enqueued_at"))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # MinIO에서 파일 다운로드
+            local_file = os.path.join(tmpdir, "document")
+            storage_service.download_to_file(document.file_path, local_file)
+
+            document.page_count = _count_pages(document, local_file)
+            db.commit()
+            progress_service.update(document_id, pages_total=document.page_count)
+
+            # 대용량 PDF는 페이지 범위로 나눠 워커 여러 대에 분산
+            page_ranges = _plan_page_ranges(document.page_count, settings.OCR_FANOUT_PAGES_PER_TASK)
+            if document.mime_type == "application/pdf" and len(page_ranges) > 1:
+                progress_service.update(document_id, stage=progress_service.STAGE_SPLITTING)
+                _fan_out(
+                    document, ocr_mode, local_file, page_ranges, deadline,
+                    priority_cls=_request_header(self.request, "priority_class"),
+                )
+                return {"status": "dispatched", "document_id": document_id, "subtasks": len(page_ranges)}
+
+            # OCR 처리 (3가지 모드)
+            degraded_pages = _process_pages(db, document, ocr_mode, local_file, deadline=deadline)
 
+        _complete_document(db, document, degraded_pages)
         return {"status": "success", "document_id": document_id}
 
+    except cancel_service.DocumentCancelled:
+        # 문서 상태는 취소 요청 시 이미 변경됨
+        db.rollback()
+        print(f"[INFO] Processing of document {document_id} cancelled")
+        return {"status": "cancelled", "document_id": document_id}
+
     except Exception as e:
+        db.rollback()
+        # 재시도가 남아 있으면 PROCESSING 유지 (저장된 페이지는 다음 시도에서 건너뜀)
+        if self.request.retries < self.max_retries:
+            print(f"[WARNING] Document {document_id} failed, retrying: {e}")
+            release_slot = False
+            raise self.retry(exc=e)
         document.status = DocumentStatus.FAILED
         document.error_message = str(e)
         db.commit()
+        progress_service.finish(document_id, progress_service.STAGE_FAILED)
+        document_lock_service.clear_request(document_id)
+        raise
+
+    finally:
+        db.close()
+        lease.release()
+        if release_slot:
+            _release_slot(f"doc:{document_id}")
+
+
+@celery_app.task(bind=True, name="classify_document", **RESUMABLE_TASK_OPTIONS)
+def classify_document(
+    self,
+    document_id: int,
+    deadline_seconds: Optional[int] = None,
+    deadline: Optional[float] = None,
+):
+    """
+    AUTO 문서 OCR 모드 결정 (fast_ocr 큐의 가벼운 CPU 태스크)
+
+    샘플 페이지 사전 분석(스캔본/표/다단/품질)과 문서 메타데이터로 모드를 정해 recommended_ocr_mode에 저장하고,
+    해당 모드 큐의 process_document로 다시 등록한다. 우선순위 등급과 최초 등록 시각은 그대로 넘긴다.
+
+    Args:
+        document_id: 문서 ID
+        deadline_seconds: 업로드 시 지정한 문서 처리 제한 시간 (모드 선택에 반영, process_document에 전달)
+        deadline: 등록 시 정한 문서 제한 시각 (process_document에 그대로 전달)
+    """
+    lease = document_lock_service.DocumentLease(f"classify:{document_id}")
+    if not lease.acquire():
+        return _defer_duplicate(self, f"Document {document_id}", {"status": "duplicate", "document_id": document_id})
+
+    db = SessionLocal()
+    try:
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if not document:
+            return {"status": "error", "message": "Document not found"}
+        if document.status != DocumentStatus.PENDING:
+            print(f"[INFO] Document {document_id} is already {document.status.value}, skipping duplicate classification")
+            return {"status": "duplicate", "document_id": document_id}
+
+        progress_service.start(document_id, stage=progress_service.STAGE_CLASSIFYING)
+        # 샘플 페이지 사전 분석 (재시도/재처리 시에는 캐시 사용)
+        features = page_analysis_service.get_cached(document_id)
+        if features is None:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                local_file = os.path.join(tmpdir, "document")
+                storage_service.download_to_file(document.file_path, local_file)
+                features = page_analysis_service.analyze(local_file, document.mime_type)
+            page_analysis_service.cache(document_id, features)
+        if not document.page_count:
+            document.page_count = features["page_count"]
+
+        recommendation = get_ocr_mode_recommendation(document, features)
+        ocr_mode = recommendation.recommended_mode
+        # 업로드 시 제한 시간을 지정했으면 처리 이력상 남은 시간 안에 끝나는 가장 정확한 모드 (추천 모드 이하)
+        enqueued_at = _request_header(self.request, "enqueued_at")
+        if deadline_seconds:
+            remaining = (deadline or _document_deadline(deadline_seconds, enqueued_at)) - time.time()
+            estimates = latency_service.estimate_modes(document.page_count, features)
+            if estimates:
+                ocr_mode = latency_service.select_mode(estimates, remaining, ocr_mode)
+        document.recommended_ocr_mode = ocr_mode
+        document.precision_score = recommendation.precision_score
+        db.commit()
+        progress_service.update(document_id, stage=progress_service.STAGE_QUEUED)
+
+        _requeue_document(
+            document,
+            ocr_mode,
+            {"deadline_seconds": deadline_seconds, "deadline": deadline},
+            _request_header(self.request, "priority_class"),
+            enqueued_at,
+        )
+        print(f"[INFO] Document {document_id} classified as {ocr_mode.value}")
+        return {"status": "classified", "document_id": document_id, "ocr_mode": ocr_mode.value}
+
+    except Exception as e:
+        db.rollback()
+        if self.request.retries < self.max_retries:
+            print(f"[WARNING] Classification of document {document_id} failed, retrying: {e}")
+            raise self.retry(exc=e)
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if document:
+            document.status = DocumentStatus.FAILED
+            document.error_message = str(e)
+            db.commit()
+        progress_service.finish(document_id, progress_service.STAGE_FAILED)
+        document_lock_service.clear_request(document_id)
         raise
 
     finally:
         db.close()
+        lease.release()
 
 
-def _determine_ocr_mode(document: Document) -> OCRMode:
-    """OCR 모드 자동 결정"""
-    from app.services.ocr_service import recommend_ocr_mode
-    import asyncio
+def _document_deadline(deadline_seconds: Optional[int], enqueued_at: Optional[float]) -> Optional[float]:
+    """
+    문서 제한 시각 (최초 등록 시각 기준)
 
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    등록 시 deadline을 정하지 않은 작업용. 재시도마다 처리 시작 시각으로 다시 계산하면
+    제한 시간이 늘어나므로 메시지 헤더의 최초 등록 시각을 기준으로 한다.
+    """
+    deadline_seconds = deadline_seconds or settings.OCR_PRECISION_DOCUMENT_DEADLINE_SECONDS
+    if not deadline_seconds:
+        return None
+    return float(enqueued_at or time.time()) + deadline_seconds
+
+
+def _requeue_document(
+    document: Document,
+    ocr_mode: Optional[OCRMode],
+    kwargs: dict,
+    priority_cls: Optional[str],
+    enqueued_at: Optional[float],
+):
+    """
+    문서를 OCR 모드에 맞는 큐로 다시 등록 (모드가 정해지지 않았으면 classify_document로)
+
+    원래 우선순위 등급과 최초 등록 시각을 유지해 공정 분배 순서와 대기 시간 통계가 이어지게 한다.
+    """
+    from app.services.document_service import _get_ocr_queue
+
+    if priority_cls not in priority_service.PRIORITY_CLASSES:
+        priority_cls = priority_service.priority_class(document.importance)
+    if ocr_mode in (None, OCRMode.AUTO):
+        job = fair_share_service.make_job("classify_document", [document.id], kwargs, None, priority_cls)
+    else:
+        job = fair_share_service.make_job(
+            "process_document", [document.id], kwargs, f"doc:{document.id}", priority_cls,
+        )
+    if enqueued_at is not None:
+        job["enqueued_at"] = float(enqueued_at)
+    enqueue_ocr(_get_ocr_queue(ocr_mode or OCRMode.AUTO), fair_share_service.tenant_of(document), [job])
+
+
+@celery_app.task(bind=True, name="process_page_range", **RESUMABLE_TASK_OPTIONS)
+def process_page_range(
+    self,
+    document_id: int,
+    ocr_mode: str,
+    first_page: int,
+    chunk_path: str,
+    deadline: Optional[float] = None,
+):
+    """
+    페이지 범위 OCR 서브태스크 (process_document 분할 처리)
+
+    Args:
+        document_id: 문서 ID
+        ocr_mode: 결정된 OCR 모드 (fast/accurate/precision)
+        first_page: 범위의 첫 페이지 번호 (문서 기준)
+        chunk_path: 범위 PDF의 MinIO 경로
+        deadline: 정밀 OCR 문서 제한 시각 (epoch seconds)
+
+    Returns:
+        범위 처리 결과 (마지막 범위면 finalize_document 호출)
+    """
+    lease = document_lock_service.DocumentLease(f"doc:{document_id}:{first_page}")
+    if not lease.acquire():
+        return _defer_duplicate(
+            self, f"Pages from {first_page} of document {document_id}", {"first_page": first_page, "skipped": True},
+        )
+
+    db = SessionLocal()
+    release_slot = True
     try:
-        recommendation = loop.run_until_complete(recommend_ocr_mode(document))
-        return recommendation.recommended_mode
+        document = db.query(Document).filter(Document.id == document_id).first()
+        # 다른 범위가 실패해 문서가 실패 처리되었거나 이미 마무리된 문서면 남은 범위는 처리하지 않음
+        if not document or document.status != DocumentStatus.PROCESSING:
+            return {"first_page": first_page, "skipped": True}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            local_file = os.path.join(tmpdir, "chunk.pdf")
+            storage_service.download_to_file(chunk_path, local_file)
+            degraded_pages = _process_pages(
+                db, document, OCRMode(ocr_mode), local_file, first_page=first_page, deadline=deadline,
+            )
+
+        if fanout_service.range_done(document_id, first_page, degraded_pages):
+            finalize_document.apply_async(args=[document_id])
+        return {"first_page": first_page, "degraded_pages": degraded_pages}
+
+    except cancel_service.DocumentCancelled:
+        db.rollback()
+        print(f"[INFO] Pages from {first_page} of document {document_id} cancelled")
+        return {"first_page": first_page, "cancelled": True}
+
+    except Exception as e:
+        db.rollback()
+        # 재시도를 모두 소진하면 문서 실패 처리
+        if self.request.retries < self.max_retries:
+            print(f"[WARNING] Pages from {first_page} of document {document_id} failed, retrying: {e}")
+            release_slot = False
+            raise self.retry(exc=e)
+        mark_document_failed.apply_async(args=[document_id, str(e)])
+        raise
+
     finally:
-        loop.close()
+        db.close()
+        lease.release()
+        if release_slot:
+            _release_slot(f"doc:{document_id}:{first_page}")
+
+
+@celery_app.task(name="finalize_document")
+def finalize_document(document_id: int):
+    """
+    분할 처리 마무리 (마지막 페이지 범위 완료 시 호출)
+
+    범위별 결과를 합산해 문서 상태와 페이지 수를 확정하고 범위 PDF를 정리
+    """
+    db = SessionLocal()
+    try:
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if not document:
+            return {"status": "error", "message": "Document not found"}
+
+        progress_service.update(document_id, stage=progress_service.STAGE_FINALIZING)
+        document.page_count = db.query(DocumentPage).filter(DocumentPage.document_id == document_id).count()
+        _complete_document(db, document, fanout_service.degraded_pages(document_id))
+        return {"status": "success", "document_id": document_id}
+
+    finally:
+        db.close()
+        storage_service.delete_document_chunks(document_id)
+        fanout_service.clear(document_id)
+
+
+@celery_app.task(name="mark_document_failed")
+def mark_document_failed(document_id: int, error: str):
+    """분할 처리 중 범위 서브태스크가 재시도를 모두 소진하면 문서를 실패 상태로 표시"""
+    db = SessionLocal()
+    try:
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if document:
+            document.status = DocumentStatus.FAILED
+            document.error_message = error
+            db.commit()
+        progress_service.finish(document_id, progress_service.STAGE_FAILED)
+        document_lock_service.clear_request(document_id)
+    finally:
+        db.close()
+        storage_service.delete_document_chunks(document_id)
+        fanout_service.clear(document_id)
+
+
+@celery_app.task(name="dispatch_ocr_queues")
+def dispatch_ocr_queues():
+    """
+    공정 분배 대기열 주기 dispatch (celery beat)
+
+    보통은 작업 등록/완료 시 바로 dispatch되며, 워커 비정상 종료로 만료된 슬롯을 회수하는 용도
+    """
+    from app.services.document_service import OCR_QUEUES
+
+    if not settings.OCR_FAIR_SHARE_ENABLED:
+        return {}
+    dispatched = {}
+    for queue in OCR_QUEUES:
+        jobs = fair_share_service.dispatch(queue)
+        _send_jobs(queue, jobs)
+        dispatched[queue] = len(jobs)
+    return dispatched
+
+
+def enqueue_ocr(queue: str, tenant: str, jobs: List[dict]):
+    """
+    OCR 태스크 등록 (fair_share_service.make_job으로 만든 작업)
+
+    공정 분배를 사용하면 부서 대기열에 넣고 빈 슬롯만큼만 Celery 큐로 보낸다.
+    긴급 요청과 슬롯이 없는 작업(classify_document)은 부서 대기열을 거치지 않고,
+    공정 분배를 끄거나 Redis에 넣지 못하면 바로 Celery 큐에 넣는다.
+    """
+    if not settings.OCR_FAIR_SHARE_ENABLED:
+        _send_jobs(queue, jobs)
+        return
+
+    direct = [job for job in jobs if job["priority_class"] == "urgent" or not job["slot"]]
+    queued = [job for job in jobs if job not in direct]
+    if queued:
+        try:
+            fair_share_service.submit(queue, tenant, queued)
+        except redis.RedisError as e:
+            print(f"[WARNING] Fair-share queue unavailable, enqueueing directly: {e}")
+            direct += queued
+        else:
+            try:
+                direct += fair_share_service.dispatch(queue)
+            except redis.RedisError as e:
+                # 대기열에는 들어갔으므로 다음 dispatch(작업 완료, beat)에서 보냄
+                print(f"[WARNING] Fair-share dispatch failed: {e}")
+    _send_jobs(queue, direct)
+
+
+def _send_jobs(queue: str, jobs: List[dict]):
+    """작업을 Celery 큐로 전송 (우선순위 등급과 최초 등록 시각 유지)"""
+    ocr_tasks = {
+        "classify_document": classify_document,
+        "process_document": process_document,
+        "process_page_range": process_page_range,
+    }
+    for job in jobs:
+        options = priority_service.class_options(job["priority_class"])
+        options["headers"]["enqueued_at"] = job["enqueued_at"]
+        result = ocr_tasks[job["task"]].apply_async(args=job["args"], kwargs=job["kwargs"], queue=queue, **options)
+        # 처리 취소 시 아직 시작하지 않은 태스크를 revoke할 수 있도록 기록
+        cancel_service.track_task(job["args"][0], result.id)
+
+
+def _release_slot(slot: str):
+    """공정 분배 처리 중 슬롯 반환 후 해당 큐의 다음 작업 dispatch"""
+    from app.services.document_service import OCR_QUEUES
+
+    if not settings.OCR_FAIR_SHARE_ENABLED:
+        return
+    try:
+        for queue in fair_share_service.release(slot, list(OCR_QUEUES)):
+            _send_jobs(queue, fair_share_service.dispatch(queue))
+    except redis.RedisError as e:
+        print(f"[WARNING] Failed to release fair-share slot {slot}: {e}")
+
+
+@celery_app.task(name="age_ocr_queues")
+def age_ocr_queues():
+    """OCR 큐에서 OCR_PRIORITY_AGING_SECONDS 이상 대기한 작업의 우선순위를 한 단계 올림 (celery beat)"""
+    from app.services.document_service import OCR_QUEUES
+
+    r = redis.from_url(settings.REDIS_URL)
+    moved = {
+        queue: priority_service.age_queue(r, queue, settings.OCR_PRIORITY_AGING_SECONDS)
+        for queue in OCR_QUEUES
+    }
+    if any(moved.values()):
+        print(f"[INFO] Promoted long-waiting OCR tasks: {moved}")
+    return moved
+
+
+def _defer_duplicate(task, label: str, result: dict) -> dict:
+    """
+    다른 태스크가 임대를 잡고 있을 때 처리하지 않고 바로 종료
+
+    원래 태스크의 워커가 죽어 임대 만료를 기다리는 재전달일 수 있으므로 재시도가 남아 있으면
+    임대 TTL 뒤에 한 번 더 확인한다 (그때는 임대를 잡아 이어서 처리하거나, 문서 상태로 이미 처리된
+    요청임을 확인해 건너뜀). 처리 중 슬롯은 원래 태스크의 것이므로 반환하지 않는다.
+    """
+    if task.request.retries < task.max_retries:
+        print(f"[INFO] {label} is being processed by another task, checking again later")
+        raise task.retry(countdown=settings.OCR_DOCUMENT_LEASE_SECONDS)
+    print(f"[INFO] {label} is being processed by another task, skipping duplicate")
+    return result
+
+
+def _request_header(request, name: str):
+    """apply_async(headers=...)로 전달한 메시지 헤더 값 (Celery 버전에 따라 위치가 다름)"""
+    value = getattr(request, name, None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get(name)
+    return value
+
+
+def _process_pages(
+    db: Session,
+    document: Document,
+    ocr_mode: OCRMode,
+    local_file: str,
+    first_page: int = 1,
+    deadline: Optional[float] = None,
+) -> int:
+    """
+    OCR 모드별 페이지 처리 (문서 전체 또는 페이지 범위 PDF)
+
+    Returns:
+        엔진 오류/제한 시간 초과로 대체 엔진이 처리한 페이지 수
+    """
+    from app.services.document_service import _get_ocr_queue
+
+    # 엔진별 처리 시간 이력 (이번 태스크가 새로 저장한 페이지 기준, 시작 시점 큐 깊이로 구분)
+    last_page = first_page + _count_pages(document, local_file) - 1
+    saved_before = _count_saved_pages(db, document.id, first_page, last_page)
+    try:
+        depth = latency_service.queue_depth(_get_ocr_queue(ocr_mode))
+    except redis.RedisError:
+        depth = 0
+    started = time.time()
+
+    degraded_pages = _run_engine(db, document, ocr_mode, local_file, first_page, deadline)
+
+    latency_service.record(
+        ocr_mode,
+        page_analysis_service.get_cached(document.id),
+        depth,
+        _count_saved_pages(db, document.id, first_page, last_page) - saved_before,
+        time.time() - started,
+    )
+    return degraded_pages
+
 
+def _run_engine(
+    db: Session,
+    document: Document,
+    ocr_mode: OCRMode,
+    local_file: str,
+    first_page: int = 1,
+    deadline: Optional[float] = None,
+) -> int:
+    """OCR 모드 엔진으로 처리 (대체 엔진이 처리한 페이지 수 반환)"""
+    if ocr_mode == OCRMode.FAST:
+        return _process_fast_ocr(db, document, local_file, first_page)
+    if ocr_mode == OCRMode.ACCURATE:
+        return _process_accurate_ocr(db, document, local_file, first_page)
+    return _process_precision_ocr(db, document, local_file, first_page, deadline)
+
+
+def _unavailable_engine(
+    db: Session,
+    document: Document,
+    ocr_mode: OCRMode,
+    local_file: str,
+    first_page: int = 1,
+    deadline: Optional[float] = None,
+) -> int:
+    """엔진이 설치되지 않은 워커: 문서 전체를 대체 체인의 첫 번째 엔진으로 처리"""
+    chain = get_fallback_chain(ocr_mode)
+    if not chain:
+        raise RuntimeError(f"{ENGINE_NAMES[ocr_mode]} is not available and {ocr_mode.value} has no fallback engine")
+    print(
+        f"[INFO] {ENGINE_NAMES[ocr_mode]} not available, falling back to {chain[0].value} OCR "
+        f"for document {document.id}"
+    )
+    return _run_engine(db, document, chain[0], local_file, first_page, deadline)
+
+
+def _count_saved_pages(db: Session, document_id: int, first_page: int, last_page: int) -> int:
+    """범위 안에 저장된 페이지 수"""
+    return db.query(DocumentPage).filter(
+        DocumentPage.document_id == document_id,
+        DocumentPage.page_no >= first_page,
+        DocumentPage.page_no <= last_page,
+    ).count()
+
+
+def _complete_document(db: Session, document: Document, degraded_pages: int):
+    """OCR 완료 처리 (엔진 오류/제한 시간 초과로 일부 페이지를 대체 엔진이 처리한 경우 검토 필요 상태로 표시)"""
+    if degraded_pages:
+        document.error_message = (
+            f"엔진 오류 또는 제한 시간 초과로 {degraded_pages}/{document.page_count} 페이지를 "
+            f"대체 엔진으로 처리했습니다"
+        )
+    document.status = DocumentStatus.REVIEW if degraded_pages else DocumentStatus.COMPLETED
+    document.processed_at = datetime.utcnow()
+    db.commit()
+    progress_service.finish(document.id)
+    document_lock_service.clear_request(document.id)
+
+
+def _count_pages(document: Document, local_file: str) -> int:
+    """문서 페이지 수 (PDF는 렌더링 없이 메타데이터로 확인)"""
+    if document.mime_type != "application/pdf":
+        return 1
+    return int(pdfinfo_from_path(local_file)["Pages"])
+
+
+def _plan_page_ranges(page_count: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """
+    분할 처리 페이지 범위 계산
+
+    Returns:
+        [(첫 페이지, 마지막 페이지), ...]. 분할하지 않으면 문서 전체 범위 하나
+    """
+    if pages_per_task <= 0 or page_count <= pages_per_task:
+        return [(1, page_count)]
+    return [
+        (first, min(first + pages_per_task - 1, page_count))
+        for first in range(1, page_count + 1, pages_per_task)
+    ]
 
-def _load_document_images(document: Document, tmpdir: str) -> List[Image.Image]:
-    """문서 파일을 이미지로 로드"""
-    # MinIO에서 파일 다운로드
-    local_file = os.path.join(tmpdir, "document")
-    storage_service.download_to_file(document.file_path, local_file)
 
+def _fan_out(
+    document: Document,
+    ocr_mode: OCRMode,
+    local_file: str,
+    page_ranges: List[Tuple[int, int]],
+    deadline: Optional[float],
+    priority_cls: Optional[str] = None,
+):
+    """
+    페이지 범위별 PDF를 MinIO에 저장하고 서브태스크 등록
+
+    서브태스크는 자기 범위의 PDF만 내려받아 처리한다. 마지막 범위가 끝나면 finalize_document,
+    하나라도 재시도를 소진하면 mark_document_failed가 호출된다.
+    서브태스크는 원래 문서와 같은 우선순위 등급으로, 같은 부서의 공정 분배 대기열에 넣는다.
+    """
+    import fitz  # PyMuPDF
+    from app.services.document_service import _get_ocr_queue
+
+    queue = _get_ocr_queue(ocr_mode)
+    if priority_cls not in priority_service.PRIORITY_CLASSES:
+        priority_cls = priority_service.priority_class(document.importance)
+    jobs = []
+    with fitz.open(local_file) as source:
+        for first_page, last_page in page_ranges:
+            with fitz.open() as chunk:
+                chunk.insert_pdf(source, from_page=first_page - 1, to_page=last_page - 1)
+                chunk_path = storage_service.upload_document_chunk(
+                    chunk.tobytes(), document.id, first_page, last_page,
+                )
+            jobs.append(fair_share_service.make_job(
+                "process_page_range",
+                args=[document.id, ocr_mode.value, first_page, chunk_path],
+                kwargs={"deadline": deadline},
+                slot=f"doc:{document.id}:{first_page}",
+                priority_cls=priority_cls,
+            ))
+
+    fanout_service.start(document.id, len(jobs))
+    enqueue_ocr(queue, fair_share_service.tenant_of(document), jobs)
+    print(
+        f"[INFO] Document {document.id} split into {len(jobs)} page-range tasks "
+        f"({document.page_count} pages) on {queue}"
+    )
+
+
+def _load_document_images(
+    document: Document,
+    local_file: str,
+    dpi: int = 200,
+    start: int = 1,
+) -> List[Image.Image]:
+    """
+    문서 파일(또는 페이지 범위 PDF)을 이미지로 로드
+
+    Args:
+        start: 렌더링을 시작할 파일 내 페이지 번호 (이어서 처리할 때 앞쪽 페이지 생략)
+    """
     # 파일 형식에 따라 처리
     if document.mime_type == "application/pdf":
-        images = convert_from_path(local_file, dpi=200)
+        images = convert_from_path(local_file, dpi=dpi, first_page=start)
     else:
         images = [Image.open(local_file)]
         # RGB로 변환
@@ -100,9 +723,58 @@ def _load_document_images(document: Document, tmpdir: str) -> List[Image.Image]:
     return images
 
 
+def _page_writer(db: Session, document: Document, batch_size: int = 1) -> PageWriter:
+    """페이지 저장 버퍼 (커밋된 페이지만 진행 상황에 완료로 보고)"""
+    return PageWriter(db, batch_size, on_flush=lambda page_nos: progress_service.page_done(document.id, page_nos))
+
+
+def _pending_pages(
+    db: Session,
+    document: Document,
+    local_file: str,
+    first_page: int = 1,
+    dpi: int = 200,
+) -> Tuple[List[Tuple[int, Image.Image]], List[int]]:
+    """
+    아직 저장되지 않은 페이지만 렌더링
+
+    페이지는 처리할 때마다 커밋되므로, 재시도/재전달/재처리 시 이미 저장된 페이지와
+    이미지는 그대로 두고 첫 번째 미완료 페이지부터 이어서 처리한다.
+
+    Returns:
+        ([(페이지 번호, 이미지)], 이미 완료된 페이지 번호 목록)
+    """
+    last_page = first_page + _count_pages(document, local_file) - 1
+    done = {
+        page_no for (page_no,) in db.query(DocumentPage.page_no).filter(
+            DocumentPage.document_id == document.id,
+            DocumentPage.page_no >= first_page,
+            DocumentPage.page_no <= last_page,
+        )
+    }
+    remaining = [page_no for page_no in range(first_page, last_page + 1) if page_no not in done]
+    progress_service.page_done(document.id, done, timed=False)
+    if not remaining:
+        return [], sorted(done)
+    if done:
+        print(
+            f"[INFO] Resuming document {document.id} from page {remaining[0]} "
+            f"({len(done)} pages already saved)"
+        )
+
+    progress_service.update(document.id, stage=progress_service.STAGE_RENDERING)
+    images = _load_document_images(document, local_file, dpi, start=remaining[0] - first_page + 1)
+    pages = [
+        (page_no, image)
+        for page_no, image in zip(range(remaining[0], last_page + 1), images)
+        if page_no not in done
+    ]
+    return pages, sorted(done)
+
+
 def _save_page_images(
     document: Document,
-    images: List[Image.Image],
+    pages: List[Tuple[int, Image.Image]],
     save_thumbnails: bool = True,
 ) -> List[str]:
     """
@@ -110,7 +782,7 @@ def _save_page_images(
 
     Args:
         document: 문서 객체
-        images: PIL 이미지 리스트
+        pages: (페이지 번호, PIL 이미지) 리스트
         save_thumbnails: 썸네일 저장 여부
 
     Returns:
@@ -118,7 +790,9 @@ def _save_page_images(
     """
     image_paths = []
 
-    for page_no, image in enumerate(images, start=1):
+    for page_no, image in pages:
+        cancel_service.check(document.id)
+
         # 페이지 이미지 저장
         image_path = storage_service.upload_page_image(
             image=image,
@@ -139,276 +813,552 @@ def _save_page_images(
     return image_paths
 
 
-def _process_fast_ocr(db: Session, document: Document):
+def _process_fast_ocr(db: Session, document: Document, local_file: str, first_page: int = 1) -> int:
     """
     빠른 OCR 처리 (Tesseract)
     CPU 기반, 가장 빠른 처리 속도
+
+    Returns:
+        대체 엔진이 처리한 페이지 수 (이전 시도 포함)
     """
-    import pytesseract
+    # 미완료 페이지 이미지 로드
+    pages, done_pages = _pending_pages(db, document, local_file, first_page)
+
+    # 페이지 이미지 저장
+    image_paths = _save_page_images(document, pages)
+
+    # OCR_PAGE_WRITE_BATCH 페이지마다 일괄 저장/커밋 (중단 후 이어서 처리하는 단위)
+    writer = _page_writer(db, document, settings.OCR_PAGE_WRITE_BATCH)
+    chain = get_fallback_chain(OCRMode.FAST)
+    processors = {}
+    fallback_pages = 0
+    progress_service.update(document.id, stage=progress_service.STAGE_OCR)
+    for (page_no, image), image_path in zip(pages, image_paths):
+        # 취소 요청은 페이지마다 확인
+        cancel_service.check(document.id)
+
+        # Tesseract OCR 실행 (실패한 페이지는 대체 체인이 있으면 다음 엔진으로)
+        try:
+            ocr_data, raw_text = _run_tesseract(image)
+        except Exception as e:
+            if not chain:
+                raise
+            _fallback_page(
+                writer, document, page_no, image, image_path, chain,
+                _degraded("error", OCRMode.FAST, e), processors,
+            )
+            fallback_pages += 1
+            continue
+        _save_tesseract_page(writer, document, page_no, image, image_path, ocr_data, raw_text)
+    writer.flush()
+    return fallback_pages + _count_degraded_pages(db, document, done_pages)
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # 문서 이미지 로드
-        images = _load_document_images(document, tmpdir)
-        document.page_count = len(images)
 
-        # 페이지 이미지 저장
-        image_paths = _save_page_images(document, images)
+def _run_tesseract(image: Image.Image) -> Tuple[dict, str]:
+    """Tesseract OCR 실행 (단어 단위 데이터, 전체 텍스트)"""
+    import pytesseract
 
-        for page_no, (image, image_path) in enumerate(zip(images, image_paths), start=1):
-            # Tesseract OCR 실행
-            ocr_data = pytesseract.image_to_data(
-                image, lang="kor+eng", output_type=pytesseract.Output.DICT
-            )
-            raw_text = pytesseract.image_to_string(image, lang="kor+eng")
+    ocr_data = pytesseract.image_to_data(
+        image, lang="kor+eng", output_type=pytesseract.Output.DICT
+    )
+    raw_text = pytesseract.image_to_string(image, lang="kor+eng")
+    return ocr_data, raw_text
 
-            # 페이지 저장
-            width, height = image.size
-            page = DocumentPage(
-                document_id=document.id,
-                page_no=page_no,
-                image_path=image_path,
-                width=width,
-                height=height,
-                raw_text=raw_text,
-                ocr_json={"tesseract_data": ocr_data, "ocr_engine": "tesseract"},
-                confidence=_calculate_confidence(ocr_data),
-            )
-            db.add(page)
-            db.flush()
-
-            # 블록 추출 및 저장
-            blocks = _extract_blocks_from_tesseract(ocr_data, width, height)
-            for block_order, block_data in enumerate(blocks):
-                block = DocumentBlock(
-                    page_id=page.id,
-                    block_order=block_order,
-                    block_type=BlockType.TEXT,
-                    bbox=block_data["bbox"],
-                    text=block_data["text"],
-                    confidence=block_data["confidence"],
-                )
-                db.add(block)
 
-        db.commit()
+def _save_tesseract_page(
+    writer: PageWriter,
+    document: Document,
+    page_no: int,
+    image: Image.Image,
+    image_path: str,
+    ocr_data: dict,
+    raw_text: str,
+    extra_json: Optional[dict] = None,
+):
+    """Tesseract 결과로 페이지/블록 저장"""
+    width, height = image.size
+    page = dict(
+        document_id=document.id,
+        page_no=page_no,
+        image_path=image_path,
+        width=width,
+        height=height,
+        raw_text=raw_text,
+        ocr_json={"tesseract_data": ocr_data, "ocr_engine": "tesseract", **(extra_json or {})},
+        confidence=_calculate_confidence(ocr_data),
+    )
 
+    # 블록 추출
+    blocks = [
+        dict(
+            block_order=block_order,
+            block_type=BlockType.TEXT,
+            bbox=block_data["bbox"],
+            text=block_data["text"],
+            confidence=block_data["confidence"],
+        )
+        for block_order, block_data in enumerate(_extract_blocks_from_tesseract(ocr_data, width, height))
+    ]
+    writer.add(page, blocks)
 
-def _process_accurate_ocr(db: Session, document: Document):
+
+def _process_accurate_ocr(db: Session, document: Document, local_file: str, first_page: int = 1) -> int:
     """
     정확 OCR 처리 (PaddleOCR)
     딥러닝 기반, 높은 정확도
 
     https://github.com/PaddlePaddle/PaddleOCR
+
+    Returns:
+        대체 엔진이 처리한 페이지 수 (이전 시도 포함)
     """
-    # PaddleOCR 프로세서 임포트 시도
-    paddle_available = False
+    # PaddleOCR 프로세서 초기화 (CPU 모드, 없으면 대체 엔진으로 문서 전체 처리)
+    processor = _load_paddle_processor()
+    if processor is None:
+        return _unavailable_engine(db, document, OCRMode.ACCURATE, local_file, first_page)
+
+    # 미완료 페이지만 한 번 렌더링하여 미리보기 저장과 OCR에 함께 사용
+    pages, done_pages = _pending_pages(db, document, local_file, first_page)
+
+    # 페이지 이미지/썸네일 저장
+    image_paths = _save_page_images(document, pages)
+
+    writer = _page_writer(db, document, settings.OCR_PAGE_WRITE_BATCH)
+    chain = get_fallback_chain(OCRMode.ACCURATE)
+    processors = {}
+    fallback_pages = 0
+    progress_service.update(document.id, stage=progress_service.STAGE_OCR)
+    for (page_no, image), image_path in zip(pages, image_paths):
+        # 취소 요청은 페이지마다 확인
+        cancel_service.check(document.id)
+
+        # PaddleOCR 처리 (실패한 페이지는 대체 체인의 다음 엔진으로)
+        try:
+            result = processor.process_image_pil(image, page_no)
+        except Exception as e:
+            if not chain:
+                raise
+            _fallback_page(
+                writer, document, page_no, image, image_path, chain,
+                _degraded("error", OCRMode.ACCURATE, e), processors,
+            )
+            fallback_pages += 1
+            continue
+        _save_paddle_page(writer, document, result, image_path)
+    writer.flush()
+    return fallback_pages + _count_degraded_pages(db, document, done_pages)
+
+
+def _load_paddle_processor():
+    """PaddleOCR 프로세서 (설치되지 않은 워커면 None)"""
     try:
         from workers.accurate_ocr.processor import PaddleOCRProcessor
-        paddle_available = True
     except ImportError:
         try:
             import sys
             sys.path.insert(0, "/app/workers/accurate_ocr")
             from processor import PaddleOCRProcessor
-            paddle_available = True
         except ImportError:
-            pass
-
-    # PaddleOCR가 없으면 빠른 OCR로 대체
-    if not paddle_available:
-        print(f"[INFO] PaddleOCR not available, falling back to fast OCR for document {document.id}")
-        _process_fast_ocr(db, document)
-        return
-
-    # PaddleOCR 프로세서 초기화
-    processor = PaddleOCRProcessor(
+            return None
+    return PaddleOCRProcessor(
         use_gpu=False,  # CPU 모드
         lang="korean",
         dpi=200,
     )
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # MinIO에서 파일 다운로드
-        local_file = os.path.join(tmpdir, "document")
-        storage_service.download_to_file(document.file_path, local_file)
 
-        # 이미지 로드 (썸네일용)
-        if document.mime_type == "application/pdf":
-            preview_images = convert_from_path(local_file, dpi=200)
-        else:
-            preview_images = [Image.open(local_file)]
+def _save_paddle_page(
+    writer: PageWriter,
+    document: Document,
+    result,
+    image_path: str,
+    extra_json: Optional[dict] = None,
+):
+    """PaddleOCR 결과로 페이지/블록 저장"""
+    page = dict(
+        document_id=document.id,
+        page_no=result.page_no,
+        image_path=image_path,
+        width=result.width,
+        height=result.height,
+        raw_text=result.raw_text,
+        ocr_json={
+            "markdown": result.markdown,
+            "html": result.html,
+            "ocr_engine": "paddleocr",
+            "blocks": [
+                {
+                    "type": b.block_type,
+                    "text": b.text,
+                    "bbox": b.bbox,
+                    "confidence": b.confidence,
+                    "reading_order": b.reading_order,
+                }
+                for b in result.blocks
+            ],
+            **(extra_json or {}),
+        },
+        layout_score=result.layout_score,
+        confidence=result.confidence,
+    )
 
-        # 페이지 이미지/썸네일 저장
-        image_paths = _save_page_images(document, preview_images)
+    # 블록 저장
+    blocks = [
+        dict(
+            block_order=block_data.reading_order,
+            block_type=_map_block_type(block_data.block_type),
+            bbox=block_data.bbox,
+            text=block_data.text,
+            confidence=block_data.confidence,
+        )
+        for block_data in result.blocks
+    ]
+    writer.add(page, blocks)
 
-        # PaddleOCR 처리
-        if document.mime_type == "application/pdf":
-            results = processor.process_pdf(local_file)
-        else:
-            result = processor.process_image(local_file)
-            results = [result]
 
-        document.page_count = len(results)
+def _degraded(reason: str, ocr_mode: OCRMode, error: Optional[Exception] = None) -> dict:
+    """대체 처리 기록 (ocr_json.degraded: 사유, 원래 요청한 엔진, 실패한 엔진별 오류)"""
+    degraded = {"reason": reason, "requested_engine": ENGINE_NAMES[ocr_mode], "attempts": []}
+    if error is not None:
+        degraded["attempts"].append({"engine": ENGINE_NAMES[ocr_mode], "error": str(error)[:500]})
+    return degraded
 
-        for result, image_path in zip(results, image_paths):
-            # 페이지 저장
-            page = DocumentPage(
-                document_id=document.id,
-                page_no=result.page_no,
-                image_path=image_path,
-                width=result.width,
-                height=result.height,
-                raw_text=result.raw_text,
-                ocr_json={
-                    "markdown": result.markdown,
-                    "html": result.html,
-                    "ocr_engine": "paddleocr",
-                    "blocks": [
-                        {
-                            "type": b.block_type,
-                            "text": b.text,
-                            "bbox": b.bbox,
-                            "confidence": b.confidence,
-                            "reading_order": b.reading_order,
-                        }
-                        for b in result.blocks
-                    ],
-                },
-                layout_score=result.layout_score,
-                confidence=result.confidence,
-            )
-            db.add(page)
-            db.flush()
-
-            # 블록 저장
-            for block_data in result.blocks:
-                block_type = _map_block_type(block_data.block_type)
-
-                block = DocumentBlock(
-                    page_id=page.id,
-                    block_order=block_data.reading_order,
-                    block_type=block_type,
-                    bbox=block_data.bbox,
-                    text=block_data.text,
-                    confidence=block_data.confidence,
-                )
-                db.add(block)
 
-        db.commit()
+def _fallback_page(
+    writer: PageWriter,
+    document: Document,
+    page_no: int,
+    image: Image.Image,
+    image_path: str,
+    chain: List[OCRMode],
+    degraded: dict,
+    processors: dict,
+    extra_json: Optional[dict] = None,
+):
+    """
+    엔진이 실패하거나 제한 시간을 넘긴 페이지를 대체 체인 순서로 다시 처리
+
+    실제로 처리한 엔진은 ocr_json.ocr_engine에, 대체 사유와 실패한 엔진은 ocr_json.degraded에 남긴다
+    (검토 필요 페이지로 집계). 체인의 마지막 엔진까지 실패하면 예외를 올려 태스크 재시도로 넘긴다.
+
+    Args:
+        chain: 시도할 대체 모드 순서 (accurate/fast)
+        degraded: _degraded()로 만든 기록 (실패한 대체 엔진의 오류가 attempts에 추가됨)
+        processors: 태스크 안에서 재사용할 엔진 프로세서 (처음 필요할 때 생성)
+    """
+    for i, mode in enumerate(chain):
+        cancel_service.check(document.id)
+        page_json = {**(extra_json or {}), "degraded": degraded}
+        try:
+            if mode == OCRMode.ACCURATE:
+                if "paddleocr" not in processors:
+                    processors["paddleocr"] = _load_paddle_processor()
+                if processors["paddleocr"] is None:
+                    degraded["attempts"].append({"engine": ENGINE_NAMES[mode], "error": "not available"})
+                    continue
+                result = processors["paddleocr"].process_image_pil(image, page_no)
+                _save_paddle_page(writer, document, result, image_path, extra_json=page_json)
+            else:
+                ocr_data, raw_text = _run_tesseract(image)
+                _save_tesseract_page(
+                    writer, document, page_no, image, image_path, ocr_data, raw_text, extra_json=page_json,
+                )
+            return
+        except Exception as e:
+            if i == len(chain) - 1:
+                raise
+            print(f"[WARNING] {ENGINE_NAMES[mode]} failed on page {page_no} of document {document.id}: {e}")
+            degraded["attempts"].append({"engine": ENGINE_NAMES[mode], "error": str(e)[:500]})
+    raise RuntimeError(f"No fallback OCR engine available for page {page_no} of document {document.id}")
 
 
-def _process_precision_ocr(db: Session, document: Document):
+def _process_precision_ocr(
+    db: Session,
+    document: Document,
+    local_file: str,
+    first_page: int = 1,
+    deadline: Optional[float] = None,
+) -> int:
     """
     정밀 OCR 처리 (Chandra VLM)
     GPU 기반
 
     https://github.com/datalab-to/chandra
 
-    GPU/VLM이 없는 환경에서는 일반 OCR로 대체
+    GPU/VLM이 없는 환경에서는 대체 체인(OCR_FALLBACK_CHAINS)의 첫 번째 엔진으로 문서 전체를 처리
+
+    VLM 요청이 실패하거나 페이지 제한 시간을 넘긴 페이지는 대체 체인 순서(정확 -> 빠른 OCR)로 다시 처리하고,
+    문서 제한 시간(deadline, epoch seconds)을 넘기면 남은 페이지는 VLM에 보내지 않고 체인의 마지막(가장 빠른) 엔진으로 처리
+
+    Returns:
+        제한 시간 초과/VLM 오류로 대체 엔진이 처리한 페이지 수
     """
-    # VLM 서버 확인
-    vllm_api_base = os.getenv("VLLM_API_BASE", "")
+    page_timeout = settings.OCR_PRECISION_PAGE_DEADLINE_SECONDS or None
+
+    # VLM 서버 확인 (여러 레플리카가 설정된 경우 로드 밸런싱)
+    vllm_api_base = settings.VLM_API_BASES or os.getenv("VLLM_API_BASE", "")
 
     # Chandra 프로세서 임포트 시도
     chandra_available = False
     if vllm_api_base:
         try:
-            from workers.precision_ocr.processor import ChandraOCRProcessor
+            from workers.precision_ocr.processor import ChandraOCRProcessor, SkippedPage
             chandra_available = True
         except ImportError:
             try:
                 import sys
                 sys.path.insert(0, "/app/workers/precision_ocr")
-                from processor import ChandraOCRProcessor
+                from processor import ChandraOCRProcessor, SkippedPage
                 chandra_available = True
             except ImportError:
                 pass
 
-    # Chandra가 없으면 빠른 OCR로 대체
+    # Chandra가 없으면 대체 엔진으로 문서 전체 처리
     if not chandra_available:
-        print(f"[INFO] Precision OCR not available, falling back to fast OCR for document {document.id}")
-        _process_fast_ocr(db, document)
-        return
+        return _unavailable_engine(db, document, OCRMode.PRECISION, local_file, first_page, deadline)
 
     # Chandra 프로세서 초기화
-    # DPI 150 사용 (이미지 토큰이 모델 컨텍스트 제한 4096을 초과하지 않도록)
+    # 이미지 크기/품질은 비전 토큰 예산(VLM_MAX_IMAGE_TOKENS)에 맞게 페이지별로 조정
     processor = ChandraOCRProcessor(
         api_base=vllm_api_base,
-        dpi=150,  # 300에서 150으로 감소
-        max_tokens=2048,
+        dpi=settings.VLM_RENDER_DPI,
+        max_tokens=2048,  # 페이지별 추정값의 상한
+        max_image_tokens=settings.VLM_MAX_IMAGE_TOKENS,
+        max_tiles=settings.VLM_MAX_TILES,
+        concurrency=settings.VLM_CONCURRENCY,
+        on_endpoint_stats=vlm_stats_service.publish_endpoint_stats,
+        adaptive_max_tokens=settings.VLM_ADAPTIVE_MAX_TOKENS,
+        max_continuations=settings.VLM_MAX_CONTINUATIONS,
+        image_transport=settings.VLM_IMAGE_TRANSPORT,
+        image_store=(
+            VLMImageStore(storage_service, timedelta(seconds=settings.VLM_IMAGE_URL_TTL_SECONDS))
+            if settings.VLM_IMAGE_TRANSPORT == "minio" else None
+        ),
+        image_shared_dir=settings.VLM_IMAGE_SHARED_DIR,
+        # 여러 정밀 OCR 워커가 vLLM 대기열을 과도하게 채우지 않도록 전역 동시 요청 제한
+        admission=VLMAdmissionController() if settings.VLM_ADMISSION_CONTROL else None,
+        pack_max_images=settings.VLM_PACK_MAX_IMAGES,
+        health_probe_interval=settings.VLM_HEALTH_PROBE_SECONDS,
     )
+    # 다른 워커/이전 문서에서 학습한 출력 길이 추정 상태 이어받기
+    if processor.token_estimator:
+        processor.token_estimator.load_state(vlm_stats_service.load_token_estimator_state())
+
+    # 미완료 페이지만 한 번 렌더링하여 미리보기 저장과 OCR에 함께 사용
+    pages, done_pages = _pending_pages(db, document, local_file, first_page, dpi=settings.VLM_RENDER_DPI)
+    images = dict(pages)
+
+    # 페이지 이미지/썸네일 저장
+    image_paths = dict(zip(images, _save_page_images(document, pages)))
+
+    # VLM 페이지는 다시 처리하는 비용이 크므로 페이지마다 저장/커밋
+    writer = _page_writer(db, document)
+
+    # 캐스케이드: CPU 엔진으로 먼저 읽고 신뢰도가 낮거나 레이아웃이 복잡한 페이지만 VLM으로 전송
+    vlm_pages = pages
+    cascade_info = {}
+    if settings.OCR_PRECISION_CASCADE:
+        progress_service.update(document.id, stage=progress_service.STAGE_CASCADE)
+        vlm_pages = []
+        for page_no, image in pages:
+            cancel_service.check(document.id)
+            image_path = image_paths[page_no]
+            ocr_data, raw_text = _run_tesseract(image)
+            confidence, complexity = _score_tesseract_page(ocr_data, *image.size)
+            info = {
+                "confidence": round(confidence, 4),
+                "complexity": round(complexity, 4),
+            }
+            if (
+                confidence >= settings.OCR_CASCADE_MIN_CONFIDENCE
+                and complexity <= settings.OCR_CASCADE_MAX_COMPLEXITY
+            ):
+                _save_tesseract_page(
+                    writer, document, page_no, image, image_path, ocr_data, raw_text,
+                    extra_json={"cascade": {**info, "routed_to": "tesseract"}},
+                )
+            else:
+                cascade_info[page_no] = {**info, "routed_to": "vlm"}
+                vlm_pages.append((page_no, image))
+        print(
+            f"[INFO] Cascade OCR for document {document.id}: "
+            f"{len(vlm_pages)}/{len(images)} pages sent to VLM"
+        )
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # MinIO에서 파일 다운로드
-        local_file = os.path.join(tmpdir, "document")
-        storage_service.download_to_file(document.file_path, local_file)
+    # Chandra OCR 처리 (페이지 동시 요청, 레플리카 간 분산)
+    truncated_pages = 0
+    skipped_pages = []
+    progress_service.update(document.id, stage=progress_service.STAGE_VLM)
+    results = processor.iter_process_images(
+        vlm_pages, deadline=deadline, page_timeout=page_timeout, skip_errors=True,
+    )
+    try:
+        for result in results:
+            if isinstance(result, SkippedPage):
+                skipped_pages.append(result)
+            else:
+                extra_json = {"cascade": cascade_info[result.page_no]} if result.page_no in cascade_info else None
+                _save_vlm_page(writer, document, result, image_paths[result.page_no], extra_json)
+                if result.finish_reason == "length":
+                    truncated_pages += 1
+            # 취소되면 남은 페이지는 VLM에 보내지 않음 (제출된 요청은 취소하고 연결 종료)
+            cancel_service.check(document.id)
+    finally:
+        results.close()
+        processor.close()
+        if processor.token_estimator:
+            vlm_stats_service.save_token_estimator_state(
+                processor.token_estimator.state(), truncated_pages=truncated_pages,
+            )
 
-        # 저해상도 이미지 로드 (썸네일용)
-        if document.mime_type == "application/pdf":
-            preview_images = convert_from_path(local_file, dpi=150)
-        else:
-            preview_images = [Image.open(local_file)]
+    # 제한 시간 초과/오류 페이지는 대체 엔진으로 마무리
+    # (대체 체인이 비어 있어도 제한 시간 초과 페이지는 빠른 OCR로 처리, 문서 제한 시간을 넘겼으면 가장 빠른 엔진만 사용)
+    chain = get_fallback_chain(OCRMode.PRECISION) or [OCRMode.FAST]
+    processors = {}
+    if skipped_pages:
+        progress_service.update(document.id, stage=progress_service.STAGE_FALLBACK)
+    for skipped in skipped_pages:
+        degraded = _degraded(skipped.reason, OCRMode.PRECISION)
+        if skipped.error:
+            degraded["attempts"].append({"engine": ENGINE_NAMES[OCRMode.PRECISION], "error": skipped.error[:500]})
+        _fallback_page(
+            writer, document, skipped.page_no, images[skipped.page_no], image_paths[skipped.page_no],
+            chain[-1:] if skipped.reason == "document_deadline" else chain,
+            degraded, processors,
+            extra_json={"cascade": cascade_info[skipped.page_no]} if skipped.page_no in cascade_info else None,
+        )
 
-        # 페이지 이미지/썸네일 저장
-        image_paths = _save_page_images(document, preview_images)
+    if skipped_pages:
+        print(
+            f"[INFO] Precision OCR fell back for document {document.id}: "
+            f"{len(skipped_pages)} pages finished with fallback engines"
+        )
 
-        # Chandra OCR 처리 (고해상도)
-        if document.mime_type == "application/pdf":
-            results = processor.process_pdf(local_file)
-        else:
-            result = processor.process_image(local_file)
-            results = [result]
+    # 이전 시도에서 대체 엔진으로 처리된 페이지도 검토 대상에 포함
+    return len(skipped_pages) + _count_degraded_pages(db, document, done_pages)
 
-        document.page_count = len(results)
 
-        for result, image_path in zip(results, image_paths):
-            # 페이지 저장
-            page = DocumentPage(
-                document_id=document.id,
-                page_no=result.page_no,
-                image_path=image_path,
-                width=result.width,
-                height=result.height,
-                raw_text=result.raw_text,
-                ocr_json={
-                    "markdown": result.markdown,
-                    "html": result.html,
-                    "blocks": [
-                        {
-                            "type": b.block_type,
-                            "text": b.text,
-                            "bbox": b.bbox,
-                            "confidence": b.confidence,
-                            "reading_order": b.reading_order,
-                            "table": b.table.__dict__ if b.table else None,
-                        }
-                        for b in result.blocks
-                    ],
-                },
-                layout_score=result.layout_score,
-                confidence=result.confidence,
-            )
-            db.add(page)
-            db.flush()
-
-            # 블록 저장
-            for block_data in result.blocks:
-                block_type = _map_block_type(block_data.block_type)
-                table_json = None
-                if block_data.table:
-                    table_json = {"rows": block_data.table.rows}
-
-                block = DocumentBlock(
-                    page_id=page.id,
-                    block_order=block_data.reading_order,
-                    block_type=block_type,
-                    bbox=block_data.bbox,
-                    text=block_data.text,
-                    table_json=table_json,
-                    confidence=block_data.confidence,
-                )
-                db.add(block)
+def _count_degraded_pages(db: Session, document: Document, page_nos: List[int]) -> int:
+    """이미 저장된 페이지 중 대체 엔진으로 처리된 페이지 수"""
+    if not page_nos:
+        return 0
+    rows = db.query(DocumentPage.ocr_json).filter(
+        DocumentPage.document_id == document.id,
+        DocumentPage.page_no.in_(page_nos),
+    )
+    return sum(1 for (ocr_json,) in rows if ocr_json and "degraded" in ocr_json)
 
-        db.commit()
+
+def _save_vlm_page(
+    writer: PageWriter,
+    document: Document,
+    result,
+    image_path: str,
+    extra_json: Optional[dict] = None,
+):
+    """VLM(Chandra) 결과로 페이지/블록 저장"""
+    page = dict(
+        document_id=document.id,
+        page_no=result.page_no,
+        image_path=image_path,
+        width=result.width,
+        height=result.height,
+        raw_text=result.raw_text,
+        ocr_json={
+            "markdown": result.markdown,
+            "html": result.html,
+            "ocr_engine": "chandra",
+            "tile_count": result.tile_count,
+            "max_tokens": result.max_tokens,
+            "completion_tokens": result.completion_tokens,
+            "finish_reason": result.finish_reason,
+            "continuations": result.continuations,
+            "pack_size": result.pack_size,
+            "blocks": [
+                {
+                    "type": b.block_type,
+                    "text": b.text,
+                    "bbox": b.bbox,
+                    "confidence": b.confidence,
+                    "reading_order": b.reading_order,
+                    "table": b.table.__dict__ if b.table else None,
+                }
+                for b in result.blocks
+            ],
+            **(extra_json or {}),
+        },
+        layout_score=result.layout_score,
+        confidence=result.confidence,
+    )
+
+    # 블록 저장
+    blocks = [
+        dict(
+            block_order=block_data.reading_order,
+            block_type=_map_block_type(block_data.block_type),
+            bbox=block_data.bbox,
+            text=block_data.text,
+            table_json={"rows": block_data.table.rows} if block_data.table else None,
+            confidence=block_data.confidence,
+        )
+        for block_data in result.blocks
+    ]
+    writer.add(page, blocks)
+
+
+def _score_tesseract_page(ocr_data: dict, page_width: int, page_height: int) -> Tuple[float, float]:
+    """
+    캐스케이드 라우팅용 Tesseract 페이지 점수
+
+    Returns:
+        (confidence, complexity)
+        - confidence: 인식된 단어의 평균 신뢰도 (0~1, 단어가 없으면 0)
+        - complexity: 레이아웃 복잡도 (0~1). 다단 구성, 표처럼 큰 간격으로
+          나뉜 줄의 비율, 저신뢰 단어 비율이 높을수록 커짐
+    """
+    words = []
+    for i, text in enumerate(ocr_data.get("text", [])):
+        try:
+            conf = float(ocr_data["conf"][i])
+        except (TypeError, ValueError):
+            continue
+        if not str(text).strip() or conf < 0:
+            continue
+        words.append({
+            "conf": conf / 100.0,
+            "left": ocr_data["left"][i],
+            "width": ocr_data["width"][i],
+            "height": ocr_data["height"][i],
+            "line": (ocr_data["block_num"][i], ocr_data["par_num"][i], ocr_data["line_num"][i]),
+        })
+
+    if not words:
+        return 0.0, 1.0
+
+    confidence = sum(w["conf"] for w in words) / len(words)
+    low_conf_ratio = sum(1 for w in words if w["conf"] < 0.6) / len(words)
+
+    # 줄 단위로 묶어 단어 사이 간격이 글자 높이의 3배를 넘는 줄(표/양식 형태) 비율 계산
+    lines = {}
+    for w in words:
+        lines.setdefault(w["line"], []).append(w)
+    gapped_lines = 0
+    for line_words in lines.values():
+        line_words.sort(key=lambda w: w["left"])
+        height = max(w["height"] for w in line_words) or 1
+        for prev, cur in zip(line_words, line_words[1:]):
+            if cur["left"] - (prev["left"] + prev["width"]) > height * 3:
+                gapped_lines += 1
+                break
+    gapped_ratio = gapped_lines / len(lines)
+
+    # 줄 시작 위치가 페이지 가운데 이후에 몰려 있으면 다단 구성으로 판단
+    line_starts = [min(w["left"] for w in line_words) for line_words in lines.values()]
+    right_starts = sum(1 for x in line_starts if x > page_width * 0.45)
+    multi_column = 1.0 if len(line_starts) >= 6 and right_starts / len(line_starts) >= 0.25 else 0.0
+
+    complexity = min(1.0, 0.5 * multi_column + gapped_ratio + 0.5 * low_conf_ratio)
+    return confidence, complexity
 
 
 def _calculate_confidence(ocr_data: dict) -> float:
@@ -0,0 +1,156 @@
+"""
+OCR 큐 간 작업 가져가기 (work stealing)
+
+accurate_ocr가 비어 있는 동안 그 워커는 놀고 fast_ocr에는 작업이 수천 개 밀릴 수 있다.
+워커 소비자 bootstep이 OCR_WORK_STEALING_INTERVAL_SECONDS마다 큐 깊이를 확인해
+- 주 큐(-Q로 지정한 큐)가 비어 있고 보조 큐에 작업이 있으면 보조 큐도 소비하기 시작하고
+- 주 큐에 작업이 들어오거나 보조 큐가 비면 보조 큐 소비를 취소해 돌려준다
+  (이미 받은 보조 큐 작업은 끝까지 처리하므로 보조 큐는 짧은 작업 큐로 설정)
+
+보조 큐는 워커에 해당 엔진이 있을 때만 가져간다 (ocr_service.engine_available, 대체 체인과 같은 기준).
+기본값은 사용 안 함이며 OCR_WORK_STEALING으로 켠다.
+공정 분배를 쓰면 가져가는 동안 워커 프로세스 수만큼 보조 큐의 dispatch window를 넓혀
+부서 대기열의 작업이 실제로 이 워커까지 오게 한다.
+"""
+from typing import List
+
+import redis
+from celery import bootsteps
+from celery.worker import state
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.services import fair_share_service, latency_service, ocr_service
+from app.workers.autoscaler import QUEUE_MODES
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def engine_available(queue: str) -> bool:
+    """워커가 큐의 OCR 엔진을 실행할 수 있는지"""
+    mode = QUEUE_MODES.get(queue)
+    return mode is not None and ocr_service.engine_available(mode)
+
+
+def secondary_queues(primary: List[str]) -> List[str]:
+    """
+    주 큐별 보조 큐 (설정 순서, 주 큐와 엔진이 없는 큐 제외)
+
+    OCR_WORK_STEALING="accurate_ocr=fast_ocr,precision_ocr=accurate_ocr>fast_ocr"
+    """
+    chains = {}
+    for entry in (settings.OCR_WORK_STEALING or "").split(","):
+        name, sep, value = entry.partition("=")
+        if sep and name.strip():
+            chains[name.strip()] = [q.strip() for q in value.split(">") if q.strip()]
+
+    queues = []
+    for queue in (q for p in primary for q in chains.get(p, [])):
+        if queue in primary or queue in queues:
+            continue
+        if not engine_available(queue):
+            print(f"[INFO] Not stealing from {queue}: engine is not available on this worker")
+            continue
+        queues.append(queue)
+    return queues
+
+
+class WorkStealer:
+    """주 큐가 빈 동안 보조 큐를 소비 (소비자 이벤트 루프에서 호출)"""
+
+    def __init__(self, consumer):
+        self.consumer = consumer
+        self.primary = [q for q in QUEUE_MODES if q in consumer.app.amqp.queues.consume_from]
+        self.secondary = secondary_queues(self.primary)
+        self.stolen = []
+
+    def rebalance(self):
+        """주 큐에 작업이 있으면 모든 보조 큐를 반환하고, 비어 있으면 쉬는 프로세스로 작업이 있는 보조 큐를 소비"""
+        try:
+            r = _redis()
+            if any(latency_service.queue_depth(queue, r) for queue in self.primary):
+                self.hand_back_all()
+                return
+            for queue in self.secondary:
+                if latency_service.queue_depth(queue, r):
+                    if queue in self.stolen or self.has_idle_process():
+                        self.steal(queue)
+                elif queue in self.stolen:
+                    self.hand_back(queue)
+        except redis.RedisError as e:
+            # 주 큐 상태를 알 수 없으면 주 큐만 처리
+            print(f"[WARNING] Work stealing paused: {e}")
+            self.hand_back_all()
+
+    def has_idle_process(self) -> bool:
+        """받아 둔 작업보다 프로세스가 많은지 (주 큐 작업으로 바쁜 워커는 새로 가져가지 않음)"""
+        return len(state.reserved_requests) < self.consumer.pool.num_processes
+
+    def steal(self, queue: str):
+        """보조 큐 소비 시작 (이미 소비 중이면 빌려준 처리 수만 연장)"""
+        if settings.OCR_FAIR_SHARE_ENABLED:
+            fair_share_service.lend_capacity(
+                queue,
+                self.consumer.hostname,
+                self.consumer.pool.num_processes,
+                settings.OCR_WORK_STEALING_INTERVAL_SECONDS * 3,
+            )
+        if queue in self.stolen:
+            return
+        self.consumer.add_task_queue(queue)
+        self.stolen.append(queue)
+        print(f"[INFO] Stealing work from {queue} while {', '.join(self.primary)} is empty")
+        if settings.OCR_FAIR_SHARE_ENABLED:
+            from app.workers.tasks import _send_jobs
+
+            _send_jobs(queue, fair_share_service.dispatch(queue))
+
+    def hand_back(self, queue: str):
+        """보조 큐 소비 취소 (받아 둔 작업은 끝까지 처리)"""
+        self.consumer.cancel_task_queue(queue)
+        self.stolen.remove(queue)
+        if settings.OCR_FAIR_SHARE_ENABLED:
+            fair_share_service.return_capacity(queue, self.consumer.hostname)
+        print(f"[INFO] Handed back {queue}")
+
+    def hand_back_all(self):
+        for queue in list(self.stolen):
+            self.hand_back(queue)
+
+
+class WorkStealing(bootsteps.StartStopStep):
+    """작업 가져가기 소비자 bootstep"""
+
+    requires = ("celery.worker.consumer.tasks:Tasks",)
+
+    def __init__(self, c, **kwargs):
+        self.enabled = bool(settings.OCR_WORK_STEALING)
+        self.stealer = None
+        self.tref = None
+        super().__init__(c, **kwargs)
+
+    def start(self, c):
+        self.stealer = WorkStealer(c)
+        if self.stealer.secondary:
+            self.tref = c.timer.call_repeatedly(
+                settings.OCR_WORK_STEALING_INTERVAL_SECONDS, self.stealer.rebalance,
+            )
+
+    def stop(self, c):
+        if self.tref:
+            self.tref.cancel()
+            self.tref = None
+        if self.stealer:
+            self.stealer.hand_back_all()
+
+    shutdown = stop
+
+
+celery_app.steps["consumer"].add(WorkStealing)
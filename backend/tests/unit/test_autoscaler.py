@@ -0,0 +1,105 @@
+"""
+Unit tests for the OCR worker autoscaler
+"""
+from unittest.mock import patch, MagicMock
+
+import redis
+
+from app.workers.autoscaler import OCRAutoscaler, target_processes
+
+GB = 1024 ** 3
+
+
+def _autoscaler(queues=("fast_ocr",), processes=2, min_c=2, max_c=6):
+    pool = MagicMock()
+    pool.num_processes = processes
+    pool.info = {"processes": []}
+    worker = MagicMock()
+    worker.app.amqp.queues.consume_from = {queue: MagicMock() for queue in queues}
+    worker.consumer.initial_prefetch_count = max_c
+    worker.consumer.qos.value = max_c
+    return OCRAutoscaler(pool, max_c, min_c, worker=worker)
+
+
+class TestTargetProcesses:
+    """Tests for target_processes function"""
+
+    def test_follows_demand_within_bounds(self):
+        """Test the pool grows with the backlog but stays within min/max"""
+        assert target_processes(4, 2, 2, 6, cpus=8) == 4
+        assert target_processes(50, 2, 2, 6, cpus=8) == 6
+        assert target_processes(0, 4, 2, 6, cpus=8) == 2
+
+    def test_cpu_usage_caps_growth(self):
+        """Test CPU-bound tasks are capped by available cores while I/O-bound tasks are not"""
+        # 4 cores x 0.85 target / 1 core per task
+        assert target_processes(6, 2, 1, 6, cpus=4, cpu_per_task=1.0) == 3
+        assert target_processes(6, 2, 1, 6, cpus=4, cpu_per_task=0.1) == 6
+
+    def test_memory_caps_growth(self):
+        """Test no process is added once free memory would drop below the reserve"""
+        assert target_processes(6, 2, 1, 6, cpus=8, rss_per_task=GB, free_memory=3 * GB) == 4
+        assert target_processes(6, 2, 1, 6, cpus=8, rss_per_task=GB, free_memory=GB) == 2
+
+    def test_latency_slowdown_holds_pool_size(self):
+        """Test contention (pages much slower than when idle) stops further growth"""
+        assert target_processes(6, 3, 1, 6, cpus=8, slowdown=2.5) == 3
+        assert target_processes(6, 3, 1, 6, cpus=8, slowdown=1.2) == 6
+
+
+class TestOCRAutoscaler:
+    """Tests for OCRAutoscaler"""
+
+    @patch("app.workers.autoscaler.available_memory", return_value=None)
+    @patch("app.workers.autoscaler.latency_service")
+    @patch("app.workers.autoscaler._redis")
+    def test_scales_up_for_queue_backlog(self, _, mock_latency, __):
+        """Test queued work (not only prefetched messages) grows the pool, capped by the dispatch window"""
+        mock_latency.queue_depth.return_value = 40
+        mock_latency.slowdown.return_value = None
+        autoscaler = _autoscaler()
+        autoscaler.pool.grow.side_effect = lambda n: setattr(autoscaler.pool, "num_processes", 2 + n)
+
+        with patch("app.workers.autoscaler.fair_share_service.dispatch_window", return_value=5):
+            assert autoscaler._maybe_scale() is True
+
+        autoscaler.pool.grow.assert_called_once_with(3)
+        mock_latency.queue_depth.assert_called_once()
+        assert mock_latency.queue_depth.call_args[0][0] == "fast_ocr"
+
+    @patch("app.workers.autoscaler.available_memory", return_value=None)
+    @patch("app.workers.autoscaler._redis")
+    def test_redis_error_falls_back_to_reserved_tasks(self, _, __):
+        """Test the pool only follows reserved work when the queue depth is unavailable"""
+        autoscaler = _autoscaler(processes=4)
+
+        with patch("app.workers.autoscaler.latency_service.queue_depth", side_effect=redis.ConnectionError("down")):
+            autoscaler._maybe_scale()
+
+        assert autoscaler.target == 2
+        autoscaler.pool.shrink.assert_called_once_with(2)
+
+    @patch("app.workers.autoscaler.available_memory", return_value=None)
+    @patch("app.workers.autoscaler.latency_service")
+    @patch("app.workers.autoscaler._redis")
+    def test_prefetch_follows_process_count(self, _, mock_latency, __):
+        """Test prefetch is reduced from max concurrency to processes x the queue multiplier"""
+        mock_latency.queue_depth.return_value = 0
+        mock_latency.slowdown.return_value = None
+        autoscaler = _autoscaler(queues=("precision_ocr",), processes=1, min_c=1, max_c=2)
+
+        autoscaler._maybe_scale()
+
+        qos = autoscaler.worker.consumer.qos
+        qos.decrement_eventually.assert_called_once_with(1)
+        assert autoscaler.worker.consumer.initial_prefetch_count == 1
+
+    def test_measurement_is_rate_limited(self):
+        """Test queue depth and resource usage are not re-read on every task message"""
+        autoscaler = _autoscaler()
+
+        with patch.object(autoscaler, "compute_target", return_value=2) as mock_compute:
+            autoscaler._maybe_scale()
+            autoscaler._maybe_scale()
+
+        mock_compute.assert_called_once()
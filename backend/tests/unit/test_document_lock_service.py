@@ -0,0 +1,79 @@
+"""
+Unit tests for per-document processing leases and OCR request markers
+"""
+from unittest.mock import patch, MagicMock
+
+import redis
+
+from app.services import document_lock_service
+from app.services.document_lock_service import DocumentLease, claim_request
+
+
+class TestDocumentLease:
+    """Tests for DocumentLease"""
+
+    @patch("app.services.document_lock_service._redis")
+    def test_acquire_and_release_with_token(self, mock_redis):
+        """Test the lease is taken with SET NX PX and released only for its own token"""
+        r = mock_redis.return_value
+        r.set.return_value = True
+
+        lease = DocumentLease("doc:7", ttl_seconds=30)
+        assert lease.acquire() is True
+        r.set.assert_called_once_with("ocr:lock:doc:7", lease.token, nx=True, px=30000)
+        assert lease._heartbeat.is_alive()
+
+        lease.release()
+        assert not lease._heartbeat.is_alive()
+        r.register_script.return_value.assert_called_with(keys=["ocr:lock:doc:7"], args=[lease.token])
+
+    @patch("app.services.document_lock_service._redis")
+    def test_held_lease_is_not_acquired(self, mock_redis):
+        """Test a second task cannot take a lease another task holds"""
+        mock_redis.return_value.set.return_value = None
+
+        lease = DocumentLease("doc:7")
+        assert lease.acquire() is False
+        assert lease._heartbeat is None
+        lease.release()
+        mock_redis.return_value.register_script.assert_not_called()
+
+    @patch("app.services.document_lock_service._redis")
+    def test_heartbeat_renews_and_detects_loss(self, mock_redis):
+        """Test the heartbeat extends the TTL and stops once the lease belongs to someone else"""
+        r = mock_redis.return_value
+        r.set.return_value = True
+        renew = r.register_script.return_value
+        renew.side_effect = [1, 0]
+
+        lease = DocumentLease("doc:7", ttl_seconds=0.03)
+        lease.acquire()
+        lease._heartbeat.join(timeout=2)
+
+        assert renew.call_count == 2
+        renew.assert_called_with(keys=["ocr:lock:doc:7"], args=[lease.token, 30])
+        assert lease.lost is True
+
+    @patch("app.services.document_lock_service._redis")
+    def test_redis_error_does_not_block_processing(self, mock_redis):
+        """Test processing continues without a lease when Redis is unavailable"""
+        mock_redis.return_value.set.side_effect = redis.ConnectionError("down")
+
+        lease = DocumentLease("doc:7")
+        assert lease.acquire() is True
+        assert lease.held is False
+
+
+class TestRequestMarker:
+    """Tests for OCR request markers"""
+
+    @patch("app.services.document_lock_service._redis")
+    def test_claim_request(self, mock_redis):
+        """Test only the first request is claimed and Redis errors fail open"""
+        r = mock_redis.return_value
+        r.set.side_effect = [True, None, redis.ConnectionError("down")]
+
+        assert claim_request(3) is True
+        r.set.assert_called_with("ocr:request:3", 1, nx=True, ex=document_lock_service.REQUEST_TTL_SECONDS)
+        assert claim_request(3) is False
+        assert claim_request(3) is True
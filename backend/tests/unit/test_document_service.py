@@ -1,12 +1,14 @@
 """
 Unit tests for document service
 """
+import time
+
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime
 from io import BytesIO
 
-from app.models.document import Document, DocumentStatus, OCRMode, Importance
+from app.models.document import Document, DocumentPage, DocumentStatus, OCRMode, Importance
 from app.schemas.document import DocumentCreate, DocumentUpdate, BlockUpdate
 from app.services.document_service import (
     _get_ocr_queue,
@@ -17,6 +19,7 @@ from app.services.document_service import (
     delete_document,
     reprocess_document,
     update_block,
+    cancel_document,
     get_document_statistics,
 )
 
@@ -54,12 +57,35 @@ class TestGetOcrQueue:
         assert _get_ocr_queue("Fast") == "fast_ocr"
 
 
+@pytest.fixture(autouse=True)
+def direct_enqueue():
+    """Send OCR tasks straight to Celery (fair-share dispatcher needs Redis)"""
+    with patch("app.workers.tasks.settings.OCR_FAIR_SHARE_ENABLED", False):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def request_markers():
+    """Claim every OCR request marker (no Redis in unit tests)"""
+    with patch("app.services.document_lock_service._redis") as mock_redis:
+        mock_redis.return_value.set.return_value = True
+        yield mock_redis.return_value
+
+
+@pytest.fixture(autouse=True)
+def cancel_redis():
+    """Cancellation flags and task ids live in a mocked Redis"""
+    with patch("app.services.cancel_service._redis") as mock_redis:
+        mock_redis.return_value.pipeline.return_value.execute.return_value = [set(), 0]
+        yield mock_redis.return_value
+
+
 class TestCreateDocument:
     """Tests for create_document function"""
 
     @pytest.mark.asyncio
     @patch("app.services.document_service.storage_service")
-    @patch("app.workers.tasks.process_document")
+    @patch("app.workers.tasks.classify_document")
     async def test_create_document_success(self, mock_task, mock_storage, in_memory_db):
         """Test successful document creation"""
         # Setup mocks
@@ -88,7 +114,9 @@ class TestCreateDocument:
         assert result.department == "Engineering"
         assert result.status == DocumentStatus.PENDING
         mock_storage.upload_document.assert_called_once()
+        # AUTO documents are classified on the fast_ocr queue first
         mock_task.apply_async.assert_called_once()
+        assert mock_task.apply_async.call_args.kwargs["queue"] == "fast_ocr"
 
     @pytest.mark.asyncio
     @patch("app.services.document_service.storage_service")
@@ -115,6 +143,56 @@ class TestCreateDocument:
         call_kwargs = mock_task.apply_async.call_args.kwargs
         assert call_kwargs["queue"] == "precision_ocr"
 
+    @pytest.mark.asyncio
+    @patch("app.services.document_service.storage_service")
+    @patch("app.workers.tasks.process_document")
+    async def test_create_document_passes_deadline(self, mock_task, mock_storage, in_memory_db):
+        """Test per-upload deadline is forwarded to the OCR task"""
+        mock_storage.upload_document.return_value = ("documents/test.pdf", 1024)
+        mock_task.apply_async.return_value = MagicMock(id="task-123")
+
+        mock_file = MagicMock()
+        mock_file.read = AsyncMock(return_value=b"file content")
+        mock_file.filename = "report.pdf"
+        mock_file.content_type = "application/pdf"
+
+        doc_create = DocumentCreate(
+            title="Report",
+            ocr_mode=OCRMode.PRECISION,
+            deadline_seconds=600,
+        )
+
+        await create_document(in_memory_db, mock_file, doc_create)
+
+        call_kwargs = mock_task.apply_async.call_args.kwargs
+        assert call_kwargs["kwargs"]["deadline_seconds"] == 600
+        # 재시도/재등록에도 유지되도록 등록 시 절대 시각으로 고정
+        assert call_kwargs["kwargs"]["deadline"] == pytest.approx(time.time() + 600, abs=5)
+
+    @pytest.mark.asyncio
+    @patch("app.services.document_service.storage_service")
+    @patch("app.workers.tasks.classify_document")
+    async def test_create_document_priority_from_importance(self, mock_task, mock_storage, in_memory_db):
+        """Test importance and urgency are mapped to broker priority with wait-tracking headers"""
+        mock_storage.upload_document.return_value = ("documents/test.pdf", 1024)
+        mock_task.apply_async.return_value = MagicMock(id="task-123")
+
+        mock_file = MagicMock()
+        mock_file.read = AsyncMock(return_value=b"file content")
+        mock_file.filename = "contract.pdf"
+        mock_file.content_type = "application/pdf"
+
+        await create_document(in_memory_db, mock_file, DocumentCreate(title="Contract", importance=Importance.HIGH))
+        call_kwargs = mock_task.apply_async.call_args.kwargs
+        assert call_kwargs["priority"] == 3
+        assert call_kwargs["headers"]["priority_class"] == "high"
+        assert "enqueued_at" in call_kwargs["headers"]
+
+        await create_document(
+            in_memory_db, mock_file, DocumentCreate(title="Scan", importance=Importance.LOW, urgent=True),
+        )
+        assert mock_task.apply_async.call_args.kwargs["priority"] == 0
+
 
 class TestGetDocument:
     """Tests for get_document function"""
@@ -302,7 +380,7 @@ class TestReprocessDocument:
 
     @pytest.mark.asyncio
     @patch("app.services.document_service.storage_service")
-    @patch("app.workers.tasks.process_document")
+    @patch("app.workers.tasks.classify_document")
     async def test_reprocess_document_success(self, mock_task, mock_storage, in_memory_db, sample_document):
         """Test successful document reprocessing"""
         sample_document.status = DocumentStatus.COMPLETED
@@ -337,6 +415,104 @@ class TestReprocessDocument:
         call_kwargs = mock_task.apply_async.call_args.kwargs
         assert call_kwargs["queue"] == "precision_ocr"
 
+    @pytest.mark.asyncio
+    @patch("app.services.document_service.storage_service")
+    @patch("app.workers.tasks.classify_document")
+    async def test_reprocess_failed_document_keeps_saved_pages(
+        self, mock_task, mock_storage, in_memory_db, sample_document
+    ):
+        """Test reprocessing an interrupted document resumes instead of clearing pages"""
+        sample_document.status = DocumentStatus.FAILED
+        in_memory_db.add(sample_document)
+        in_memory_db.commit()
+        in_memory_db.add(DocumentPage(
+            document_id=sample_document.id, page_no=1, image_path="pages/1/page_0001.png",
+            width=800, height=1200,
+        ))
+        in_memory_db.commit()
+
+        result = await reprocess_document(in_memory_db, sample_document.id)
+
+        assert result.status == DocumentStatus.PENDING
+        assert len(result.pages) == 1
+        mock_storage.delete_document_files.assert_not_called()
+        mock_task.apply_async.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.document_service.storage_service")
+    @patch("app.workers.tasks.classify_document")
+    @patch("app.workers.tasks.process_document")
+    async def test_resumed_auto_document_keeps_classified_mode(
+        self, mock_process, mock_classify, mock_storage, in_memory_db, sample_document
+    ):
+        """Test an AUTO document with saved pages resumes on its classified mode without reclassifying"""
+        sample_document.status = DocumentStatus.FAILED
+        sample_document.recommended_ocr_mode = OCRMode.ACCURATE
+        in_memory_db.add(sample_document)
+        in_memory_db.commit()
+        in_memory_db.add(DocumentPage(
+            document_id=sample_document.id, page_no=1, image_path="pages/1/page_0001.png",
+            width=800, height=1200,
+        ))
+        in_memory_db.commit()
+
+        result = await reprocess_document(in_memory_db, sample_document.id)
+
+        assert result.ocr_mode == OCRMode.AUTO
+        mock_classify.apply_async.assert_not_called()
+        assert mock_process.apply_async.call_args.kwargs["queue"] == "accurate_ocr"
+
+    @pytest.mark.asyncio
+    @patch("app.services.document_service.storage_service")
+    @patch("app.workers.tasks.classify_document")
+    async def test_resumed_auto_document_without_pages_is_reclassified(
+        self, mock_classify, mock_storage, in_memory_db, sample_document
+    ):
+        """Test an AUTO document that failed before saving any page is classified again"""
+        sample_document.status = DocumentStatus.FAILED
+        sample_document.recommended_ocr_mode = OCRMode.ACCURATE
+        in_memory_db.add(sample_document)
+        in_memory_db.commit()
+
+        await reprocess_document(in_memory_db, sample_document.id)
+
+        assert mock_classify.apply_async.call_args.kwargs["queue"] == "fast_ocr"
+
+    @pytest.mark.asyncio
+    @patch("app.services.document_service.storage_service")
+    @patch("app.workers.tasks.process_document")
+    async def test_reprocess_coalesces_with_request_in_flight(
+        self, mock_task, mock_storage, in_memory_db, sample_document, request_markers
+    ):
+        """Test a repeated reprocess joins the pending request instead of clearing and re-enqueueing"""
+        sample_document.status = DocumentStatus.PROCESSING
+        in_memory_db.add(sample_document)
+        in_memory_db.commit()
+        request_markers.set.return_value = None
+
+        result = await reprocess_document(in_memory_db, sample_document.id, ocr_mode=OCRMode.PRECISION)
+
+        assert result.status == DocumentStatus.PROCESSING
+        assert result.ocr_mode == sample_document.ocr_mode
+        mock_storage.delete_document_files.assert_not_called()
+        mock_task.apply_async.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.document_service.storage_service")
+    @patch("app.workers.tasks.classify_document")
+    async def test_failed_enqueue_clears_request_marker(
+        self, mock_task, mock_storage, in_memory_db, sample_document, request_markers
+    ):
+        """Test a reprocess that could not be enqueued does not block the next one"""
+        in_memory_db.add(sample_document)
+        in_memory_db.commit()
+        mock_task.apply_async.side_effect = ConnectionError("broker down")
+
+        with pytest.raises(ConnectionError):
+            await reprocess_document(in_memory_db, sample_document.id)
+
+        request_markers.delete.assert_called_once_with(f"ocr:request:{sample_document.id}")
+
     @pytest.mark.asyncio
     async def test_reprocess_nonexistent_document(self, in_memory_db):
         """Test reprocessing non-existent document returns None"""
@@ -344,6 +520,52 @@ class TestReprocessDocument:
         assert result is None
 
 
+class TestCancelDocument:
+    """Tests for cancel_document function"""
+
+    @pytest.mark.asyncio
+    @patch("app.core.celery_app.celery_app")
+    @patch("app.services.document_service.storage_service")
+    async def test_cancel_processing_document(
+        self, mock_storage, mock_celery, in_memory_db, sample_document, request_markers, cancel_redis
+    ):
+        """Test cancelling flags running tasks, revokes queued ones and fails the document"""
+        sample_document.status = DocumentStatus.PROCESSING
+        in_memory_db.add(sample_document)
+        in_memory_db.commit()
+        cancel_redis.pipeline.return_value.execute.return_value = [{b"task-1", b"task-2"}, 1]
+
+        result = await cancel_document(in_memory_db, sample_document.id)
+
+        assert result.status == DocumentStatus.FAILED
+        assert "취소" in result.error_message
+        cancel_redis.set.assert_called_once_with(f"ocr:cancel:{sample_document.id}", 1, ex=24 * 3600)
+        mock_celery.control.revoke.assert_called_once_with(["task-1", "task-2"])
+        mock_storage.delete_document_chunks.assert_called_once_with(sample_document.id)
+        request_markers.delete.assert_called_once_with(f"ocr:request:{sample_document.id}")
+
+    @pytest.mark.asyncio
+    @patch("app.core.celery_app.celery_app")
+    async def test_cancel_finished_document_is_noop(
+        self, mock_celery, in_memory_db, sample_document, cancel_redis
+    ):
+        """Test a completed document is returned unchanged"""
+        sample_document.status = DocumentStatus.COMPLETED
+        in_memory_db.add(sample_document)
+        in_memory_db.commit()
+
+        result = await cancel_document(in_memory_db, sample_document.id)
+
+        assert result.status == DocumentStatus.COMPLETED
+        cancel_redis.set.assert_not_called()
+        mock_celery.control.revoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cancel_nonexistent_document(self, in_memory_db):
+        """Test cancelling non-existent document returns None"""
+        assert await cancel_document(in_memory_db, 99999) is None
+
+
 class TestGetDocumentStatistics:
     """Tests for get_document_statistics function"""
 
@@ -0,0 +1,119 @@
+"""
+Unit tests for fair-share OCR dispatcher service
+"""
+import json
+from unittest.mock import patch, MagicMock
+
+from app.services import fair_share_service
+from app.services.fair_share_service import (
+    dispatch_window,
+    make_job,
+    parse_setting_map,
+    release,
+    submit,
+    tenant_of,
+)
+
+
+class TestSettings:
+    """Tests for setting helpers"""
+
+    def test_parse_setting_map(self):
+        """Test name=value pairs are parsed and malformed entries ignored"""
+        assert parse_setting_map("재무팀=2, 법무팀=0.5,,broken") == {"재무팀": 2.0, "법무팀": 0.5}
+        assert parse_setting_map("") == {}
+
+    @patch("app.services.fair_share_service.settings")
+    def test_dispatch_window_per_queue(self, mock_settings):
+        """Test per-queue window with a default for unlisted queues"""
+        mock_settings.OCR_FAIR_SHARE_DISPATCH_WINDOW = "fast_ocr=6,precision_ocr=2"
+        mock_settings.OCR_FAIR_SHARE_DEFAULT_DISPATCH_WINDOW = 4
+
+        assert dispatch_window("fast_ocr") == 6
+        assert dispatch_window("accurate_ocr") == 4
+
+    def test_tenant_of_defaults(self):
+        """Test documents without a department share the default tenant"""
+        assert tenant_of(MagicMock(department=" Finance ")) == "Finance"
+        assert tenant_of(MagicMock(department=None)) == "default"
+
+
+class TestSubmit:
+    """Tests for submit function"""
+
+    def test_priority_class_orders_within_tenant(self):
+        """Test a higher-priority job scores ahead of an older lower-priority one"""
+        client = MagicMock()
+        script = client.register_script.return_value
+        low = make_job("process_document", [1], {}, "doc:1", "low")
+        high = make_job("process_document", [2], {}, "doc:2", "high")
+
+        with patch.object(fair_share_service, "_client", client):
+            submit("fast_ocr", "Finance", [low, high])
+
+        kwargs = script.call_args.kwargs
+        assert kwargs["keys"][0] == "ocr:fair:fast_ocr:pending:Finance"
+        tenant, low_score, low_json, high_score, high_json = kwargs["args"]
+        assert tenant == "Finance"
+        assert high_score < low_score
+        assert json.loads(low_json)["slot"] == "doc:1"
+
+    def test_low_job_not_starved_by_high_stream(self):
+        """Test a LOW job is dispatched although the same tenant keeps submitting HIGH jobs faster than they drain"""
+        client = MagicMock()
+        pending = {}
+
+        def zadd(keys, args):
+            for score, job in zip(args[1::2], args[2::2]):
+                pending[job] = score
+
+        client.register_script.return_value.side_effect = zadd
+        now = [0.0]
+
+        with patch.object(fair_share_service, "_client", client), \
+                patch("app.services.priority_service.settings") as mock_settings, \
+                patch("app.services.fair_share_service.time.time", side_effect=lambda: now[0]):
+            mock_settings.OCR_PRIORITY_AGING_SECONDS = 300
+            submit("fast_ocr", "Finance", [make_job("process_document", [0], {}, "doc:0", "low")])
+            dispatched_at, newest_before = None, 0
+            for second in range(1, 3600):
+                now[0] = float(second)
+                # two HIGH jobs arrive per second while one slot frees up
+                submit("fast_ocr", "Finance", [
+                    make_job("process_document", [second, i], {}, f"doc:{second}:{i}", "high") for i in range(2)
+                ])
+                job = min(pending, key=pending.get)
+                del pending[job]
+                if json.loads(job)["slot"] == "doc:0":
+                    dispatched_at = second
+                    break
+                newest_before = max(newest_before, json.loads(job)["args"][0])
+
+        # LOW is two classes below HIGH, so no HIGH job submitted after two aging periods goes first
+        assert dispatched_at is not None
+        assert newest_before <= 2 * 300
+
+
+class TestRelease:
+    """Tests for release function"""
+
+    def test_returns_queues_that_held_the_slot(self):
+        """Test only queues where the slot was removed are returned for re-dispatch"""
+        client = MagicMock()
+        client.pipeline.return_value.execute.return_value = [0, 0, 1, 1, 0, 0]
+
+        with patch.object(fair_share_service, "_client", client):
+            assert release("doc:1", ["fast_ocr", "accurate_ocr", "precision_ocr"]) == ["accurate_ocr"]
+
+
+class TestLentCapacity:
+    """Tests for capacity lent by work-stealing workers"""
+
+    @patch("app.services.fair_share_service.time.time", return_value=1000.0)
+    def test_only_unexpired_capacity_counts(self, _):
+        """Test lent processes widen the window until the lender stops renewing"""
+        client = MagicMock()
+        client.hvals.return_value = [b"2:1005.0", b"3:999.0"]
+
+        assert fair_share_service.lent_capacity("fast_ocr", client) == 2
+        client.hvals.assert_called_once_with("ocr:fair:fast_ocr:lent")
@@ -0,0 +1,103 @@
+"""
+Unit tests for OCR latency history service
+"""
+from unittest.mock import patch, MagicMock
+
+from app.models.document import OCRMode
+from app.services import latency_service
+from app.services.latency_service import estimate_modes, layout_bucket, load_bucket, select_mode
+
+
+def _estimates(precision, accurate, fast):
+    return {
+        "precision": {"total_seconds": precision},
+        "accurate": {"total_seconds": accurate},
+        "fast": {"total_seconds": fast},
+    }
+
+
+class TestBuckets:
+    """Tests for latency bucket helpers"""
+
+    def test_layout_bucket(self):
+        """Test features map to scan/digital and complex/simple buckets"""
+        assert layout_bucket(None) is None
+        assert layout_bucket({"text_layer": True, "column_count": 1}) == "digital_simple"
+        assert layout_bucket({"text_layer": False, "table_line_density": 8}) == "scan_complex"
+
+    @patch("app.services.latency_service.fair_share_service.dispatch_window", return_value=3)
+    def test_load_bucket(self, _):
+        """Test queue depth is bucketed relative to the dispatch window"""
+        assert load_bucket("precision_ocr", 0) == "idle"
+        assert load_bucket("precision_ocr", 2) == "busy"
+        assert load_bucket("precision_ocr", 3) == "saturated"
+
+
+class TestSelectMode:
+    """Tests for select_mode function"""
+
+    def test_most_accurate_mode_within_deadline(self):
+        """Test the most accurate mode meeting the deadline is chosen"""
+        estimates = _estimates(900, 200, 60)
+
+        assert select_mode(estimates, 1000) == OCRMode.PRECISION
+        assert select_mode(estimates, 300) == OCRMode.ACCURATE
+        assert select_mode(estimates, 100) == OCRMode.FAST
+
+    def test_never_above_recommended_mode(self):
+        """Test a document recommended for CPU OCR is not upgraded to the GPU"""
+        assert select_mode(_estimates(10, 20, 30), 1000, OCRMode.ACCURATE) == OCRMode.ACCURATE
+
+    def test_fastest_when_deadline_unreachable(self):
+        """Test the quickest estimate is used when no mode meets the deadline"""
+        assert select_mode(_estimates(900, 200, 250), 50) == OCRMode.ACCURATE
+
+
+class TestEstimateModes:
+    """Tests for estimate_modes function"""
+
+    @patch("app.services.latency_service.queue_depth")
+    @patch("app.services.latency_service.settings")
+    def test_history_and_queue_wait(self, mock_settings, mock_depth):
+        """Test history replaces defaults once enough samples exist and queue depth adds wait"""
+        mock_settings.OCR_DEFAULT_PAGE_SECONDS = "fast=1,accurate=4,precision=20"
+        mock_settings.OCR_FANOUT_PAGES_PER_TASK = 16
+        mock_depth.side_effect = lambda queue, r: {"precision_ocr": 4}.get(queue, 0)
+        client = MagicMock()
+        client.pipeline.return_value.execute.return_value = [
+            {b"all:saturated:avg": b"10", b"all:saturated:n": b"5", b"task:avg": b"100", b"task:n": b"5"},
+            {b"all:avg": b"3", b"all:n": b"2"},
+            {},
+        ]
+
+        with patch.object(latency_service, "_client", client):
+            estimates = estimate_modes(32)
+
+        # 32 pages in 2 ranges run in parallel; 4 queued precision tasks over a window of 2
+        assert estimates["precision"] == {
+            "queue_wait_seconds": 200.0, "processing_seconds": 160.0, "total_seconds": 360.0, "samples": 5,
+        }
+        # too few samples: default 4 s/page
+        assert estimates["accurate"]["processing_seconds"] == 64.0
+        assert estimates["accurate"]["samples"] == 0
+        assert estimates["fast"]["total_seconds"] == 16.0
+
+
+class TestSlowdown:
+    """Tests for slowdown function"""
+
+    @patch("app.services.latency_service.fair_share_service.dispatch_window", return_value=3)
+    def test_ratio_to_idle_latency(self, _):
+        """Test per-page time under load is compared with idle time and needs enough samples"""
+        client = MagicMock()
+        client.hgetall.return_value = {
+            b"all:idle:avg": b"2", b"all:idle:n": b"10",
+            b"all:saturated:avg": b"5", b"all:saturated:n": b"4",
+            b"all:busy:avg": b"3", b"all:busy:n": b"1",
+        }
+
+        with patch.object(latency_service, "_client", client):
+            assert latency_service.slowdown(OCRMode.ACCURATE, 5) == 2.5
+            assert latency_service.slowdown(OCRMode.ACCURATE, 1) is None
+            assert latency_service.slowdown(OCRMode.ACCURATE, 0) is None
+        client.hgetall.assert_called_with("ocr:latency:accurate")
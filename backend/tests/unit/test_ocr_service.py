@@ -6,7 +6,21 @@ from unittest.mock import patch, MagicMock
 from datetime import datetime
 
 from app.models.document import Document, OCRMode, DocumentStatus, Importance
-from app.services.ocr_service import recommend_ocr_mode, PRECISION_REQUIRED_TYPES
+from app.services.ocr_service import (
+    recommend_ocr_mode,
+    get_ocr_mode_recommendation,
+    pre_ocr_quality_check,
+    get_fallback_chain,
+    engine_available,
+    PRECISION_REQUIRED_TYPES,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_cached_features():
+    """Recommend from metadata only unless a test passes page features"""
+    with patch("app.services.ocr_service.page_analysis_service.get_cached", return_value=None):
+        yield
 
 
 class TestPrecisionRequiredTypes:
@@ -390,3 +404,128 @@ class TestRecommendOCRModeReasons:
 
         # Last reason should explain the threshold decision
         assert any("총점" in r for r in result.reasons)
+
+
+class TestRecommendOCRModeFeatures:
+    """Tests for pre-analysis page features in the recommendation"""
+
+    def _doc(self, **kwargs):
+        fields = dict(
+            id=1, title="Scan", original_filename="scan.pdf", file_path="documents/scan.pdf",
+            importance=Importance.MEDIUM, page_count=0, status=DocumentStatus.PENDING,
+        )
+        fields.update(kwargs)
+        return Document(**fields)
+
+    def test_digital_single_column_stays_fast(self):
+        """Test a born-digital plain document is not sent to the GPU"""
+        features = {"page_count": 12, "text_layer": True, "table_line_density": 0, "column_count": 1}
+
+        result = get_ocr_mode_recommendation(self._doc(), features)
+
+        assert result.recommended_mode == OCRMode.FAST
+        assert result.features == features
+
+    def test_scan_with_tables_adds_points(self):
+        """Test scanned pages and table lines each add 20 points"""
+        features = {
+            "page_count": 3, "text_layer": False, "scan_noise": 0.0,
+            "table_line_density": 12.0, "column_count": 1, "quality_score": 0.99,
+        }
+
+        result = get_ocr_mode_recommendation(self._doc(), features)
+
+        assert result.precision_score == 15 + 20 + 20
+        assert result.recommended_mode == OCRMode.ACCURATE
+        assert any("스캔본" in r for r in result.reasons)
+        assert any("표/다단" in r for r in result.reasons)
+
+    def test_low_quality_scan_forces_precision(self):
+        """Test a noisy scan below the quality threshold goes to precision OCR"""
+        features = {"page_count": 3, "text_layer": False, "quality_score": 0.4}
+
+        result = get_ocr_mode_recommendation(self._doc(importance=Importance.LOW), features)
+
+        assert result.recommended_mode == OCRMode.PRECISION
+        assert "스캔 품질" in result.reasons[0]
+
+    def test_page_count_from_features(self):
+        """Test the analysed page count applies before the upload page count is known"""
+        features = {"page_count": 250, "text_layer": False, "quality_score": 0.2}
+
+        result = get_ocr_mode_recommendation(self._doc(importance=Importance.LOW), features)
+
+        assert result.recommended_mode == OCRMode.FAST
+
+    def test_quality_check_without_features(self):
+        """Test the quality check is neutral when no analysis is available"""
+        assert pre_ocr_quality_check({}) == 1.0
+        assert pre_ocr_quality_check({"text_layer": False, "scan_noise": 0.005}) == 0.5
+
+
+class TestFallbackChain:
+    """Tests for get_fallback_chain function"""
+
+    @pytest.fixture(autouse=True)
+    def all_engines(self):
+        """Every engine is installed unless a test says otherwise"""
+        with patch("app.services.ocr_service.engine_available", return_value=True) as mock_available:
+            yield mock_available
+
+    def test_default_chains(self):
+        """Test precision falls back to accurate then fast, and fast has no fallback"""
+        assert get_fallback_chain(OCRMode.PRECISION) == [OCRMode.ACCURATE, OCRMode.FAST]
+        assert get_fallback_chain(OCRMode.ACCURATE) == [OCRMode.FAST]
+        assert get_fallback_chain(OCRMode.FAST) == []
+
+    @patch("app.services.ocr_service.settings")
+    def test_only_cpu_engines_without_self_or_repeats(self, mock_settings):
+        """Test the chain keeps only accurate/fast once each and never the mode itself"""
+        mock_settings.OCR_FALLBACK_CHAINS = "precision=fast>precision>fast>accurate, accurate = accurate"
+
+        assert get_fallback_chain(OCRMode.PRECISION) == [OCRMode.FAST, OCRMode.ACCURATE]
+        assert get_fallback_chain(OCRMode.ACCURATE) == []
+
+    def test_skips_engines_missing_on_worker(self, all_engines):
+        """Test engines this worker cannot run are dropped from the chain"""
+        all_engines.side_effect = lambda mode: mode == OCRMode.ACCURATE
+
+        assert get_fallback_chain(OCRMode.PRECISION) == [OCRMode.ACCURATE]
+        assert get_fallback_chain(OCRMode.ACCURATE) == []
+
+
+class TestEngineAvailable:
+    """Tests for engine_available function"""
+
+    @patch("app.services.ocr_service.importlib.util.find_spec")
+    @patch("app.services.ocr_service.shutil.which", return_value="/usr/bin/tesseract")
+    def test_fast_needs_binary_and_pytesseract(self, mock_which, mock_find_spec):
+        """Test Tesseract counts only when both the binary and pytesseract are installed"""
+        mock_find_spec.side_effect = lambda name: MagicMock() if name == "pytesseract" else None
+        assert engine_available(OCRMode.FAST) is True
+
+        mock_find_spec.side_effect = lambda name: None
+        assert engine_available(OCRMode.FAST) is False
+
+        mock_which.return_value = None
+        mock_find_spec.side_effect = lambda name: MagicMock()
+        assert engine_available(OCRMode.FAST) is False
+
+    @patch("app.services.ocr_service.importlib.util.find_spec")
+    def test_accurate_needs_paddleocr(self, mock_find_spec):
+        """Test PaddleOCR is available only when its package is installed"""
+        mock_find_spec.side_effect = lambda name: MagicMock() if name == "paddleocr" else None
+        assert engine_available(OCRMode.ACCURATE) is True
+
+        mock_find_spec.side_effect = lambda name: None
+        assert engine_available(OCRMode.ACCURATE) is False
+
+    @patch("app.services.ocr_service.settings")
+    def test_precision_needs_vlm_server(self, mock_settings, monkeypatch):
+        """Test the VLM engine is available only when a server is configured"""
+        monkeypatch.delenv("VLLM_API_BASE", raising=False)
+        mock_settings.VLM_API_BASES = ""
+        assert engine_available(OCRMode.PRECISION) is False
+
+        monkeypatch.setenv("VLLM_API_BASE", "http://vlm:8000/v1")
+        assert engine_available(OCRMode.PRECISION) is True
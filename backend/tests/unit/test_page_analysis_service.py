@@ -0,0 +1,79 @@
+"""
+Unit tests for pre-OCR page analysis service
+"""
+import fitz
+from PIL import Image, ImageDraw
+
+from app.services.page_analysis_service import analyze, analyze_image, sample_page_numbers
+
+
+def _text_page(draw, left, right, top=60, bottom=1040):
+    for y in range(top, bottom, 16):
+        for x in range(left, right - 30, 36):
+            draw.rectangle([x, y, x + 28, y + 8], fill=0)
+
+
+class TestSamplePageNumbers:
+    """Tests for sample_page_numbers function"""
+
+    def test_first_and_middle_page(self):
+        """Test the first and middle pages are sampled without duplicates"""
+        assert sample_page_numbers(10, 2) == [0, 5]
+        assert sample_page_numbers(1, 2) == [0]
+        assert sample_page_numbers(10, 1) == [0]
+        assert sample_page_numbers(0, 2) == []
+
+
+class TestAnalyzeImage:
+    """Tests for analyze_image function"""
+
+    def test_detects_two_columns(self):
+        """Test a wide blank gutter splits the page into two columns"""
+        image = Image.new("L", (850, 1100), 255)
+        draw = ImageDraw.Draw(image)
+        _text_page(draw, 60, 400)
+        _text_page(draw, 450, 790)
+
+        features = analyze_image(image)
+
+        assert features["column_count"] == 2
+        assert features["table_lines"] == 0
+
+    def test_detects_table_lines_and_noise(self):
+        """Test ruled lines are counted and isolated specks measured as noise"""
+        image = Image.new("L", (850, 1100), 255)
+        draw = ImageDraw.Draw(image)
+        for y in range(300, 701, 50):
+            draw.line([(60, y), (790, y)], fill=0)
+        for x in (60, 300, 550, 790):
+            draw.line([(x, 300), (x, 700)], fill=0)
+        clean = analyze_image(image)
+
+        for i in range(2000):
+            image.putpixel(((i * 37) % 850, (i * 53) % 1100), 0)
+        noisy = analyze_image(image)
+
+        assert clean["table_lines"] == 9 + 4
+        assert clean["scan_noise"] == 0
+        assert noisy["scan_noise"] > 0.001
+
+
+class TestAnalyze:
+    """Tests for analyze function"""
+
+    def test_pdf_with_text_layer(self, tmp_path):
+        """Test page count and text layer come from the PDF itself"""
+        pdf = fitz.open()
+        for _ in range(3):
+            page = pdf.new_page()
+            page.insert_textbox(fitz.Rect(60, 60, 550, 780), "Lorem ipsum dolor sit amet. " * 80, fontsize=10)
+        path = tmp_path / "doc.pdf"
+        pdf.save(path)
+
+        features = analyze(str(path), "application/pdf")
+
+        assert features["page_count"] == 3
+        assert features["sampled_pages"] == 2
+        assert features["text_layer"] is True
+        assert features["quality_score"] == 1.0
+        assert features["column_count"] == 1
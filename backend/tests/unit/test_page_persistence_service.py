@@ -0,0 +1,108 @@
+"""
+Unit tests for bulk page/block persistence service
+"""
+import pytest
+
+from app.models.document import DocumentPage, DocumentBlock, BlockType
+from app.services.page_persistence_service import (
+    PageWriter,
+    delete_document_pages,
+    insert_pages,
+)
+
+
+def _page(document_id, page_no):
+    return dict(
+        document_id=document_id,
+        page_no=page_no,
+        image_path=f"pages/{document_id}/page_{page_no:04d}.png",
+        width=800,
+        height=1200,
+        raw_text=f"page {page_no}",
+        ocr_json={"ocr_engine": "tesseract"},
+        confidence=0.9,
+    )
+
+
+def _blocks(count):
+    return [
+        dict(block_order=i, block_type=BlockType.TEXT, bbox=[0, 0, 1, 1], text=f"block {i}", confidence=0.9)
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def saved_document(in_memory_db, sample_document):
+    in_memory_db.add(sample_document)
+    in_memory_db.commit()
+    return sample_document
+
+
+class TestInsertPages:
+    """Tests for insert_pages function"""
+
+    def test_returns_ids_in_order_and_links_blocks(self, in_memory_db, saved_document):
+        """Test page ids follow input order and blocks get the matching page_id"""
+        page_ids = insert_pages(
+            in_memory_db,
+            [_page(saved_document.id, 1), _page(saved_document.id, 2)],
+            [_blocks(2), _blocks(3)],
+        )
+        in_memory_db.commit()
+
+        pages = {p.id: p for p in in_memory_db.query(DocumentPage).all()}
+        assert [pages[page_id].page_no for page_id in page_ids] == [1, 2]
+        assert in_memory_db.query(DocumentBlock).filter(DocumentBlock.page_id == page_ids[0]).count() == 2
+        assert in_memory_db.query(DocumentBlock).filter(DocumentBlock.page_id == page_ids[1]).count() == 3
+
+    def test_empty_batch(self, in_memory_db):
+        """Test empty input issues no statements"""
+        assert insert_pages(in_memory_db, [], []) == []
+
+
+class TestDeleteDocumentPages:
+    """Tests for delete_document_pages function"""
+
+    def test_deletes_pages_and_blocks(self, in_memory_db, saved_document):
+        """Test all pages and blocks of the document are removed with set-based deletes"""
+        insert_pages(in_memory_db, [_page(saved_document.id, 1), _page(saved_document.id, 2)], [_blocks(2), _blocks(1)])
+        in_memory_db.commit()
+
+        assert delete_document_pages(in_memory_db, saved_document.id) == (2, 3)
+        in_memory_db.commit()
+        assert in_memory_db.query(DocumentPage).count() == 0
+        assert in_memory_db.query(DocumentBlock).count() == 0
+
+
+class TestPageWriter:
+    """Tests for PageWriter"""
+
+    def test_flushes_every_batch(self, in_memory_db, saved_document):
+        """Test pages are committed once the batch fills and the rest on flush()"""
+        writer = PageWriter(in_memory_db, batch_size=2)
+        for page_no in range(1, 4):
+            writer.add(_page(saved_document.id, page_no), _blocks(1))
+
+        assert writer.written == 2
+        assert in_memory_db.query(DocumentPage).count() == 2
+
+        writer.flush()
+        assert writer.written == 3
+        assert in_memory_db.query(DocumentBlock).count() == 3
+
+    def test_reports_pages_after_commit(self, in_memory_db, saved_document):
+        """Test on_flush only sees pages once their batch is committed"""
+        flushed = []
+
+        def on_flush(page_nos):
+            assert in_memory_db.query(DocumentPage).count() == writer.written
+            flushed.append(page_nos)
+
+        writer = PageWriter(in_memory_db, batch_size=2, on_flush=on_flush)
+        for page_no in range(1, 4):
+            writer.add(_page(saved_document.id, page_no), _blocks(1))
+        assert flushed == [[1, 2]]
+
+        writer.flush()
+        writer.flush()
+        assert flushed == [[1, 2], [3]]
@@ -0,0 +1,637 @@
+"""
+Unit tests for the precision OCR (VLM) processor
+"""
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from PIL import Image
+
+# workers/precision_ocr 패키지 경로 (worker 컨테이너의 /app/workers와 같은 구조)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from workers.precision_ocr.processor import (
+    ChandraOCRProcessor,
+    ImageSizingPolicy,
+    SkippedPage,
+    OutputTokenEstimator,
+    VLMClient,
+    VLMEndpointPool,
+    VLMResponse,
+    VLMUnavailableError,
+    parse_endpoints,
+    parse_markdown,
+    split_packed_markdown,
+    stitch_tile_markdown,
+)
+
+
+def _chat(content, finish_reason="stop", completion_tokens=None):
+    """OpenAI-compatible chat/completions response body"""
+    body = {"choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}]}
+    if completion_tokens is not None:
+        body["usage"] = {"completion_tokens": completion_tokens}
+    return body
+
+
+def _vlm_client(responses, requests, **kwargs):
+    """VLMClient whose HTTP calls are answered in order from responses (dict body, status code or (status, message))"""
+    replies = iter(responses)
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        reply = next(replies)
+        if isinstance(reply, int):
+            return httpx.Response(reply, json={"error": "failed"})
+        if isinstance(reply, tuple):
+            status, message = reply
+            return httpx.Response(status, json={"object": "error", "message": message, "code": status})
+        return httpx.Response(200, json=reply)
+
+    client = VLMClient(api_base="http://vlm/v1", **kwargs)
+    client._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def _page(width, height, ink=False):
+    """White page, or a page with black horizontal text-like stripes"""
+    image = Image.new("L", (width, height), 255)
+    if ink:
+        for top in range(0, height, 20):
+            image.paste(0, (0, top, width, top + 8))
+    return image
+
+
+class TestImageSizingPolicy:
+    """Tests for ImageSizingPolicy"""
+
+    def test_fit_scale_keeps_small_images(self):
+        """Test images within the token budget are not scaled"""
+        policy = ImageSizingPolicy(token_pixels=28, max_image_tokens=1536)
+        assert policy.fit_scale(28 * 30, 28 * 40) == 1.0
+
+    def test_fit_scale_fits_budget(self):
+        """Test the scaled image never exceeds the token budget"""
+        policy = ImageSizingPolicy(token_pixels=28, max_image_tokens=1536)
+        for width, height in [(2480, 3508), (1700, 2200), (4000, 1000)]:
+            scale = policy.fit_scale(width, height)
+            assert scale < 1.0
+            assert policy.estimate_tokens(int(width * scale), int(height * scale)) <= 1536
+
+    def test_plan_tiles_single_box_when_scaling_is_enough(self):
+        """Test a sparse page that only needs mild downscaling is sent whole"""
+        policy = ImageSizingPolicy(token_pixels=28, max_image_tokens=1536, min_scale=0.5)
+        image = _page(1400, 1400)
+
+        assert policy.plan_tiles(image) == [(0, 0, 1400, 1400)]
+
+    def test_plan_tiles_splits_dense_page_with_overlap(self):
+        """Test a dense page is split into overlapping top-to-bottom strips covering the page"""
+        policy = ImageSizingPolicy(token_pixels=28, max_image_tokens=1536, max_tiles=4, tile_overlap=0.1)
+        image = _page(1400, 2800, ink=True)
+
+        boxes = policy.plan_tiles(image)
+
+        assert len(boxes) == 4
+        assert boxes[0][1] == 0 and boxes[-1][3] == 2800
+        assert all(box[0] == 0 and box[2] == 1400 for box in boxes)
+        for previous, current in zip(boxes, boxes[1:]):
+            assert current[1] < previous[3]
+
+    def test_plan_tiles_disabled(self):
+        """Test max_tiles=1 turns tiling off"""
+        policy = ImageSizingPolicy(max_tiles=1)
+        assert policy.plan_tiles(_page(3000, 6000, ink=True)) == [(0, 0, 3000, 6000)]
+
+
+class TestStitchTileMarkdown:
+    """Tests for stitch_tile_markdown function"""
+
+    def test_removes_overlapping_lines(self):
+        """Test lines repeated at the start of the next tile are dropped once"""
+        parts = ["# Title\n\nline 1\nline 2", "line 2\n\nline 3\nline 4"]
+        assert stitch_tile_markdown(parts) == "# Title\n\nline 1\nline 2\nline 3\nline 4"
+
+    def test_keeps_non_overlapping_tiles(self):
+        """Test tiles without shared lines are joined unchanged"""
+        assert stitch_tile_markdown(["a\nb", "c\nd"]) == "a\nb\nc\nd"
+
+    def test_only_leading_lines_are_skipped(self):
+        """Test a repeated line later in the tile is kept"""
+        assert stitch_tile_markdown(["a\nb", "c\nb"]) == "a\nb\nc\nb"
+
+
+class TestVLMEndpointPool:
+    """Tests for VLMEndpointPool"""
+
+    def test_parse_endpoints(self):
+        """Test the shared spec parser is used for weights and trailing slashes"""
+        endpoints = parse_endpoints("http://gpu1:8000/v1;weight=2, http://gpu2:8000/v1/,")
+        assert [(e.api_base, e.weight) for e in endpoints] == [
+            ("http://gpu1:8000/v1", 2.0),
+            ("http://gpu2:8000/v1", 1.0),
+        ]
+
+    def test_acquire_balances_by_weighted_in_flight(self):
+        """Test requests go to the endpoint with the fewest in-flight requests per weight"""
+        pool = VLMEndpointPool(parse_endpoints("http://a/v1;weight=2,http://b/v1"))
+        a, b = pool.endpoints
+
+        picks = [pool.acquire() for _ in range(3)]
+
+        assert picks == [a, a, b]
+        assert (a.in_flight, b.in_flight) == (2, 1)
+        pool.release(a, 100.0)
+        assert a.in_flight == 1
+        assert a.latency_ms_avg == 100.0
+
+    def test_acquire_excludes_tried_endpoints(self):
+        """Test a retry skips endpoints that were already tried"""
+        pool = VLMEndpointPool(parse_endpoints("http://a/v1,http://b/v1"))
+        a, b = pool.endpoints
+
+        assert pool.acquire(exclude=[a]) is b
+        with pytest.raises(VLMUnavailableError):
+            pool.acquire(exclude=[a, b])
+
+    def test_eject_after_consecutive_failures(self):
+        """Test an endpoint is ejected after max_failures errors and a success resets the count"""
+        pool = VLMEndpointPool(parse_endpoints("http://a/v1,http://b/v1"), max_failures=2)
+        a, b = pool.endpoints
+
+        pool.release(pool.acquire(), 0, error="timeout")
+        pool.release(a, 0)
+        assert a.consecutive_failures == 0 and a.healthy
+
+        for _ in range(2):
+            pool.acquire(exclude=[b])
+            pool.release(a, 0, error="HTTP 503")
+
+        assert not a.healthy
+        assert a.ejected_until > time.time()
+        assert pool.acquire() is b
+
+    def test_readmit_after_eject_period_when_probe_passes(self):
+        """Test an ejected endpoint is probed once the eject period ends and re-admitted if healthy"""
+        probe = MagicMock(side_effect=[False, True])
+        pool = VLMEndpointPool(parse_endpoints("http://a/v1"), probe=probe, max_failures=1, eject_seconds=30)
+        endpoint = pool.endpoints[0]
+        pool.release(endpoint, 0, error="timeout")
+
+        endpoint.ejected_until = 0
+        with pytest.raises(VLMUnavailableError):
+            pool.acquire()
+        # 실패한 검사는 다음 검사 시점을 eject_seconds 뒤로 미룸
+        assert endpoint.ejected_until > time.time()
+
+        endpoint.ejected_until = 0
+        assert pool.acquire() is endpoint
+        assert probe.call_count == 2
+
+    def test_periodic_probe_ejects_dead_endpoint(self):
+        """Test active health probing marks a healthy-looking endpoint down before requests fail on it"""
+        probe = MagicMock(side_effect=lambda e: e.api_base != "http://b/v1")
+        pool = VLMEndpointPool(parse_endpoints("http://a/v1,http://b/v1"), probe=probe, probe_interval=30)
+
+        assert pool.probe_all() is True
+        assert [e.healthy for e in pool.endpoints] == [True, False]
+
+    def test_periodic_probe_is_rate_limited(self):
+        """Test acquire starts a background probe only once per probe_interval"""
+        probe = MagicMock(return_value=True)
+        pool = VLMEndpointPool(parse_endpoints("http://a/v1"), probe=probe, probe_interval=30)
+        pool._next_probe = 0
+
+        pool.acquire()
+        pool.acquire()
+        deadline = time.time() + 2
+        while probe.call_count < 1 and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert probe.call_count == 1
+
+
+class TestOutputTokenEstimator:
+    """Tests for OutputTokenEstimator"""
+
+    def test_estimate_is_clamped(self):
+        """Test the estimate scales with ink ratio within min/max tokens"""
+        estimator = OutputTokenEstimator(min_tokens=256, max_tokens=8192, tokens_per_ink=25000, margin=1.3)
+
+        assert estimator.estimate(0.0) == 256
+        assert estimator.estimate(0.1) == 3250
+        assert estimator.estimate(1.0) == 8192
+
+    def test_learns_tokens_per_ink_from_complete_responses(self):
+        """Test finished responses move tokens_per_ink toward the observed ratio"""
+        estimator = OutputTokenEstimator(tokens_per_ink=25000)
+
+        estimator.observe(0.1, VLMResponse("x", finish_reason="stop", completion_tokens=1000))
+
+        assert estimator.tokens_per_ink == pytest.approx(0.9 * 25000 + 0.1 * 10000)
+        assert estimator.observed_count == 1
+
+    def test_ignores_blank_pages_and_missing_usage(self):
+        """Test near-empty pages and responses without token usage do not skew the ratio"""
+        estimator = OutputTokenEstimator(tokens_per_ink=25000)
+
+        estimator.observe(0.001, VLMResponse("", finish_reason="stop", completion_tokens=50))
+        estimator.observe(0.1, VLMResponse("x", finish_reason="stop", completion_tokens=None))
+
+        assert estimator.tokens_per_ink == 25000
+        assert estimator.observed_count == 2
+
+    def test_truncation_raises_margin_and_recovers_slowly(self):
+        """Test a truncated response widens the margin (capped) and later successes decay it to the base"""
+        estimator = OutputTokenEstimator(margin=1.3)
+
+        estimator.observe(0.1, VLMResponse("x", finish_reason="length", completion_tokens=3250))
+        assert estimator.margin == pytest.approx(1.625)
+        assert estimator.truncated_count == 1
+        for _ in range(10):
+            estimator.observe(0.1, VLMResponse("x", finish_reason="length"))
+        assert estimator.margin == 4.0
+
+        for _ in range(200):
+            estimator.observe(0.1, VLMResponse("x", finish_reason="stop", completion_tokens=2500))
+        assert estimator.margin == 1.3
+
+    def test_state_round_trip(self):
+        """Test learned state is shared between workers without lowering the base margin"""
+        estimator = OutputTokenEstimator(margin=1.3)
+        estimator.load_state({"tokens_per_ink": 18000.0, "margin": 1.1})
+        assert (estimator.tokens_per_ink, estimator.margin) == (18000.0, 1.3)
+
+        estimator.load_state(None)
+        other = OutputTokenEstimator()
+        other.load_state(estimator.state())
+        assert other.tokens_per_ink == 18000.0
+
+
+class TestContinuation:
+    """Tests for continuing outputs truncated at max_tokens"""
+
+    def test_truncated_output_is_continued(self):
+        """Test a length-truncated page is continued from the partial output instead of re-run"""
+        requests = []
+        client = _vlm_client(
+            [_chat("# Title\nfirst", "length", 100), _chat(" half\nend", "stop", 40)],
+            requests, max_tokens=2048,
+        )
+
+        response = client.complete(_page(56, 56), max_tokens=100)
+
+        assert response.content == "# Title\nfirst half\nend"
+        assert (response.finish_reason, response.continuations) == ("stop", 1)
+        assert response.completion_tokens == 140
+        assert response.max_tokens == 100
+        continuation = requests[1]
+        assert continuation["messages"][-1] == {"role": "assistant", "content": "# Title\nfirst"}
+        assert continuation["messages"][:-1] == requests[0]["messages"]
+        assert continuation["continue_final_message"] is True
+        assert continuation["add_generation_prompt"] is False
+        assert continuation["max_tokens"] == 2048
+
+    def test_stops_after_max_continuations(self):
+        """Test continuation requests are capped and the result stays marked as truncated"""
+        requests = []
+        client = _vlm_client(
+            [_chat("a", "length", 10), _chat("b", "length", 10), _chat("c", "length", 10)],
+            requests, max_continuations=2,
+        )
+
+        response = client.complete(_page(56, 56), max_tokens=10)
+
+        assert len(requests) == 3
+        assert response.content == "abc"
+        assert response.truncated and response.continuations == 2
+
+    def test_failed_continuation_keeps_partial_output(self):
+        """Test a failing continuation request returns the truncated output rather than an error"""
+        requests = []
+        client = _vlm_client([_chat("partial", "length", 10), 500, 500], requests, max_retries=1)
+
+        response = client.complete(_page(56, 56), max_tokens=10)
+
+        assert response.content == "partial"
+        assert response.truncated and response.continuations == 0
+
+    def test_empty_chunk_ends_continuation(self):
+        """Test an empty continuation stops the loop and unknown usage is not guessed"""
+        requests = []
+        client = _vlm_client([_chat("partial", "length", 10), _chat("", "length")], requests)
+
+        response = client.complete(_page(56, 56), max_tokens=10)
+
+        assert len(requests) == 2
+        assert response.content == "partial"
+        assert response.completion_tokens is None
+
+
+def _image_store():
+    """Reference image store handing out presigned-style URLs"""
+    store = MagicMock()
+    store.put.side_effect = lambda data: ("http://minio:9000/vlm/page.jpg?X-Amz-Signature=abc", "vlm/page.jpg")
+    return store
+
+
+class TestReferenceTransport:
+    """Tests for sending images by reference with an inline fallback"""
+
+    def test_fetch_failure_retries_inline(self):
+        """Test a 4xx naming the image URL resends the same image inline and counts the failure"""
+        requests = []
+        store = _image_store()
+        client = _vlm_client(
+            [(400, "Failed to fetch http://minio:9000/vlm/page.jpg: 403 Forbidden"), _chat("text")],
+            requests, image_store=store,
+        )
+
+        assert client.complete(_page(56, 56)).content == "text"
+
+        urls = [r["messages"][0]["content"][0]["image_url"]["url"] for r in requests]
+        assert urls[0].startswith("http://minio:9000/")
+        assert urls[1].startswith("data:image/jpeg;base64,")
+        assert client._reference_failures == 1
+        store.delete.assert_called_once_with("vlm/page.jpg")
+
+    @pytest.mark.parametrize("status, message", [
+        (400, "This model's maximum context length is 32768 tokens. However, you requested 40000 tokens."),
+        (413, "Request entity too large"),
+        (422, "Field required: messages.0.content"),
+    ])
+    def test_other_client_errors_are_not_retried_inline(self, status, message):
+        """Test ordinary request errors fail without an inline resend or disabling reference transport"""
+        requests = []
+        client = _vlm_client([(status, message)], requests, image_store=_image_store())
+
+        with pytest.raises(httpx.HTTPStatusError):
+            client.complete(_page(56, 56))
+
+        assert len(requests) == 1
+        assert client._reference_failures == 0
+
+    def test_disable_warning_logged_once_under_concurrency(self, caplog):
+        """Test concurrent failures from page/tile threads disable reference transport exactly once"""
+        client = VLMClient(api_base="http://vlm/v1")
+        barrier = threading.Barrier(12)
+
+        def fail():
+            barrier.wait()
+            client._reference_failed(RuntimeError("fetch failed"))
+
+        threads = [threading.Thread(target=fail) for _ in range(12)]
+        with caplog.at_level("WARNING"):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert client._reference_failures == 12
+        assert sum("transport disabled" in record.message for record in caplog.records) == 1
+
+
+class TestAdmission:
+    """Tests for the shared admission limit around VLM requests"""
+
+    def test_admission_wait_is_not_counted_as_in_flight(self):
+        """Test the replica's in-flight count only includes requests actually sent"""
+        admission = MagicMock()
+        requests = []
+        client = _vlm_client([_chat("ok")], requests, admission=admission)
+        endpoint = client.pool.endpoints[0]
+        in_flight_while_waiting = []
+        admission.acquire.side_effect = lambda api_base: in_flight_while_waiting.append(endpoint.in_flight) or "slot"
+
+        client.complete(_page(56, 56), max_tokens=10)
+
+        assert in_flight_while_waiting == [0]
+        admission.release.assert_called_once_with("http://vlm/v1", "slot")
+        assert endpoint.in_flight == 0
+
+    def test_admission_failure_leaves_pool_balanced(self):
+        """Test an error while waiting for admission does not leak an in-flight request"""
+        admission = MagicMock()
+        admission.acquire.side_effect = RuntimeError("admission broken")
+        client = _vlm_client([], [], admission=admission)
+
+        with pytest.raises(RuntimeError):
+            client.complete(_page(56, 56), max_tokens=10)
+
+        assert client.pool.endpoints[0].in_flight == 0
+        admission.release.assert_not_called()
+
+    def test_slot_released_when_request_fails(self):
+        """Test the admission slot and in-flight count are both released after a failed request"""
+        admission = MagicMock()
+        admission.acquire.return_value = "slot"
+        client = _vlm_client([400], [], admission=admission)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            client.complete(_page(56, 56), max_tokens=10)
+
+        admission.release.assert_called_once_with("http://vlm/v1", "slot")
+        assert client.pool.endpoints[0].in_flight == 0
+
+
+def _chandra(delays, concurrency=1, admission=None):
+    """ChandraOCRProcessor whose n-th VLM request takes delays[n] seconds"""
+    lock = threading.Lock()
+    calls = []
+
+    def handler(request):
+        with lock:
+            index = len(calls)
+            calls.append(index)
+        time.sleep(delays[index] if index < len(delays) else 0)
+        return httpx.Response(200, json=_chat(f"page text {index}"))
+
+    processor = ChandraOCRProcessor(
+        api_base="http://vlm/v1", concurrency=concurrency, adaptive_max_tokens=False,
+        max_continuations=0, image_transport="inline", admission=admission, health_probe_interval=0,
+    )
+    processor.client._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return processor
+
+
+def _outcomes(results):
+    return [
+        (r.page_no, r.reason) if isinstance(r, SkippedPage) else (r.page_no, "ok")
+        for r in results
+    ]
+
+
+class TestIterProcessImagesDeadlines:
+    """Tests for page/document deadlines in ChandraOCRProcessor.iter_process_images"""
+
+    def test_document_deadline_skips_remaining_pages_in_order(self):
+        """Test pages are yielded in input order and pages after the document deadline are never sent"""
+        processor = _chandra([0.3, 0.3, 0.3, 0.3])
+        pages = [(no, _page(56, 56)) for no in range(1, 5)]
+
+        results = list(processor.iter_process_images(pages, deadline=time.time() + 0.45))
+
+        assert _outcomes(results) == [
+            (1, "ok"),
+            (2, "document_deadline"),
+            (3, "document_deadline"),
+            (4, "document_deadline"),
+        ]
+
+    def test_page_timer_starts_when_request_is_sent(self):
+        """Test time spent waiting for an admission slot does not count against the page timeout"""
+        admission = MagicMock()
+        admission.acquire.side_effect = lambda api_base: time.sleep(0.3) or "slot"
+        processor = _chandra([0.05], admission=admission)
+
+        results = list(processor.iter_process_images([(1, _page(56, 56))], page_timeout=0.2))
+
+        assert _outcomes(results) == [(1, "ok")]
+
+    def test_slow_page_does_not_expire_queued_page(self):
+        """Test a page queued behind a timed-out request gets its own full timeout once sent"""
+        processor = _chandra([0.5, 0.05])
+        pages = [(1, _page(56, 56)), (2, _page(56, 56))]
+
+        results = list(processor.iter_process_images(pages, page_timeout=0.2))
+
+        assert _outcomes(results) == [(1, "page_deadline"), (2, "ok")]
+
+
+class TestPackedRequests:
+    """Tests for packing several small pages into one VLM request"""
+
+    def test_split_packed_markdown(self):
+        """Test output is split on IMAGE markers, ignoring text before the first marker"""
+        text = "Sure, here you go.\n=== IMAGE 1 ===\n# Receipt A\n\n=== image 2 ===\nTotal: 30\n"
+
+        assert split_packed_markdown(text, 2) == {1: "# Receipt A", 2: "Total: 30"}
+
+    def test_split_packed_markdown_drops_duplicate_and_out_of_range_markers(self):
+        """Test only the first marker per image within 1..count is kept"""
+        text = "=== IMAGE 1 ===\na\n=== IMAGE 3 ===\nx\n=== IMAGE 1 ===\nb\n=== IMAGE 2 ===\nc"
+
+        # 범위 밖 마커(3)의 내용은 어느 이미지에도 붙이지 않음
+        assert split_packed_markdown(text, 2) == {1: "a", 2: "c"}
+        assert split_packed_markdown("no markers", 2) == {}
+
+    def test_complete_packed_splits_usage_and_truncation(self):
+        """Test one request serves every image, tokens are shared by length and only the last part is truncated"""
+        requests = []
+        client = _vlm_client(
+            [_chat("=== IMAGE 1 ===\naaaa\n=== IMAGE 2 ===\nbbbbbbbbbbbb", "length", 160)],
+            requests, max_tokens=4096, max_continuations=0,
+        )
+
+        responses = client.complete_packed([_page(56, 56), _page(56, 56)])
+
+        assert len(requests) == 1
+        content = requests[0]["messages"][0]["content"]
+        assert [part["type"] for part in content] == ["text", "image_url", "text", "image_url", "text"]
+        assert "=== IMAGE k ===" in content[-1]["text"]
+        assert [(r.content, r.finish_reason, r.completion_tokens) for r in responses] == [
+            ("aaaa", "stop", 40),
+            ("bbbbbbbbbbbb", "length", 120),
+        ]
+
+    def test_complete_packed_missing_marker(self):
+        """Test an image without its marker is returned as None so the caller can resend it alone"""
+        client = _vlm_client([_chat("=== IMAGE 2 ===\nonly the second")], [], max_continuations=0)
+
+        responses = client.complete_packed([_page(56, 56), _page(56, 56)])
+
+        assert responses[0] is None
+        assert responses[1].content == "only the second"
+
+    def test_small_pages_are_packed_and_missing_pages_resent(self):
+        """Test consecutive small pages share one request and a page missing from the output is sent alone"""
+        requests = []
+        processor = ChandraOCRProcessor(
+            api_base="http://vlm/v1", concurrency=1, adaptive_max_tokens=False, max_continuations=0,
+            image_transport="inline", pack_max_images=2, health_probe_interval=0,
+        )
+        replies = iter([_chat("=== IMAGE 1 ===\nfirst receipt"), _chat("second receipt")])
+
+        def handler(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, json=next(replies))
+
+        processor.client._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+        results = list(processor.iter_process_images([(1, _page(56, 56)), (2, _page(56, 56))]))
+
+        assert len(requests) == 2
+        assert [(r.page_no, r.raw_text.strip(), r.pack_size) for r in results] == [
+            (1, "first receipt", 2),
+            (2, "second receipt", 1),
+        ]
+
+
+def _blocks(markdown):
+    return [
+        (b.block_type, b.text, b.table.rows if b.table else None)
+        for b in parse_markdown(markdown).blocks
+    ]
+
+
+class TestParseMarkdown:
+    """Tests for parse_markdown, including where it differs from the previous per-output parsers"""
+
+    def test_code_fence_is_one_block(self):
+        """Test a fenced code block is kept whole: '#' lines and blank lines inside it are not block boundaries"""
+        markdown = "Intro\n```python\n# not a header\n\nx = 1\n```\nAfter"
+
+        # 이전 파서: [text "Intro\n```python"], [header "not a header"], [text "x = 1\n```\nAfter"]
+        assert _blocks(markdown) == [
+            ("text", "Intro", None),
+            ("text", "```python\n# not a header\n\nx = 1\n```", None),
+            ("text", "After", None),
+        ]
+        parsed = parse_markdown(markdown)
+        assert "<pre><code># not a header\n\nx = 1</code></pre>" in parsed.html
+        assert "not a header" not in parsed.raw_text
+
+    def test_header_resets_block_type(self):
+        """Test text after a header is a text block even when a list preceded the header"""
+        # 이전 파서: 헤더 뒤 "plain text"가 list 블록으로 저장됨
+        assert _blocks("- a\n- b\n# Title\nplain text") == [
+            ("list", "- a\n- b", None),
+            ("header", "Title", None),
+            ("text", "plain text", None),
+        ]
+
+    def test_table_ended_by_header_or_blank_line_is_parsed(self):
+        """Test tables closed by a header or a blank line carry parsed rows (separator row skipped)"""
+        # 이전 파서: 헤더/빈 줄로 끝난 표는 table=None (텍스트 줄로 끝난 표만 행 파싱)
+        assert _blocks("| a | b |\n|---|---|\n| 1 | 2 |\n# Title\ntext")[0] == (
+            "table", "| a | b |\n|---|---|\n| 1 | 2 |", [["a", "b"], ["1", "2"]],
+        )
+        assert _blocks("| a | b |\n| 1 | 2 |\n\ntext") == [
+            ("table", "| a | b |\n| 1 | 2 |", [["a", "b"], ["1", "2"]]),
+            ("text", "text", None),
+        ]
+
+    def test_unchanged_segmentation(self):
+        """Test paragraphs, list continuation lines and tables ended by text segment as before"""
+        assert _blocks("para 1\nline 2\n\n- item\ncontinued\n| a |\ntext") == [
+            ("text", "para 1\nline 2", None),
+            ("list", "- item\ncontinued", None),
+            ("table", "| a |", [["a"]]),
+            ("text", "text", None),
+        ]
+
+    def test_plain_text_and_html(self):
+        """Test raw text drops markup and tables while HTML escapes text and renders tables"""
+        parsed = parse_markdown("# **Total** <net>\n\n| Item | Price |\n|---|---|\n| A | 3 |\n\n- see [doc](http://x)")
+
+        assert parsed.raw_text == "Total <net>\n\nsee doc"
+        assert parsed.html.split("\n") == [
+            "<h1><strong>Total</strong> &lt;net&gt;</h1>",
+            "<table><tr><th>Item</th><th>Price</th></tr><tr><td>A</td><td>3</td></tr></table>",
+            '<ul><li>see <a href="http://x">doc</a></li></ul>',
+        ]
@@ -0,0 +1,79 @@
+"""
+Unit tests for OCR queue priority service
+"""
+from unittest.mock import MagicMock
+
+from app.models.document import Importance
+from app.services.priority_service import (
+    age_queue,
+    get_wait_stats,
+    priority_class,
+    priority_queue_names,
+    queue_length,
+)
+
+
+class TestPriorityClass:
+    """Tests for priority_class function"""
+
+    def test_importance_mapping(self):
+        """Test each importance level maps to its own class"""
+        assert priority_class(Importance.HIGH) == "high"
+        assert priority_class(Importance.MEDIUM) == "medium"
+        assert priority_class(Importance.LOW) == "low"
+        assert priority_class(None) == "medium"
+
+    def test_urgent_overrides_importance(self):
+        """Test urgent requests go to the top class regardless of importance"""
+        assert priority_class(Importance.LOW, urgent=True) == "urgent"
+
+
+class TestPriorityQueues:
+    """Tests for priority sub-queue helpers"""
+
+    def test_queue_names_follow_broker_naming(self):
+        """Test step 0 keeps the plain queue name and others get the separator suffix"""
+        assert priority_queue_names("fast_ocr") == ["fast_ocr", "fast_ocr:3", "fast_ocr:6", "fast_ocr:9"]
+
+    def test_queue_length_sums_all_priorities(self):
+        """Test waiting messages are counted across every priority list"""
+        r = MagicMock()
+        r.pipeline.return_value.execute.return_value = [1, 0, 5, 20]
+
+        assert queue_length(r, "fast_ocr") == 26
+
+    def test_age_queue_promotes_one_step_from_the_top(self):
+        """Test each list is aged into the next higher one, highest pair first"""
+        r = MagicMock()
+        script = r.register_script.return_value
+        script.side_effect = [0, 2, 1]
+
+        assert age_queue(r, "fast_ocr", max_wait_seconds=300) == 3
+        pairs = [call.kwargs["keys"] for call in script.call_args_list]
+        assert pairs == [
+            ["fast_ocr:3", "fast_ocr"],
+            ["fast_ocr:6", "fast_ocr:3"],
+            ["fast_ocr:9", "fast_ocr:6"],
+        ]
+
+
+class TestGetWaitStats:
+    """Tests for get_wait_stats function"""
+
+    def test_stats_per_class(self):
+        """Test wait samples are summarized per priority class"""
+        r = MagicMock()
+        r.pipeline.return_value.execute.return_value = [
+            [],
+            [b"1.0", b"3.0"],
+            [],
+            [str(v).encode() for v in range(1, 101)],
+        ]
+
+        stats = get_wait_stats(r)
+
+        assert stats["urgent"] == {"samples": 0}
+        assert stats["high"]["avg_seconds"] == 2.0
+        assert stats["low"]["samples"] == 100
+        assert stats["low"]["p95_seconds"] == 96.0
+        assert stats["low"]["max_seconds"] == 100.0
@@ -0,0 +1,99 @@
+"""
+Unit tests for document progress service
+"""
+from unittest.mock import patch, MagicMock
+
+import redis
+
+from app.services import progress_service
+
+
+def _mock_client(replies):
+    client = MagicMock()
+    client.pipeline.return_value.execute.return_value = replies
+    return client
+
+
+class TestGetProgress:
+    """Tests for get_progress function"""
+
+    def test_eta_from_remaining_pages(self):
+        """Test ETA is remaining pages times the moving-average page time"""
+        client = _mock_client([
+            {
+                b"stage": b"vlm", b"pages_total": b"400", b"avg_page_seconds": b"2.5",
+                b"started_at": b"100.0", b"updated_at": b"200.0",
+            },
+            3,
+        ])
+
+        with patch.object(progress_service, "_client", client):
+            progress = progress_service.get_progress([7])[7]
+
+        assert progress["stage"] == "vlm"
+        assert progress["pages_done"] == 3
+        assert progress["pages_total"] == 400
+        assert progress["percent"] == 0.8
+        assert progress["eta_seconds"] == 397 * 2.5
+
+    def test_skips_documents_without_progress(self):
+        """Test documents with no record are left out and no timing means no ETA"""
+        client = _mock_client([
+            {},
+            0,
+            {b"stage": b"rendering", b"pages_total": b"10"},
+            0,
+        ])
+
+        with patch.object(progress_service, "_client", client):
+            progress = progress_service.get_progress([1, 2])
+
+        assert list(progress) == [2]
+        assert progress[2]["eta_seconds"] is None
+
+    def test_completed_document_has_zero_eta(self):
+        """Test finished documents report no remaining time"""
+        client = _mock_client([{b"stage": b"completed", b"pages_total": b"10"}, 10])
+
+        with patch.object(progress_service, "_client", client):
+            assert progress_service.get_progress([1])[1]["eta_seconds"] == 0.0
+
+    def test_redis_error_returns_no_progress(self):
+        """Test an unreachable Redis degrades to no progress instead of failing the API"""
+        client = MagicMock()
+        client.pipeline.return_value.execute.side_effect = redis.ConnectionError("down")
+
+        with patch.object(progress_service, "_client", client):
+            assert progress_service.get_progress([1, 2]) == {}
+
+
+class TestPageDone:
+    """Tests for page_done function"""
+
+    def test_reports_page_numbers(self):
+        """Test pages are reported to the script with both keys and timing flag"""
+        script = MagicMock()
+        with patch.object(progress_service, "_client", MagicMock()), \
+                patch.object(progress_service, "_page_done", script):
+            progress_service.page_done(5, [3, 4], timed=False)
+
+        kwargs = script.call_args.kwargs
+        assert kwargs["keys"] == ["ocr:progress:5", "ocr:progress:5:pages"]
+        assert kwargs["args"][3] == 0
+        assert kwargs["args"][4:] == [3, 4]
+
+    def test_redis_errors_do_not_propagate(self):
+        """Test progress reporting never fails the OCR task"""
+        script = MagicMock(side_effect=redis.ConnectionError("down"))
+        with patch.object(progress_service, "_client", MagicMock()), \
+                patch.object(progress_service, "_page_done", script):
+            progress_service.page_done(5, [1])
+
+    def test_no_pages_is_noop(self):
+        """Test an empty page list issues no Redis call"""
+        script = MagicMock()
+        with patch.object(progress_service, "_client", MagicMock()), \
+                patch.object(progress_service, "_page_done", script):
+            progress_service.page_done(5, [])
+
+        script.assert_not_called()
@@ -356,6 +356,61 @@ class TestDeleteFile:
         assert result is False
 
 
+class TestUploadVLMImage:
+    """Tests for upload_vlm_image method"""
+
+    @patch.object(StorageService, "client", new_callable=PropertyMock)
+    @patch("app.services.storage_service.settings")
+    def test_upload_vlm_image_returns_internal_url(self, mock_settings, mock_client_prop, storage_service, mock_minio_client):
+        """Test temporary VLM image is uploaded and presigned without external host rewrite"""
+        mock_settings.MINIO_BUCKET = "test-bucket"
+        mock_settings.MINIO_ENDPOINT = "minio:9000"
+        mock_settings.MINIO_EXTERNAL_ENDPOINT = "storage.example.com"
+        mock_minio_client.presigned_get_object.return_value = "http://minio:9000/test-bucket/vlm-tmp/x.jpg"
+        mock_client_prop.return_value = mock_minio_client
+
+        url, object_name = storage_service.upload_vlm_image(b"jpeg", expires=timedelta(minutes=2))
+
+        assert object_name.startswith("vlm-tmp/")
+        assert object_name.endswith(".jpg")
+        assert url == "http://minio:9000/test-bucket/vlm-tmp/x.jpg"
+        mock_minio_client.put_object.assert_called_once()
+        mock_minio_client.presigned_get_object.assert_called_once_with(
+            "test-bucket", object_name, expires=timedelta(minutes=2)
+        )
+
+
+class TestDocumentChunks:
+    """Tests for page-range PDF chunk upload/cleanup"""
+
+    @patch.object(StorageService, "client", new_callable=PropertyMock)
+    @patch("app.services.storage_service.settings")
+    def test_upload_document_chunk(self, mock_settings, mock_client_prop, storage_service, mock_minio_client):
+        """Test chunk PDF is stored under the document's chunks/ prefix"""
+        mock_settings.MINIO_BUCKET = "test-bucket"
+        mock_client_prop.return_value = mock_minio_client
+
+        object_name = storage_service.upload_document_chunk(b"%PDF", 7, 17, 32)
+
+        assert object_name == "chunks/7/pages_0017-0032.pdf"
+        mock_minio_client.put_object.assert_called_once()
+
+    @patch.object(StorageService, "client", new_callable=PropertyMock)
+    @patch("app.services.storage_service.settings")
+    def test_delete_document_chunks(self, mock_settings, mock_client_prop, storage_service, mock_minio_client):
+        """Test all chunks of a document are removed"""
+        mock_settings.MINIO_BUCKET = "test-bucket"
+        mock_minio_client.list_objects.return_value = [
+            MagicMock(object_name="chunks/7/pages_0001-0016.pdf"),
+            MagicMock(object_name="chunks/7/pages_0017-0032.pdf"),
+        ]
+        mock_client_prop.return_value = mock_minio_client
+
+        assert storage_service.delete_document_chunks(7) is True
+        mock_minio_client.list_objects.assert_called_once_with("test-bucket", prefix="chunks/7/", recursive=True)
+        assert mock_minio_client.remove_object.call_count == 2
+
+
 class TestDeleteDocumentFiles:
     """Tests for delete_document_files method"""
 
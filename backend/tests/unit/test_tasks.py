@@ -0,0 +1,609 @@
+"""
+Unit tests for OCR task routing, page-range fan-out and enqueueing
+"""
+import sys
+from unittest.mock import patch, MagicMock
+
+import fitz
+import pytest
+import redis
+from celery.exceptions import Retry
+
+from app.models.document import OCRMode, Importance, DocumentStatus
+from app.services.cancel_service import DocumentCancelled
+from app.services.fair_share_service import make_job
+from app.workers.tasks import (
+    _plan_page_ranges,
+    _fan_out,
+    _process_fast_ocr,
+    _process_accurate_ocr,
+    _fallback_page,
+    _degraded,
+    _process_precision_ocr,
+    _pending_pages,
+    _score_tesseract_page,
+    classify_document,
+    enqueue_ocr,
+    process_document,
+)
+
+
+@pytest.fixture(autouse=True)
+def lock_redis():
+    """Grant every document lease and request marker (no Redis in unit tests)"""
+    with patch("app.services.document_lock_service._redis") as mock_redis:
+        mock_redis.return_value.set.return_value = True
+        yield mock_redis.return_value
+
+
+@pytest.fixture(autouse=True)
+def cancel_redis():
+    """No document is cancelled unless a test says so"""
+    with patch("app.services.cancel_service._redis") as mock_redis:
+        mock_redis.return_value.exists.return_value = 0
+        yield mock_redis.return_value
+
+
+@pytest.fixture(autouse=True)
+def all_engines():
+    """Fallback chains are not trimmed by what this test machine has installed"""
+    with patch("app.services.ocr_service.engine_available", return_value=True):
+        yield
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """Create a 5-page PDF"""
+    path = tmp_path / "document.pdf"
+    with fitz.open() as doc:
+        for i in range(5):
+            doc.new_page().insert_text((72, 72), f"page {i + 1}")
+        doc.save(str(path))
+    return str(path)
+
+
+class TestPlanPageRanges:
+    """Tests for _plan_page_ranges function"""
+
+    def test_splits_into_fixed_size_ranges(self):
+        """Test pages are split into consecutive ranges with a short last range"""
+        assert _plan_page_ranges(40, 16) == [(1, 16), (17, 32), (33, 40)]
+
+    def test_single_range_when_small_or_disabled(self):
+        """Test small documents and pages_per_task=0 are not split"""
+        assert _plan_page_ranges(16, 16) == [(1, 16)]
+        assert _plan_page_ranges(500, 0) == [(1, 500)]
+
+
+class TestFanOut:
+    """Tests for _fan_out function"""
+
+    @patch("app.workers.tasks.enqueue_ocr")
+    @patch("app.workers.tasks.fanout_service")
+    @patch("app.workers.tasks.storage_service")
+    def test_uploads_chunks_and_enqueues_ranges(self, mock_storage, mock_fanout, mock_enqueue, sample_pdf):
+        """Test each range is stored as its own PDF and queued as a subtask on the mode's queue"""
+        chunks = {}
+
+        def upload(data, document_id, first_page, last_page):
+            chunks[first_page] = fitz.open(stream=data, filetype="pdf").page_count
+            return f"chunks/{document_id}/{first_page}.pdf"
+
+        mock_storage.upload_document_chunk.side_effect = upload
+        document = MagicMock(id=3, page_count=5, department="Finance", importance=Importance.LOW)
+
+        _fan_out(document, OCRMode.PRECISION, sample_pdf, [(1, 2), (3, 4), (5, 5)], deadline=123.0)
+
+        assert chunks == {1: 2, 3: 2, 5: 1}
+        mock_fanout.start.assert_called_once_with(3, 3)
+        queue, tenant, jobs = mock_enqueue.call_args[0]
+        assert (queue, tenant) == ("precision_ocr", "Finance")
+        assert [job["args"] for job in jobs] == [
+            [3, "precision", 1, "chunks/3/1.pdf"],
+            [3, "precision", 3, "chunks/3/3.pdf"],
+            [3, "precision", 5, "chunks/3/5.pdf"],
+        ]
+        assert [job["slot"] for job in jobs] == ["doc:3:1", "doc:3:3", "doc:3:5"]
+        assert all(job["task"] == "process_page_range" for job in jobs)
+        assert all(job["priority_class"] == "low" for job in jobs)
+        assert jobs[0]["kwargs"] == {"deadline": 123.0}
+
+
+class TestEnqueueOcr:
+    """Tests for enqueue_ocr function"""
+
+    @patch("app.workers.tasks.process_document")
+    @patch("app.workers.tasks.fair_share_service")
+    def test_dispatches_through_fair_share(self, mock_fair_share, mock_task):
+        """Test jobs go to the tenant queue and only dispatched jobs are sent to Celery"""
+        job = make_job("process_document", [1], {}, "doc:1", "medium")
+        mock_fair_share.dispatch.return_value = [job]
+
+        enqueue_ocr("fast_ocr", "Finance", [job])
+
+        mock_fair_share.submit.assert_called_once_with("fast_ocr", "Finance", [job])
+        call_kwargs = mock_task.apply_async.call_args.kwargs
+        assert call_kwargs["queue"] == "fast_ocr"
+        assert call_kwargs["priority"] == 6
+        assert call_kwargs["headers"]["enqueued_at"] == job["enqueued_at"]
+
+    @patch("app.workers.tasks.process_document")
+    @patch("app.workers.tasks.fair_share_service")
+    def test_urgent_and_redis_failure_go_direct(self, mock_fair_share, mock_task):
+        """Test urgent jobs bypass the tenant queue and Redis errors fall back to direct enqueue"""
+        mock_fair_share.submit.side_effect = redis.ConnectionError("down")
+        urgent = make_job("process_document", [1], {}, "doc:1", "urgent")
+        normal = make_job("process_document", [2], {}, "doc:2", "low")
+
+        enqueue_ocr("fast_ocr", "Finance", [urgent, normal])
+
+        sent = [c.kwargs["args"] for c in mock_task.apply_async.call_args_list]
+        assert sent == [[1], [2]]
+        mock_fair_share.dispatch.assert_not_called()
+
+
+def _mock_session(document):
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = document
+    return db
+
+
+class TestClassifyDocument:
+    """Tests for classify_document task"""
+
+    @patch("app.workers.tasks.enqueue_ocr")
+    @patch("app.workers.tasks.page_analysis_service")
+    @patch("app.workers.tasks.progress_service")
+    @patch("app.workers.tasks.SessionLocal")
+    def test_stores_mode_and_requeues_on_mode_queue(self, mock_session, mock_progress, mock_analysis, mock_enqueue):
+        """Test the recommended mode is saved and the document moves to that mode's queue"""
+        document = MagicMock(
+            id=4, page_count=10, doc_type="report", department="Legal",
+            importance=Importance.HIGH, ocr_mode=OCRMode.AUTO, status=DocumentStatus.PENDING,
+        )
+        mock_session.return_value = _mock_session(document)
+        mock_analysis.get_cached.return_value = {"page_count": 10, "text_layer": True}
+
+        result = classify_document.run(4, deadline_seconds=600, deadline=1_000_000.0)
+
+        assert result["ocr_mode"] == "precision"
+        assert document.recommended_ocr_mode == OCRMode.PRECISION
+        assert document.precision_score == 100
+        mock_analysis.analyze.assert_not_called()
+        queue, tenant, [job] = mock_enqueue.call_args[0]
+        assert (queue, tenant) == ("precision_ocr", "Legal")
+        assert job["task"] == "process_document"
+        assert job["slot"] == "doc:4"
+        assert job["priority_class"] == "high"
+        assert job["kwargs"] == {"deadline_seconds": 600, "deadline": 1_000_000.0}
+
+
+    @patch("app.workers.tasks.enqueue_ocr")
+    @patch("app.workers.tasks.page_analysis_service")
+    @patch("app.workers.tasks.storage_service")
+    @patch("app.workers.tasks.progress_service")
+    @patch("app.workers.tasks.SessionLocal")
+    def test_analyses_once_and_caches_features(
+        self, mock_session, mock_progress, mock_storage, mock_analysis, mock_enqueue,
+    ):
+        """Test uncached documents are analysed, cached and get their page count from the analysis"""
+        document = MagicMock(
+            id=5, page_count=0, doc_type=None, department=None,
+            importance=Importance.MEDIUM, ocr_mode=OCRMode.AUTO, mime_type="application/pdf",
+            status=DocumentStatus.PENDING,
+        )
+        mock_session.return_value = _mock_session(document)
+        features = {"page_count": 40, "text_layer": False, "table_line_density": 10.0, "quality_score": 0.9}
+        mock_analysis.get_cached.return_value = None
+        mock_analysis.analyze.return_value = features
+
+        result = classify_document.run(5)
+
+        mock_storage.download_to_file.assert_called_once()
+        mock_analysis.cache.assert_called_once_with(5, features)
+        assert document.page_count == 40
+        assert result["ocr_mode"] == "accurate"
+        assert mock_enqueue.call_args[0][0] == "accurate_ocr"
+
+
+class TestProcessDocumentRouting:
+    """Tests for process_document queue guard"""
+
+    @patch("app.workers.tasks._release_slot")
+    @patch("app.workers.tasks.enqueue_ocr")
+    @patch("app.workers.tasks.SessionLocal")
+    def test_wrong_queue_is_rerouted_without_processing(self, mock_session, mock_enqueue, mock_release):
+        """Test a precision document delivered to fast_ocr is re-enqueued instead of run there"""
+        document = MagicMock(
+            id=4, department="Legal", importance=Importance.MEDIUM,
+            ocr_mode=OCRMode.AUTO, recommended_ocr_mode=OCRMode.PRECISION, status=DocumentStatus.PENDING,
+        )
+        mock_session.return_value = _mock_session(document)
+
+        process_document.push_request(delivery_info={"routing_key": "fast_ocr"}, retries=0)
+        try:
+            result = process_document.run(4)
+        finally:
+            process_document.pop_request()
+
+        assert result["status"] == "rerouted"
+        mock_release.assert_called_once_with("doc:4")
+        queue, _, [job] = mock_enqueue.call_args[0]
+        assert queue == "precision_ocr"
+        assert job["task"] == "process_document"
+
+    @patch("app.workers.tasks._release_slot")
+    @patch("app.workers.tasks.enqueue_ocr")
+    @patch("app.workers.tasks.SessionLocal")
+    def test_unclassified_auto_document_is_classified_first(self, mock_session, mock_enqueue, mock_release):
+        """Test an AUTO document without a recommended mode goes back to classification"""
+        document = MagicMock(
+            id=4, department=None, importance=Importance.LOW,
+            ocr_mode=OCRMode.AUTO, recommended_ocr_mode=None, status=DocumentStatus.PENDING,
+        )
+        mock_session.return_value = _mock_session(document)
+
+        result = process_document.run(4)
+
+        assert result["status"] == "rerouted"
+        queue, tenant, [job] = mock_enqueue.call_args[0]
+        assert (queue, tenant) == ("fast_ocr", "default")
+        assert job["task"] == "classify_document"
+        assert job["slot"] is None
+
+
+class TestDocumentDeadline:
+    """Tests for the precision OCR document deadline across retries"""
+
+    @patch("app.workers.tasks._release_slot")
+    @patch("app.workers.tasks._complete_document")
+    @patch("app.workers.tasks._process_pages", return_value=0)
+    @patch("app.workers.tasks._count_pages", return_value=3)
+    @patch("app.workers.tasks.progress_service")
+    @patch("app.workers.tasks.storage_service")
+    @patch("app.workers.tasks.SessionLocal")
+    def test_deadline_set_at_enqueue_is_reused(self, mock_session, mock_storage, mock_progress, mock_count,
+                                                mock_process, mock_complete, mock_release):
+        """Test a retried task keeps the absolute deadline instead of restarting the clock"""
+        document = MagicMock(id=9, ocr_mode=OCRMode.PRECISION, status=DocumentStatus.PROCESSING, mime_type="image/png")
+        mock_session.return_value = _mock_session(document)
+
+        process_document.run(9, deadline_seconds=600, deadline=1_000_000.0)
+
+        assert mock_process.call_args.kwargs["deadline"] == 1_000_000.0
+
+    @patch("app.workers.tasks._release_slot")
+    @patch("app.workers.tasks._complete_document")
+    @patch("app.workers.tasks._process_pages", return_value=0)
+    @patch("app.workers.tasks._count_pages", return_value=3)
+    @patch("app.workers.tasks.progress_service")
+    @patch("app.workers.tasks.storage_service")
+    @patch("app.workers.tasks.SessionLocal")
+    def test_deadline_without_enqueue_value_uses_first_enqueue_time(
+        self, mock_session, mock_storage, mock_progress, mock_count, mock_process, mock_complete, mock_release,
+    ):
+        """Test messages without a stored deadline count from the original enqueue time, not the retry"""
+        document = MagicMock(id=9, ocr_mode=OCRMode.PRECISION, status=DocumentStatus.PROCESSING, mime_type="image/png")
+        mock_session.return_value = _mock_session(document)
+
+        process_document.push_request(enqueued_at=500.0, retries=1)
+        try:
+            process_document.run(9, deadline_seconds=600)
+        finally:
+            process_document.pop_request()
+
+        assert mock_process.call_args.kwargs["deadline"] == 1100.0
+
+
+class TestDuplicateExecution:
+    """Tests for per-document leases and idempotent task execution"""
+
+    @patch("app.workers.tasks._release_slot")
+    @patch("app.workers.tasks.SessionLocal")
+    def test_concurrent_duplicate_exits_without_processing(self, mock_session, mock_release, lock_redis):
+        """Test a second process_document on a leased document stops before touching the database"""
+        lock_redis.set.return_value = None
+
+        process_document.push_request(retries=process_document.max_retries)
+        try:
+            result = process_document.run(4)
+        finally:
+            process_document.pop_request()
+
+        assert result == {"status": "duplicate", "document_id": 4}
+        mock_session.assert_not_called()
+        mock_release.assert_not_called()
+
+    @patch("app.workers.tasks.SessionLocal")
+    def test_duplicate_checks_again_after_lease_ttl(self, mock_session, lock_redis):
+        """Test a blocked task retries after the lease TTL in case the holder's worker died"""
+        lock_redis.set.return_value = None
+
+        with patch.object(process_document, "retry", side_effect=Retry) as mock_retry:
+            with pytest.raises(Retry):
+                process_document.run(4)
+
+        assert mock_retry.call_args.kwargs["countdown"] == 60
+        mock_session.assert_not_called()
+
+    @patch("app.workers.tasks.storage_service")
+    @patch("app.workers.tasks.SessionLocal")
+    def test_finished_document_is_not_processed_again(self, mock_session, mock_storage, lock_redis):
+        """Test a late redelivery of a completed document does nothing and frees the lease"""
+        document = MagicMock(id=4, ocr_mode=OCRMode.FAST, status=DocumentStatus.COMPLETED)
+        mock_session.return_value = _mock_session(document)
+
+        result = process_document.run(4)
+
+        assert result["status"] == "duplicate"
+        assert document.status == DocumentStatus.COMPLETED
+        mock_storage.download_to_file.assert_not_called()
+        assert lock_redis.register_script.return_value.call_args.kwargs["keys"] == ["ocr:lock:doc:4"]
+
+
+class TestCancellation:
+    """Tests for cooperative cancellation of running OCR tasks"""
+
+    @patch("app.workers.tasks._save_tesseract_page")
+    @patch("app.workers.tasks._run_tesseract", return_value=({}, ""))
+    @patch("app.workers.tasks._save_page_images", return_value=["p1", "p2", "p3"])
+    @patch("app.workers.tasks._pending_pages")
+    def test_page_loop_stops_at_next_page(
+        self, mock_pending, mock_images, mock_tesseract, mock_save, cancel_redis,
+    ):
+        """Test fast OCR finishes the current page and stops before the next one"""
+        mock_pending.return_value = ([(1, MagicMock()), (2, MagicMock()), (3, MagicMock())], [])
+        cancel_redis.exists.side_effect = [0, 1]
+        document = MagicMock(id=9)
+
+        with pytest.raises(DocumentCancelled):
+            _process_fast_ocr(MagicMock(), document, "document.pdf")
+
+        assert mock_tesseract.call_count == 1
+        cancel_redis.exists.assert_called_with("ocr:cancel:9")
+
+    @patch("app.workers.tasks._release_slot")
+    @patch("app.workers.tasks._process_pages", side_effect=DocumentCancelled("cancelled"))
+    @patch("app.workers.tasks._count_pages", return_value=3)
+    @patch("app.workers.tasks.progress_service")
+    @patch("app.workers.tasks.storage_service")
+    @patch("app.workers.tasks.SessionLocal")
+    def test_cancelled_task_exits_without_retry(
+        self, mock_session, mock_storage, mock_progress, mock_count, mock_process, mock_release,
+    ):
+        """Test a cancelled document is not retried or marked failed again by the task"""
+        document = MagicMock(id=9, ocr_mode=OCRMode.FAST, status=DocumentStatus.PENDING, mime_type="image/png")
+        db = _mock_session(document)
+        mock_session.return_value = db
+
+        with patch.object(process_document, "retry") as mock_retry:
+            result = process_document.run(9)
+
+        assert result == {"status": "cancelled", "document_id": 9}
+        mock_retry.assert_not_called()
+        db.rollback.assert_called_once()
+        mock_release.assert_called_once_with("doc:9")
+
+
+class TestPendingPages:
+    """Tests for resuming a document from its first unfinished page"""
+
+    @staticmethod
+    def _db(done):
+        db = MagicMock()
+        db.query.return_value.filter.return_value = [(page_no,) for page_no in done]
+        return db
+
+    @patch("app.workers.tasks.progress_service")
+    @patch("app.workers.tasks._load_document_images")
+    @patch("app.workers.tasks._count_pages", return_value=5)
+    def test_renders_from_first_unfinished_page(self, mock_count, mock_load, mock_progress):
+        """Test saved pages are skipped and rendering starts at the first gap"""
+        mock_load.return_value = [f"image{n}" for n in range(2, 6)]
+
+        pages, done = _pending_pages(self._db([1, 3]), MagicMock(id=4), "document.pdf")
+
+        assert mock_load.call_args.kwargs["start"] == 2
+        assert pages == [(2, "image2"), (4, "image4"), (5, "image5")]
+        assert done == [1, 3]
+        mock_progress.page_done.assert_called_once_with(4, {1, 3}, timed=False)
+
+    @patch("app.workers.tasks.progress_service")
+    @patch("app.workers.tasks._load_document_images")
+    @patch("app.workers.tasks._count_pages", return_value=3)
+    def test_page_range_offsets_render_start(self, mock_count, mock_load, mock_progress):
+        """Test a page-range task renders relative to its own first page"""
+        mock_load.return_value = ["image12"]
+
+        pages, done = _pending_pages(self._db([10, 11]), MagicMock(id=4), "range.pdf", first_page=10)
+
+        assert mock_load.call_args.kwargs["start"] == 3
+        assert pages == [(12, "image12")]
+        assert done == [10, 11]
+
+    @patch("app.workers.tasks.progress_service")
+    @patch("app.workers.tasks._load_document_images")
+    @patch("app.workers.tasks._count_pages", return_value=2)
+    def test_finished_document_renders_nothing(self, mock_count, mock_load, mock_progress):
+        """Test a fully saved document is not rendered again"""
+        pages, done = _pending_pages(self._db([1, 2]), MagicMock(id=4), "document.pdf")
+
+        assert pages == []
+        assert done == [1, 2]
+        mock_load.assert_not_called()
+
+
+class TestEngineFallback:
+    """Tests for per-page engine fallback chains"""
+
+    @patch("app.workers.tasks._save_tesseract_page")
+    @patch("app.workers.tasks._run_tesseract", return_value=({"text": []}, "text"))
+    @patch("app.workers.tasks._load_paddle_processor", return_value=None)
+    def test_skips_unavailable_engine_and_records_attempts(self, mock_paddle, mock_tesseract, mock_save):
+        """Test a failed VLM page goes through the chain and the used engine is recorded"""
+        degraded = _degraded("error", OCRMode.PRECISION, RuntimeError("vLLM 500"))
+
+        _fallback_page(
+            MagicMock(), MagicMock(id=3), 2, MagicMock(), "p2", [OCRMode.ACCURATE, OCRMode.FAST],
+            degraded, {}, extra_json={"cascade": {"routed_to": "vlm"}},
+        )
+
+        extra_json = mock_save.call_args.kwargs["extra_json"]
+        assert extra_json["cascade"] == {"routed_to": "vlm"}
+        assert extra_json["degraded"]["requested_engine"] == "chandra"
+        assert extra_json["degraded"]["attempts"] == [
+            {"engine": "chandra", "error": "vLLM 500"},
+            {"engine": "paddleocr", "error": "not available"},
+        ]
+
+    @patch("app.workers.tasks._run_tesseract", side_effect=RuntimeError("tesseract crashed"))
+    def test_last_engine_failure_propagates(self, mock_tesseract):
+        """Test the task retries when every engine in the chain fails"""
+        with pytest.raises(RuntimeError, match="tesseract crashed"):
+            _fallback_page(
+                MagicMock(), MagicMock(id=3), 2, MagicMock(), "p2", [OCRMode.FAST],
+                _degraded("page_deadline", OCRMode.PRECISION), {},
+            )
+
+    @patch("app.workers.tasks._count_degraded_pages", return_value=0)
+    @patch("app.workers.tasks._save_paddle_page")
+    @patch("app.workers.tasks._save_tesseract_page")
+    @patch("app.workers.tasks._run_tesseract", return_value=({"text": []}, "text"))
+    @patch("app.workers.tasks._save_page_images", return_value=["p1", "p2"])
+    @patch("app.workers.tasks._pending_pages")
+    @patch("app.workers.tasks._load_paddle_processor")
+    def test_failed_page_falls_back_without_failing_document(
+        self, mock_paddle, mock_pending, mock_images, mock_tesseract, mock_save_tesseract,
+        mock_save_paddle, mock_degraded,
+    ):
+        """Test a PaddleOCR error on one page only moves that page to Tesseract"""
+        mock_pending.return_value = ([(1, MagicMock()), (2, MagicMock())], [])
+        mock_paddle.return_value.process_image_pil.side_effect = [MagicMock(page_no=1), ValueError("bad page")]
+
+        degraded_pages = _process_accurate_ocr(MagicMock(), MagicMock(id=3), "document.pdf")
+
+        assert degraded_pages == 1
+        assert mock_save_paddle.call_count == 1
+        args, kwargs = mock_save_tesseract.call_args
+        assert args[2] == 2
+        assert kwargs["extra_json"]["degraded"]["attempts"] == [{"engine": "paddleocr", "error": "bad page"}]
+
+
+def _ocr_data(words):
+    """Tesseract image_to_data style dict from (text, conf, left, width, line_num) tuples"""
+    return {
+        "text": [w[0] for w in words],
+        "conf": [w[1] for w in words],
+        "left": [w[2] for w in words],
+        "width": [w[3] for w in words],
+        "height": [20] * len(words),
+        "block_num": [1] * len(words),
+        "par_num": [1] * len(words),
+        "line_num": [w[4] for w in words],
+    }
+
+
+class SkippedPage:
+    pass
+
+
+@pytest.fixture
+def chandra_processor():
+    """Stand-in for workers.precision_ocr.processor (not importable from the backend tests)"""
+    module = MagicMock(SkippedPage=SkippedPage)
+    processor = module.ChandraOCRProcessor.return_value
+    processor.token_estimator = None
+    processor.iter_process_images.side_effect = lambda pages, **kwargs: (
+        MagicMock(page_no=page_no, finish_reason="stop") for page_no, _ in pages
+    )
+    modules = {
+        "workers": MagicMock(),
+        "workers.precision_ocr": MagicMock(),
+        "workers.precision_ocr.processor": module,
+    }
+    with patch.dict(sys.modules, modules):
+        yield processor
+
+
+class TestCascade:
+    """Tests for the Tesseract -> VLM cascade"""
+
+    def test_clean_single_column_page(self):
+        """Test a confidently read plain text page scores high confidence and no complexity"""
+        data = _ocr_data([
+            ("Hello", "96", 100, 80, 1), ("world", "94", 190, 80, 1),
+            ("second", "92", 100, 90, 2), ("line", "95", 200, 60, 2),
+        ])
+
+        confidence, complexity = _score_tesseract_page(data, 1000, 1400)
+
+        assert confidence == pytest.approx(0.9425)
+        assert complexity == 0.0
+
+    def test_empty_page_escalates(self):
+        """Test a page with no recognized words is treated as fully complex"""
+        data = _ocr_data([("", "-1", 0, 0, 1), ("  ", "95", 10, 10, 1)])
+        assert _score_tesseract_page(data, 1000, 1400) == (0.0, 1.0)
+
+    def test_table_gaps_and_low_confidence_raise_complexity(self):
+        """Test lines split by wide gaps (tables/forms) and low-confidence words add complexity"""
+        data = _ocr_data([
+            ("Item", "95", 100, 60, 1), ("Price", "95", 600, 60, 1),
+            ("Total", "40", 100, 60, 2), ("30", "95", 170, 30, 2),
+        ])
+
+        confidence, complexity = _score_tesseract_page(data, 1000, 1400)
+
+        # 1/2 gapped lines + 0.5 * 1/4 low-confidence words
+        assert complexity == pytest.approx(0.625)
+        assert confidence == pytest.approx(0.8125)
+
+    def test_multi_column_layout(self):
+        """Test lines starting in the right half of the page are detected as a second column"""
+        words = [(f"left{i}", "95", 50, 300, i) for i in range(4)]
+        words += [(f"right{i}", "95", 550, 300, 10 + i) for i in range(4)]
+
+        _, complexity = _score_tesseract_page(_ocr_data(words), 1000, 1400)
+
+        assert complexity == 0.5
+
+    @patch("app.workers.tasks._count_degraded_pages", return_value=0)
+    @patch("app.workers.tasks._save_vlm_page")
+    @patch("app.workers.tasks._save_tesseract_page")
+    @patch("app.workers.tasks._score_tesseract_page")
+    @patch("app.workers.tasks._run_tesseract", return_value=({}, "text"))
+    @patch("app.workers.tasks._save_page_images", return_value=["p1", "p2", "p3"])
+    @patch("app.workers.tasks._pending_pages")
+    @patch("app.workers.tasks.vlm_stats_service")
+    @patch("app.workers.tasks.progress_service")
+    @patch("app.workers.tasks.settings")
+    def test_only_pages_below_threshold_go_to_vlm(
+        self, mock_settings, mock_progress, mock_stats, mock_pending, mock_images, mock_tesseract,
+        mock_score, mock_save_tesseract, mock_save_vlm, mock_degraded, chandra_processor,
+    ):
+        """Test pages at the confidence/complexity thresholds stay on Tesseract and the rest escalate"""
+        mock_settings.VLM_API_BASES = "http://gpu1:8000/v1"
+        mock_settings.VLM_ADMISSION_CONTROL = False
+        mock_settings.VLM_IMAGE_TRANSPORT = "inline"
+        mock_settings.OCR_PRECISION_PAGE_DEADLINE_SECONDS = 0
+        mock_settings.OCR_PRECISION_CASCADE = True
+        mock_settings.OCR_CASCADE_MIN_CONFIDENCE = 0.85
+        mock_settings.OCR_CASCADE_MAX_COMPLEXITY = 0.3
+        mock_pending.return_value = ([(1, MagicMock(size=(10, 10))), (2, MagicMock(size=(10, 10))),
+                                      (3, MagicMock(size=(10, 10)))], [])
+        # 기준값과 같은 페이지 / 복잡도 초과 / 신뢰도 미달
+        mock_score.side_effect = [(0.85, 0.3), (0.95, 0.31), (0.84, 0.0)]
+
+        degraded_pages = _process_precision_ocr(MagicMock(), MagicMock(id=5), "document.pdf")
+
+        assert degraded_pages == 0
+        assert [c.args[2] for c in mock_save_tesseract.call_args_list] == [1]
+        assert mock_save_tesseract.call_args.kwargs["extra_json"] == {
+            "cascade": {"confidence": 0.85, "complexity": 0.3, "routed_to": "tesseract"},
+        }
+        vlm_pages = chandra_processor.iter_process_images.call_args.args[0]
+        assert [page_no for page_no, _ in vlm_pages] == [2, 3]
+        assert [c.args[4] for c in mock_save_vlm.call_args_list] == [
+            {"cascade": {"confidence": 0.95, "complexity": 0.31, "routed_to": "vlm"}},
+            {"cascade": {"confidence": 0.84, "complexity": 0.0, "routed_to": "vlm"}},
+        ]
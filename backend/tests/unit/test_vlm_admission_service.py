@@ -0,0 +1,125 @@
+"""
+Unit tests for VLM admission control service
+"""
+from unittest.mock import patch, MagicMock
+
+import redis
+
+from app.services.vlm_admission_service import (
+    VLMAdmissionController,
+    next_limit,
+    parse_vllm_metrics,
+)
+
+
+METRICS_TEXT = """# HELP vllm:num_requests_running Number of requests currently running on GPU.
+# TYPE vllm:num_requests_running gauge
+vllm:num_requests_running{model_name="qwen3-vl"} 3.0
+vllm:num_requests_waiting{model_name="qwen3-vl"} 2.0
+vllm:gpu_cache_usage_perc{model_name="qwen3-vl"} 0.75
+vllm:request_success_total{finished_reason="stop",model_name="qwen3-vl"} 120.0
+"""
+
+
+class TestParseVLLMMetrics:
+    """Tests for parse_vllm_metrics function"""
+
+    def test_parses_load_metrics(self):
+        """Test running/waiting/KV cache metrics are extracted"""
+        metrics = parse_vllm_metrics(METRICS_TEXT)
+
+        assert metrics == {"running": 3.0, "waiting": 2.0, "kv_cache_usage": 0.75}
+
+    def test_v1_kv_cache_metric_name(self):
+        """Test vLLM V1 kv_cache_usage_perc metric is recognized"""
+        metrics = parse_vllm_metrics('vllm:kv_cache_usage_perc{model_name="m"} 0.5\n')
+
+        assert metrics["kv_cache_usage"] == 0.5
+        assert metrics["waiting"] == 0.0
+
+
+class TestNextLimit:
+    """Tests for next_limit function (AIMD)"""
+
+    def test_decreases_when_requests_waiting(self):
+        """Test limit shrinks multiplicatively when vLLM queue builds up"""
+        metrics = {"running": 8, "waiting": 3, "kv_cache_usage": 0.5}
+
+        assert next_limit(8, 8, metrics, min_limit=1, max_limit=32) == 6
+
+    def test_decreases_when_kv_cache_saturated(self):
+        """Test limit shrinks when KV cache usage is above threshold"""
+        metrics = {"running": 4, "waiting": 0, "kv_cache_usage": 0.95}
+
+        assert next_limit(4, 4, metrics, min_limit=1, max_limit=32) == 3
+        assert next_limit(1, 1, metrics, min_limit=1, max_limit=32) == 1
+
+    def test_increases_when_limit_binding_and_idle_capacity(self):
+        """Test limit grows by one when all slots are used and the server has headroom"""
+        metrics = {"running": 4, "waiting": 0, "kv_cache_usage": 0.4}
+
+        assert next_limit(4, 4, metrics, min_limit=1, max_limit=32) == 5
+        assert next_limit(32, 32, metrics, min_limit=1, max_limit=32) == 32
+
+    def test_holds_when_demand_below_limit(self):
+        """Test limit is unchanged when workers are not using all slots"""
+        metrics = {"running": 2, "waiting": 0, "kv_cache_usage": 0.4}
+
+        assert next_limit(4, 2, metrics, min_limit=1, max_limit=32) == 4
+
+
+class TestVLMAdmissionController:
+    """Tests for VLMAdmissionController"""
+
+    def _controller(self, client, **kwargs):
+        params = dict(
+            initial_limit=2, min_limit=1, max_limit=8, kv_high=0.9,
+            adjust_interval=2, lease_seconds=60, wait_timeout=0.2,
+        )
+        params.update(kwargs)
+        return VLMAdmissionController(redis_client=client, **params)
+
+    def test_acquire_returns_token_when_slot_free(self):
+        """Test slot is granted when under the shared limit"""
+        client = MagicMock()
+        client.set.return_value = False  # 다른 워커가 한도 조정 중
+        client.register_script.return_value = MagicMock(return_value=1)
+
+        token = self._controller(client).acquire("http://gpu1:8000/v1")
+
+        assert token is not None
+        client.register_script.return_value.assert_called_once()
+
+    def test_acquire_waits_then_proceeds_after_timeout(self):
+        """Test acquire gives up waiting after wait_timeout and proceeds without a slot"""
+        client = MagicMock()
+        client.set.return_value = False
+        script = MagicMock(return_value=0)
+        client.register_script.return_value = script
+
+        token = self._controller(client).acquire("http://gpu1:8000/v1")
+
+        assert token is None
+        assert script.call_count > 1
+
+    def test_acquire_fails_open_on_redis_error(self):
+        """Test Redis outage does not block VLM requests"""
+        client = MagicMock()
+        client.set.side_effect = redis.ConnectionError("down")
+
+        assert self._controller(client).acquire("http://gpu1:8000/v1") is None
+
+    @patch("app.services.vlm_admission_service.httpx")
+    def test_adjust_reads_metrics_and_updates_limit(self, mock_httpx):
+        """Test the worker holding the adjust lock applies AIMD from /metrics"""
+        client = MagicMock()
+        client.set.return_value = True
+        client.get.return_value = b"4"
+        client.zcount.return_value = 4
+        client.register_script.return_value = MagicMock(return_value=1)
+        mock_httpx.get.return_value = MagicMock(text=METRICS_TEXT)
+
+        self._controller(client).acquire("http://gpu1:8000/v1")
+
+        mock_httpx.get.assert_called_once_with("http://gpu1:8000/metrics", timeout=2)
+        client.pipeline.return_value.set.assert_any_call("vlm:admission:http://gpu1:8000/v1:limit", 3)
@@ -0,0 +1,116 @@
+"""
+Unit tests for VLM endpoint stats service
+"""
+import json
+import time
+from unittest.mock import patch, MagicMock
+
+from app.services.vlm_stats_service import (
+    configured_endpoints,
+    get_endpoint_stats,
+    load_token_estimator_state,
+    save_token_estimator_state,
+    TOKEN_ESTIMATOR_KEY,
+    TRUNCATED_PAGES_KEY,
+)
+
+
+class TestConfiguredEndpoints:
+    """Tests for configured_endpoints function"""
+
+    @patch("app.services.vlm_stats_service.settings")
+    def test_multiple_endpoints_with_weights(self, mock_settings):
+        """Test VLM_API_BASES is parsed with weights"""
+        mock_settings.VLM_API_BASES = "http://gpu1:8000/v1;weight=2, http://gpu2:8000/v1/"
+        mock_settings.VLM_API_BASE = "http://localhost:8080/v1"
+
+        endpoints = configured_endpoints()
+
+        assert endpoints == [
+            {"api_base": "http://gpu1:8000/v1", "weight": 2.0},
+            {"api_base": "http://gpu2:8000/v1", "weight": 1.0},
+        ]
+
+    @patch("app.services.vlm_stats_service.settings")
+    def test_falls_back_to_single_endpoint(self, mock_settings):
+        """Test VLM_API_BASE is used when VLM_API_BASES is empty"""
+        mock_settings.VLM_API_BASES = ""
+        mock_settings.VLM_API_BASE = "http://localhost:8080/v1"
+
+        assert configured_endpoints() == [{"api_base": "http://localhost:8080/v1", "weight": 1.0}]
+
+
+class TestGetEndpointStats:
+    """Tests for get_endpoint_stats function"""
+
+    @patch("app.services.vlm_stats_service.redis")
+    def test_merges_stats_across_workers(self, mock_redis):
+        """Test stats from several worker processes are summed per endpoint"""
+        now = time.time()
+        client = MagicMock()
+        client.hvals.return_value = [
+            json.dumps({
+                "api_base": "http://gpu1:8000/v1", "requests": 10, "errors": 0,
+                "in_flight": 1, "latency_ms_avg": 100.0, "healthy": True,
+                "last_error": None, "updated_at": now,
+            }),
+            json.dumps({
+                "api_base": "http://gpu1:8000/v1", "requests": 30, "errors": 10,
+                "in_flight": 2, "latency_ms_avg": 200.0, "healthy": False,
+                "last_error": "timeout", "updated_at": now,
+            }),
+        ]
+        mock_redis.from_url.return_value = client
+
+        stats = get_endpoint_stats()["http://gpu1:8000/v1"]
+
+        assert stats["requests"] == 40
+        assert stats["errors"] == 10
+        assert stats["in_flight"] == 3
+        assert stats["healthy"] is False
+        assert stats["last_error"] == "timeout"
+        assert stats["reporters"] == 2
+        # (100 * 10 + 200 * 20) / 30
+        assert stats["latency_ms_avg"] == round(5000 / 30, 2)
+
+    @patch("app.services.vlm_stats_service.redis")
+    def test_ignores_stale_reports(self, mock_redis):
+        """Test reports from workers that stopped publishing are ignored"""
+        client = MagicMock()
+        client.hvals.return_value = [
+            json.dumps({
+                "api_base": "http://gpu1:8000/v1", "requests": 5, "errors": 0,
+                "in_flight": 0, "latency_ms_avg": 50.0, "healthy": True,
+                "updated_at": time.time() - 3600,
+            }),
+        ]
+        mock_redis.from_url.return_value = client
+
+        assert get_endpoint_stats() == {}
+
+
+class TestTokenEstimatorState:
+    """Test output token estimator state persistence"""
+
+    @patch("app.services.vlm_stats_service.redis")
+    def test_save_and_load_roundtrip(self, mock_redis):
+        """Test saved estimator state is returned as-is and truncations are counted"""
+        client = MagicMock()
+        pipe = client.pipeline.return_value
+        mock_redis.from_url.return_value = client
+        state = {"tokens_per_ink": 18000.0, "margin": 1.6}
+
+        save_token_estimator_state(state, truncated_pages=2)
+
+        pipe.set.assert_called_once_with(TOKEN_ESTIMATOR_KEY, json.dumps(state))
+        pipe.incrby.assert_called_once_with(TRUNCATED_PAGES_KEY, 2)
+
+        client.get.return_value = json.dumps(state)
+        assert load_token_estimator_state() == state
+
+    @patch("app.services.vlm_stats_service.redis")
+    def test_load_returns_none_when_redis_unavailable(self, mock_redis):
+        """Test missing Redis falls back to default estimator state"""
+        mock_redis.from_url.side_effect = ConnectionError("down")
+
+        assert load_token_estimator_state() is None
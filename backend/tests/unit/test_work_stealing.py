@@ -0,0 +1,123 @@
+"""
+Unit tests for work stealing between OCR queues
+"""
+from unittest.mock import patch, MagicMock
+
+import pytest
+import redis
+
+from app.models.document import OCRMode
+from app.workers.work_stealing import WorkStealer, engine_available, secondary_queues
+
+
+def _consumer(queues=("accurate_ocr",), processes=2):
+    consumer = MagicMock()
+    consumer.hostname = "celery@accurate-1"
+    consumer.pool.num_processes = processes
+    consumer.app.amqp.queues.consume_from = {queue: MagicMock() for queue in queues}
+    return consumer
+
+
+@pytest.fixture
+def stealing_settings():
+    with patch("app.workers.work_stealing.settings") as mock_settings:
+        mock_settings.OCR_WORK_STEALING = "accurate_ocr=fast_ocr,precision_ocr=accurate_ocr>fast_ocr"
+        mock_settings.OCR_WORK_STEALING_INTERVAL_SECONDS = 2.0
+        mock_settings.OCR_FAIR_SHARE_ENABLED = False
+        yield mock_settings
+
+
+class TestEngineAvailable:
+    """Tests for engine_available function"""
+
+    @patch("app.workers.work_stealing.ocr_service.engine_available", side_effect=lambda mode: mode == OCRMode.FAST)
+    def test_uses_shared_capability_check(self, mock_available):
+        """Test queues map to their OCR mode and share the fallback chain's engine check"""
+        assert engine_available("fast_ocr") is True
+        assert engine_available("accurate_ocr") is False
+        assert mock_available.call_args_list[-1].args == (OCRMode.ACCURATE,)
+
+    @patch("app.workers.work_stealing.ocr_service.engine_available", return_value=True)
+    def test_unknown_queue(self, mock_available):
+        """Test a queue that is not an OCR queue is never stolen from"""
+        assert engine_available("celery") is False
+        mock_available.assert_not_called()
+
+    @patch("app.services.ocr_service.importlib.util.find_spec", return_value=None)
+    @patch("app.services.ocr_service.shutil.which", return_value="/usr/bin/tesseract")
+    def test_fast_queue_needs_pytesseract(self, _, __):
+        """Test a worker with the tesseract binary but no pytesseract does not steal fast_ocr"""
+        assert engine_available("fast_ocr") is False
+
+
+class TestSecondaryQueues:
+    """Tests for secondary_queues function"""
+
+    @patch("app.workers.work_stealing.engine_available", return_value=True)
+    def test_configured_order(self, _, stealing_settings):
+        """Test secondary queues follow the configured order and skip the worker's own queues"""
+        assert secondary_queues(["precision_ocr"]) == ["accurate_ocr", "fast_ocr"]
+        assert secondary_queues(["accurate_ocr", "fast_ocr"]) == []
+        assert secondary_queues(["fast_ocr"]) == []
+
+    @patch("app.workers.work_stealing.engine_available", side_effect=lambda queue: queue == "fast_ocr")
+    def test_engine_capability(self, _, stealing_settings):
+        """Test a worker never steals from a queue whose engine it cannot run"""
+        assert secondary_queues(["precision_ocr"]) == ["fast_ocr"]
+
+
+@patch("app.workers.work_stealing.engine_available", return_value=True)
+@patch("app.workers.work_stealing._redis")
+class TestWorkStealer:
+    """Tests for WorkStealer"""
+
+    def test_steals_only_while_primary_empty(self, _, __, stealing_settings):
+        """Test the secondary queue is consumed when the primary is empty and handed back when work arrives"""
+        depths = {"accurate_ocr": 0, "fast_ocr": 500}
+        stealer = WorkStealer(_consumer())
+
+        with patch("app.workers.work_stealing.latency_service.queue_depth", side_effect=lambda q, r: depths[q]):
+            stealer.rebalance()
+            stealer.consumer.add_task_queue.assert_called_once_with("fast_ocr")
+            assert stealer.stolen == ["fast_ocr"]
+
+            depths["accurate_ocr"] = 1
+            stealer.rebalance()
+
+        stealer.consumer.cancel_task_queue.assert_called_once_with("fast_ocr")
+        assert stealer.stolen == []
+
+    def test_busy_worker_does_not_steal(self, _, __, stealing_settings):
+        """Test a worker whose processes all hold reserved tasks does not start stealing"""
+        stealer = WorkStealer(_consumer(processes=1))
+
+        with patch("app.workers.work_stealing.latency_service.queue_depth", side_effect=lambda q, r: 0 if q == "accurate_ocr" else 9), \
+                patch("app.workers.work_stealing.state.reserved_requests", {MagicMock()}):
+            stealer.rebalance()
+
+        stealer.consumer.add_task_queue.assert_not_called()
+
+    def test_lends_dispatch_window_with_fair_share(self, _, __, stealing_settings):
+        """Test stealing widens the secondary queue's fair-share window and returns it on hand back"""
+        stealing_settings.OCR_FAIR_SHARE_ENABLED = True
+        stealer = WorkStealer(_consumer())
+
+        with patch("app.workers.work_stealing.fair_share_service") as mock_fair_share, \
+                patch("app.workers.tasks._send_jobs") as mock_send:
+            mock_fair_share.dispatch.return_value = [{"task": "process_document"}]
+            stealer.steal("fast_ocr")
+            stealer.hand_back("fast_ocr")
+
+        mock_fair_share.lend_capacity.assert_called_once_with("fast_ocr", "celery@accurate-1", 2, 6.0)
+        mock_send.assert_called_once_with("fast_ocr", [{"task": "process_document"}])
+        mock_fair_share.return_capacity.assert_called_once_with("fast_ocr", "celery@accurate-1")
+
+    def test_redis_error_hands_back(self, _, __, stealing_settings):
+        """Test stealing stops when queue depths cannot be read"""
+        stealer = WorkStealer(_consumer())
+        stealer.stolen = ["fast_ocr"]
+
+        with patch("app.workers.work_stealing.latency_service.queue_depth", side_effect=redis.ConnectionError("down")):
+            stealer.rebalance()
+
+        stealer.consumer.cancel_task_queue.assert_called_once_with("fast_ocr")
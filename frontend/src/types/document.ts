@@ -56,6 +56,25 @@ export interface Document {
   pages: DocumentPage[];
 }
 
+export interface ModeEstimate {
+  queue_wait_seconds: number;
+  processing_seconds: number;
+  total_seconds: number;
+  samples: number;
+}
+
+export interface ProcessingEstimate {
+  ocr_mode: OCRMode;
+  estimated_seconds: number;
+  deadline_seconds: number | null;
+  meets_deadline: boolean | null;
+  modes: Record<string, ModeEstimate>;
+}
+
+export interface DocumentUploadResponse extends Document {
+  estimate: ProcessingEstimate | null;
+}
+
 export interface DocumentListResponse {
   total: number;
   page: number;
@@ -63,10 +82,22 @@ export interface DocumentListResponse {
   items: Document[];
 }
 
+export interface PageFeatures {
+  page_count: number;
+  sampled_pages: number;
+  text_layer: boolean;
+  text_chars?: number;
+  scan_noise?: number;
+  table_line_density?: number;
+  column_count?: number;
+  quality_score: number;
+}
+
 export interface OCRModeRecommendation {
   recommended_mode: OCRMode;
   precision_score: number;
   reasons: string[];
+  features?: PageFeatures | null;
 }
 
 export interface DocumentUploadParams {
@@ -76,6 +107,7 @@ export interface DocumentUploadParams {
   doc_type?: string;
   importance?: Importance;
   ocr_mode?: OCRMode;
+  deadline_seconds?: number;  // 정밀 OCR 문서 처리 제한 시간 (초)
 }
 
 export interface ProcessingQueueItem {
@@ -26,6 +26,41 @@ export interface GPUStatus {
   status: 'available' | 'busy' | 'unavailable';
 }
 
+export interface VLMEndpointStatus {
+  api_base: string;
+  weight: number;
+  status: 'healthy' | 'ejected' | 'unknown';
+  in_flight: number;
+  requests: number;
+  errors: number;
+  error_rate: number;
+  latency_ms_avg?: number;
+  last_error?: string;
+  updated_at?: string;
+  admission_limit?: number;
+  admission_in_use: number;
+  vllm_running?: number;
+  vllm_waiting?: number;
+  kv_cache_usage?: number;
+}
+
+export interface QueueWaitStatus {
+  priority_class: 'urgent' | 'high' | 'medium' | 'low';
+  priority: number;
+  samples: number;
+  avg_seconds?: number;
+  p50_seconds?: number;
+  p95_seconds?: number;
+  max_seconds?: number;
+}
+
+export interface FairShareTenantStatus {
+  queue_name: string;
+  tenant: string;
+  pending: number;
+  inflight: number;
+}
+
 export interface StorageStatus {
   name: string;
   used_bytes: number;
@@ -40,5 +75,8 @@ export interface SystemStatusResponse {
   services: ServiceStatus[];
   workers: WorkerQueueStatus[];
   gpu?: GPUStatus[];
+  vlm_endpoints?: VLMEndpointStatus[];
+  queue_wait?: QueueWaitStatus[];
+  fair_share?: FairShareTenantStatus[];
   storage?: StorageStatus;
 }
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+VLM 이미지 전송 방식 벤치마크 (inline base64 vs 참조 URL)
+
+페이지당 요청 본문 크기와 워커 측 요청 생성 시간(JPEG 인코딩, base64, JSON 직렬화)을
+비교한다. 참조 방식은 공유 볼륨(file) 저장 시간을 포함한다.
+
+사용법:
+    python scripts/benchmark_image_transport.py [--pages 20] [--dpi 200] [--shared-dir /tmp/vlm-images]
+"""
+import sys
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+# 프로젝트 루트 및 정밀 OCR 워커 경로 추가
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "workers" / "precision_ocr"))
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from processor import VLMClient, SharedVolumeImageStore
+from benchmark_vlm import make_pages
+
+
+def build_body(client: VLMClient, image) -> tuple:
+    """요청 본문 생성 (직렬화까지) → (본문 바이트, 참조 키)"""
+    data = client._encode_image(image)
+    url, key = client._image_url(data)
+    payload = {
+        "model": client.model_name,
+        "messages": [{
+            "role": "user",
+            "content": [
+                {"type": "image_url", "image_url": {"url": url}},
+                {"type": "text", "text": client.OCR_LAYOUT_PROMPT},
+            ],
+        }],
+        "max_tokens": client.max_tokens,
+    }
+    return json.dumps(payload).encode("utf-8"), key
+
+
+def measure(client: VLMClient, pages) -> dict:
+    sizes, times = [], []
+    for image in pages:
+        start = time.perf_counter()
+        body, key = build_body(client, image)
+        times.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(body))
+        if key is not None:
+            client.image_store.delete(key)
+    return {
+        "bytes_avg": statistics.mean(sizes),
+        "ms_avg": statistics.mean(times),
+        "ms_p95": sorted(times)[int(len(times) * 0.95) - 1] if len(times) > 1 else times[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VLM 이미지 전송 방식 벤치마크")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--dpi", type=int, default=200, help="합성 페이지 렌더링 해상도")
+    parser.add_argument("--model", default="chandra")
+    parser.add_argument("--shared-dir", default="/tmp/vlm-images")
+    args = parser.parse_args()
+
+    scale = args.dpi / 150
+    pages = [p.resize((int(p.width * scale), int(p.height * scale))) for p in make_pages(args.pages)]
+
+    inline = measure(VLMClient(model_name=args.model), pages)
+    reference = measure(
+        VLMClient(model_name=args.model, image_store=SharedVolumeImageStore(args.shared_dir)),
+        pages,
+    )
+
+    print(f"\n📊 이미지 전송 방식 비교: {args.pages} pages @ {args.dpi}dpi")
+    print("-" * 60)
+    print(f"{'mode':<10} {'body bytes':>12} {'build ms':>10} {'p95 ms':>10}")
+    for name, r in (("inline", inline), ("reference", reference)):
+        print(f"{name:<10} {r['bytes_avg']:>12,.0f} {r['ms_avg']:>10.2f} {r['ms_p95']:>10.2f}")
+    print("-" * 60)
+    print(f"페이지당 절감: {inline['bytes_avg'] - reference['bytes_avg']:,.0f} bytes, "
+          f"{inline['ms_avg'] - reference['ms_avg']:.2f} ms (워커 측)")
+
+
+if __name__ == "__main__":
+    main()
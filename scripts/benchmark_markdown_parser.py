@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+VLM Markdown 출력 파싱 벤치마크 (기존 다중 패스 vs 단일 패스 토크나이저)
+
+표 위주의 대용량 합성 Markdown(재무제표/거래내역 페이지 흉내)으로
+블록/순수 텍스트/HTML 생성 시간을 비교한다. 기존 구현은 비교 기준으로 이 파일에 보존한다.
+
+사용법:
+    python scripts/benchmark_markdown_parser.py [--pages 50] [--tables 6] [--rows 40] [--cols 8]
+"""
+import sys
+import argparse
+import random
+import re
+import statistics
+import time
+from pathlib import Path
+
+# 정밀 OCR 워커 경로 추가
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "workers" / "precision_ocr"))
+sys.path.insert(0, str(ROOT / "backend"))
+
+from processor import parse_markdown
+
+
+def make_markdown(seed: int, tables: int, rows: int, cols: int) -> str:
+    """헤더, 문단, 리스트, 표가 섞인 합성 페이지 Markdown 생성"""
+    rng = random.Random(seed)
+    words = ["매출", "원가", "**합계**", "수수료", "*비고*", "잔액", "Revenue", "Total", "`A-01`", "[근거](http://x)"]
+    lines = [f"# 거래 내역서 {seed}", ""]
+    for t in range(tables):
+        lines += [f"## 표 {t + 1}", "", " ".join(rng.choice(words) for _ in range(30)), ""]
+        lines.append("| " + " | ".join(f"항목{c}" for c in range(cols)) + " |")
+        lines.append("|" + "|".join("---" for _ in range(cols)) + "|")
+        for _ in range(rows):
+            cells = [f"{rng.randint(0, 10 ** 7):,}" if c else rng.choice(words) for c in range(cols)]
+            lines.append("| " + " | ".join(cells) + " |")
+        lines += ["", "- " + " ".join(rng.choice(words) for _ in range(12)), "- 비고 없음", ""]
+    return "\n".join(lines)
+
+
+def legacy_parse(markdown: str) -> tuple:
+    """기존 구현 (_extract_plain_text, _markdown_to_html, _parse_blocks_from_markdown 순차 호출)"""
+    text = markdown
+    text = re.sub(r"#+\s*", "", text)
+    text = re.sub(r"\*\*([^*]+)\*\*", r"\1", text)
+    text = re.sub(r"\*([^*]+)\*", r"\1", text)
+    text = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", text)
+    text = re.sub(r"!\[([^\]]*)\]\([^)]+\)", "", text)
+    text = re.sub(r"```[^`]*```", "", text, flags=re.DOTALL)
+    text = re.sub(r"`([^`]+)`", r"\1", text)
+    text = re.sub(r"\|[^\n]+\|", "", text)
+    text = re.sub(r"[-*]\s+", "", text)
+    raw_text = re.sub(r"\n{3,}", "\n\n", text).strip()
+
+    html = markdown
+    html = re.sub(r"^### (.+)$", r"<h3>\1</h3>", html, flags=re.MULTILINE)
+    html = re.sub(r"^## (.+)$", r"<h2>\1</h2>", html, flags=re.MULTILINE)
+    html = re.sub(r"^# (.+)$", r"<h1>\1</h1>", html, flags=re.MULTILINE)
+    html = re.sub(r"\*\*([^*]+)\*\*", r"<strong>\1</strong>", html)
+    html = re.sub(r"\*([^*]+)\*", r"<em>\1</em>", html)
+    html = "<p>" + re.sub(r"\n\n", r"</p><p>", html) + "</p>"
+
+    def parse_table(table_lines):
+        rows = []
+        for line in table_lines:
+            if re.match(r"^\|[\s\-:]+\|$", line):
+                continue
+            cells = [cell.strip() for cell in line.split("|") if cell.strip()]
+            if cells:
+                rows.append(cells)
+        return rows or None
+
+    blocks = []
+    current, current_type = [], "text"
+    for line in markdown.split("\n"):
+        stripped = line.strip()
+        if not stripped:
+            if current:
+                blocks.append((current_type, "\n".join(current), parse_table(current) if current_type == "table" else None))
+                current, current_type = [], "text"
+            continue
+        if stripped.startswith("#"):
+            if current:
+                blocks.append((current_type, "\n".join(current), None))
+                current = []
+            blocks.append(("header", re.sub(r"^#+\s*", "", stripped), None))
+            continue
+        if stripped.startswith("|") and stripped.endswith("|"):
+            if current_type != "table":
+                if current:
+                    blocks.append((current_type, "\n".join(current), None))
+                    current = []
+                current_type = "table"
+            current.append(stripped)
+            continue
+        if stripped.startswith(("-", "*", "+")) and len(stripped) > 2 and stripped[1] == " ":
+            if current_type != "list":
+                if current:
+                    blocks.append((current_type, "\n".join(current), None))
+                    current = []
+                current_type = "list"
+            current.append(stripped)
+            continue
+        if current_type == "table":
+            if current:
+                blocks.append(("table", "\n".join(current), parse_table(current)))
+                current = []
+            current_type = "text"
+        current.append(stripped)
+    if current:
+        blocks.append((current_type, "\n".join(current), parse_table(current) if current_type == "table" else None))
+    return blocks, raw_text, html
+
+
+def measure(fn, pages, repeat: int) -> list:
+    """페이지당 처리 시간(ms) 목록 (repeat 회 중 최소값)"""
+    times = []
+    for markdown in pages:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(markdown)
+            best = min(best, time.perf_counter() - start)
+        times.append(best * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VLM Markdown 파싱 벤치마크")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--tables", type=int, default=6, help="페이지당 표 수")
+    parser.add_argument("--rows", type=int, default=40, help="표당 행 수")
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = [make_markdown(i, args.tables, args.rows, args.cols) for i in range(args.pages)]
+    size = sum(len(p.encode("utf-8")) for p in pages) / len(pages)
+
+    # 블록 구성 일치 확인 (종류/텍스트)
+    for markdown in pages:
+        legacy_blocks = [(kind, text) for kind, text, _ in legacy_parse(markdown)[0]]
+        blocks = [(b.block_type, b.text) for b in parse_markdown(markdown).blocks]
+        if legacy_blocks != blocks:
+            print("⚠️  블록 구성이 기존 구현과 다릅니다")
+            break
+
+    legacy = measure(legacy_parse, pages, args.repeat)
+    single = measure(parse_markdown, pages, args.repeat)
+
+    print(f"\n📊 Markdown 파싱: {args.pages} pages, 평균 {size / 1024:.1f} KB/page "
+          f"({args.tables} tables x {args.rows} rows x {args.cols} cols)")
+    print("-" * 60)
+    print(f"{'parser':<12} {'avg ms':>10} {'p95 ms':>10} {'MB/s':>10}")
+    for name, times in (("legacy", legacy), ("single-pass", single)):
+        avg = statistics.mean(times)
+        p95 = sorted(times)[int(len(times) * 0.95) - 1] if len(times) > 1 else times[0]
+        print(f"{name:<12} {avg:>10.2f} {p95:>10.2f} {size / 1024 / 1024 / (avg / 1000):>10.1f}")
+    print("-" * 60)
+    print(f"속도 향상: x{statistics.mean(legacy) / statistics.mean(single):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+정밀 OCR 프로세서 벤치마크 (VLM 시뮬레이터 사용)
+
+scripts/vlm_simulator.py 레플리카를 띄워 ChandraOCRProcessor의
+동시 처리량, 재시도, 출력 이어받기 동작을 GPU 없이 측정한다.
+
+사용법:
+    python scripts/benchmark_vlm.py [--pages 24] [--replicas 2] [--concurrency 1,2,4,8]
+
+예시:
+    # 동시성별 처리량
+    python scripts/benchmark_vlm.py --concurrency 1,2,4,8
+
+    # 장애 주입 (레플리카 1개 5xx 30%, 잘림 20%)
+    python scripts/benchmark_vlm.py --faulty-error-rate 0.3 --truncate-rate 0.2
+
+    # 영수증 크기 페이지 묶음 요청 비교
+    python scripts/benchmark_vlm.py --small-pages --pack-max-images 4
+
+    # 이미 실행 중인 서버 사용
+    python scripts/benchmark_vlm.py --api-base http://gpu1:8000/v1,http://gpu2:8000/v1
+"""
+import sys
+import argparse
+import random
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# 프로젝트 루트 및 정밀 OCR 워커 경로 추가
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "workers" / "precision_ocr"))
+sys.path.insert(0, str(ROOT / "backend"))
+
+import httpx
+from PIL import Image, ImageDraw
+
+from processor import ChandraOCRProcessor
+
+
+def make_pages(count: int, seed: int = 0, size: Tuple[int, int] = (1240, 1754)) -> List[Image.Image]:
+    """텍스트 밀도가 다른 합성 페이지 이미지 생성 (기본 A4 150dpi, 작은 크기로 영수증/전표 흉내)"""
+    rng = random.Random(seed)
+    width, height = size
+    margin = max(10, width // 12)
+    pages = []
+    for _ in range(count):
+        image = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(image)
+        line_gap = rng.choice([28, 36, 48, 72])
+        for y in range(margin, height - margin, line_gap):
+            x = margin
+            while x < width - margin:
+                word = rng.randint(20, 120)
+                draw.rectangle([x, y, min(width - margin, x + word), y + line_gap // 3], fill=(rng.randint(0, 60),) * 3)
+                x += word + rng.randint(10, 30)
+        pages.append(image)
+    return pages
+
+
+def start_simulators(
+    replicas: int,
+    base_port: int,
+    args: argparse.Namespace,
+) -> List[subprocess.Popen]:
+    """시뮬레이터 레플리카 실행 (첫 번째 레플리카에만 장애 주입)"""
+    procs = []
+    for i in range(replicas):
+        cmd = [
+            sys.executable, str(ROOT / "scripts" / "vlm_simulator.py"),
+            "--port", str(base_port + i),
+            "--model", args.model,
+            "--latency-ms", str(args.latency_ms),
+            "--tokens-per-second", str(args.tokens_per_second),
+            "--max-concurrency", str(args.server_concurrency),
+            "--truncate-rate", str(args.truncate_rate),
+            "--seed", str(i),
+            "--allowed-local-media-path", args.shared_dir,
+        ]
+        if i == 0 and args.faulty_error_rate:
+            cmd += ["--error-rate", str(args.faulty_error_rate)]
+        procs.append(subprocess.Popen(cmd, stdout=subprocess.DEVNULL))
+
+    for i in range(replicas):
+        url = f"http://127.0.0.1:{base_port + i}/health"
+        for _ in range(100):
+            try:
+                if httpx.get(url, timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError(f"simulator on port {base_port + i} did not start")
+    return procs
+
+
+def run(api_base: str, pages: List[Image.Image], concurrency: int, args: argparse.Namespace) -> dict:
+    """동시성 1개 설정으로 전체 페이지 처리"""
+    processor = ChandraOCRProcessor(
+        api_base=api_base,
+        model_name=args.model,
+        max_tokens=args.max_tokens,
+        timeout=args.timeout,
+        concurrency=concurrency,
+        max_continuations=args.max_continuations,
+        image_transport=args.image_transport,
+        image_shared_dir=args.shared_dir,
+        pack_max_images=args.pack_max_images,
+    )
+    latencies = []
+    results = []
+    start = time.time()
+    last = start
+    try:
+        for result in processor.iter_process_images(enumerate(pages, start=1)):
+            now = time.time()
+            latencies.append(now - last)
+            last = now
+            results.append(result)
+        elapsed = time.time() - start
+        endpoints = processor.client.endpoint_stats()
+    finally:
+        processor.close()
+
+    return {
+        "concurrency": concurrency,
+        "pages": len(results),
+        "elapsed": elapsed,
+        "pages_per_sec": len(results) / elapsed if elapsed else 0.0,
+        "p50_gap": statistics.median(latencies) if latencies else 0.0,
+        "max_gap": max(latencies) if latencies else 0.0,
+        "truncated": sum(1 for r in results if r.finish_reason == "length"),
+        "continuations": sum(r.continuations for r in results),
+        "requests": sum(e["requests"] for e in endpoints),
+        "errors": sum(e["errors"] for e in endpoints),
+        "endpoints": endpoints,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="정밀 OCR 프로세서 벤치마크")
+    parser.add_argument("--api-base", default=None, help="기존 서버 URL (쉼표 구분, 지정 시 시뮬레이터 미실행)")
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--replicas", type=int, default=2)
+    parser.add_argument("--base-port", type=int, default=18080)
+    parser.add_argument("--concurrency", default="1,2,4,8", help="비교할 동시성 목록")
+    parser.add_argument("--model", default="chandra")
+    parser.add_argument("--max-tokens", type=int, default=2048)
+    parser.add_argument("--max-continuations", type=int, default=2)
+    parser.add_argument("--timeout", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    parser.add_argument("--server-concurrency", type=int, default=4, help="레플리카당 동시 처리 수")
+    parser.add_argument("--faulty-error-rate", type=float, default=0.0, help="첫 레플리카 5xx 비율")
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--image-transport", default="inline", choices=["inline", "file"])
+    parser.add_argument("--shared-dir", default="/tmp/vlm-images", help="file 전송 모드 공유 디렉토리")
+    parser.add_argument("--small-pages", action="store_true", help="영수증 크기(400x640) 페이지 사용")
+    parser.add_argument("--pack-max-images", type=int, default=1, help="소형 페이지 묶음 요청 최대 수")
+    args = parser.parse_args(argv)
+
+    pages = make_pages(args.pages, size=(400, 640) if args.small_pages else (1240, 1754))
+    procs: List[subprocess.Popen] = []
+    api_base = args.api_base
+    if not api_base:
+        procs = start_simulators(args.replicas, args.base_port, args)
+        api_base = ",".join(f"http://127.0.0.1:{args.base_port + i}/v1" for i in range(args.replicas))
+
+    print(f"\n📊 정밀 OCR 벤치마크: {args.pages} pages, endpoints={api_base}")
+    print("-" * 78)
+    print(f"{'conc':>4} {'elapsed':>8} {'pages/s':>8} {'p50 gap':>8} {'max gap':>8} "
+          f"{'reqs':>5} {'errors':>6} {'trunc':>5} {'cont':>5}")
+    try:
+        for concurrency in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+            r = run(api_base, pages, concurrency, args)
+            print(f"{r['concurrency']:>4} {r['elapsed']:>7.2f}s {r['pages_per_sec']:>8.2f} "
+                  f"{r['p50_gap']:>7.2f}s {r['max_gap']:>7.2f}s {r['requests']:>5} {r['errors']:>6} "
+                  f"{r['truncated']:>5} {r['continuations']:>5}")
+        print("-" * 78)
+        for endpoint in r["endpoints"]:
+            print(f"  {endpoint['api_base']}: requests={endpoint['requests']} errors={endpoint['errors']} "
+                  f"latency={endpoint['latency_ms_avg']:.0f}ms healthy={endpoint['healthy']}")
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
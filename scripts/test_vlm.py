@@ -19,6 +19,7 @@ from pathlib import Path
 
 # 프로젝트 루트 추가
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 
 import httpx
 from PIL import Image
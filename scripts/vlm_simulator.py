@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+VLM 시뮬레이터 (OpenAI 호환 vLLM 대체 서버)
+
+GPU 없이 정밀 OCR 경로(workers/precision_ocr/processor.py)를 부하/장애 상황에서
+검증하기 위한 로컬 서버. 입력 이미지 해시로부터 결정적인 Markdown을 생성한다.
+
+제공 엔드포인트:
+    GET  /health
+    GET  /metrics                 (vLLM 형식 Prometheus 지표 일부)
+    GET  /v1/models
+    POST /v1/chat/completions     (stream=true/false, continue_final_message 지원)
+
+이미지는 data:, http(s)://, file:// (--allowed-local-media-path 허용 경로) URL을 받으며
+가져오지 못하면 vLLM처럼 400으로 응답한다.
+
+사용법:
+    python scripts/vlm_simulator.py [--port 8080] [--latency-ms 800] [--max-concurrency 4]
+
+예시:
+    # 기본 실행
+    python scripts/vlm_simulator.py
+
+    # 장애 주입: 5xx 10%, 출력 잘림 20%, 반복 루프 5%
+    python scripts/vlm_simulator.py --error-rate 0.1 --truncate-rate 0.2 --loop-rate 0.05
+
+    # 정밀 OCR 워커를 시뮬레이터에 연결
+    VLM_API_BASE=http://localhost:8080/v1 VLM_MODEL_NAME=chandra ...
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+
+# 토큰 수 근사 (문자 4개당 1토큰)
+CHARS_PER_TOKEN = 4
+
+WORDS = [
+    "계약", "당사자", "조항", "기간", "금액", "지급", "검수", "납품", "보증", "책임",
+    "report", "summary", "invoice", "total", "amount", "date", "section", "policy",
+    "2024", "2025", "100", "250", "1,200", "3.5%", "제1조", "제2조", "부칙", "별첨",
+]
+
+
+@dataclass
+class SimulatorConfig:
+    """시뮬레이터 동작 설정"""
+    model: str = "chandra"
+    latency_ms: float = 800.0          # 요청당 기본 지연 (prefill)
+    jitter: float = 0.2                # 지연 편차 비율
+    tokens_per_second: float = 400.0   # 요청당 디코딩 속도
+    max_concurrency: int = 4           # 동시 처리 가능 요청 수 (초과분은 대기)
+    max_waiting: int = 64              # 대기열 한도 (초과 시 503)
+    error_rate: float = 0.0            # 5xx 응답 비율
+    timeout_rate: float = 0.0          # 응답 지연(hang) 비율
+    hang_seconds: float = 300.0
+    truncate_rate: float = 0.0         # 출력을 강제로 잘라 finish_reason=length로 응답할 비율
+    loop_rate: float = 0.0             # max_tokens까지 같은 줄을 반복하는 비율
+    kv_cache_tokens: int = 200_000     # KV 캐시 사용률 계산용 총 토큰 수
+    allowed_media_path: Optional[str] = None  # file:// 이미지 허용 경로 (vLLM --allowed-local-media-path)
+    max_images_per_prompt: int = 4    # 요청당 이미지 수 한도 (vLLM --limit-mm-per-prompt)
+    seed: int = 0
+
+
+class SimulatorState:
+    """요청 처리 상태 및 지표"""
+
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+        self.semaphore = asyncio.Semaphore(config.max_concurrency)
+        self.running = 0
+        self.waiting = 0
+        self.reserved_tokens = 0
+        self.requests_total = 0
+        self.errors_total = 0
+        self.truncated_total = 0
+        self.rng = random.Random(config.seed)
+
+    def roll(self, rate: float) -> bool:
+        return rate > 0 and self.rng.random() < rate
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+class MediaFetchError(Exception):
+    """이미지 URL을 가져올 수 없음 (vLLM과 동일하게 400 응답)"""
+
+
+def _fetch_image(url: str, allowed_media_path: Optional[str]) -> bytes:
+    """data:, file://, http(s):// 이미지 URL 읽기"""
+    if url.startswith("data:"):
+        return base64.b64decode(url.split(",", 1)[1], validate=False)
+    if url.startswith("file://"):
+        path = url[len("file://"):]
+        if not allowed_media_path or not os.path.realpath(path).startswith(os.path.realpath(allowed_media_path)):
+            raise MediaFetchError(f"local media path not allowed: {path}")
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError as e:
+            raise MediaFetchError(str(e))
+    if url.startswith(("http://", "https://")):
+        try:
+            response = httpx.get(url, timeout=10)
+            response.raise_for_status()
+            return response.content
+        except httpx.HTTPError as e:
+            raise MediaFetchError(str(e))
+    raise MediaFetchError(f"unsupported image url: {url[:32]}")
+
+
+def _image_digests(messages: List[Dict[str, Any]], allowed_media_path: Optional[str] = None) -> List[Tuple[str, int]]:
+    """메시지의 이미지별 데이터 해시 및 크기"""
+    digests = []
+    for message in messages:
+        content = message.get("content")
+        if not isinstance(content, list):
+            continue
+        for part in content:
+            if part.get("type") != "image_url":
+                continue
+            raw = _fetch_image(part.get("image_url", {}).get("url", ""), allowed_media_path)
+            digests.append((hashlib.sha256(raw).hexdigest(), len(raw)))
+    return digests or [(hashlib.sha256(b"").hexdigest(), 0)]
+
+
+def render_page_markdown(digest: str, image_bytes: int) -> str:
+    """
+    이미지 해시로부터 결정적인 Markdown 페이지 생성
+
+    이미지 용량이 클수록(텍스트가 많은 페이지일수록) 문단 수를 늘린다.
+    """
+    rng = random.Random(digest)
+    sections = 2 + min(6, image_bytes // 60_000) + rng.randint(0, 2)
+    lines = [f"# 문서 {digest[:8]}", ""]
+
+    for s in range(1, sections + 1):
+        lines.append(f"## {s}. {rng.choice(WORDS)} {rng.choice(WORDS)}")
+        lines.append("")
+        for _ in range(rng.randint(1, 3)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(12, 40))]
+            lines.append(" ".join(words) + ".")
+            lines.append("")
+        if rng.random() < 0.3:
+            lines.append("| 항목 | 수량 | 금액 |")
+            lines.append("| --- | --- | --- |")
+            for _ in range(rng.randint(2, 5)):
+                lines.append(f"| {rng.choice(WORDS)} | {rng.randint(1, 99)} | {rng.randint(1, 999) * 1000:,} |")
+            lines.append("")
+        elif rng.random() < 0.3:
+            for _ in range(rng.randint(2, 4)):
+                lines.append(f"- {rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(WORDS)}")
+            lines.append("")
+
+    return "\n".join(lines).strip() + "\n"
+
+
+def _continuation_prefix(payload: Dict[str, Any]) -> str:
+    """continue_final_message 요청이면 이미 받은 assistant 출력 반환"""
+    messages = payload.get("messages", [])
+    if payload.get("continue_final_message") and messages and messages[-1].get("role") == "assistant":
+        return messages[-1].get("content") or ""
+    return ""
+
+
+def generate_completion(
+    state: SimulatorState,
+    payload: Dict[str, Any],
+) -> Tuple[str, str, int]:
+    """
+    응답 텍스트 생성
+
+    Returns:
+        (출력 텍스트, finish_reason, prompt_tokens)
+    """
+    config = state.config
+    messages = payload.get("messages", [])
+    max_tokens = int(payload.get("max_tokens") or 8192)
+    digests = _image_digests(messages, config.allowed_media_path)
+    if len(digests) > config.max_images_per_prompt:
+        raise MediaFetchError(f"At most {config.max_images_per_prompt} image(s) may be provided in one request")
+    digest, image_bytes = digests[0]
+    prompt_tokens = 64 + sum(size for _, size in digests) // 500
+
+    if state.roll(config.loop_rate):
+        # 반복 루프: 같은 줄을 max_tokens까지 반복
+        line = f"| {digest[:6]} | {digest[6:12]} | {digest[12:18]} |\n"
+        text = (line * (max_tokens * CHARS_PER_TOKEN // len(line) + 1))[: max_tokens * CHARS_PER_TOKEN]
+        return text, "length", prompt_tokens
+
+    if len(digests) == 1:
+        full = render_page_markdown(digest, image_bytes)
+    else:
+        # 묶음 요청: 이미지별 구분 줄 뒤에 각 페이지 출력
+        full = "".join(
+            f"=== IMAGE {i} ===\n{render_page_markdown(d, size)}\n"
+            for i, (d, size) in enumerate(digests, start=1)
+        )
+    prefix = _continuation_prefix(payload)
+    remaining = full[len(prefix):] if full.startswith(prefix) else ""
+
+    limit = max_tokens * CHARS_PER_TOKEN
+    if state.roll(config.truncate_rate):
+        limit = min(limit, max(CHARS_PER_TOKEN, len(remaining) // 2))
+
+    if len(remaining) > limit:
+        state.truncated_total += 1
+        return remaining[:limit], "length", prompt_tokens
+    return remaining, "stop", prompt_tokens
+
+
+def create_app(config: SimulatorConfig) -> FastAPI:
+    """시뮬레이터 FastAPI 앱 생성"""
+    app = FastAPI(title="VLM Simulator")
+    state = SimulatorState(config)
+    app.state.simulator = state
+
+    @app.get("/health")
+    async def health():
+        return PlainTextResponse("")
+
+    @app.get("/v1/models")
+    async def models():
+        return {
+            "object": "list",
+            "data": [{"id": config.model, "object": "model", "owned_by": "simulator"}],
+        }
+
+    @app.get("/metrics")
+    async def metrics():
+        usage = min(1.0, state.reserved_tokens / config.kv_cache_tokens)
+        lines = [
+            f'vllm:num_requests_running{{model_name="{config.model}"}} {state.running}',
+            f'vllm:num_requests_waiting{{model_name="{config.model}"}} {state.waiting}',
+            f'vllm:gpu_cache_usage_perc{{model_name="{config.model}"}} {usage:.4f}',
+            f'vllm:request_success_total{{model_name="{config.model}"}} {state.requests_total}',
+            f"simulator_errors_total {state.errors_total}",
+            f"simulator_truncated_total {state.truncated_total}",
+        ]
+        return PlainTextResponse("\n".join(lines) + "\n")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        if payload.get("model") not in (None, config.model):
+            return JSONResponse(
+                status_code=404,
+                content={"error": {"message": f"model {payload.get('model')} not found"}},
+            )
+
+        if state.waiting >= config.max_waiting:
+            state.errors_total += 1
+            return JSONResponse(status_code=503, content={"error": {"message": "server overloaded"}})
+
+        max_tokens = int(payload.get("max_tokens") or 8192)
+        state.waiting += 1
+        await state.semaphore.acquire()
+        state.waiting -= 1
+        state.running += 1
+        state.reserved_tokens += max_tokens
+
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                state.running -= 1
+                state.reserved_tokens -= max_tokens
+                state.semaphore.release()
+
+        try:
+            if state.roll(config.error_rate):
+                state.errors_total += 1
+                await asyncio.sleep(config.latency_ms / 1000 * 0.1)
+                release()
+                return JSONResponse(status_code=500, content={"error": {"message": "simulated failure"}})
+
+            if state.roll(config.timeout_rate):
+                await asyncio.sleep(config.hang_seconds)
+
+            try:
+                text, finish_reason, prompt_tokens = await asyncio.to_thread(generate_completion, state, payload)
+            except MediaFetchError as e:
+                state.errors_total += 1
+                release()
+                return JSONResponse(status_code=400, content={"error": {"message": f"failed to load image: {e}"}})
+            completion_tokens = _count_tokens(text)
+            jitter = 1 + state.rng.uniform(-config.jitter, config.jitter)
+            prefill = config.latency_ms / 1000 * jitter
+            decode = completion_tokens / config.tokens_per_second
+            request_id = f"chatcmpl-{uuid.uuid4().hex[:16]}"
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+
+            if payload.get("stream"):
+                async def stream():
+                    try:
+                        await asyncio.sleep(prefill)
+                        chunk_chars = 64
+                        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)] or [""]
+                        delay = decode / len(chunks)
+                        for i, piece in enumerate(chunks):
+                            await asyncio.sleep(delay)
+                            data = {
+                                "id": request_id,
+                                "object": "chat.completion.chunk",
+                                "created": int(time.time()),
+                                "model": config.model,
+                                "choices": [{
+                                    "index": 0,
+                                    "delta": {"role": "assistant", "content": piece} if i == 0 else {"content": piece},
+                                    "finish_reason": finish_reason if i == len(chunks) - 1 else None,
+                                }],
+                            }
+                            if i == len(chunks) - 1 and (payload.get("stream_options") or {}).get("include_usage"):
+                                data["usage"] = usage
+                            yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+                        yield "data: [DONE]\n\n"
+                        state.requests_total += 1
+                    finally:
+                        release()
+
+                return StreamingResponse(stream(), media_type="text/event-stream")
+
+            await asyncio.sleep(prefill + decode)
+            state.requests_total += 1
+            release()
+            return {
+                "id": request_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": config.model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": usage,
+            }
+        except BaseException:
+            release()
+            raise
+
+    return app
+
+
+def parse_args(argv: Optional[List[str]] = None) -> Tuple[argparse.Namespace, SimulatorConfig]:
+    parser = argparse.ArgumentParser(description="OpenAI 호환 VLM 시뮬레이터")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--model", default="chandra", help="served model name")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="요청당 기본 지연 (ms)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="지연 편차 비율")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="요청당 디코딩 속도")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="동시 처리 요청 수")
+    parser.add_argument("--max-waiting", type=int, default=64, help="대기열 한도 (초과 시 503)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="5xx 응답 비율")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="응답 지연(hang) 비율")
+    parser.add_argument("--hang-seconds", type=float, default=300.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="출력 강제 잘림 비율")
+    parser.add_argument("--loop-rate", type=float, default=0.0, help="반복 루프 출력 비율")
+    parser.add_argument("--allowed-local-media-path", default=None, help="file:// 이미지 허용 경로")
+    parser.add_argument("--max-images-per-prompt", type=int, default=4, help="요청당 이미지 수 한도")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = SimulatorConfig(
+        model=args.model,
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        max_concurrency=args.max_concurrency,
+        max_waiting=args.max_waiting,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        truncate_rate=args.truncate_rate,
+        loop_rate=args.loop_rate,
+        allowed_media_path=args.allowed_local_media_path,
+        max_images_per_prompt=args.max_images_per_prompt,
+        seed=args.seed,
+    )
+    return args, config
+
+
+def main():
+    args, config = parse_args()
+    print(f"VLM simulator: http://{args.host}:{args.port}/v1 (model={config.model})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,16 +9,26 @@ Chandra: https://github.com/datalab-to/chandra
 import os
 import re
 import json
+import math
+import time
+import uuid
 import base64
 import logging
+import threading
 from io import BytesIO
-from typing import List, Dict, Any, Optional
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Any, Optional, Tuple, Union, Callable, Iterable, Iterator
 from dataclasses import dataclass, field
+from html import escape
 
 import httpx
 from PIL import Image
 from pdf2image import convert_from_path
 
+from app.core.vlm_endpoints import parse_endpoint_spec
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,6 +69,460 @@ class PageOCRResult:
     html: str
     confidence: float
     layout_score: float = 0.0
+    tile_count: int = 1  # 고밀도 페이지 타일 분할 수
+    continuations: int = 0  # 잘린 출력 이어받기 요청 수 (타일 합계)
+    pack_size: int = 1  # 함께 요청한 이미지 수 (소형 페이지 묶음 요청)
+    max_tokens: Optional[int] = None  # 요청한 max_tokens (타일 합계)
+    completion_tokens: Optional[int] = None
+    finish_reason: Optional[str] = None  # 타일 중 하나라도 잘리면 "length"
+
+
+@dataclass
+class SkippedPage:
+    """제한 시간 초과 또는 요청 오류로 VLM 결과를 받지 못한 페이지 (호출 측에서 다른 엔진으로 처리)"""
+    page_no: int
+    reason: str  # "page_deadline", "document_deadline" 또는 "error"
+    error: Optional[str] = None  # reason == "error"일 때 오류 내용
+
+
+# 전송 전 페이지의 전송 여부를 확인하는 간격 (페이지 제한 시간은 전송 시점부터)
+DISPATCH_POLL_SECONDS = 0.2
+
+
+# 모델별 비전 토큰 1개가 담당하는 픽셀 크기 (patch_size * spatial_merge_size)
+# vLLM은 이미지를 이 크기의 배수로 리사이즈한 뒤 격자 단위로 토큰화한다
+VISION_TOKEN_PIXELS = {
+    "chandra": 32,      # Qwen3-VL 기반
+    "qwen3-vl": 32,     # patch 16 x merge 2
+    "qwen2.5-vl": 28,   # patch 14 x merge 2
+    "qwen2-vl": 28,
+}
+DEFAULT_VISION_TOKEN_PIXELS = 28
+
+
+@dataclass
+class ImageSizingPolicy:
+    """
+    비전 토큰 예산 기반 이미지 크기/품질 결정 정책
+
+    - 모델별 토큰 격자 크기로 이미지당 비전 토큰 수를 추정
+    - 예산을 넘으면 예산에 맞게 축소
+    - 글자가 빽빽한 페이지는 축소 대신 겹치는 가로 타일로 분할
+    - JPEG 품질은 페이로드 크기 제한을 넘지 않는 가장 높은 값 선택
+    """
+    token_pixels: int = DEFAULT_VISION_TOKEN_PIXELS
+    max_image_tokens: int = 1536
+    max_tiles: int = 4
+    tile_overlap: float = 0.08
+    min_scale: float = 0.5  # 이보다 더 축소해야 하면 타일 분할
+    dense_ink_ratio: float = 0.08  # 잉크 픽셀 비율이 이 이상이면 고밀도 페이지
+    max_payload_bytes: int = 2 * 1024 * 1024
+    jpeg_qualities: Tuple[int, ...] = (92, 85, 75, 60)
+
+    @classmethod
+    def for_model(cls, model_name: str, **kwargs) -> "ImageSizingPolicy":
+        """모델 이름으로 토큰 격자 크기를 결정하여 정책 생성"""
+        name = (model_name or "").lower()
+        token_pixels = DEFAULT_VISION_TOKEN_PIXELS
+        for prefix, pixels in VISION_TOKEN_PIXELS.items():
+            if prefix in name:
+                token_pixels = pixels
+                break
+        return cls(token_pixels=token_pixels, **kwargs)
+
+    def estimate_tokens(self, width: int, height: int) -> int:
+        """이미지 크기로 비전 토큰 수 추정"""
+        tp = self.token_pixels
+        return max(1, round(width / tp)) * max(1, round(height / tp))
+
+    def fit_scale(self, width: int, height: int) -> float:
+        """토큰 예산에 맞추기 위한 축소 비율 (1.0 = 원본 유지)"""
+        tokens = self.estimate_tokens(width, height)
+        if tokens <= self.max_image_tokens:
+            return 1.0
+        scale = math.sqrt(self.max_image_tokens / tokens)
+        # 반올림 오차로 예산을 넘는 경우 조금씩 더 축소
+        while scale > 0.05 and self.estimate_tokens(
+            int(width * scale), int(height * scale)
+        ) > self.max_image_tokens:
+            scale *= 0.97
+        return scale
+
+    def resize(self, image: Image.Image) -> Image.Image:
+        """토큰 예산에 맞게 이미지 리사이즈"""
+        scale = self.fit_scale(*image.size)
+        if scale >= 1.0:
+            return image
+        new_size = (max(1, int(image.size[0] * scale)), max(1, int(image.size[1] * scale)))
+        logger.info(f"Image resized {image.size} -> {new_size} (token budget {self.max_image_tokens})")
+        return image.resize(new_size, Image.Resampling.LANCZOS)
+
+    def ink_ratio(self, image: Image.Image) -> float:
+        """저해상도 흑백 변환 후 어두운 픽셀 비율 (텍스트 밀도 근사치)"""
+        sample = image.convert("L")
+        sample.thumbnail((256, 256))
+        histogram = sample.histogram()
+        total = sum(histogram)
+        return sum(histogram[:128]) / total if total else 0.0
+
+    def plan_tiles(self, image: Image.Image) -> List[Tuple[int, int, int, int]]:
+        """
+        타일 분할 계획 (가로 띠 형태, 위에서 아래 순서)
+
+        Returns:
+            (left, top, right, bottom) 박스 리스트. 분할이 필요 없으면 전체 박스 1개
+        """
+        width, height = image.size
+        full = [(0, 0, width, height)]
+        if self.max_tiles <= 1:
+            return full
+
+        scale = self.fit_scale(width, height)
+        if scale >= 1.0:
+            return full
+        if scale >= self.min_scale and self.ink_ratio(image) < self.dense_ink_ratio:
+            return full
+
+        tokens = self.estimate_tokens(width, height)
+        count = min(self.max_tiles, math.ceil(tokens / self.max_image_tokens))
+        if count <= 1:
+            return full
+
+        step = height / count
+        overlap = int(step * self.tile_overlap)
+        boxes = []
+        for i in range(count):
+            top = max(0, int(i * step) - overlap)
+            bottom = min(height, int((i + 1) * step) + overlap)
+            boxes.append((0, top, width, bottom))
+        return boxes
+
+    def encode(self, image: Image.Image) -> Tuple[bytes, int]:
+        """페이로드 제한 내 최고 품질로 JPEG 인코딩 (bytes, quality)"""
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        data = b""
+        quality = self.jpeg_qualities[-1]
+        for quality in self.jpeg_qualities:
+            buffer = BytesIO()
+            image.save(buffer, format="JPEG", quality=quality)
+            data = buffer.getvalue()
+            # base64 인코딩 시 4/3 배로 증가
+            if len(data) * 4 / 3 <= self.max_payload_bytes:
+                break
+        return data, quality
+
+
+@dataclass
+class VLMResponse:
+    """VLM 단일 요청 응답"""
+    content: str
+    finish_reason: Optional[str] = None  # "stop", "length" 등
+    completion_tokens: Optional[int] = None
+    max_tokens: Optional[int] = None
+    continuations: int = 0  # 잘린 출력을 이어 받은 추가 요청 수
+
+    @property
+    def truncated(self) -> bool:
+        return self.finish_reason == "length"
+
+
+class OutputTokenEstimator:
+    """
+    페이지별 출력 토큰 수 추정기
+
+    페이지의 잉크(어두운 픽셀) 비율로 예상 출력 길이를 추정하여 max_tokens를
+    그보다 조금 크게 설정한다. vLLM은 max_tokens 기준으로 KV 캐시를 예약하므로
+    과도한 고정값 대신 추정값을 쓰면 동시 배치 수가 늘어난다.
+
+    - 정상 종료(stop) 응답으로 잉크 비율당 토큰 수를 이동 평균으로 학습
+    - length로 잘린 응답이 나오면 안전 계수를 키움
+    """
+
+    def __init__(
+        self,
+        min_tokens: int = 256,
+        max_tokens: int = 8192,
+        tokens_per_ink: float = 25000.0,
+        margin: float = 1.3,
+    ):
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.tokens_per_ink = tokens_per_ink
+        self.base_margin = margin
+        self.margin = margin
+        self.truncated_count = 0
+        self.observed_count = 0
+        self._lock = threading.Lock()
+
+    def estimate(self, ink_ratio: float) -> int:
+        """잉크 비율로 max_tokens 결정"""
+        with self._lock:
+            expected = ink_ratio * self.tokens_per_ink * self.margin
+        return int(min(self.max_tokens, max(self.min_tokens, math.ceil(expected))))
+
+    def observe(self, ink_ratio: float, response: VLMResponse):
+        """응답 결과로 추정기 갱신"""
+        with self._lock:
+            self.observed_count += 1
+            if response.truncated:
+                self.truncated_count += 1
+                self.margin = min(self.margin * 1.25, 4.0)
+                return
+            if response.completion_tokens and ink_ratio >= 0.005:
+                ratio = response.completion_tokens / ink_ratio
+                self.tokens_per_ink = 0.9 * self.tokens_per_ink + 0.1 * ratio
+                # 잘림 없이 여유가 있으면 안전 계수를 천천히 기본값으로 복귀
+                self.margin = max(self.base_margin, self.margin * 0.98)
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tokens_per_ink": self.tokens_per_ink,
+                "margin": self.margin,
+                "truncated_count": self.truncated_count,
+                "observed_count": self.observed_count,
+            }
+
+    def load_state(self, state: Optional[Dict[str, Any]]):
+        if not state:
+            return
+        with self._lock:
+            self.tokens_per_ink = float(state.get("tokens_per_ink", self.tokens_per_ink))
+            self.margin = max(self.base_margin, float(state.get("margin", self.margin)))
+
+
+class VLMUnavailableError(RuntimeError):
+    """사용 가능한 VLM 엔드포인트가 없음"""
+
+
+@dataclass
+class VLMEndpoint:
+    """vLLM 레플리카 엔드포인트 상태/통계"""
+    api_base: str
+    weight: float = 1.0
+    in_flight: int = 0
+    healthy: bool = True
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    latency_ms_avg: Optional[float] = None  # 지수 이동 평균
+    last_error: Optional[str] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "api_base": self.api_base,
+            "weight": self.weight,
+            "in_flight": self.in_flight,
+            "healthy": self.healthy,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms_avg": round(self.latency_ms_avg, 2) if self.latency_ms_avg is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+def parse_endpoints(spec: Union[str, Iterable[str]]) -> List[VLMEndpoint]:
+    """
+    엔드포인트 설정 파싱 (형식은 app.core.vlm_endpoints와 공유)
+
+    "http://gpu1:8000/v1;weight=2,http://gpu2:8000/v1" 형식의 문자열 또는 리스트
+    """
+    return [VLMEndpoint(api_base=url, weight=weight) for url, weight in parse_endpoint_spec(spec)]
+
+
+class VLMEndpointPool:
+    """
+    다중 vLLM 엔드포인트 로드 밸런서
+
+    - 가중치 대비 처리 중 요청 수가 가장 적은 엔드포인트로 라우팅
+    - 연속 실패가 max_failures에 도달하면 eject_seconds 동안 제외
+    - 제외 기간이 끝나면 헬스 체크 통과 시 재투입
+    - probe_interval마다 모든 엔드포인트를 능동 검사 (요청이 들어오는 동안 백그라운드 스레드에서)
+    """
+
+    def __init__(
+        self,
+        endpoints: List[VLMEndpoint],
+        probe: Optional[Callable[[VLMEndpoint], bool]] = None,
+        max_failures: int = 3,
+        eject_seconds: float = 30.0,
+        on_stats: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        stats_interval: float = 5.0,
+        probe_interval: float = 0.0,
+    ):
+        if not endpoints:
+            raise ValueError("At least one VLM endpoint is required")
+        self.endpoints = endpoints
+        self.probe = probe
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.on_stats = on_stats
+        self.stats_interval = stats_interval
+        self._lock = threading.Lock()
+        self._last_stats = 0.0
+        self.probe_interval = probe_interval
+        self._next_probe = time.time() + probe_interval
+
+    def _readmit_due(self):
+        """제외 기간이 끝난 엔드포인트 헬스 체크 후 재투입"""
+        now = time.time()
+        with self._lock:
+            due = [e for e in self.endpoints if not e.healthy and e.ejected_until <= now]
+            # 동시에 여러 스레드가 같은 엔드포인트를 검사하지 않도록 다음 검사 시점 예약
+            for endpoint in due:
+                endpoint.ejected_until = now + self.eject_seconds
+        for endpoint in due:
+            if self.probe is None or self.probe(endpoint):
+                with self._lock:
+                    endpoint.healthy = True
+                    endpoint.consecutive_failures = 0
+                logger.info(f"VLM endpoint re-admitted: {endpoint.api_base}")
+
+    def _probe_due(self):
+        """주기적 헬스 체크 시점이면 백그라운드 스레드에서 전체 검사 (요청 경로는 대기하지 않음)"""
+        if self.probe is None or self.probe_interval <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            if now < self._next_probe:
+                return
+            self._next_probe = now + self.probe_interval
+        threading.Thread(target=self.probe_all, name="vlm-health-probe", daemon=True).start()
+
+    def probe_all(self) -> bool:
+        """모든 엔드포인트 헬스 체크 후 결과 반영 (하나라도 정상이면 True)"""
+        healthy = False
+        for endpoint in self.endpoints:
+            ok = self.probe is None or self.probe(endpoint)
+            self.mark_health(endpoint, ok)
+            healthy = healthy or ok
+        return healthy
+
+    def _pick(self, exclude: Optional[List[VLMEndpoint]]) -> VLMEndpoint:
+        """가중치 대비 처리 중 요청이 가장 적은 정상 엔드포인트 (self._lock 안에서 호출)"""
+        candidates = [
+            e for e in self.endpoints
+            if e.healthy and not (exclude and e in exclude)
+        ]
+        if not candidates:
+            raise VLMUnavailableError("No healthy VLM endpoint available")
+        return min(
+            candidates,
+            key=lambda e: ((e.in_flight + 1) / e.weight, e.latency_ms_avg or 0.0),
+        )
+
+    def select(self, exclude: Optional[List[VLMEndpoint]] = None) -> VLMEndpoint:
+        """요청을 보낼 엔드포인트 선택만 수행 (전송 직전에 begin으로 in_flight 증가)"""
+        self._readmit_due()
+        self._probe_due()
+        with self._lock:
+            return self._pick(exclude)
+
+    def begin(self, endpoint: VLMEndpoint):
+        """요청 전송 시작 기록 (in_flight 증가, release와 짝)"""
+        with self._lock:
+            endpoint.in_flight += 1
+
+    def acquire(self, exclude: Optional[List[VLMEndpoint]] = None) -> VLMEndpoint:
+        """요청을 보낼 엔드포인트 선택 (in_flight 증가)"""
+        self._readmit_due()
+        self._probe_due()
+        with self._lock:
+            endpoint = self._pick(exclude)
+            endpoint.in_flight += 1
+            return endpoint
+
+    def release(self, endpoint: VLMEndpoint, latency_ms: float, error: Optional[str] = None):
+        """요청 완료 기록 (in_flight 감소, 통계 갱신, 필요 시 제외)"""
+        with self._lock:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+            endpoint.requests += 1
+            if error:
+                endpoint.errors += 1
+                endpoint.consecutive_failures += 1
+                endpoint.last_error = error
+                if endpoint.healthy and endpoint.consecutive_failures >= self.max_failures:
+                    endpoint.healthy = False
+                    endpoint.ejected_until = time.time() + self.eject_seconds
+                    logger.warning(f"VLM endpoint ejected: {endpoint.api_base} ({error})")
+            else:
+                endpoint.consecutive_failures = 0
+                if endpoint.latency_ms_avg is None:
+                    endpoint.latency_ms_avg = latency_ms
+                else:
+                    endpoint.latency_ms_avg = 0.8 * endpoint.latency_ms_avg + 0.2 * latency_ms
+        self._publish_stats()
+
+    def mark_health(self, endpoint: VLMEndpoint, healthy: bool):
+        """헬스 체크 결과 반영"""
+        with self._lock:
+            if healthy:
+                endpoint.healthy = True
+                endpoint.consecutive_failures = 0
+            elif endpoint.healthy:
+                endpoint.healthy = False
+                endpoint.ejected_until = time.time() + self.eject_seconds
+        self._publish_stats(force=True)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [e.snapshot() for e in self.endpoints]
+
+    def _publish_stats(self, force: bool = False):
+        if self.on_stats is None:
+            return
+        now = time.time()
+        if not force and now - self._last_stats < self.stats_interval:
+            return
+        self._last_stats = now
+        try:
+            self.on_stats(self.snapshot())
+        except Exception as e:
+            logger.warning(f"Failed to publish VLM endpoint stats: {e}")
+
+
+# 서버가 참조 이미지를 가져오지 못했을 때의 4xx 오류 메시지 문구 (소문자)
+# 그 외 4xx(컨텍스트 길이 초과, 검증 오류 등)는 인라인으로 다시 보내도 같은 오류이므로 그대로 실패
+REFERENCE_ERROR_HINTS = (
+    "allowed-local-media-path",
+    "local media",
+    "fetch",
+    "download",
+    "cannot connect",
+    "no such file",
+    "cannot identify image",
+    "failed to load image",
+)
+
+
+class SharedVolumeImageStore:
+    """
+    공유 볼륨 이미지 저장소 (file 전송 모드)
+
+    워커와 vLLM 서버가 같은 디렉토리를 마운트하고, vLLM은
+    --allowed-local-media-path 로 해당 경로를 허용해야 한다.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, data: bytes) -> Tuple[str, str]:
+        """이미지 저장 후 (file:// URL, 삭제 키) 반환"""
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}.jpg")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)  # 서버가 쓰는 중인 파일을 읽지 않도록
+        return f"file://{path}", path
+
+    def delete(self, key: str):
+        try:
+            os.remove(key)
+        except OSError:
+            pass
 
 
 class VLMClient:
@@ -97,31 +561,77 @@ For tables, use:
 
 Extract the document content:"""
 
+    # 여러 이미지 묶음 요청 시 프롬프트 뒤에 추가
+    PACK_PROMPT_SUFFIX = """
+
+This request contains {count} separate document images, numbered in order.
+Process each image independently and do not merge content across images.
+Before the output of each image, write a line exactly in the form:
+=== IMAGE k ===
+where k is the image number (1 to {count})."""
+
     def __init__(
         self,
-        api_base: str = "http://localhost:8080/v1",
+        api_base: Union[str, List[str]] = "http://localhost:8080/v1",
         model_name: str = "qwen3-vl",
         max_tokens: int = 8192,
         timeout: int = 120,
+        sizing: Optional[ImageSizingPolicy] = None,
+        max_retries: int = 1,
+        on_endpoint_stats: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        token_estimator: Optional[OutputTokenEstimator] = None,
+        max_continuations: int = 2,
+        image_store: Optional[Any] = None,
+        admission: Optional[Any] = None,
+        health_probe_interval: float = 0.0,
     ):
         """
         Args:
-            api_base: vLLM 서버 API 기본 URL
+            api_base: vLLM 서버 API 기본 URL (쉼표 구분 또는 리스트로 여러 레플리카 지정,
+                "url;weight=2" 형식으로 가중치 지정)
             model_name: 모델 이름 (vLLM served-model-name)
             max_tokens: 최대 출력 토큰 수
             timeout: 요청 타임아웃 (초)
+            sizing: 이미지 크기/품질 정책 (기본: 모델 기준 정책)
+            max_retries: 연결 오류/5xx 시 다른 엔드포인트로 재시도할 횟수
+            on_endpoint_stats: 엔드포인트 통계 발행 콜백
+            token_estimator: 페이지별 max_tokens 추정기 (없으면 max_tokens 고정)
+            max_continuations: 출력이 max_tokens에서 잘렸을 때 이어받기 요청 최대 횟수
+            image_store: 이미지 참조 전송용 저장소 (put(bytes) -> (url, key), delete(key)).
+                없으면 base64 인라인 전송
+            admission: 전역 동시 요청 제한기 (acquire(api_base) -> slot, release(api_base, slot))
+            health_probe_interval: 엔드포인트 주기적 헬스 체크 간격 (초, 0이면 제외된 엔드포인트만 검사)
         """
-        self.api_base = api_base.rstrip("/")
+        self.pool = VLMEndpointPool(
+            parse_endpoints(api_base),
+            probe=self._probe,
+            on_stats=on_endpoint_stats,
+            probe_interval=health_probe_interval,
+        )
+        self.api_base = self.pool.endpoints[0].api_base
         self.model_name = model_name
         self.max_tokens = max_tokens
         self.timeout = timeout
+        self.sizing = sizing or ImageSizingPolicy.for_model(model_name)
+        self.max_retries = max_retries
+        self.token_estimator = token_estimator
+        self.max_continuations = max_continuations
+        self.image_store = image_store
+        self.admission = admission
+        self.reference_fallback_limit = 3  # 연속 실패 시 인라인 전송으로 전환
+        self._reference_failures = 0
+        self._reference_lock = threading.Lock()
         self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        self._dispatch = threading.local()
 
     @property
     def client(self) -> httpx.Client:
-        """HTTP 클라이언트 지연 초기화"""
+        """HTTP 클라이언트 지연 초기화 (여러 스레드에서 공유)"""
         if self._client is None:
-            self._client = httpx.Client(timeout=self.timeout)
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(timeout=self.timeout)
         return self._client
 
     def close(self):
@@ -136,30 +646,88 @@ Extract the document content:"""
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-    def health_check(self) -> bool:
-        """서버 상태 확인"""
+    @contextmanager
+    def on_dispatch(self, callback: Optional[Callable[[], None]]):
+        """
+        현재 스레드의 요청이 실제로 전송될 때마다 callback 호출
+
+        전역 동시 요청 한도(admission) 대기가 끝나고 HTTP 요청을 보내기 직전에 호출되므로
+        호출 측은 대기 시간을 뺀 처리 시간을 잴 수 있다. 타일 요청 스레드에도 이어진다.
+        """
+        previous = getattr(self._dispatch, "callback", None)
+        self._dispatch.callback = callback
+        try:
+            yield
+        finally:
+            self._dispatch.callback = previous
+
+    def _probe(self, endpoint: VLMEndpoint) -> bool:
+        """개별 엔드포인트 상태 확인"""
         try:
-            response = self.client.get(f"{self.api_base}/models")
+            response = self.client.get(f"{endpoint.api_base}/models", timeout=10)
             return response.status_code == 200
         except Exception as e:
-            logger.error(f"VLM health check failed: {e}")
+            logger.error(f"VLM health check failed ({endpoint.api_base}): {e}")
             return False
 
-    def _image_to_base64(self, image: Image.Image, max_dim: int = 2048) -> str:
-        """PIL 이미지를 base64 문자열로 변환 (크기 제한 포함)"""
-        # 이미지 크기가 max_dim을 초과하면 리사이즈
-        if max(image.size) > max_dim:
-            ratio = max_dim / max(image.size)
-            new_size = (int(image.size[0] * ratio), int(image.size[1] * ratio))
-            image = image.resize(new_size, Image.Resampling.LANCZOS)
-            logger.info(f"Image resized to {new_size}")
-
-        buffer = BytesIO()
-        # JPEG로 저장 (용량 최적화)
-        if image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")
-        image.save(buffer, format="JPEG", quality=95)
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+    def health_check(self) -> bool:
+        """서버 상태 확인 (모든 엔드포인트 검사, 하나라도 정상이면 True)"""
+        return self.pool.probe_all()
+
+    def endpoint_stats(self) -> List[Dict[str, Any]]:
+        """엔드포인트별 지연 시간/오류 통계"""
+        return self.pool.snapshot()
+
+    def _encode_image(self, image: Image.Image) -> bytes:
+        """토큰 예산에 맞게 크기/품질을 조정한 JPEG 바이트"""
+        image = self.sizing.resize(image)
+        data, _ = self.sizing.encode(image)
+        return data
+
+    @staticmethod
+    def _inline_url(data: bytes) -> str:
+        return f"data:image/jpeg;base64,{base64.b64encode(data).decode('utf-8')}"
+
+    def _image_url(self, data: bytes) -> Tuple[str, Optional[str]]:
+        """
+        요청에 넣을 이미지 URL
+
+        Returns:
+            (이미지 URL, 참조 저장소 키 - 인라인이면 None)
+        """
+        if self.image_store is None or self._reference_failures >= self.reference_fallback_limit:
+            return self._inline_url(data), None
+        try:
+            return self.image_store.put(data)
+        except Exception as e:
+            logger.warning(f"Image reference upload failed, sending inline: {e}")
+            return self._inline_url(data), None
+
+    @staticmethod
+    def _is_reference_error(error: httpx.HTTPStatusError, urls: List[str]) -> bool:
+        """4xx 오류가 서버의 참조 이미지 가져오기 실패인지 (오류 본문에 참조 URL이나 가져오기 실패 문구)"""
+        try:
+            body = error.response.text
+        except Exception:
+            return False
+        lowered = body.lower()
+        return (
+            any(url.split("?", 1)[0] in body for url in urls)
+            or any(hint in lowered for hint in REFERENCE_ERROR_HINTS)
+        )
+
+    def _reference_failed(self, error: Exception):
+        """서버가 참조 URL을 가져오지 못한 경우 집계 (연속 실패 시 인라인 전환, 페이지/타일 스레드 공유)"""
+        logger.warning(f"VLM server could not fetch image reference, retrying inline: {error}")
+        with self._reference_lock:
+            self._reference_failures += 1
+            disabled = self._reference_failures == self.reference_fallback_limit
+        if disabled:
+            logger.warning("Image reference transport disabled after repeated failures; using inline images")
+
+    def _reference_succeeded(self):
+        with self._reference_lock:
+            self._reference_failures = 0
 
     def ocr(
         self,
@@ -178,6 +746,27 @@ Extract the document content:"""
         Returns:
             OCR 결과 텍스트 (Markdown 형식)
         """
+        return self.complete(image, prompt_type, custom_prompt).content
+
+    def complete(
+        self,
+        image: Image.Image,
+        prompt_type: str = "ocr_layout",
+        custom_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> VLMResponse:
+        """
+        이미지 OCR 요청 (종료 사유/토큰 사용량 포함)
+
+        Args:
+            image: PIL 이미지
+            prompt_type: 프롬프트 타입 ("ocr" 또는 "ocr_layout")
+            custom_prompt: 사용자 정의 프롬프트 (선택)
+            max_tokens: 최대 출력 토큰 수 (기본: 추정기 또는 self.max_tokens)
+
+        Returns:
+            VLM 응답
+        """
         # 프롬프트 선택
         if custom_prompt:
             prompt = custom_prompt
@@ -186,54 +775,553 @@ Extract the document content:"""
         else:
             prompt = self.OCR_PROMPT
 
-        # 이미지 base64 인코딩
-        image_base64 = self._image_to_base64(image)
+        # 페이지 텍스트 밀도로 출력 길이 추정
+        ink_ratio = None
+        if max_tokens is None and self.token_estimator is not None:
+            ink_ratio = self.sizing.ink_ratio(image)
+            max_tokens = min(self.max_tokens, self.token_estimator.estimate(ink_ratio))
+        max_tokens = max_tokens or self.max_tokens
+
+        # 추정기는 첫 응답 기준으로 학습 (잘리면 다음 페이지부터 여유분 확대)
+        observe = None
+        if ink_ratio is not None:
+            observe = lambda response: self.token_estimator.observe(ink_ratio, response)
+
+        return self._request([self._encode_image(image)], prompt, max_tokens, on_first_response=observe)
+
+    def complete_packed(
+        self,
+        images: List[Image.Image],
+        prompt_type: str = "ocr_layout",
+    ) -> List[Optional[VLMResponse]]:
+        """
+        여러 소형 이미지를 한 요청으로 OCR
+
+        고정 프롬프트와 요청당 오버헤드를 이미지 여러 장이 나눠 쓰도록 한 메시지에 담고,
+        이미지별 구분 줄(=== IMAGE k ===)로 출력을 받아 다시 나눈다.
+
+        Returns:
+            이미지별 응답 (구분 줄을 찾지 못한 이미지는 None - 호출 측에서 단독 재요청)
+        """
+        prompt = self.OCR_LAYOUT_PROMPT if prompt_type == "ocr_layout" else self.OCR_PROMPT
+        prompt += self.PACK_PROMPT_SUFFIX.format(count=len(images))
+
+        if self.token_estimator is not None:
+            max_tokens = sum(self.token_estimator.estimate(self.sizing.ink_ratio(image)) for image in images)
+        else:
+            max_tokens = self.max_tokens
+        max_tokens = min(self.max_tokens, max_tokens)
+
+        response = self._request([self._encode_image(image) for image in images], prompt, max_tokens)
+        parts = split_packed_markdown(response.content, len(images))
+
+        total_chars = sum(len(part) for part in parts.values()) or 1
+        responses: List[Optional[VLMResponse]] = []
+        for index in range(1, len(images) + 1):
+            part = parts.get(index)
+            if part is None:
+                responses.append(None)
+                continue
+            share = len(part) / total_chars
+            responses.append(VLMResponse(
+                content=part,
+                # 잘린 경우 마지막으로 받은 이미지만 미완성
+                finish_reason=response.finish_reason if index == max(parts) else "stop",
+                completion_tokens=(
+                    round(response.completion_tokens * share) if response.completion_tokens is not None else None
+                ),
+                max_tokens=round(max_tokens / len(images)),
+                continuations=response.continuations,
+            ))
+        return responses
+
+    def _request(
+        self,
+        images_data: List[bytes],
+        prompt: str,
+        max_tokens: int,
+        on_first_response: Optional[Callable[[VLMResponse], None]] = None,
+    ) -> VLMResponse:
+        """
+        이미지(들) + 프롬프트 chat/completions 요청
+
+        참조 전송 실패 시 인라인 재요청, 잘린 출력 이어받기, 임시 이미지 정리 포함
+        """
+        # 이미지 인코딩 (참조 저장소가 있으면 URL, 없으면 base64 인라인)
+        image_refs = [self._image_url(data) for data in images_data]
 
         # vLLM OpenAI 호환 API 요청 구성
-        # Vision 모델용 멀티모달 메시지 형식
+        # Vision 모델용 멀티모달 메시지 형식 (여러 장이면 이미지 앞에 번호 표시)
+        content: List[Dict[str, Any]] = []
+        image_parts: List[Dict[str, Any]] = []
+        for index, (image_url, _) in enumerate(image_refs, start=1):
+            if len(image_refs) > 1:
+                content.append({"type": "text", "text": f"Image {index}:"})
+            part = {"type": "image_url", "image_url": {"url": image_url}}
+            image_parts.append(part)
+            content.append(part)
+        content.append({"type": "text", "text": prompt})
+
         payload = {
             "model": self.model_name,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_base64}"
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": prompt
-                        }
-                    ]
-                }
-            ],
-            "max_tokens": self.max_tokens,
+            "messages": [{"role": "user", "content": content}],
+            "max_tokens": max_tokens,
             "temperature": 0.1,  # 낮은 temperature로 일관된 출력
         }
+        referenced = [key for _, key in image_refs if key is not None]
 
         try:
-            response = self.client.post(
-                f"{self.api_base}/chat/completions",
-                json=payload,
-                timeout=self.timeout,
+            try:
+                result = self._post_chat(payload)
+            except httpx.HTTPStatusError as e:
+                # 4xx 중 서버가 참조 URL을 가져오지 못한 경우만 같은 이미지를 인라인으로 재요청
+                if (
+                    not referenced
+                    or e.response.status_code >= 500
+                    or not self._is_reference_error(e, [url for url, key in image_refs if key is not None])
+                ):
+                    raise
+                self._reference_failed(e)
+                for part, data in zip(image_parts, images_data):
+                    part["image_url"]["url"] = self._inline_url(data)
+                result = self._post_chat(payload)
+            else:
+                if referenced:
+                    self._reference_succeeded()
+
+            choice = result["choices"][0]
+            response = VLMResponse(
+                content=choice["message"]["content"] or "",
+                finish_reason=choice.get("finish_reason"),
+                completion_tokens=(result.get("usage") or {}).get("completion_tokens"),
+                max_tokens=max_tokens,
+            )
+            if on_first_response is not None:
+                on_first_response(response)
+            if response.truncated:
+                response = self._continue(payload, response)
+            return response
+        finally:
+            for key in referenced:
+                self.image_store.delete(key)
+
+    def _continue(self, payload: Dict[str, Any], response: VLMResponse) -> VLMResponse:
+        """
+        max_tokens에서 잘린 출력 이어받기
+
+        지금까지의 출력을 assistant 메시지로 붙여 같은 이미지/프롬프트로 재요청한다.
+        vLLM의 continue_final_message 옵션으로 모델이 마지막 메시지를 이어서 생성하므로
+        페이지 전체를 다시 OCR할 필요가 없다.
+        """
+        content = response.content
+        completion_tokens = response.completion_tokens
+        finish_reason = response.finish_reason
+        continuations = 0
+
+        while finish_reason == "length" and continuations < self.max_continuations:
+            continuation_payload = {
+                **payload,
+                "messages": payload["messages"] + [{"role": "assistant", "content": content}],
+                "max_tokens": self.max_tokens,
+                "continue_final_message": True,
+                "add_generation_prompt": False,
+            }
+            try:
+                result = self._post_chat(continuation_payload)
+            except Exception as e:
+                # 이어받기 실패 시 잘린 결과라도 반환
+                logger.warning(f"VLM continuation failed, keeping truncated output: {e}")
+                break
+
+            continuations += 1
+            choice = result["choices"][0]
+            chunk = choice["message"]["content"] or ""
+            finish_reason = choice.get("finish_reason")
+            usage_tokens = (result.get("usage") or {}).get("completion_tokens")
+            completion_tokens = (
+                completion_tokens + usage_tokens
+                if completion_tokens is not None and usage_tokens is not None else None
+            )
+            if not chunk.strip():
+                break
+            content += chunk
+
+        if finish_reason == "length":
+            logger.warning(
+                f"VLM output still truncated after {continuations} continuation(s) "
+                f"(max_tokens={response.max_tokens})"
             )
-            response.raise_for_status()
+        else:
+            logger.info(f"VLM output completed with {continuations} continuation(s)")
+
+        return VLMResponse(
+            content=content,
+            finish_reason=finish_reason,
+            completion_tokens=completion_tokens,
+            max_tokens=response.max_tokens,
+            continuations=continuations,
+        )
 
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+    def _post_chat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        chat/completions 요청 (엔드포인트 선택 및 재시도 포함)
 
-        except httpx.TimeoutException:
-            logger.error(f"VLM request timeout after {self.timeout}s")
-            raise
-        except httpx.HTTPStatusError as e:
-            logger.error(f"VLM API error: {e.response.status_code} - {e.response.text}")
-            raise
-        except Exception as e:
-            logger.error(f"VLM OCR failed: {e}")
-            raise
+        연결 오류, 타임아웃, 5xx 응답은 다른 엔드포인트로 max_retries회 재시도
+        """
+        tried: List[VLMEndpoint] = []
+        while True:
+            try:
+                endpoint = self.pool.select(exclude=tried)
+            except VLMUnavailableError:
+                if not tried:
+                    raise
+                # 남은 엔드포인트가 없으면 이미 시도한 엔드포인트 중에서 다시 선택
+                endpoint = self.pool.select()
+            tried.append(endpoint)
+            # 전역 동시 요청 한도 (여러 워커 간 공유)
+            # 대기 중인 요청은 in_flight/지연 통계에 넣지 않음 (실제 전송 시점부터 집계)
+            slot = self.admission.acquire(endpoint.api_base) if self.admission else None
+            try:
+                self.pool.begin(endpoint)
+                start = time.time()
+                dispatched = getattr(self._dispatch, "callback", None)
+                if dispatched is not None:
+                    dispatched()
+                response = self.client.post(
+                    f"{endpoint.api_base}/chat/completions",
+                    json=payload,
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                result = response.json()
+                self.pool.release(endpoint, (time.time() - start) * 1000)
+                return result
+
+            except httpx.TimeoutException:
+                logger.error(f"VLM request timeout after {self.timeout}s ({endpoint.api_base})")
+                self.pool.release(endpoint, (time.time() - start) * 1000, error="timeout")
+                if len(tried) > self.max_retries:
+                    raise
+            except httpx.HTTPStatusError as e:
+                logger.error(f"VLM API error: {e.response.status_code} - {e.response.text}")
+                status_code = e.response.status_code
+                # 4xx는 요청 자체의 문제이므로 엔드포인트 실패로 집계하지 않음
+                self.pool.release(
+                    endpoint,
+                    (time.time() - start) * 1000,
+                    error=f"HTTP {status_code}" if status_code >= 500 else None,
+                )
+                if status_code < 500 or len(tried) > self.max_retries:
+                    raise
+            except httpx.TransportError as e:
+                logger.error(f"VLM connection failed ({endpoint.api_base}): {e}")
+                self.pool.release(endpoint, (time.time() - start) * 1000, error=str(e) or type(e).__name__)
+                if len(tried) > self.max_retries:
+                    raise
+            except Exception as e:
+                logger.error(f"VLM OCR failed: {e}")
+                self.pool.release(endpoint, (time.time() - start) * 1000, error=str(e))
+                raise
+            finally:
+                if slot is not None:
+                    self.admission.release(endpoint.api_base, slot)
+
+    def ocr_page(
+        self,
+        image: Image.Image,
+        prompt_type: str = "ocr_layout",
+    ) -> Tuple[str, List[VLMResponse]]:
+        """
+        페이지 OCR (고밀도 페이지는 타일 분할 후 병렬 요청)
+
+        Returns:
+            (Markdown 결과, 타일별 VLM 응답 리스트)
+        """
+        boxes = self.sizing.plan_tiles(image)
+        if len(boxes) == 1:
+            response = self.complete(image, prompt_type=prompt_type)
+            return response.content, [response]
+
+        logger.info(f"Dense page split into {len(boxes)} tiles")
+        tiles = [image.crop(box) for box in boxes]
+        callback = getattr(self._dispatch, "callback", None)
+
+        def complete_tile(tile: Image.Image) -> VLMResponse:
+            with self.on_dispatch(callback):
+                return self.complete(tile, prompt_type=prompt_type)
+
+        with ThreadPoolExecutor(max_workers=len(tiles)) as executor:
+            responses = list(executor.map(complete_tile, tiles))
+        return stitch_tile_markdown([r.content for r in responses]), responses
+
+
+PACK_MARKER_PATTERN = re.compile(r"^\s*=+\s*IMAGE\s+(\d+)\s*=+\s*$", re.MULTILINE | re.IGNORECASE)
+
+
+def split_packed_markdown(text: str, count: int) -> Dict[int, str]:
+    """
+    묶음 요청 출력을 이미지별로 분리
+
+    Returns:
+        {이미지 번호: Markdown}. 구분 줄이 없거나 중복/범위 밖인 번호는 제외
+    """
+    matches = list(PACK_MARKER_PATTERN.finditer(text))
+    parts: Dict[int, str] = {}
+    for i, match in enumerate(matches):
+        index = int(match.group(1))
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        if 1 <= index <= count and index not in parts:
+            parts[index] = text[match.end():end].strip()
+    return parts
+
+
+def stitch_tile_markdown(parts: List[str], window: int = 8) -> str:
+    """
+    타일별 Markdown 결과를 순서대로 이어 붙이기
+
+    타일 경계의 겹치는 영역은 양쪽 타일에 모두 나타나므로,
+    다음 타일의 앞부분 줄 중 이전 타일 끝부분(window 줄 이내)에 이미 있는 줄은 제거
+    """
+    merged: List[str] = []
+    for part in parts:
+        lines = part.strip("\n").split("\n")
+        tail = {line.strip() for line in merged[-window:] if line.strip()}
+        skip = 0
+        for line in lines[:window]:
+            if line.strip() and line.strip() in tail:
+                skip += 1
+            elif not line.strip() and skip:
+                skip += 1
+            else:
+                break
+        merged.extend(lines[skip:])
+    return "\n".join(merged).strip()
+
+
+# VLM Markdown 출력 파싱 패턴 (모듈 로드 시 한 번만 컴파일)
+HEADER_PATTERN = re.compile(r"^(#+)\s*")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\|[\s\-:|]+\|$")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+INLINE_PATTERN = re.compile(
+    r"!\[(?P<alt>[^\]]*)\]\((?P<src>[^)]+)\)"
+    r"|\[(?P<link>[^\]]+)\]\((?P<href>[^)]+)\)"
+    r"|\*\*(?P<strong>[^*]+)\*\*"
+    r"|\*(?P<em>[^*]+)\*"
+    r"|`(?P<code>[^`]+)`"
+)
+LIST_MARKERS = ("- ", "* ", "+ ")
+
+
+def _has_inline(text: str) -> bool:
+    """인라인 서식 후보 문자가 있는지 (대부분의 줄은 정규식 없이 통과)"""
+    return "*" in text or "`" in text or "](" in text
+
+
+def _is_plain_html(text: str) -> bool:
+    """서식도 이스케이프할 문자도 없어 그대로 HTML에 넣을 수 있는지"""
+    return not ("&" in text or "<" in text or ">" in text or _has_inline(text))
+
+
+def _plain_inline(match: "re.Match") -> str:
+    if match.group("alt") is not None:
+        return ""  # 이미지
+    return match.group("link") or match.group("strong") or match.group("em") or match.group("code")
+
+
+def _strip_inline(text: str) -> str:
+    """인라인 서식 제거 (볼드/이탤릭/링크/인라인 코드는 내용만, 이미지는 삭제)"""
+    if not _has_inline(text):
+        return text
+    return INLINE_PATTERN.sub(_plain_inline, text)
+
+
+def _inline_html(text: str) -> str:
+    """인라인 서식을 HTML로 변환 (나머지 텍스트는 이스케이프)"""
+    if _is_plain_html(text):
+        return text
+    if not _has_inline(text):
+        return escape(text, quote=False)
+    parts = []
+    pos = 0
+    for match in INLINE_PATTERN.finditer(text):
+        parts.append(escape(text[pos:match.start()], quote=False))
+        if match.group("alt") is not None:
+            parts.append(f'<img src="{escape(match.group("src"))}" alt="{escape(match.group("alt"))}">')
+        elif match.group("link"):
+            parts.append(f'<a href="{escape(match.group("href"))}">{escape(match.group("link"), quote=False)}</a>')
+        elif match.group("strong"):
+            parts.append(f"<strong>{escape(match.group('strong'), quote=False)}</strong>")
+        elif match.group("em"):
+            parts.append(f"<em>{escape(match.group('em'), quote=False)}</em>")
+        else:
+            parts.append(f"<code>{escape(match.group('code'), quote=False)}</code>")
+        pos = match.end()
+    parts.append(escape(text[pos:], quote=False))
+    return "".join(parts)
+
+
+@dataclass
+class ParsedMarkdown:
+    """VLM Markdown 출력 파싱 결과"""
+    blocks: List[OCRBlock]
+    raw_text: str
+    html: str
+
+
+class _MarkdownTokenizer:
+    """
+    줄 단위 Markdown 토크나이저
+
+    헤더/표/리스트/코드/문단을 구분하면서 블록, 순수 텍스트 줄, HTML 조각을 함께 생성
+    - 빈 줄과 헤더는 블록 경계, 표/리스트는 종류가 바뀔 때 경계
+    - 리스트 뒤의 일반 텍스트 줄은 리스트 항목의 이어지는 줄로 취급
+    - 순수 텍스트에서 표와 코드 블록은 제외
+    """
+
+    def __init__(self):
+        self.blocks: List[OCRBlock] = []
+        self.text_lines: List[str] = []
+        self.html_parts: List[str] = []
+        self.current: List[str] = []
+        self.current_type = "text"
+        self.code_lines: Optional[List[str]] = None  # 코드 블록 안이면 원본 줄 목록
+
+    def feed(self, line: str):
+        stripped = line.strip()
+
+        if self.code_lines is not None:
+            self.current.append(stripped)
+            if stripped.startswith("```"):
+                self._flush()
+            else:
+                self.code_lines.append(line)
+            return
+
+        if not stripped:
+            self._flush()
+            self.text_lines.append("")
+            return
+
+        if stripped.startswith("```"):
+            self._flush()
+            self.current.append(stripped)
+            self.code_lines = []
+            self.text_lines.append("")
+            return
+
+        if stripped[0] == "#":
+            self._flush()
+            match = HEADER_PATTERN.match(stripped)
+            header_text = stripped[match.end():]
+            level = min(len(match.group(1)), 6)
+            self._add_block(header_text, "header")
+            self.html_parts.append(f"<h{level}>{_inline_html(header_text)}</h{level}>")
+            self.text_lines.append(_strip_inline(header_text))
+            return
+
+        if stripped[0] == "|" and stripped[-1] == "|":
+            if self.current_type != "table":
+                self._flush()
+                self.current_type = "table"
+            self.current.append(stripped)
+            self.text_lines.append("")
+            return
+
+        if stripped[:2] in LIST_MARKERS and len(stripped) > 2:
+            if self.current_type != "list":
+                self._flush()
+                self.current_type = "list"
+            self.current.append(stripped)
+            self.text_lines.append(_strip_inline(stripped[2:]))
+            return
+
+        if self.current_type == "table":
+            self._flush()
+        self.current.append(stripped)
+        self.text_lines.append(_strip_inline(stripped))
+
+    def finish(self) -> ParsedMarkdown:
+        self._flush()
+        raw_text = BLANK_LINES_PATTERN.sub("\n\n", "\n".join(self.text_lines)).strip()
+        return ParsedMarkdown(blocks=self.blocks, raw_text=raw_text, html="\n".join(self.html_parts))
+
+    def _add_block(self, text: str, block_type: str, table: Optional[Table] = None):
+        self.blocks.append(
+            OCRBlock(
+                text=text,
+                bbox=[0.05, 0.05, 0.95, 0.95],
+                confidence=0.95,
+                block_type=block_type,
+                table=table,
+                reading_order=len(self.blocks),
+            )
+        )
+
+    def _flush(self):
+        """현재 블록 종료"""
+        if not self.current:
+            return
+        lines = self.current
+        table = None
+        if self.code_lines is not None:
+            code = escape("\n".join(self.code_lines), quote=False)
+            self.html_parts.append(f"<pre><code>{code}</code></pre>")
+            self.code_lines = None
+        elif self.current_type == "table":
+            table, html = self._table(lines)
+            self.html_parts.append(html)
+        elif self.current_type == "list":
+            self.html_parts.append(self._list_html(lines))
+        else:
+            self.html_parts.append("<p>" + "<br>".join(_inline_html(line) for line in lines) + "</p>")
+        self._add_block("\n".join(lines), self.current_type, table)
+        self.current = []
+        self.current_type = "text"
+
+    @staticmethod
+    def _table(lines: List[str]) -> Tuple[Optional[Table], str]:
+        """표 행 파싱 → (Table, HTML). 구분선 바로 위 행은 머리글"""
+        rows: List[List[str]] = []
+        html_rows: List[str] = []
+        for line in lines:
+            if "-" in line and TABLE_SEPARATOR_PATTERN.match(line):
+                if len(rows) == 1:
+                    html_rows[0] = html_rows[0].replace("td>", "th>")
+                continue
+            cells = [cell for cell in (c.strip() for c in line.split("|")) if cell]
+            if not cells:
+                continue
+            rows.append(cells)
+            # 숫자 위주 행은 셀별 변환 없이 한 번에 조립
+            html_cells = cells if _is_plain_html(line) else [_inline_html(c) for c in cells]
+            html_rows.append("<tr><td>" + "</td><td>".join(html_cells) + "</td></tr>")
+        if not rows:
+            return None, ""
+        table = Table(rows=rows, bbox=[0.05, 0.05, 0.95, 0.95], confidence=0.95)
+        return table, "<table>" + "".join(html_rows) + "</table>"
+
+    @staticmethod
+    def _list_html(lines: List[str]) -> str:
+        items: List[str] = []
+        for line in lines:
+            if line[:2] in LIST_MARKERS:
+                items.append(_inline_html(line[2:]))
+            else:
+                items[-1] += "<br>" + _inline_html(line)
+        return "<ul>" + "".join(f"<li>{item}</li>" for item in items) + "</ul>"
+
+
+def parse_markdown(markdown: str) -> ParsedMarkdown:
+    """
+    VLM Markdown 출력을 한 번 훑어서 블록 목록, 순수 텍스트, HTML을 함께 생성
+
+    Returns:
+        ParsedMarkdown (blocks, raw_text, html)
+    """
+    tokenizer = _MarkdownTokenizer()
+    for line in markdown.split("\n"):
+        tokenizer.feed(line)
+    return tokenizer.finish()
 
 
 class ChandraOCRProcessor:
@@ -250,20 +1338,81 @@ class ChandraOCRProcessor:
         max_tokens: int = 8192,
         timeout: int = 120,
         dpi: int = 300,
+        max_image_tokens: Optional[int] = None,
+        max_tiles: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        on_endpoint_stats: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        adaptive_max_tokens: Optional[bool] = None,
+        max_continuations: Optional[int] = None,
+        image_transport: Optional[str] = None,
+        image_store: Optional[Any] = None,
+        image_shared_dir: Optional[str] = None,
+        admission: Optional[Any] = None,
+        pack_max_images: Optional[int] = None,
+        pack_token_budget: Optional[int] = None,
+        health_probe_interval: Optional[float] = None,
     ):
         """
         Args:
-            api_base: vLLM 서버 URL (기본: 환경변수 또는 localhost:8080)
+            api_base: vLLM 서버 URL, 쉼표로 여러 레플리카 지정 가능
+                (기본: 환경변수 VLM_API_BASES / VLM_API_BASE 또는 localhost:8080)
             model_name: 모델 이름 (기본: chandra)
-            max_tokens: 최대 출력 토큰 수
+            max_tokens: 최대 출력 토큰 수 (adaptive_max_tokens 사용 시 상한)
             timeout: 요청 타임아웃 (초)
-            dpi: PDF 렌더링 해상도
+            dpi: PDF 렌더링 해상도 (모델 입력 크기는 토큰 예산으로 별도 조정)
+            max_image_tokens: 이미지당 비전 토큰 예산 (기본: 환경변수 또는 1536)
+            max_tiles: 고밀도 페이지 최대 타일 수 (기본: 환경변수 또는 4, 1이면 분할 안 함)
+            concurrency: 동시에 처리할 페이지 수 (기본: 환경변수 또는 2)
+            on_endpoint_stats: 엔드포인트 통계 발행 콜백
+            adaptive_max_tokens: 페이지 텍스트 밀도로 max_tokens 추정 (기본: 환경변수 또는 사용)
+            max_continuations: 잘린 출력 이어받기 최대 횟수 (기본: 환경변수 또는 2, 0이면 사용 안 함)
+            image_transport: 이미지 전송 방식 (기본: 환경변수 VLM_IMAGE_TRANSPORT 또는 inline)
+                - inline: base64 data URL
+                - file: 공유 볼륨(VLM_IMAGE_SHARED_DIR)에 저장 후 file:// URL
+                - minio: image_store(MinIO 사전 서명 URL) 사용
+            image_store: 참조 전송용 저장소 (minio 모드에서 호출 측이 주입)
+            image_shared_dir: file 모드 공유 볼륨 경로 (기본: 환경변수 또는 /shared/vlm-images)
+            admission: 워커 간 공유 동시 요청 제한기 (없으면 워커별 concurrency만 적용)
+            pack_max_images: 소형 페이지를 한 요청에 묶는 최대 수 (기본: 환경변수 또는 1 = 사용 안 함)
+            pack_token_budget: 묶음 요청의 비전 토큰 합계 상한 (기본: 이미지당 토큰 예산)
+            health_probe_interval: 엔드포인트 주기적 헬스 체크 간격 (기본: 환경변수 또는 30초, 0이면 사용 안 함)
         """
-        self.api_base = api_base or os.getenv("VLM_API_BASE", "http://localhost:8080/v1")
+        self.api_base = (
+            api_base
+            or os.getenv("VLM_API_BASES")
+            or os.getenv("VLM_API_BASE", "http://localhost:8080/v1")
+        )
         self.model_name = model_name or os.getenv("VLM_MODEL_NAME", "qwen3-vl")
         self.max_tokens = max_tokens
         self.timeout = timeout
         self.dpi = dpi
+        self.sizing = ImageSizingPolicy.for_model(
+            self.model_name,
+            max_image_tokens=max_image_tokens or int(os.getenv("VLM_MAX_IMAGE_TOKENS", "1536")),
+            max_tiles=max_tiles or int(os.getenv("VLM_MAX_TILES", "4")),
+        )
+        self.concurrency = max(1, concurrency or int(os.getenv("VLM_CONCURRENCY", "2")))
+        self.on_endpoint_stats = on_endpoint_stats
+        if adaptive_max_tokens is None:
+            adaptive_max_tokens = os.getenv("VLM_ADAPTIVE_MAX_TOKENS", "true").lower() == "true"
+        self.token_estimator = OutputTokenEstimator(max_tokens=max_tokens) if adaptive_max_tokens else None
+        if max_continuations is None:
+            max_continuations = int(os.getenv("VLM_MAX_CONTINUATIONS", "2"))
+        self.max_continuations = max(0, max_continuations)
+        self.image_transport = (image_transport or os.getenv("VLM_IMAGE_TRANSPORT", "inline")).lower()
+        if image_store is None and self.image_transport == "file":
+            image_store = SharedVolumeImageStore(
+                image_shared_dir or os.getenv("VLM_IMAGE_SHARED_DIR", "/shared/vlm-images")
+            )
+        elif self.image_transport == "inline":
+            image_store = None
+        self.image_store = image_store
+        self.admission = admission
+        self.pack_max_images = max(1, pack_max_images or int(os.getenv("VLM_PACK_MAX_IMAGES", "1")))
+        self.pack_token_budget = pack_token_budget or self.sizing.max_image_tokens
+        if health_probe_interval is None:
+            health_probe_interval = float(os.getenv("VLM_HEALTH_PROBE_SECONDS", "30"))
+        self.health_probe_interval = max(0.0, health_probe_interval)
 
         self._client: Optional[VLMClient] = None
 
@@ -276,13 +1425,171 @@ class ChandraOCRProcessor:
                 model_name=self.model_name,
                 max_tokens=self.max_tokens,
                 timeout=self.timeout,
+                sizing=self.sizing,
+                on_endpoint_stats=self.on_endpoint_stats,
+                token_estimator=self.token_estimator,
+                max_continuations=self.max_continuations,
+                image_store=self.image_store,
+                admission=self.admission,
+                health_probe_interval=self.health_probe_interval,
             )
         return self._client
 
+    def close(self):
+        """VLM 클라이언트 종료"""
+        if self._client:
+            self._client.close()
+            self._client = None
+
     def health_check(self) -> bool:
         """VLM 서버 상태 확인"""
         return self.client.health_check()
 
+    def iter_process_images(
+        self,
+        pages: Iterable[Tuple[int, Image.Image]],
+        deadline: Optional[float] = None,
+        page_timeout: Optional[float] = None,
+        skip_errors: bool = False,
+    ) -> Iterator[Union[PageOCRResult, SkippedPage]]:
+        """
+        여러 페이지를 동시에 처리하며 페이지 순서대로 결과 반환
+
+        최대 concurrency개 요청만 미리 제출하므로, 반복을 중단하면 남은 페이지는 전송되지 않음.
+        pack_max_images > 1이면 연속된 소형 페이지를 토큰 예산 안에서 한 요청으로 묶는다.
+
+        Args:
+            pages: (페이지 번호, PIL 이미지) 목록
+            deadline: 문서 전체 마감 시각 (time.time() 기준). 지나면 새 페이지를 보내지 않음
+            page_timeout: 요청당 최대 처리 시간 (초, 요청이 실제로 전송된 시점부터.
+                스레드/전역 동시 요청 한도 대기 시간은 포함하지 않음)
+            skip_errors: 요청이 실패한 페이지를 예외 대신 SkippedPage(reason="error")로 반환
+                (호출 측에서 페이지 단위로 다른 엔진에 넘길 때 사용)
+
+        Yields:
+            페이지별 OCR 결과 (입력 순서). 제한 시간을 넘기거나 실패한 페이지는 SkippedPage
+        """
+        pages = iter(pages)
+        self.client  # 스레드 시작 전 클라이언트 생성
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        pending = deque()
+
+        def submit(batch: List[Tuple[int, Image.Image]]):
+            dispatched: Dict[str, float] = {}
+
+            def run():
+                # 첫 요청이 전송된 시각 (페이지 제한 시간 기준)
+                with self.client.on_dispatch(lambda: dispatched.setdefault("at", time.time())):
+                    if len(batch) == 1:
+                        return self.process_image_pil(batch[0][1], batch[0][0])
+                    return self.process_images_packed(batch)
+
+            pending.append(([page_no for page_no, _ in batch], executor.submit(run), dispatched))
+
+        def wait(page_nos: List[int], future, dispatched: Dict[str, float]) -> List[Union[PageOCRResult, SkippedPage]]:
+            while True:
+                limits = []
+                if page_timeout and "at" in dispatched:
+                    limits.append(dispatched["at"] + page_timeout)
+                if deadline:
+                    limits.append(deadline)
+                timeout = max(0.0, min(limits) - time.time()) if limits else None
+                # 아직 전송 전이면 전송 시점을 알 수 있도록 짧게 나눠 대기
+                undispatched = bool(page_timeout) and "at" not in dispatched
+                if undispatched:
+                    timeout = DISPATCH_POLL_SECONDS if timeout is None else min(timeout, DISPATCH_POLL_SECONDS)
+                try:
+                    result = future.result(timeout=timeout)
+                    return result if isinstance(result, list) else [result]
+                except FutureTimeoutError:
+                    if undispatched and not (deadline and time.time() >= deadline):
+                        continue
+                    # 실행 중인 요청은 중단할 수 없으므로 결과만 버림 (HTTP timeout으로 정리됨)
+                    future.cancel()
+                    reason = "document_deadline" if deadline and time.time() >= deadline else "page_deadline"
+                    logger.warning(f"Pages {page_nos} exceeded {reason}, skipping VLM result")
+                    return [SkippedPage(page_no=page_no, reason=reason) for page_no in page_nos]
+                except Exception as e:
+                    if not skip_errors:
+                        raise
+                    logger.warning(f"Pages {page_nos} failed on VLM, skipping: {e}")
+                    return [SkippedPage(page_no=page_no, reason="error", error=str(e)) for page_no in page_nos]
+
+        batch: List[Tuple[int, Image.Image]] = []
+        batch_tokens = 0
+        try:
+            for page_no, image in pages:
+                if deadline and time.time() >= deadline:
+                    # 문서 마감 이후: 이미 보낸 페이지를 정리하고 나머지는 전송하지 않음
+                    while pending:
+                        yield from wait(*pending.popleft())
+                    for skipped_no, _ in batch:
+                        yield SkippedPage(page_no=skipped_no, reason="document_deadline")
+                    batch = []
+                    yield SkippedPage(page_no=page_no, reason="document_deadline")
+                    for page_no, _ in pages:
+                        yield SkippedPage(page_no=page_no, reason="document_deadline")
+                    return
+
+                tokens = self._pack_tokens(image)
+                if batch and (
+                    tokens is None
+                    or len(batch) >= self.pack_max_images
+                    or batch_tokens + tokens > self.pack_token_budget
+                ):
+                    submit(batch)
+                    batch, batch_tokens = [], 0
+                if tokens is None:
+                    submit([(page_no, image)])
+                else:
+                    batch.append((page_no, image))
+                    batch_tokens += tokens
+
+                while len(pending) >= self.concurrency:
+                    yield from wait(*pending.popleft())
+
+            if batch:
+                submit(batch)
+                batch = []
+            while pending:
+                yield from wait(*pending.popleft())
+        finally:
+            for _, future, _ in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _pack_tokens(self, image: Image.Image) -> Optional[int]:
+        """묶음 요청 대상이면 비전 토큰 수, 아니면 None (최소 2장이 예산에 들어가는 소형 이미지만)"""
+        if self.pack_max_images <= 1:
+            return None
+        tokens = self.sizing.estimate_tokens(*image.size)
+        return tokens if tokens <= self.pack_token_budget // 2 else None
+
+    def process_images_packed(self, batch: List[Tuple[int, Image.Image]]) -> List[PageOCRResult]:
+        """
+        소형 페이지 여러 장을 한 요청으로 처리
+
+        출력에서 구분 줄을 찾지 못한 페이지는 단독 요청으로 다시 처리하고,
+        서버가 다중 이미지 요청을 거부하면(4xx) 이후 묶음 요청을 사용하지 않는다.
+        """
+        images = [image.convert("RGB") if image.mode != "RGB" else image for _, image in batch]
+        try:
+            responses = self.client.complete_packed(images, prompt_type="ocr_layout")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                raise
+            logger.warning(f"VLM server rejected multi-image request, disabling packing: {e}")
+            self.pack_max_images = 1
+            responses = [None] * len(batch)
+
+        results = []
+        for (page_no, _), image, response in zip(batch, images, responses):
+            if response is None:
+                results.append(self._process_image(image, page_no))
+            else:
+                results.append(self._build_result(image, page_no, response.content, [response], pack_size=len(batch)))
+        return results
+
     def process_pdf(self, pdf_path: str) -> List[PageOCRResult]:
         """
         PDF 파일 정밀 OCR 처리
@@ -341,15 +1648,24 @@ class ChandraOCRProcessor:
         """
         이미지 정밀 OCR 처리 (내부)
         """
-        width, height = image.size
+        # VLM OCR 실행 (토큰 예산 초과 고밀도 페이지는 타일 분할)
+        markdown_text, responses = self.client.ocr_page(image, prompt_type="ocr_layout")
+        return self._build_result(image, page_no, markdown_text, responses)
 
-        # VLM OCR 실행
-        markdown_text = self.client.ocr(image, prompt_type="ocr_layout")
+    def _build_result(
+        self,
+        image: Image.Image,
+        page_no: int,
+        markdown_text: str,
+        responses: List[VLMResponse],
+        pack_size: int = 1,
+    ) -> PageOCRResult:
+        """VLM 출력으로 페이지 결과 구성"""
+        width, height = image.size
 
-        # 결과 파싱
-        raw_text = self._extract_plain_text(markdown_text)
-        html_text = self._markdown_to_html(markdown_text)
-        blocks = self._parse_blocks_from_markdown(markdown_text, width, height)
+        # 결과 파싱 (블록/순수 텍스트/HTML 단일 패스)
+        parsed = parse_markdown(markdown_text)
+        blocks = parsed.blocks
 
         # 평균 confidence 계산 (VLM은 일반적으로 높은 정확도)
         confidences = [b.confidence for b in blocks if b.confidence > 0]
@@ -360,213 +1676,20 @@ class ChandraOCRProcessor:
             width=width,
             height=height,
             blocks=blocks,
-            raw_text=raw_text,
+            raw_text=parsed.raw_text,
             markdown=markdown_text,
-            html=html_text,
+            html=parsed.html,
             confidence=avg_confidence,
             layout_score=0.9,
-        )
-
-    def _extract_plain_text(self, markdown: str) -> str:
-        """Markdown에서 순수 텍스트 추출"""
-        text = markdown
-        # 마크다운 문법 제거
-        text = re.sub(r"#+\s*", "", text)  # 헤더
-        text = re.sub(r"\*\*([^*]+)\*\*", r"\1", text)  # 볼드
-        text = re.sub(r"\*([^*]+)\*", r"\1", text)  # 이탤릭
-        text = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", text)  # 링크
-        text = re.sub(r"!\[([^\]]*)\]\([^)]+\)", "", text)  # 이미지
-        text = re.sub(r"```[^`]*```", "", text, flags=re.DOTALL)  # 코드 블록
-        text = re.sub(r"`([^`]+)`", r"\1", text)  # 인라인 코드
-        text = re.sub(r"\|[^\n]+\|", "", text)  # 테이블 행
-        text = re.sub(r"[-*]\s+", "", text)  # 리스트
-        text = re.sub(r"\n{3,}", "\n\n", text)  # 다중 줄바꿈
-        return text.strip()
-
-    def _markdown_to_html(self, markdown: str) -> str:
-        """간단한 Markdown to HTML 변환"""
-        html = markdown
-
-        # 헤더
-        html = re.sub(r"^### (.+)$", r"<h3>\1</h3>", html, flags=re.MULTILINE)
-        html = re.sub(r"^## (.+)$", r"<h2>\1</h2>", html, flags=re.MULTILINE)
-        html = re.sub(r"^# (.+)$", r"<h1>\1</h1>", html, flags=re.MULTILINE)
-
-        # 볼드/이탤릭
-        html = re.sub(r"\*\*([^*]+)\*\*", r"<strong>\1</strong>", html)
-        html = re.sub(r"\*([^*]+)\*", r"<em>\1</em>", html)
-
-        # 줄바꿈
-        html = re.sub(r"\n\n", r"</p><p>", html)
-        html = f"<p>{html}</p>"
-
-        return html
-
-    def _parse_blocks_from_markdown(
-        self, markdown: str, page_width: int, page_height: int
-    ) -> List[OCRBlock]:
-        """Markdown에서 블록 구조 추출"""
-        blocks = []
-        lines = markdown.split("\n")
-        current_block = []
-        current_type = "text"
-        block_order = 0
-
-        for line in lines:
-            stripped = line.strip()
-
-            if not stripped:
-                # 빈 줄 - 블록 구분
-                if current_block:
-                    text = "\n".join(current_block)
-                    blocks.append(
-                        OCRBlock(
-                            text=text,
-                            bbox=[0.05, 0.05, 0.95, 0.95],
-                            confidence=0.95,
-                            block_type=current_type,
-                            reading_order=block_order,
-                        )
-                    )
-                    block_order += 1
-                    current_block = []
-                    current_type = "text"
-                continue
-
-            # 블록 타입 감지
-            if stripped.startswith("#"):
-                if current_block:
-                    blocks.append(
-                        OCRBlock(
-                            text="\n".join(current_block),
-                            bbox=[0.05, 0.05, 0.95, 0.95],
-                            confidence=0.95,
-                            block_type=current_type,
-                            reading_order=block_order,
-                        )
-                    )
-                    block_order += 1
-                    current_block = []
-
-                # 헤더 블록
-                header_text = re.sub(r"^#+\s*", "", stripped)
-                blocks.append(
-                    OCRBlock(
-                        text=header_text,
-                        bbox=[0.05, 0.05, 0.95, 0.95],
-                        confidence=0.95,
-                        block_type="header",
-                        reading_order=block_order,
-                    )
-                )
-                block_order += 1
-                continue
-
-            if stripped.startswith("|") and stripped.endswith("|"):
-                # 테이블 행
-                if current_type != "table":
-                    if current_block:
-                        blocks.append(
-                            OCRBlock(
-                                text="\n".join(current_block),
-                                bbox=[0.05, 0.05, 0.95, 0.95],
-                                confidence=0.95,
-                                block_type=current_type,
-                                reading_order=block_order,
-                            )
-                        )
-                        block_order += 1
-                        current_block = []
-                    current_type = "table"
-                current_block.append(stripped)
-                continue
-
-            if stripped.startswith(("-", "*", "+")) and len(stripped) > 2 and stripped[1] == " ":
-                # 리스트 아이템
-                if current_type != "list":
-                    if current_block:
-                        blocks.append(
-                            OCRBlock(
-                                text="\n".join(current_block),
-                                bbox=[0.05, 0.05, 0.95, 0.95],
-                                confidence=0.95,
-                                block_type=current_type,
-                                reading_order=block_order,
-                            )
-                        )
-                        block_order += 1
-                        current_block = []
-                    current_type = "list"
-                current_block.append(stripped)
-                continue
-
-            # 일반 텍스트
-            if current_type == "table":
-                # 테이블 종료
-                if current_block:
-                    table = self._parse_markdown_table(current_block)
-                    blocks.append(
-                        OCRBlock(
-                            text="\n".join(current_block),
-                            bbox=[0.05, 0.05, 0.95, 0.95],
-                            confidence=0.95,
-                            block_type="table",
-                            table=table,
-                            reading_order=block_order,
-                        )
-                    )
-                    block_order += 1
-                    current_block = []
-                current_type = "text"
-
-            current_block.append(stripped)
-
-        # 마지막 블록 처리
-        if current_block:
-            table = None
-            if current_type == "table":
-                table = self._parse_markdown_table(current_block)
-
-            blocks.append(
-                OCRBlock(
-                    text="\n".join(current_block),
-                    bbox=[0.05, 0.05, 0.95, 0.95],
-                    confidence=0.95,
-                    block_type=current_type,
-                    table=table,
-                    reading_order=block_order,
-                )
-            )
-
-        return blocks
-
-    def _parse_markdown_table(self, table_lines: List[str]) -> Optional[Table]:
-        """Markdown 테이블 파싱"""
-        if not table_lines:
-            return None
-
-        rows = []
-        for line in table_lines:
-            # 구분선 스킵
-            if re.match(r"^\|[\s\-:]+\|$", line):
-                continue
-
-            # 셀 추출
-            cells = [
-                cell.strip()
-                for cell in line.split("|")
-                if cell.strip()
-            ]
-            if cells:
-                rows.append(cells)
-
-        if not rows:
-            return None
-
-        return Table(
-            rows=rows,
-            bbox=[0.05, 0.05, 0.95, 0.95],
-            confidence=0.95,
+            tile_count=len(responses),
+            continuations=sum(r.continuations for r in responses),
+            pack_size=pack_size,
+            max_tokens=sum(r.max_tokens or 0 for r in responses) or None,
+            completion_tokens=(
+                sum(r.completion_tokens for r in responses)
+                if all(r.completion_tokens is not None for r in responses) else None
+            ),
+            finish_reason="length" if any(r.truncated for r in responses) else responses[-1].finish_reason,
         )
 
 